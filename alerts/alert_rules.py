@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Alert Rules - пороги алертов с гистерезисом
+
+Правило срабатывает один раз при пересечении порога входа и снова
+«взводится» только после возврата метрики ниже порога выхода. Это убирает
+дребезг алертов, когда значение колеблется около порога.
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+# Типы событий, на которые подписываются правила
+EVENT_BOOK = "book"
+EVENT_TRADE = "trade"
+EVENT_KLINE = "kline"
+EVENT_SCENARIO = "scenario"
+
+
+@dataclass(slots=True)
+class HysteresisRule:
+    """Порог с гистерезисом (состояние отдельно по каждому символу)"""
+
+    name: str
+    event: str
+    enter: float  # Срабатывание: value >= enter
+    exit: float  # Повторное взведение: value < exit
+    armed: Dict[str, bool] = field(default_factory=dict)
+
+    def update(self, symbol: str, value: float) -> bool:
+        """Новое значение метрики; True - правило сработало"""
+        is_armed = self.armed.get(symbol, True)
+
+        if is_armed and value >= self.enter:
+            self.armed[symbol] = False
+            return True
+
+        if not is_armed and value < self.exit:
+            self.armed[symbol] = True
+
+        return False
+
+    def rearm(self, symbol: str):
+        """Взвести снова (срабатывание не привело к алерту)"""
+        self.armed[symbol] = True
+
+    def reset(self, symbol: Optional[str] = None):
+        if symbol:
+            self.armed.pop(symbol, None)
+        else:
+            self.armed.clear()
+
+
+class LevelCrossRule:
+    """
+    Пробой ценовых уровней (POC/VAH/VAL) с полосой гистерезиса
+
+    Сторона цены относительно уровня меняется только когда цена ушла
+    дальше band (доля от уровня), иначе сохраняется прежняя.
+    """
+
+    __slots__ = ("name", "event", "band", "levels", "sides")
+
+    def __init__(self, name: str, band: float = 0.001, event: str = EVENT_KLINE):
+        self.name = name
+        self.event = event
+        self.band = band
+        self.levels: Dict[str, Dict[str, float]] = {}
+        self.sides: Dict[Tuple[str, str], int] = {}
+
+    def set_levels(self, symbol: str, levels: Dict[str, float]):
+        """Обновить уровни символа ({'POC': price, ...}); стороны пересчитаются"""
+        current = self.levels.get(symbol, {})
+        for level, price in levels.items():
+            if current.get(level) != price:
+                self.sides.pop((symbol, level), None)
+        self.levels[symbol] = {k: float(v) for k, v in levels.items() if v}
+
+    def update(self, symbol: str, price: float) -> List[Tuple[str, float, str]]:
+        """
+        Новая цена закрытия
+
+        Returns:
+            [(level, level_price, "UP"/"DOWN"), ...] для пробитых уровней
+        """
+        breaks = []
+        for level, level_price in self.levels.get(symbol, {}).items():
+            distance = price - level_price
+            if abs(distance) <= level_price * self.band:
+                continue  # Внутри полосы - сторона не меняется
+
+            side = 1 if distance > 0 else -1
+            key = (symbol, level)
+            previous = self.sides.get(key)
+            self.sides[key] = side
+
+            if previous is not None and previous != side:
+                breaks.append((level, level_price, "UP" if side > 0 else "DOWN"))
+
+        return breaks
+
+
+class RollingSum:
+    """Сумма значений за скользящее окно времени (по символам)"""
+
+    __slots__ = ("window", "_events", "_totals")
+
+    def __init__(self, window: float):
+        self.window = window
+        self._events: Dict[str, Deque[Tuple[float, float, Any]]] = {}
+        self._totals: Dict[str, float] = {}
+
+    def add(self, symbol: str, timestamp: float, value: float, item: Any = None) -> float:
+        """Добавить значение (timestamp в секундах), вернуть сумму за окно"""
+        events = self._events.setdefault(symbol, deque())
+        events.append((timestamp, value, item))
+        total = self._totals.get(symbol, 0.0) + value
+
+        cutoff = timestamp - self.window
+        while events and events[0][0] < cutoff:
+            total -= events.popleft()[1]
+
+        self._totals[symbol] = total
+        return total
+
+    def items(self, symbol: str) -> List[Any]:
+        """Объекты, попавшие в текущее окно"""
+        return [item for _, _, item in self._events.get(symbol, ())]
+
+
+class RollingMean:
+    """Среднее последних N значений (по символам)"""
+
+    __slots__ = ("size", "_values")
+
+    def __init__(self, size: int):
+        self.size = size
+        self._values: Dict[str, Deque[float]] = {}
+
+    def mean(self, symbol: str) -> Optional[float]:
+        values = self._values.get(symbol)
+        if not values:
+            return None
+        return sum(values) / len(values)
+
+    def count(self, symbol: str) -> int:
+        return len(self._values.get(symbol, ()))
+
+    def add(self, symbol: str, value: float):
+        self._values.setdefault(symbol, deque(maxlen=self.size)).append(value)
+
+
+__all__ = [
+    "HysteresisRule",
+    "LevelCrossRule",
+    "RollingSum",
+    "RollingMean",
+    "EVENT_BOOK",
+    "EVENT_TRADE",
+    "EVENT_KLINE",
+    "EVENT_SCENARIO",
+]
@@ -3,7 +3,8 @@
 """
 Enhanced Alerts System для GIO Crypto Bot v3.0
 Интеллектуальная система алертов с:
-- Автоматическим мониторингом всех пар
+- Оценкой правил по событиям (стакан, сделки, свечи) вместо опроса
+- Порогами с гистерезисом (без дребезга около порога)
 - Защитой от спама (cooldown + throttling)
 - Градацией важности
 - Адаптивными порогами для крипто-рынка
@@ -20,12 +21,30 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from collections import defaultdict
 
+from alerts.alert_rules import (
+    EVENT_BOOK,
+    EVENT_KLINE,
+    EVENT_SCENARIO,
+    EVENT_TRADE,
+    HysteresisRule,
+    LevelCrossRule,
+    RollingMean,
+    RollingSum,
+)
+
 logger = logging.getLogger(__name__)
 
 
 class EnhancedAlertsSystem:
     """
-    Расширенная система алертов с автоматическим мониторингом
+    Расширенная система алертов, управляемая событиями
+
+    Правила оцениваются только при приходе обновления для символа:
+    - on_orderbook → L2 дисбаланс
+    - on_trade → всплеск ликвидаций / крупных сделок
+    - on_kline (закрытая свеча) → всплеск объёма, пробой VP уровней
+    - on_scenario → смена сценария Market Maker
+    Фоновый цикл остаётся только для новостей.
 
     Features:
     - L2 Orderbook дисбаланс (с адаптивными порогами 85-90%)
@@ -64,10 +83,18 @@ class EnhancedAlertsSystem:
             # L2 Orderbook
             "l2_normal_threshold": 85.0,  # Сильный дисбаланс (85-90%)
             "l2_extreme_threshold": 90.0,  # Экстремальный (>90%)
+            "l2_release_threshold": 70.0,  # Повторное взведение после <70%
             # Ликвидации
             "liquidation_min_usd": 100000,  # Минимум $100K
+            "liquidation_window": 60,  # Окно суммирования крупных сделок (сек)
+            "liquidation_release_ratio": 0.5,  # Взведение при сумме < 50% порога
             # Всплески объёмов
             "volume_spike_multiplier": 3.0,  # 3x от среднего
+            "volume_spike_release": 1.5,  # Взведение при < 1.5x
+            "volume_avg_bars": 20,  # Свечей для среднего объёма
+            "volume_min_bars": 10,  # Минимум свечей для оценки
+            # Volume Profile
+            "vp_break_band": 0.001,  # Полоса гистерезиса вокруг уровня (0.1%)
             # Новости
             "news_critical_keywords": [
                 "SEC",
@@ -92,7 +119,6 @@ class EnhancedAlertsSystem:
             "vol_cooldown": 60,  # 1 минута между volume spike алертами
             "news_cooldown": 300,  # 5 минут между news алертами
             # Интервалы мониторинга
-            "monitoring_interval": 30,  # Основной цикл: 30 секунд
             "news_check_interval": 300,  # Проверка новостей: 5 минут
         }
 
@@ -116,6 +142,38 @@ class EnhancedAlertsSystem:
         self.volume_history = {}  # Для расчёта среднего объёма
         self.last_news_check = 0  # Timestamp последней проверки новостей
 
+        # ========== ПРАВИЛА (оцениваются по событиям) ==========
+        self.rules: Dict[str, HysteresisRule] = {}
+        self.register_rule(
+            "l2_imbalance",
+            EVENT_BOOK,
+            enter=self.config["l2_normal_threshold"],
+            exit=self.config["l2_release_threshold"],
+        )
+        self.register_rule(
+            "liquidations",
+            EVENT_TRADE,
+            enter=self.config["liquidation_min_usd"],
+            exit=self.config["liquidation_min_usd"]
+            * self.config["liquidation_release_ratio"],
+        )
+        self.register_rule(
+            "volume_spike",
+            EVENT_KLINE,
+            enter=self.config["volume_spike_multiplier"],
+            exit=self.config["volume_spike_release"],
+        )
+        self.vp_rule = LevelCrossRule("vp_break", band=self.config["vp_break_band"])
+
+        self.large_trade_flow = RollingSum(self.config["liquidation_window"])
+        self.kline_volumes = RollingMean(self.config["volume_avg_bars"])
+        # Время последней оценённой закрытой свечи (свечи из REST повторяются)
+        self.last_kline_ts: Dict[str, int] = {}
+        self.last_mm_scenario: Dict[str, str] = {}
+
+        # Отправка алертов не блокирует обработчики WebSocket
+        self._pending_tasks = set()
+
         # Флаг работы
         self.is_running = False
 
@@ -129,12 +187,11 @@ class EnhancedAlertsSystem:
 
     async def start_monitoring(self):
         """
-        Запуск автоматического мониторинга всех пар
+        Запуск мониторинга
 
-        Основной цикл проверяет каждые 30 секунд:
-        - L2 дисбаланс orderbook (все пары)
-        - Критичные новости (раз в 5 минут)
-        - Опционально: ликвидации и всплески объёмов
+        Рыночные алерты срабатывают по событиям (on_orderbook / on_trade /
+        on_kline / on_scenario), поэтому цикл проверяет только новости
+        (раз в news_check_interval).
         """
         if self.is_running:
             logger.warning("⚠️ EnhancedAlertsSystem уже запущен")
@@ -143,61 +200,22 @@ class EnhancedAlertsSystem:
         self.is_running = True
 
         logger.info(
-            f"🚨 Запуск мониторинга Enhanced Alerts для "
+            f"🚨 Запуск Enhanced Alerts (по событиям) для "
             f"{len(self.tracked_symbols)} пар: {', '.join(self.tracked_symbols)}"
         )
 
-        cycle_count = 0
-
         while self.is_running:
             try:
-                cycle_count += 1
-                cycle_start = time.time()
-
-                logger.debug(f"🔄 Enhanced Alerts цикл #{cycle_count}")
-
-                # ========== 1️⃣ ПРОВЕРКА L2 ДИСБАЛАНСА ДЛЯ ВСЕХ ПАР ==========
-                for symbol in self.tracked_symbols:
-                    try:
-                        await self.check_l2_imbalance_from_market_data(symbol)
-                    except Exception as e:
-                        logger.error(f"❌ Ошибка check_l2_imbalance для {symbol}: {e}")
-
-                # ========== 2️⃣ ПРОВЕРКА НОВОСТЕЙ (раз в 5 минут) ==========
                 try:
                     await self.check_news_alerts()
                 except Exception as e:
                     logger.error(f"❌ Ошибка check_news_alerts: {e}")
 
-                # ========== 3️⃣ ОПЦИОНАЛЬНО: ЛИКВИДАЦИИ И ОБЪЁМЫ ==========
-                # Раскомментируйте если хотите мониторить:
-                # for symbol in self.tracked_symbols:
-                #     try:
-                #         await self.check_liquidations(symbol)
-                #     except Exception as e:
-                #         logger.error(f"❌ Ошибка check_liquidations для {symbol}: {e}")
-                #
-                #     try:
-                #         await self.check_volume_spike(symbol)
-                #     except Exception as e:
-                #         logger.error(f"❌ Ошибка check_volume_spike для {symbol}: {e}")
-
-                # Расчёт времени выполнения цикла
-                cycle_duration = time.time() - cycle_start
-                logger.debug(
-                    f"✅ Enhanced Alerts цикл #{cycle_count} завершён за "
-                    f"{cycle_duration:.2f}s"
-                )
-
-                # Ожидание перед следующим циклом
-                sleep_time = max(1, self.config["monitoring_interval"] - cycle_duration)
-                logger.debug(f"⏳ Enhanced Alerts: ожидание {sleep_time:.0f} секунд...")
-                await asyncio.sleep(sleep_time)
+                await asyncio.sleep(self.config["news_check_interval"])
 
             except asyncio.CancelledError:
                 logger.info("🛑 Мониторинг остановлен (CancelledError)")
                 break
-
             except Exception as e:
                 logger.error(
                     f"❌ Критическая ошибка в цикле мониторинга "
@@ -206,6 +224,244 @@ class EnhancedAlertsSystem:
                 )
                 await asyncio.sleep(60)
 
+    # ========== ПРАВИЛА И СОБЫТИЯ ==========
+
+    def register_rule(
+        self, name: str, event: str, enter: float, exit: float
+    ) -> HysteresisRule:
+        """Зарегистрировать (или заменить) порог с гистерезисом"""
+        rule = HysteresisRule(name=name, event=event, enter=enter, exit=exit)
+        self.rules[name] = rule
+        return rule
+
+    def _dispatch(self, coro):
+        """Запустить отправку алерта фоном (ссылка хранится до завершения)"""
+        task = asyncio.create_task(coro)
+        self._pending_tasks.add(task)
+        task.add_done_callback(self._pending_tasks.discard)
+        return task
+
+    def on_orderbook(
+        self,
+        symbol: str,
+        imbalance: float,
+        bid_pct: Optional[float] = None,
+        ask_pct: Optional[float] = None,
+    ) -> bool:
+        """
+        Обновление стакана
+
+        Args:
+            symbol: Торговая пара
+            imbalance: Дисбаланс в % (-100 до +100)
+            bid_pct / ask_pct: Распределение давления (по умолчанию из imbalance)
+
+        Returns:
+            True если правило сработало и алерт поставлен в отправку
+        """
+        if symbol not in self.tracked_symbols:
+            return False
+
+        value = abs(imbalance)
+        if not self._update_rule("l2_imbalance", symbol, value, f"l2_{symbol}", "l2_cooldown"):
+            return False
+
+        if bid_pct is None:
+            bid_pct = (100 + imbalance) / 2
+        if ask_pct is None:
+            ask_pct = 100 - bid_pct
+
+        self._dispatch(
+            self._send_rule_alert(
+                "l2_imbalance",
+                symbol,
+                self.check_l2_imbalance(
+                    symbol=symbol, imbalance=imbalance, bid_pct=bid_pct, ask_pct=ask_pct
+                ),
+            )
+        )
+        return True
+
+    def _update_rule(
+        self, name: str, symbol: str, value: float, alert_key: str, cooldown_key: str
+    ) -> bool:
+        """
+        Оценить гистерезисное правило с учётом cooldown алерта
+
+        Во время cooldown правило только взводится (возврат ниже exit):
+        пересечение порога не расходуется и сработает после cooldown.
+        """
+        rule = self.rules[name]
+        last_sent = self.last_alert_time.get(alert_key)
+        if last_sent is not None and time.time() - last_sent < self.config[cooldown_key]:
+            if value < rule.exit:
+                rule.update(symbol, value)
+            return False
+        return rule.update(symbol, value)
+
+    async def _send_rule_alert(self, name: str, symbol: str, send) -> bool:
+        """Отправка алерта правила; со взвода снимается только если алерт ушёл"""
+        sent = await send
+        if not sent:
+            self.rules[name].rearm(symbol)
+        return sent
+
+    def on_trade(
+        self,
+        symbol: str,
+        side: str,
+        price: float,
+        qty: float,
+        timestamp: Optional[float] = None,
+    ) -> bool:
+        """
+        Сделка (или ликвидация) из WebSocket
+
+        Крупные сделки (> liquidation_min_usd) суммируются за
+        liquidation_window секунд; алерт - когда сумма пересекла порог.
+        """
+        if symbol not in self.tracked_symbols:
+            return False
+
+        trade_usd = price * qty
+        if trade_usd <= self.config["liquidation_min_usd"]:
+            return False
+
+        if timestamp is None:
+            timestamp = time.time()
+        elif timestamp > 1e12:
+            timestamp = timestamp / 1000  # ms → s
+
+        trade = {
+            "price": price,
+            "qty": qty,
+            "usd": trade_usd,
+            "side": side,
+            "time": datetime.fromtimestamp(timestamp).strftime("%H:%M:%S"),
+        }
+        total = self.large_trade_flow.add(symbol, timestamp, trade_usd, trade)
+
+        if not self._update_rule("liquidations", symbol, total, f"liq_{symbol}", "liq_cooldown"):
+            return False
+
+        large_trades = self.large_trade_flow.items(symbol)
+        self._dispatch(
+            self._send_rule_alert(
+                "liquidations", symbol, self._send_liquidation_alert(symbol, large_trades)
+            )
+        )
+        return True
+
+    def on_kline(self, symbol: str, kline: Dict) -> bool:
+        """
+        Закрытая свеча: всплеск объёма и пробой уровней Volume Profile
+
+        Returns:
+            True если сработало хотя бы одно правило
+        """
+        if symbol not in self.tracked_symbols:
+            return False
+        if not kline.get("is_closed", kline.get("confirm", True)):
+            return False
+
+        fired = False
+        volume = float(kline.get("volume", 0))
+        close = float(kline.get("close", 0))
+
+        # Всплеск объёма относительно предыдущих закрытых свечей
+        avg_volume = self.kline_volumes.mean(symbol)
+        enough = self.kline_volumes.count(symbol) >= self.config["volume_min_bars"]
+        self.kline_volumes.add(symbol, volume)
+
+        if enough and avg_volume:
+            spike_ratio = volume / avg_volume
+            if self._update_rule(
+                "volume_spike", symbol, spike_ratio, f"vol_{symbol}", "vol_cooldown"
+            ):
+                self._dispatch(
+                    self._send_rule_alert(
+                        "volume_spike",
+                        symbol,
+                        self._send_volume_spike_alert(
+                            symbol, volume, avg_volume, spike_ratio
+                        ),
+                    )
+                )
+                fired = True
+
+        # Пробой уровней VP
+        if close > 0:
+            for level, _, direction in self.vp_rule.update(symbol, close):
+                self._dispatch(
+                    self.check_volume_profile_break(symbol, level, close, direction)
+                )
+                fired = True
+
+        return fired
+
+    def on_closed_klines(
+        self,
+        symbol: str,
+        candles: List[Dict],
+        interval_minutes: int = 60,
+        now_ms: Optional[int] = None,
+    ) -> bool:
+        """
+        Свечи из REST (сканер): в on_kline уходят только новые закрытые
+
+        Первая порция по символу только прогревает средний объём - история
+        не оценивается как свежие всплески.
+
+        Returns:
+            True если сработало хотя бы одно правило
+        """
+        if symbol not in self.tracked_symbols or not candles:
+            return False
+
+        interval_ms = interval_minutes * 60_000
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+        closed = sorted(
+            (c for c in candles if int(c["timestamp"]) + interval_ms <= now_ms),
+            key=lambda c: int(c["timestamp"]),
+        )
+        if not closed:
+            return False
+
+        last_ts = self.last_kline_ts.get(symbol)
+        self.last_kline_ts[symbol] = int(closed[-1]["timestamp"])
+        if last_ts is None:
+            for candle in closed:
+                self.kline_volumes.add(symbol, float(candle.get("volume", 0)))
+            return False
+
+        fired = False
+        for candle in closed:
+            if int(candle["timestamp"]) > last_ts:
+                fired |= self.on_kline(symbol, {**candle, "is_closed": True})
+        return fired
+
+    def update_vp_levels(self, symbol: str, levels: Dict[str, float]):
+        """Задать уровни Volume Profile ({'POC': .., 'VAH': .., 'VAL': ..})"""
+        self.vp_rule.set_levels(symbol, levels)
+
+    def on_scenario(
+        self, symbol: str, scenario: str, confidence: float = 0.0, phase: str = ""
+    ) -> bool:
+        """Новый сценарий Market Maker; алерт только при смене"""
+        previous = self.last_mm_scenario.get(symbol)
+        self.last_mm_scenario[symbol] = scenario
+
+        if previous is None or previous == scenario:
+            return False
+
+        self._dispatch(
+            self.check_mm_scenario_change(
+                symbol, previous, scenario, confidence, phase
+            )
+        )
+        return True
+
     async def check_l2_imbalance_from_market_data(self, symbol: str):
         """
         Проверка L2 дисбаланса из bot.market_data
@@ -480,40 +736,41 @@ class EnhancedAlertsSystem:
                     )
 
             if large_trades:
-                # Throttling
-                alert_key = f"liq_{symbol}"
-                if self._should_throttle(alert_key, self.config["liq_cooldown"]):
-                    return
-
-                # Сортируем по объёму
-                large_trades.sort(key=lambda x: x["usd"], reverse=True)
-                top_trade = large_trades[0]
-
-                emoji = "💥" if top_trade["usd"] > 500000 else "⚠️"
-                side_emoji = (
-                    "🟢 LONG" if top_trade["side"].upper() == "BUY" else "🔴 SHORT"
-                )
-
-                message = (
-                    f"{emoji} КРУПНАЯ ЛИКВИДАЦИЯ\n"
-                    f"Пара: {symbol}\n"
-                    f"Объём: ${top_trade['usd']:,.0f}\n"
-                    f"Сторона: {side_emoji}\n"
-                    f"Цена: ${top_trade['price']:,.2f}\n"
-                    f"Время: {top_trade['time']}\n"
-                    f"Всего крупных сделок: {len(large_trades)}"
-                )
-
-                await self.send_alert("liquidations", message, priority="high")
-                logger.info(
-                    f"💥 Liquidation Alert: {symbol} (${top_trade['usd']:,.0f})"
-                )
+                await self._send_liquidation_alert(symbol, large_trades)
             else:
                 logger.debug(f"✅ {symbol}: Крупных ликвидаций не обнаружено")
 
         except Exception as e:
             logger.error(f"❌ Ошибка check_liquidations: {e}", exc_info=True)
 
+    async def _send_liquidation_alert(self, symbol: str, large_trades: List[Dict]) -> bool:
+        """Алерт о крупных ликвидациях (с throttling)"""
+        alert_key = f"liq_{symbol}"
+        if self._should_throttle(alert_key, self.config["liq_cooldown"]):
+            return False
+
+        # Сортируем по объёму
+        large_trades = sorted(large_trades, key=lambda x: x["usd"], reverse=True)
+        top_trade = large_trades[0]
+
+        emoji = "💥" if top_trade["usd"] > 500000 else "⚠️"
+        side_emoji = "🟢 LONG" if top_trade["side"].upper() == "BUY" else "🔴 SHORT"
+
+        message = (
+            f"{emoji} КРУПНАЯ ЛИКВИДАЦИЯ\n"
+            f"Пара: {symbol}\n"
+            f"Объём: ${top_trade['usd']:,.0f}\n"
+            f"Сторона: {side_emoji}\n"
+            f"Цена: ${top_trade['price']:,.2f}\n"
+            f"Время: {top_trade['time']}\n"
+            f"Всего крупных сделок: {len(large_trades)}"
+        )
+
+        success = await self.send_alert("liquidations", message, priority="high")
+        if success:
+            logger.info(f"💥 Liquidation Alert: {symbol} (${top_trade['usd']:,.0f})")
+        return success
+
     async def check_volume_spike(self, symbol: str):
         """
         Проверка всплесков объёма торгов
@@ -560,30 +817,39 @@ class EnhancedAlertsSystem:
             spike_ratio = current_volume / avg_volume if avg_volume > 0 else 0
 
             if spike_ratio > self.config["volume_spike_multiplier"]:
-                # Throttling
-                alert_key = f"vol_{symbol}"
-                if self._should_throttle(alert_key, self.config["vol_cooldown"]):
-                    return
-
-                emoji = "🔥" if spike_ratio > 5.0 else "📊"
-
-                message = (
-                    f"{emoji} ВСПЛЕСК ОБЪЁМА\n"
-                    f"Пара: {symbol}\n"
-                    f"Текущий объём: {current_volume:,.0f}\n"
-                    f"Средний объём: {avg_volume:,.0f}\n"
-                    f"Множитель: {spike_ratio:.2f}x\n"
-                    f"Время: {datetime.now().strftime('%H:%M:%S')}"
+                await self._send_volume_spike_alert(
+                    symbol, current_volume, avg_volume, spike_ratio
                 )
-
-                await self.send_alert("volume_spike", message, priority="medium")
-                logger.info(f"📊 Volume Spike Alert: {symbol} ({spike_ratio:.2f}x)")
             else:
                 logger.debug(f"✅ {symbol}: Всплеска объёма нет ({spike_ratio:.2f}x)")
 
         except Exception as e:
             logger.error(f"❌ Ошибка check_volume_spike: {e}", exc_info=True)
 
+    async def _send_volume_spike_alert(
+        self, symbol: str, current_volume: float, avg_volume: float, spike_ratio: float
+    ) -> bool:
+        """Алерт о всплеске объёма (с throttling)"""
+        alert_key = f"vol_{symbol}"
+        if self._should_throttle(alert_key, self.config["vol_cooldown"]):
+            return False
+
+        emoji = "🔥" if spike_ratio > 5.0 else "📊"
+
+        message = (
+            f"{emoji} ВСПЛЕСК ОБЪЁМА\n"
+            f"Пара: {symbol}\n"
+            f"Текущий объём: {current_volume:,.0f}\n"
+            f"Средний объём: {avg_volume:,.0f}\n"
+            f"Множитель: {spike_ratio:.2f}x\n"
+            f"Время: {datetime.now().strftime('%H:%M:%S')}"
+        )
+
+        success = await self.send_alert("volume_spike", message, priority="medium")
+        if success:
+            logger.info(f"📊 Volume Spike Alert: {symbol} ({spike_ratio:.2f}x)")
+        return success
+
     async def check_mm_scenario_change(
         self,
         symbol: str,
@@ -721,7 +987,10 @@ class EnhancedAlertsSystem:
                 try:
                     # Проверяем наличие метода send_alert
                     if hasattr(self.telegram_handler, "send_alert"):
-                        await self.telegram_handler.send_alert(message)
+                        # Очередь склеивает всплеск алертов одного типа в digest
+                        await self.telegram_handler.send_alert(
+                            message, priority=priority, alert_type=alert_type
+                        )
                     # Или send_message
                     elif hasattr(self.telegram_handler, "send_message"):
                         await self.telegram_handler.send_message(message)
@@ -736,7 +1005,7 @@ class EnhancedAlertsSystem:
                         logger.warning("⚠️ Метод отправки не найден в telegram_handler")
                         return False
 
-                    logger.info(f"✅ Алерт отправлен в Telegram: {alert_type}")
+                    logger.info(f"✅ Алерт поставлен в очередь Telegram: {alert_type}")
                     return True
 
                 except Exception as e:
@@ -794,6 +1063,8 @@ class EnhancedAlertsSystem:
     async def stop(self):
         """Остановка системы мониторинга"""
         self.is_running = False
+        if self._pending_tasks:
+            await asyncio.gather(*self._pending_tasks, return_exceptions=True)
         logger.info("🛑 Остановка EnhancedAlertsSystem...")
 
 
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Consolidated Order Book - сводный стакан Bybit / Binance / OKX / Coinbase
+- Нормализация символов (BTC-USDT, BTC-USD, btcusdt → BTCUSDT) и шага цены
+- Сводная лестница глубины с разбивкой объёма по биржам (numpy merge)
+- Лучшие bid/ask между биржами, сводный дисбаланс и арбитражный спред
+  пересчитываются при обновлении биржи, чтение - O(1)
+
+Объёмы во всех стаканах - в базовом активе (спот / linear USDT).
+"""
+
+import math
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config.settings import CONSOLIDATED_BOOK_CONFIG, logger
+
+
+KNOWN_QUOTES = ("USDT", "USDC", "USD")
+CONTRACT_SUFFIXES = ("SWAP", "PERP")
+
+_EMPTY_TICKS = np.empty(0, dtype=np.int64)
+_EMPTY_SIZES = np.empty(0, dtype=np.float64)
+
+
+def normalize_symbol(symbol: str, quote_aliases: Optional[Dict[str, str]] = None) -> str:
+    """
+    Единый символ для всех бирж
+
+    BTC-USDT / BTC-USDT-SWAP / BTC-USD / btc_usdt → BTCUSDT
+    (котировки из quote_aliases сводятся к одной, по умолчанию USD/USDC → USDT)
+    """
+    if quote_aliases is None:
+        quote_aliases = CONSOLIDATED_BOOK_CONFIG["quote_aliases"]
+
+    parts = [p for p in symbol.upper().replace("/", "-").replace("_", "-").split("-") if p]
+    if parts and parts[-1] in CONTRACT_SUFFIXES:
+        parts = parts[:-1]
+    if not parts:
+        return ""
+
+    if len(parts) >= 2:
+        base, quote = parts[0], parts[1]
+    else:
+        joined = parts[0]
+        for known in KNOWN_QUOTES:
+            if joined.endswith(known) and len(joined) > len(known):
+                base, quote = joined[: -len(known)], known
+                break
+        else:
+            return joined
+
+    return base + quote_aliases.get(quote, quote)
+
+
+def infer_tick(price: float) -> float:
+    """Шаг сетки по цене: ~1e-5 от цены, степень 10 (BTC 60000 → 0.1, ETH 3000 → 0.01)"""
+    if price <= 0:
+        return 1e-8
+    return 10.0 ** math.floor(math.log10(price) - 5)
+
+
+def _side_arrays(levels, descending: bool, depth: int):
+    """
+    Граница: уровни стакана → (prices, sizes) float64, лучшая цена первой
+
+    Принимает [[price, size, ...]], {price: size} и BookSide (array('d')).
+    """
+    if levels is None or len(levels) == 0:
+        return _EMPTY_SIZES, _EMPTY_SIZES
+
+    if hasattr(levels, "prices") and hasattr(levels, "sizes"):
+        # BookSide: уже отсортирован, без копирования
+        prices = np.frombuffer(levels.prices, dtype=np.float64)[:depth]
+        sizes = np.frombuffer(levels.sizes, dtype=np.float64)[:depth]
+        return prices, sizes
+
+    if isinstance(levels, dict):
+        prices = np.fromiter(levels.keys(), dtype=np.float64, count=len(levels))
+        sizes = np.fromiter(levels.values(), dtype=np.float64, count=len(levels))
+    else:
+        rows = np.asarray([level[:2] for level in levels], dtype=np.float64)
+        prices, sizes = rows[:, 0], rows[:, 1]
+
+    # Лучшие depth уровней: partition + сортировка только их
+    keys = -prices if descending else prices
+    if len(keys) > depth:
+        top = np.argpartition(keys, depth - 1)[:depth]
+        order = top[np.argsort(keys[top], kind="stable")]
+    else:
+        order = np.argsort(keys, kind="stable")
+    return prices[order], sizes[order]
+
+
+class _VenueBook:
+    """Стакан одной биржи в тиках сетки"""
+
+    __slots__ = ("bid_ticks", "bid_sizes", "ask_ticks", "ask_sizes", "updated")
+
+    def __init__(self):
+        self.bid_ticks = _EMPTY_TICKS
+        self.bid_sizes = _EMPTY_SIZES
+        self.ask_ticks = _EMPTY_TICKS
+        self.ask_sizes = _EMPTY_SIZES
+        self.updated = 0.0
+
+
+class _Ladder:
+    """Сводная сторона стакана: уровни, суммарный объём и объём по биржам"""
+
+    __slots__ = ("ticks", "sizes", "by_venue", "venues")
+
+    def __init__(self, ticks, sizes, by_venue, venues):
+        self.ticks = ticks
+        self.sizes = sizes
+        self.by_venue = by_venue  # [уровень, биржа]
+        self.venues = venues
+
+
+def _merge_side(
+    venues: List[str], ticks_list: List[np.ndarray], sizes_list: List[np.ndarray], descending: bool
+) -> _Ladder:
+    """Векторное слияние сторон стаканов бирж в одну лестницу"""
+    lengths = [len(t) for t in ticks_list]
+    if not sum(lengths):
+        return _Ladder(_EMPTY_TICKS, _EMPTY_SIZES, np.zeros((0, len(venues))), venues)
+
+    ticks = np.concatenate(ticks_list)
+    sizes = np.concatenate(sizes_list)
+    venue_idx = np.repeat(np.arange(len(venues)), lengths)
+
+    levels, inverse = np.unique(ticks, return_inverse=True)  # по возрастанию
+    if descending:
+        levels = levels[::-1]
+        inverse = len(levels) - 1 - inverse
+
+    by_venue = np.zeros((len(levels), len(venues)), dtype=np.float64)
+    np.add.at(by_venue, (inverse, venue_idx), sizes)
+    return _Ladder(levels, by_venue.sum(axis=1), by_venue, venues)
+
+
+class _SymbolBook:
+    """Стаканы бирж по одному символу + кэш сводных метрик"""
+
+    __slots__ = ("symbol", "tick", "venues", "bids", "asks", "quote")
+
+    def __init__(self, symbol: str, tick: Optional[float]):
+        self.symbol = symbol
+        self.tick = tick
+        self.venues: Dict[str, _VenueBook] = {}
+        self.bids: Optional[_Ladder] = None
+        self.asks: Optional[_Ladder] = None
+        self.quote: Optional[Dict] = None
+
+
+class ConsolidatedOrderBook:
+    """
+    Сводный стакан по нескольким биржам (NBBO)
+
+    update() переводит цены биржи в целые тики общей сетки (bids вниз,
+    asks вверх - консервативно), пересобирает лестницы np.unique + np.add.at
+    и пересчитывает котировку. best_bid_ask / imbalance / arbitrage_spread
+    читают готовый кэш.
+    """
+
+    def __init__(
+        self,
+        depth: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+        imbalance_levels: Optional[int] = None,
+        tick_sizes: Optional[Dict[str, float]] = None,
+    ):
+        config = CONSOLIDATED_BOOK_CONFIG
+        self.depth = depth or config["depth"]
+        self.max_age_seconds = (
+            max_age_seconds if max_age_seconds is not None else config["max_age_seconds"]
+        )
+        self.imbalance_levels = imbalance_levels or config["imbalance_levels"]
+        self.tick_sizes = dict(config["tick_sizes"] if tick_sizes is None else tick_sizes)
+
+        self._books: Dict[str, _SymbolBook] = {}
+        self.stats = {"updates": 0, "rejected": 0}
+
+    def update(
+        self,
+        venue: str,
+        symbol: str,
+        bids,
+        asks,
+        timestamp: Optional[float] = None,
+    ) -> bool:
+        """
+        Обновить стакан биржи и пересчитать сводные метрики символа
+
+        Args:
+            venue: Биржа ("bybit", "binance", "okx", "coinbase")
+            symbol: Символ в формате биржи
+            bids / asks: [[price, size, ...]], {price: size} или BookSide
+            timestamp: Время получения (сек), по умолчанию сейчас
+
+        Returns:
+            False если стакан пустой или символ не распознан
+        """
+        try:
+            key = normalize_symbol(symbol)
+            bid_prices, bid_sizes = _side_arrays(bids, True, self.depth)
+            ask_prices, ask_sizes = _side_arrays(asks, False, self.depth)
+        except (TypeError, ValueError, IndexError) as e:
+            logger.debug(f"⚠️ ConsolidatedBook: некорректный стакан {venue} {symbol}: {e}")
+            self.stats["rejected"] += 1
+            return False
+
+        if not key or (not len(bid_prices) and not len(ask_prices)):
+            self.stats["rejected"] += 1
+            return False
+
+        book = self._books.get(key)
+        if book is None:
+            book = self._books[key] = _SymbolBook(key, self.tick_sizes.get(key))
+        if book.tick is None:
+            reference = bid_prices[0] if len(bid_prices) else ask_prices[0]
+            book.tick = infer_tick(float(reference))
+
+        venue_book = book.venues.get(venue)
+        if venue_book is None:
+            venue_book = book.venues[venue] = _VenueBook()
+
+        # Малый эпсилон - чтобы цены ровно на сетке не уезжали на тик
+        scaled_bids = bid_prices / book.tick
+        scaled_asks = ask_prices / book.tick
+        venue_book.bid_ticks = np.floor(scaled_bids + 1e-6).astype(np.int64)
+        venue_book.ask_ticks = np.ceil(scaled_asks - 1e-6).astype(np.int64)
+        venue_book.bid_sizes = bid_sizes
+        venue_book.ask_sizes = ask_sizes
+        venue_book.updated = timestamp if timestamp is not None else time.time()
+
+        self._rebuild(book, venue_book.updated)
+        self.stats["updates"] += 1
+        return True
+
+    def remove_venue(self, venue: str, symbol: Optional[str] = None):
+        """Убрать биржу (например, при отключении WebSocket)"""
+        books = [self._books.get(normalize_symbol(symbol))] if symbol else self._books.values()
+        for book in books:
+            if book is not None and book.venues.pop(venue, None) is not None:
+                self._rebuild(book, time.time())
+
+    def _rebuild(self, book: _SymbolBook, now: float):
+        """Пересборка сводных лестниц и котировки (только свежие стаканы)"""
+        live = [
+            (name, vb)
+            for name, vb in book.venues.items()
+            if now - vb.updated <= self.max_age_seconds
+        ]
+        names = [name for name, _ in live]
+
+        book.bids = _merge_side(
+            names, [vb.bid_ticks for _, vb in live], [vb.bid_sizes for _, vb in live], True
+        )
+        book.asks = _merge_side(
+            names, [vb.ask_ticks for _, vb in live], [vb.ask_sizes for _, vb in live], False
+        )
+        book.quote = self._quote(book, live, now)
+
+    def _quote(self, book: _SymbolBook, live: List, now: float) -> Optional[Dict]:
+        bids, asks = book.bids, book.asks
+        if not len(bids.ticks) or not len(asks.ticks):
+            return None
+
+        tick = book.tick
+        best_bid = float(bids.ticks[0] * tick)
+        best_ask = float(asks.ticks[0] * tick)
+        # Биржа лучшего уровня - с наибольшим объёмом на нём
+        bid_venue = bids.venues[int(np.argmax(bids.by_venue[0]))]
+        ask_venue = asks.venues[int(np.argmax(asks.by_venue[0]))]
+        mid = (best_bid + best_ask) / 2
+
+        n = self.imbalance_levels
+        bid_volume = float(bids.sizes[:n].sum())
+        ask_volume = float(asks.sizes[:n].sum())
+        total = bid_volume + ask_volume
+
+        # Арбитраж: лучший bid одной биржи выше лучшего ask другой
+        arbitrage = None
+        if best_bid > best_ask and bid_venue != ask_venue:
+            arbitrage = {
+                "buy_venue": ask_venue,
+                "sell_venue": bid_venue,
+                "buy_price": best_ask,
+                "sell_price": best_bid,
+                "spread": best_bid - best_ask,
+                "spread_pct": (best_bid - best_ask) / mid * 100,
+            }
+
+        return {
+            "symbol": book.symbol,
+            "best_bid": best_bid,
+            "best_bid_size": float(bids.sizes[0]),
+            "best_bid_venue": bid_venue,
+            "best_ask": best_ask,
+            "best_ask_size": float(asks.sizes[0]),
+            "best_ask_venue": ask_venue,
+            "mid": mid,
+            "spread": best_ask - best_bid,
+            "spread_pct": (best_ask - best_bid) / mid * 100 if mid > 0 else 0.0,
+            "imbalance": (bid_volume - ask_volume) / total if total > 0 else 0.0,
+            "bid_volume": bid_volume,
+            "ask_volume": ask_volume,
+            "arbitrage": arbitrage,
+            "venues": [name for name, _ in live],
+            "tick": tick,
+            "timestamp": now,
+        }
+
+    # ===========================================
+    # ЧТЕНИЕ (O(1) из кэша)
+    # ===========================================
+
+    def _book(self, symbol: str) -> Optional[_SymbolBook]:
+        book = self._books.get(symbol)
+        if book is None:
+            book = self._books.get(normalize_symbol(symbol))
+        return book
+
+    def get_quote(self, symbol: str) -> Optional[Dict]:
+        """Сводная котировка (NBBO, дисбаланс, арбитраж) или None"""
+        book = self._book(symbol)
+        return book.quote if book else None
+
+    def best_bid_ask(self, symbol: str) -> Optional[tuple]:
+        """((bid, venue), (ask, venue)) между всеми биржами"""
+        quote = self.get_quote(symbol)
+        if not quote:
+            return None
+        return (quote["best_bid"], quote["best_bid_venue"]), (
+            quote["best_ask"],
+            quote["best_ask_venue"],
+        )
+
+    def imbalance(self, symbol: str) -> Optional[float]:
+        """Сводный дисбаланс bid/ask (-1..1) по imbalance_levels уровням"""
+        quote = self.get_quote(symbol)
+        return quote["imbalance"] if quote else None
+
+    def arbitrage_spread(self, symbol: str) -> Optional[Dict]:
+        """Кросс-биржевой арбитраж (bid > ask на разных биржах) или None"""
+        quote = self.get_quote(symbol)
+        return quote["arbitrage"] if quote else None
+
+    def venue_quotes(self, symbol: str) -> Dict[str, Dict]:
+        """Лучшие bid/ask каждой биржи {venue: {"bid", "ask", "updated"}}"""
+        book = self._book(symbol)
+        if book is None:
+            return {}
+        result = {}
+        for name, vb in book.venues.items():
+            result[name] = {
+                "bid": float(vb.bid_ticks[0] * book.tick) if len(vb.bid_ticks) else None,
+                "ask": float(vb.ask_ticks[0] * book.tick) if len(vb.ask_ticks) else None,
+                "updated": vb.updated,
+            }
+        return result
+
+    def get_depth(self, symbol: str, levels: int = 20) -> Optional[Dict]:
+        """
+        Сводная глубина с атрибуцией по биржам (граница: dict)
+
+        Returns:
+            {"bids": [{"price", "size", "venues": {venue: size}}], "asks": [...]}
+        """
+        book = self._book(symbol)
+        if book is None or book.bids is None:
+            return None
+
+        def side(ladder: _Ladder) -> List[Dict]:
+            rows = []
+            for i in range(min(levels, len(ladder.ticks))):
+                venues = {
+                    ladder.venues[j]: float(size)
+                    for j, size in enumerate(ladder.by_venue[i])
+                    if size > 0
+                }
+                rows.append(
+                    {
+                        "price": float(ladder.ticks[i] * book.tick),
+                        "size": float(ladder.sizes[i]),
+                        "venues": venues,
+                    }
+                )
+            return rows
+
+        return {"symbol": book.symbol, "bids": side(book.bids), "asks": side(book.asks)}
+
+    def symbols(self) -> List[str]:
+        return list(self._books)
+
+
+# Глобальный сводный стакан (пишут коннекторы, читают валидатор и анализ)
+_global_book: Optional[ConsolidatedOrderBook] = None
+
+
+def get_consolidated_book() -> ConsolidatedOrderBook:
+    """Получить глобальный ConsolidatedOrderBook (Singleton)"""
+    global _global_book
+    if _global_book is None:
+        _global_book = ConsolidatedOrderBook()
+    return _global_book
+
+
+__all__ = [
+    "ConsolidatedOrderBook",
+    "get_consolidated_book",
+    "normalize_symbol",
+    "infer_tick",
+]
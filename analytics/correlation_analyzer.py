@@ -9,7 +9,10 @@ import asyncio
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import numpy as np
-from config.settings import logger
+from config.settings import logger, CORRELATION_CONFIG
+from analytics.correlation_engine import RollingCorrelationEngine
+from utils.cache_manager import get_cache_manager
+from utils.helpers import current_epoch_ms
 
 
 class CorrelationAnalyzer:
@@ -20,15 +23,62 @@ class CorrelationAnalyzer:
     - Price changes (24h, 7d, 30d)
     - Volume changes
     - Market cap changes
+
+    Periods 1h/4h/24h/7d are served from RollingCorrelationEngine
+    (rolling candle returns) once it has enough samples.
     """
 
     def __init__(self, bot_instance):
         self.bot = bot_instance
         self.cache_duration = 300  # 5 minutes cache
-        self._cache = {}
-        self._cache_timestamp = {}
+        self.cache = get_cache_manager()
+
+        # Rolling engine по закрытым свечам
+        self.engine = RollingCorrelationEngine(
+            symbols=CORRELATION_CONFIG["engine_symbols"],
+            interval_minutes=CORRELATION_CONFIG["engine_interval_minutes"],
+            min_coverage=CORRELATION_CONFIG["engine_min_coverage"],
+        )
+        self._engine_seeded = False
+
         logger.info("✅ CorrelationAnalyzer инициализирован")
 
+    async def update_engine(self):
+        """
+        Feed newly closed candles into the rolling engine
+
+        First call seeds history (200 candles), later calls fetch only
+        the last few candles per symbol. Windows longer than the seed
+        (24h/7d on 5m bars) stay on the API path until the engine has
+        filled them (see RollingCorrelationEngine.min_coverage).
+        """
+        try:
+            connector = getattr(self.bot, "bybit_connector", None)
+            if not connector:
+                return
+
+            interval = str(self.engine.interval_minutes)
+            limit = 200 if not self._engine_seeded else 3
+            now = current_epoch_ms()
+
+            candles_by_symbol = {}
+            for symbol in self.engine.symbols:
+                candles = await connector.get_klines(symbol, interval, limit=limit)
+                # Только закрытые свечи
+                candles_by_symbol[symbol] = [
+                    c
+                    for c in candles or []
+                    if c["timestamp"] + self.engine.interval_ms <= now
+                ]
+
+            committed = self.engine.seed(candles_by_symbol)
+            if committed:
+                self._engine_seeded = True
+                logger.debug(f"🔗 Correlation engine: +{committed} bars")
+
+        except Exception as e:
+            logger.error(f"update_engine error: {e}", exc_info=True)
+
     async def calculate_correlation_matrix(
         self, symbols: List[str], period: str = "24h"
     ) -> Dict:
@@ -49,16 +99,31 @@ class CorrelationAnalyzer:
             }
         """
         try:
-            # Check cache
-            cache_key = f"corr_{'-'.join(symbols)}_{period}"
-            if self._is_cached(cache_key):
-                return self._cache[cache_key]
+            # Rolling engine: без запросов к API
+            if all(s in self.engine.index for s in symbols) and self.engine.is_ready(
+                period
+            ):
+                return self._engine_result(symbols, period)
+        except Exception as e:
+            logger.error(f"calculate_correlation_matrix error: {e}", exc_info=True)
+            return self._empty_result(symbols, period)
+
+        result = await self.cache.get_or_compute(
+            f"{'-'.join(symbols)}_{period}",
+            lambda: self._calculate_matrix(symbols, period),
+            ttl=self.cache_duration,
+            namespace="correlation",
+        )
+        return result if result is not None else self._empty_result(symbols, period)
 
+    async def _calculate_matrix(self, symbols: List[str], period: str) -> Optional[Dict]:
+        """Matrix from API price changes; None on failure (not cached)"""
+        try:
             # Получаем данные изменений цен для всех символов
             price_changes = await self._get_price_changes(symbols, period)
 
             if not price_changes or len(price_changes) < 2:
-                return self._empty_result(symbols, period)
+                return None
 
             # Вычисляем корреляционную матрицу
             matrix = self._calculate_correlation(price_changes)
@@ -74,15 +139,27 @@ class CorrelationAnalyzer:
                 "insights": insights,
             }
 
-            # Кэшируем результат
-            self._cache[cache_key] = result
-            self._cache_timestamp[cache_key] = datetime.now()
-
             return result
 
         except Exception as e:
             logger.error(f"calculate_correlation_matrix error: {e}", exc_info=True)
-            return self._empty_result(symbols, period)
+            return None
+
+    def _engine_result(self, symbols: List[str], period: str) -> Dict:
+        """Build result from the rolling engine (with beta to BTC)"""
+        matrix = self.engine.correlation_matrix(period, symbols)
+        betas = self.engine.betas(period)
+
+        return {
+            "matrix": matrix,
+            "symbols": [s.replace("USDT", "") for s in symbols],
+            "period": period,
+            "timestamp": datetime.now(),
+            "insights": self._generate_insights(matrix, symbols),
+            "betas": {s.replace("USDT", ""): betas[s] for s in symbols if s in betas},
+            "samples": self.engine.samples(period),
+            "source": "rolling",
+        }
 
     async def _get_price_changes(
         self, symbols: List[str], period: str
@@ -221,18 +298,6 @@ class CorrelationAnalyzer:
             logger.error(f"_generate_insights error: {e}")
             return {}
 
-    def _is_cached(self, key: str) -> bool:
-        """Check if result is cached and still valid"""
-        if key not in self._cache:
-            return False
-
-        timestamp = self._cache_timestamp.get(key)
-        if not timestamp:
-            return False
-
-        age = (datetime.now() - timestamp).total_seconds()
-        return age < self.cache_duration
-
     def _empty_result(self, symbols: List[str], period: str) -> Dict:
         """Return empty result structure"""
         n = len(symbols)
@@ -306,6 +371,14 @@ class CorrelationAnalyzer:
                     pairs_str = ", ".join([f"{p[0]}-{p[1]}" for p in strong])
                     lines.append(f"• Strong pairs: {pairs_str}")
 
+            betas = result.get("betas")
+            if betas:
+                lines.append("")
+                lines.append(f"β to BTC ({result.get('samples', 0)} bars):")
+                lines.append(
+                    "• " + ", ".join(f"{s} {b:.2f}" for s, b in betas.items())
+                )
+
             return "\n".join(lines)
 
         except Exception as e:
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Rolling Correlation Engine
+Incremental multi-window Pearson correlation over aligned candle returns
+"""
+
+import math
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+from config.settings import logger
+
+
+# Окна корреляции в минутах
+DEFAULT_WINDOWS = {
+    "1h": 60,
+    "4h": 240,
+    "24h": 1440,
+    "7d": 10080,
+}
+
+
+class RollingCorrelationEngine:
+    """
+    Rolling Correlation Engine
+
+    Keeps aligned log-return series for all tracked symbols and maintains
+    rolling sums (Σx, Σx², Σxy) per window. Each closed candle costs O(n²)
+    per window, and a correlation matrix is served in O(n²) without refetch.
+
+    Returns are aligned by candle timestamp: a bar is committed only when
+    every tracked symbol has closed it.
+
+    A window is served only once it holds at least min_coverage of its
+    bars: a 24h/7d matrix from a few hours of returns would be reported
+    as the long window while describing a short one.
+    """
+
+    def __init__(
+        self,
+        symbols: List[str],
+        interval_minutes: int = 5,
+        windows: Optional[Dict[str, int]] = None,
+        benchmark: str = "BTCUSDT",
+        min_samples: int = 6,
+        min_coverage: float = 1.0,
+    ):
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.interval_ms = interval_minutes * 60_000
+        self.interval_minutes = interval_minutes
+        self.benchmark = benchmark
+        self.min_samples = min_samples
+        self.min_coverage = min_coverage
+
+        # Окно в барах базового интервала
+        self.windows = {
+            name: max(2, minutes // interval_minutes)
+            for name, minutes in (windows or DEFAULT_WINDOWS).items()
+        }
+        self.max_window = max(self.windows.values())
+
+        n = len(self.symbols)
+        self._returns = deque(maxlen=self.max_window)
+        self._sum_x = {name: np.zeros(n) for name in self.windows}
+        self._sum_xy = {name: np.zeros((n, n)) for name in self.windows}
+
+        # Выравнивание: {bar_timestamp: {symbol: close}}
+        self._pending: Dict[int, Dict[str, float]] = {}
+        self._last_close = np.full(n, np.nan)
+        self.last_bar_ts = 0
+
+        # Пересчёт сумм с нуля для сброса накопленной ошибки float
+        self._updates_since_rebuild = 0
+        self.rebuild_every = self.max_window
+
+        logger.info(
+            f"✅ RollingCorrelationEngine: {n} символов, "
+            f"интервал {interval_minutes}m, окна {self.windows}"
+        )
+
+    # ========== ОБНОВЛЕНИЕ ==========
+
+    def on_closed_candle(self, symbol: str, timestamp: int, close: float) -> bool:
+        """
+        Register a closed candle
+
+        Returns:
+            True if a new aligned bar was committed
+        """
+        if symbol not in self.index or close <= 0 or timestamp <= self.last_bar_ts:
+            return False
+
+        bar = self._pending.setdefault(timestamp, {})
+        bar[symbol] = close
+
+        if len(bar) < len(self.symbols):
+            return False
+
+        del self._pending[timestamp]
+        # Бары старше закрытого уже не будут выровнены
+        for stale_ts in [ts for ts in self._pending if ts < timestamp]:
+            del self._pending[stale_ts]
+
+        closes = np.array([bar[s] for s in self.symbols], dtype=float)
+        self._commit(timestamp, closes)
+        return True
+
+    def seed(self, candles_by_symbol: Dict[str, List[Dict]]) -> int:
+        """
+        Bootstrap from historical candles ({symbol: [{'timestamp', 'close'}, ...]})
+
+        Returns:
+            Number of committed bars
+        """
+        committed = 0
+        rows = sorted(
+            (int(c["timestamp"]), symbol, float(c["close"]))
+            for symbol, candles in candles_by_symbol.items()
+            for c in candles or []
+        )
+        for timestamp, symbol, close in rows:
+            committed += self.on_closed_candle(symbol, timestamp, close)
+        return committed
+
+    def _commit(self, timestamp: int, closes: np.ndarray):
+        """Append an aligned bar and update rolling sums"""
+        prev = self._last_close
+        self._last_close = closes
+        self.last_bar_ts = timestamp
+
+        if np.isnan(prev).any():
+            return  # Первый бар - доходностей ещё нет
+
+        r = np.log(closes / prev)
+
+        for name, length in self.windows.items():
+            self._sum_x[name] += r
+            self._sum_xy[name] += np.outer(r, r)
+
+            # Выпадающий из окна бар (буфер ещё не сдвинут)
+            if len(self._returns) >= length:
+                old = self._returns[-length]
+                self._sum_x[name] -= old
+                self._sum_xy[name] -= np.outer(old, old)
+
+        self._returns.append(r)
+
+        self._updates_since_rebuild += 1
+        if self._updates_since_rebuild >= self.rebuild_every:
+            self._rebuild()
+
+    def _rebuild(self):
+        """Recompute all sums from the return buffer"""
+        data = np.array(self._returns)
+        for name, length in self.windows.items():
+            tail = data[-length:]
+            self._sum_x[name] = tail.sum(axis=0)
+            self._sum_xy[name] = tail.T @ tail
+        self._updates_since_rebuild = 0
+
+    # ========== ЧТЕНИЕ ==========
+
+    def samples(self, window: str) -> int:
+        """Number of returns currently inside the window"""
+        return min(len(self._returns), self.windows[window])
+
+    def required_samples(self, window: str) -> int:
+        """Returns needed before the window is served (min_coverage of its length)"""
+        length = self.windows[window]
+        return min(length, max(self.min_samples, math.ceil(length * self.min_coverage)))
+
+    def is_ready(self, window: str) -> bool:
+        return window in self.windows and self.samples(window) >= self.required_samples(window)
+
+    def _covariance(self, window: str) -> np.ndarray:
+        k = self.samples(window)
+        mean = self._sum_x[window] / k
+        return self._sum_xy[window] / k - np.outer(mean, mean)
+
+    def correlation_matrix(
+        self, window: str, symbols: Optional[List[str]] = None
+    ) -> Optional[List[List[float]]]:
+        """
+        Pearson correlation matrix for a window (optionally a subset of symbols)
+
+        Returns:
+            2D list or None if the window has too few samples
+        """
+        if not self.is_ready(window):
+            return None
+
+        cov = self._covariance(window)
+        std = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = cov / np.outer(std, std)
+        corr = np.nan_to_num(np.clip(corr, -1.0, 1.0))
+        np.fill_diagonal(corr, 1.0)
+
+        if symbols is not None:
+            idx = [self.index[s] for s in symbols]
+            corr = corr[np.ix_(idx, idx)]
+
+        return corr.tolist()
+
+    def betas(self, window: str) -> Dict[str, float]:
+        """Beta of every symbol to the benchmark (BTC)"""
+        if not self.is_ready(window) or self.benchmark not in self.index:
+            return {}
+
+        cov = self._covariance(window)
+        b = self.index[self.benchmark]
+        var_b = cov[b, b]
+        if var_b <= 0:
+            return {}
+
+        return {s: float(cov[i, b] / var_b) for s, i in self.index.items()}
+
+    def get_stats(self) -> Dict:
+        return {
+            "symbols": len(self.symbols),
+            "bars": len(self._returns),
+            "last_bar_ts": self.last_bar_ts,
+            "pending_bars": len(self._pending),
+            "windows": {name: self.samples(name) for name in self.windows},
+        }
+
+
+__all__ = ["RollingCorrelationEngine", "DEFAULT_WINDOWS"]
@@ -6,6 +6,7 @@ Cross-Exchange Validator для GIO Crypto Bot
 """
 
 import asyncio
+import time
 import numpy as np
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
@@ -13,6 +14,7 @@ from collections import defaultdict, deque
 from dataclasses import dataclass
 from enum import Enum
 from config.settings import logger
+from analytics.consolidated_book import get_consolidated_book
 
 
 class ValidationStatus(Enum):
@@ -111,6 +113,9 @@ class CrossExchangeValidator:
         # Anomaly tracking
         self.detected_anomalies: deque = deque(maxlen=100)
 
+        # Сводный стакан (NBBO, арбитраж по стаканам)
+        self.consolidated_book = get_consolidated_book()
+
         logger.info("✅ CrossExchangeValidator инициализирован")
 
     async def validate_price(self,
@@ -180,6 +185,15 @@ class CrossExchangeValidator:
                     f"{cheapest_ex}→{expensive_ex} spread: {price_deviation:.2%}"
                 )
 
+            # Пересечение стаканов (bid одной биржи > ask другой)
+            nbbo = self.consolidated_book.get_quote(symbol)
+            if (
+                nbbo
+                and nbbo["arbitrage"]
+                and AnomalyType.ARBITRAGE_OPPORTUNITY not in anomalies
+            ):
+                anomalies.append(AnomalyType.ARBITRAGE_OPPORTUNITY)
+
             # 6. Volume correlation
             volume_correlation = await self._calculate_volume_correlation(symbol, prices)
 
@@ -210,7 +224,8 @@ class CrossExchangeValidator:
                     'std_price': std_price,
                     'max_price': max_price,
                     'min_price': min_price,
-                    'prices': exchange_prices
+                    'prices': exchange_prices,
+                    'nbbo': nbbo
                 },
                 timestamp=datetime.utcnow()
             )
@@ -458,6 +473,13 @@ class CrossExchangeValidator:
             (exchange, price) или None
         """
         try:
+            # Сводный стакан: лучший ask для покупки, лучший bid для продажи
+            nbbo = self.consolidated_book.get_quote(symbol)
+            if nbbo and time.time() - nbbo['timestamp'] <= self.consolidated_book.max_age_seconds:
+                if side == 'buy':
+                    return (nbbo['best_ask_venue'], nbbo['best_ask'])
+                return (nbbo['best_bid_venue'], nbbo['best_bid'])
+
             prices = {}
             for exchange, history in self.price_history[symbol].items():
                 if history:
@@ -5,11 +5,12 @@ CVD Calculator - Cumulative Volume Delta
 """
 
 import asyncio
-from collections import deque, defaultdict
+from collections import defaultdict
 from typing import Dict, Optional, Tuple
 from datetime import datetime, timedelta
 
 from config.settings import logger
+from models.compact_data import TradeBuffer
 
 
 class CVDCalculator:
@@ -30,13 +31,15 @@ class CVDCalculator:
         # Cumulative CVD (от начала сессии)
         self.cumulative_cvd: Dict[str, float] = defaultdict(float)
 
-        # Rolling CVD (последние N trades)
-        self.rolling_trades: Dict[str, deque] = defaultdict(
-            lambda: deque(maxlen=window_size)
+        # Rolling CVD (последние N trades) - кольцевой буфер с готовыми суммами
+        self.rolling_trades: Dict[str, TradeBuffer] = defaultdict(
+            lambda: TradeBuffer(window_size)
         )
 
-        # Trade history для анализа
-        self.trade_history: Dict[str, list] = defaultdict(list)
+        # Trade history для анализа (последние 1000)
+        self.trade_history: Dict[str, TradeBuffer] = defaultdict(
+            lambda: TradeBuffer(1000)
+        )
 
         # CVD trend detection
         self.cvd_trend: Dict[str, str] = defaultdict(lambda: "NEUTRAL")
@@ -75,20 +78,10 @@ class CVDCalculator:
         # Update cumulative CVD
         self.cumulative_cvd[symbol] += delta
 
-        # Add to rolling window
-        trade_data = {
-            "timestamp": timestamp,
-            "side": side,
-            "volume": volume,
-            "price": price,
-            "delta": delta,
-        }
-        self.rolling_trades[symbol].append(trade_data)
-
-        # Add to history (keep last 1000)
-        self.trade_history[symbol].append(trade_data)
-        if len(self.trade_history[symbol]) > 1000:
-            self.trade_history[symbol] = self.trade_history[symbol][-1000:]
+        # Add to rolling window и history (буферы сами вытесняют старые)
+        is_buy = side == "BUY"
+        self.rolling_trades[symbol].append(timestamp, price, volume, is_buy)
+        self.trade_history[symbol].append(timestamp, price, volume, is_buy)
 
         # Update statistics
         self.stats["total_trades"] += 1
@@ -111,7 +104,7 @@ class CVDCalculator:
         if symbol not in self.rolling_trades:
             return 0.0
 
-        return sum(trade["delta"] for trade in self.rolling_trades[symbol])
+        return self.rolling_trades[symbol].delta_total
 
     def get_cvd_trend(self, symbol: str, window: int = None) -> Dict:
         """
@@ -140,9 +133,10 @@ class CVDCalculator:
             }
 
         window = window or self.window_size
-        trades = list(self.rolling_trades[symbol])[-window:]
+        trades = self.rolling_trades[symbol]
+        count = min(window, len(trades))
 
-        if not trades:
+        if not count:
             return {
                 "trend": "NEUTRAL",
                 "strength": 0,
@@ -152,10 +146,10 @@ class CVDCalculator:
             }
 
         # Calculate rolling CVD
-        rolling_cvd = sum(t["delta"] for t in trades)
+        rolling_cvd, max_volume, _ = trades.sums(window)
 
         # Calculate delta moving average
-        delta_ma = rolling_cvd / len(trades) if trades else 0.0
+        delta_ma = rolling_cvd / count
 
         # Determine trend
         cumulative_cvd = self.get_cvd(symbol)
@@ -164,7 +158,6 @@ class CVDCalculator:
         if rolling_cvd > 0 and delta_ma > 0:
             trend = "BULLISH"
             # Strength based on how positive rolling_cvd is
-            max_volume = sum(t["volume"] for t in trades)
             strength = (
                 min(100, int((rolling_cvd / max_volume) * 100))
                 if max_volume > 0
@@ -172,7 +165,6 @@ class CVDCalculator:
             )
         elif rolling_cvd < 0 and delta_ma < 0:
             trend = "BEARISH"
-            max_volume = sum(t["volume"] for t in trades)
             strength = (
                 min(100, int((abs(rolling_cvd) / max_volume) * 100))
                 if max_volume > 0
@@ -245,15 +237,11 @@ class CVDCalculator:
             }
         """
         window = window or self.window_size
-        trades = (
-            list(self.rolling_trades[symbol])[-window:]
-            if symbol in self.rolling_trades
-            else []
-        )
-
-        buy_volume = sum(t["volume"] for t in trades if t["side"] == "BUY")
-        sell_volume = sum(t["volume"] for t in trades if t["side"] == "SELL")
-        total_volume = buy_volume + sell_volume
+        if symbol in self.rolling_trades:
+            _, total_volume, buy_volume = self.rolling_trades[symbol].sums(window)
+        else:
+            total_volume = buy_volume = 0.0
+        sell_volume = total_volume - buy_volume
 
         ratio = buy_volume / sell_volume if sell_volume > 0 else float("inf")
         buy_percent = (buy_volume / total_volume * 100) if total_volume > 0 else 0
@@ -295,7 +283,7 @@ class CVDCalculator:
                 "trend": self.cvd_trend.get(symbol, "NEUTRAL"),
                 "buy_volume": self.stats["buy_volume"].get(symbol, 0.0),
                 "sell_volume": self.stats["sell_volume"].get(symbol, 0.0),
-                "trades_count": len(self.trade_history.get(symbol, [])),
+                "trades_count": len(self.trade_history.get(symbol, ())),
             }
         else:
             return {
@@ -11,6 +11,7 @@ from datetime import datetime, timedelta
 from collections import defaultdict
 import re
 from config.settings import logger
+from config.constants import SYMBOL_KEYWORDS
 
 # Попытка импорта VADER
 try:
@@ -109,19 +110,6 @@ KEYWORD_WEIGHTS = {
 }
 
 
-# Символы и их ключевые слова
-SYMBOL_KEYWORDS = {
-    "BTC": ["bitcoin", "btc", "btcusd", "btcusdt", "xbt"],
-    "ETH": ["ethereum", "eth", "ether", "ethusdt", "vitalik"],
-    "BNB": ["binance", "bnb"],
-    "SOL": ["solana", "sol"],
-    "XRP": ["ripple", "xrp"],
-    "ADA": ["cardano", "ada"],
-    "DOGE": ["dogecoin", "doge"],
-    "ALT": ["altcoin", "alt", "crypto", "cryptocurrency", "defi", "nft"],
-}
-
-
 class UnifiedSentimentAnalyzer:
     """
     Объединённый Enhanced Sentiment Analyzer v2.0:
@@ -132,10 +120,16 @@ class UnifiedSentimentAnalyzer:
     - Агрегация sentiment за период
     - Генерация новостных алертов
     - Кэширование и history tracking
+    - Индексная выборка новостей по символу из NewsStore (если подключен)
     """
 
-    def __init__(self):
-        """Инициализация"""
+    def __init__(self, news_store=None):
+        """
+        Инициализация
+
+        Args:
+            news_store: NewsStore с предрассчитанным символ → новости (опционально)
+        """
 
         # VADER для базового sentiment (если доступен)
         if VADER_AVAILABLE:
@@ -158,6 +152,9 @@ class UnifiedSentimentAnalyzer:
         # История sentiment (для трекинга трендов)
         self.sentiment_history = defaultdict(list)
 
+        # Персистентное хранилище новостей
+        self.news_store = news_store
+
         logger.info("✅ UnifiedSentimentAnalyzer v2.0 инициализирован")
         logger.info(f"   📊 Биграммы: {len(self.bigram_weights)}")
         logger.info(f"   📊 Униграммы: {len(self.keyword_weights)}")
@@ -296,20 +293,27 @@ class UnifiedSentimentAnalyzer:
 
     # ========== ОСТАЛЬНЫЕ МЕТОДЫ (БЕЗ ИЗМЕНЕНИЙ) ==========
 
-    def analyze_news(self, news_list: List[Dict], symbol: str = None) -> Dict:
+    def analyze_news(
+        self, news_list: List[Dict], symbol: str = None, prefiltered: bool = False
+    ) -> Dict:
         """
         Анализ новостей с фильтрацией по символу
 
         Args:
             news_list: Список новостей
             symbol: Символ для фильтрации (BTC, ETH, ALT) или None для всех
+            prefiltered: Новости уже выбраны по символу (NewsStore)
 
         Returns:
             Dict с sentiment анализом
         """
         try:
             # Фильтруем новости по символу
-            filtered_news = self.filter_news_by_symbol(news_list, symbol)
+            filtered_news = (
+                news_list
+                if prefiltered
+                else self.filter_news_by_symbol(news_list, symbol)
+            )
 
             if not filtered_news:
                 return {
@@ -483,6 +487,10 @@ class UnifiedSentimentAnalyzer:
 
             if news_list:
                 return self.analyze_news(news_list, category)
+            elif self.news_store:
+                # Индексный запрос вместо перебора всех новостей
+                store_news = self.news_store.get_news_for_symbol(category, hours=24)
+                return self.analyze_news(store_news, category, prefiltered=True)
             else:
                 cached_news = self.news_cache.get(category, [])
                 return self.analyze_news(cached_news, category)
@@ -499,14 +507,17 @@ class UnifiedSentimentAnalyzer:
     def get_aggregated_sentiment(self, symbol: str, hours: int = 24) -> Dict:
         """Получение агрегированного sentiment за период"""
         try:
-            cutoff_time = datetime.now().timestamp() - (hours * 3600)
+            if self.news_store:
+                recent_news = self.news_store.get_news_for_symbol(symbol, hours=hours)
+            else:
+                cutoff_time = datetime.now().timestamp() - (hours * 3600)
 
-            cached_news = self.news_cache.get(symbol.upper(), [])
-            recent_news = [
-                news
-                for news in cached_news
-                if news.get("published_on", 0) > cutoff_time
-            ]
+                cached_news = self.news_cache.get(symbol.upper(), [])
+                recent_news = [
+                    news
+                    for news in cached_news
+                    if news.get("published_on", 0) > cutoff_time
+                ]
 
             if not recent_news:
                 return {
@@ -520,7 +531,9 @@ class UnifiedSentimentAnalyzer:
                     "period_hours": hours,
                 }
 
-            result = self.analyze_news(recent_news, symbol)
+            result = self.analyze_news(
+                recent_news, symbol, prefiltered=self.news_store is not None
+            )
             result["period_hours"] = hours
             result["symbol"] = symbol
             result["sentiment_trend"] = result.get("sentiment", "neutral")
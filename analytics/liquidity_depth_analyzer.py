@@ -9,6 +9,7 @@ import asyncio
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from config.settings import logger
+from utils.cache_manager import get_cache_manager
 
 
 class LiquidityDepthAnalyzer:
@@ -25,8 +26,7 @@ class LiquidityDepthAnalyzer:
     def __init__(self, bot_instance):
         self.bot = bot_instance
         self.cache_duration = 60  # 1 minute cache
-        self._cache = {}
-        self._cache_timestamp = {}
+        self.cache = get_cache_manager()
 
         # Thresholds
         self.whale_threshold_usd = 1_000_000  # $1M+ считается whale wall
@@ -52,23 +52,28 @@ class LiquidityDepthAnalyzer:
                 "key_levels": {...}
             }
         """
+        result = await self.cache.get_or_compute(
+            symbol,
+            lambda: self._analyze_liquidity(symbol),
+            ttl=self.cache_duration,
+            namespace="liquidity",
+        )
+        return result if result is not None else self._empty_result(symbol)
+
+    async def _analyze_liquidity(self, symbol: str) -> Optional[Dict]:
+        """Analysis without cache; None on failure (not cached)"""
         try:
-            # Check cache
-            cache_key = f"liq_{symbol}"
-            if self._is_cached(cache_key):
-                return self._cache[cache_key]
-
             # Get current price
             ticker = await self.bot.bybit_connector.get_ticker(symbol)
             if not ticker:
-                return self._empty_result(symbol)
+                return None
 
             current_price = float(ticker.get("lastPrice", 0))
 
             # Get orderbook (L2 depth)
             orderbook = await self._get_orderbook(symbol)
             if not orderbook:
-                return self._empty_result(symbol)
+                return None
 
             # Analyze bids and asks
             bid_analysis = self._analyze_side(
@@ -102,15 +107,11 @@ class LiquidityDepthAnalyzer:
                 "key_levels": key_levels,
             }
 
-            # Cache result
-            self._cache[cache_key] = result
-            self._cache_timestamp[cache_key] = datetime.now()
-
             return result
 
         except Exception as e:
             logger.error(f"analyze_liquidity error: {e}", exc_info=True)
-            return self._empty_result(symbol)
+            return None
 
     async def _get_orderbook(self, symbol: str, limit: int = 50) -> Optional[Dict]:
         """Get L2 orderbook from exchange"""
@@ -320,18 +321,6 @@ class LiquidityDepthAnalyzer:
             logger.error(f"format_liquidity_analysis error: {e}")
             return "⚠️ Ошибка форматирования"
 
-    def _is_cached(self, key: str) -> bool:
-        """Check if result is cached and valid"""
-        if key not in self._cache:
-            return False
-
-        timestamp = self._cache_timestamp.get(key)
-        if not timestamp:
-            return False
-
-        age = (datetime.now() - timestamp).total_seconds()
-        return age < self.cache_duration
-
     def _empty_result(self, symbol: str) -> Dict:
         """Return empty result"""
         return {
@@ -9,6 +9,7 @@ import requests
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from config.settings import logger
+from utils.cache_manager import get_cache_manager
 import os
 import hashlib
 
@@ -28,9 +29,10 @@ class NewsSentimentAnalyzer:
         # CryptoCompare API (бесплатный, не требует API key для основных функций)
         self.cryptocompare_url = "https://min-api.cryptocompare.com/data/v2/news/"
 
-        # Кэш новостей
-        self.cache = {}
+        # Кэш новостей (namespace "news" в CacheManager)
+        self.cache = get_cache_manager()
         self.cache_duration = 600  # 10 минут
+        self.sentiment_cache_duration = 86400  # sentiment заголовка не меняется
 
         logger.info("✅ NewsSentimentAnalyzer инициализирован")
 
@@ -45,13 +47,17 @@ class NewsSentimentAnalyzer:
         Returns:
             Список новостей с метаданными
         """
-        try:
-            # Проверяем кэш
-            cache_key = f"news_{hours}h"
-            if self._is_cached(cache_key):
-                logger.debug(f"✅ Используем кэш новостей ({hours}h)")
-                return self.cache[cache_key]
+        news = await self.cache.get_or_compute(
+            f"latest_{hours}h",
+            lambda: self._fetch_latest_news(hours, limit),
+            ttl=self.cache_duration,
+            namespace="news",
+        )
+        return news if news is not None else []
 
+    async def _fetch_latest_news(self, hours: int, limit: int) -> Optional[List[Dict]]:
+        """Запрос к CryptoCompare без кэша; None при ошибке (не кэшируется)"""
+        try:
             # Запрос к CryptoCompare
             params = {"lang": "EN", "sortOrder": "latest"}
 
@@ -100,16 +106,13 @@ class NewsSentimentAnalyzer:
                     if len(filtered_news) >= limit:
                         break
 
-            # Кэшируем результат
-            self.cache[cache_key] = filtered_news
-
             logger.info(f"✅ Получено {len(filtered_news)} новостей за {hours}h")
 
             return filtered_news
 
         except Exception as e:
             logger.error(f"❌ get_latest_news error: {e}", exc_info=True)
-            return []
+            return None
 
     async def analyze_sentiment(self, news_list: List[Dict]) -> List[Dict]:
         """
@@ -134,9 +137,10 @@ class NewsSentimentAnalyzer:
                         f"sentiment_{hashlib.md5(news['title'].encode()).hexdigest()}"
                     )
 
-                    if cache_key in self.cache:
-                        news["sentiment"] = self.cache[cache_key]["sentiment"]
-                        news["sentiment_emoji"] = self.cache[cache_key]["emoji"]
+                    cached = await self.cache.get(cache_key, namespace="news")
+                    if cached is not None:
+                        news["sentiment"] = cached["sentiment"]
+                        news["sentiment_emoji"] = cached["emoji"]
                         logger.debug(
                             f"✅ Используем кэш sentiment для новости: {news['title'][:50]}..."
                         )
@@ -168,10 +172,12 @@ class NewsSentimentAnalyzer:
                             news["sentiment_emoji"] = "🟡"
 
                         # ✅ КЭШИРУЕМ РЕЗУЛЬТАТ
-                        self.cache[cache_key] = {
-                            "sentiment": news["sentiment"],
-                            "emoji": news["sentiment_emoji"],
-                        }
+                        await self.cache.set(
+                            cache_key,
+                            {"sentiment": news["sentiment"], "emoji": news["sentiment_emoji"]},
+                            ttl=self.sentiment_cache_duration,
+                            namespace="news",
+                        )
                     else:
                         # ✅ ИСПОЛЬЗУЕМ RULE-BASED FALLBACK И КЭШИРУЕМ
                         sentiment = self._rule_based_sentiment_single(news["title"])
@@ -179,10 +185,12 @@ class NewsSentimentAnalyzer:
                         news["sentiment_emoji"] = sentiment["emoji"]
 
                         # ✅ КЭШИРУЕМ FALLBACK РЕЗУЛЬТАТ
-                        self.cache[cache_key] = {
-                            "sentiment": news["sentiment"],
-                            "emoji": news["sentiment_emoji"],
-                        }
+                        await self.cache.set(
+                            cache_key,
+                            {"sentiment": news["sentiment"], "emoji": news["sentiment_emoji"]},
+                            ttl=self.sentiment_cache_duration,
+                            namespace="news",
+                        )
 
 
                 except Exception as e:
@@ -538,15 +546,6 @@ class NewsSentimentAnalyzer:
     ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"""
 
 
-    def _is_cached(self, key: str) -> bool:
-        """Проверяет актуальность кэша"""
-        if key not in self.cache:
-            return False
-
-        # Проверяем время жизни кэша
-        # (упрощённо, можно добавить timestamp tracking)
-        return True
-
     def format_news_report(self, news_list: List[Dict], overall: Dict) -> str:
         """Форматирует отчёт по новостям для Telegram"""
         if not news_list:
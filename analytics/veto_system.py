@@ -5,6 +5,7 @@
 """
 
 import asyncio
+import numpy as np
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
 from enum import Enum
@@ -12,11 +13,19 @@ from collections import deque, defaultdict
 
 from config.settings import (
     logger, FUNDING_RATE_VETO_THRESHOLD, VOLUME_ANOMALY_VETO_THRESHOLD,
-    SPREAD_VETO_THRESHOLD, LIQUIDATION_CASCADE_VETO_COUNT, MARKET_STABILITY_THRESHOLD
+    SPREAD_VETO_THRESHOLD, LIQUIDATION_CASCADE_VETO_COUNT, LIQUIDATION_VOLUME_THRESHOLD,
+    MARKET_STABILITY_THRESHOLD
 )
 from config.constants import VetoReasonEnum, AlertTypeEnum, TrendDirectionEnum, Colors
 from utils.helpers import current_epoch_ms, safe_float, format_percentage
-from utils.validators import validate_market_data_completeness
+
+
+# Семейства входов: проверка перезапускается, только когда меняется
+# отпечаток (версия) её входов
+VETO_FAMILIES = ("funding", "volume", "spread", "liquidation", "stability", "orderbook", "news")
+
+# Повторно используемый результат старше - пересчитывается
+VETO_MEMO_MAX_AGE_MS = 60000
 
 
 class VetoSeverityEnum(Enum):
@@ -69,7 +78,12 @@ class EnhancedVetoSystem:
         self.funding_rate_history = deque(maxlen=100)
         self.volume_history = deque(maxlen=500)
         self.spread_history = deque(maxlen=200)
-        self.liquidation_events = deque(maxlen=1000)
+        self.liquidation_events = deque(maxlen=1000)  # Обнаруженные каскады
+        # Импорт здесь: connectors/__init__ → news_connector → data.news_store
+        # замыкается на analytics при импорте на уровне модуля
+        from connectors.bybit_liquidation_stream import get_liquidation_aggregator
+
+        self.liquidations = get_liquidation_aggregator()
         self.market_anomalies = deque(maxlen=200)
 
         # Настройки чувствительности
@@ -103,6 +117,14 @@ class EnhancedVetoSystem:
             "market_stability": MARKET_STABILITY_THRESHOLD,
         }
 
+        # Мемоизация по версиям входов
+        # {(symbol, family): (fingerprint, trigger, computed_ms)}
+        self._check_memo: Dict[Tuple[str, str], Tuple[Any, Optional[VetoTrigger], int]] = {}
+        # {symbol: (ключ состояния, VetoAnalysisResult)}
+        self._result_memo: Dict[str, Tuple[Any, VetoAnalysisResult]] = {}
+        self._active_version = 0  # Растёт при изменении набора активных вето
+        self.memo_stats = {"checks_run": 0, "checks_reused": 0, "results_reused": 0}
+
         logger.info("✅ EnhancedVetoSystem инициализирована")
 
     async def analyze_market_conditions(
@@ -116,52 +138,49 @@ class EnhancedVetoSystem:
         try:
             current_time = current_epoch_ms()
 
-            # Проверяем полноту рыночных данных
-            data_completeness = validate_market_data_completeness(market_data)
-            if not any(data_completeness.values()):
+            # Проверяем полноту рыночных данных (хотя бы один вход проверок)
+            if not market_data or not any(
+                market_data.get(key) for key in ("ticker", "orderbook", "funding_rate")
+            ):
                 return self._create_no_data_result(current_time)
 
-            # Выполняем различные проверки
-            veto_triggers = []
-
-            # 1. Анализ funding rate
-            funding_veto = await self._check_funding_rate(market_data, symbol)
-            if funding_veto:
-                veto_triggers.append(funding_veto)
-
-            # 2. Анализ аномалий объёма
-            volume_veto = await self._check_volume_anomaly(market_data, volume_profile, symbol)
-            if volume_veto:
-                veto_triggers.append(volume_veto)
-
-            # 3. Анализ спреда
-            spread_veto = await self._check_spread_conditions(market_data, symbol)
-            if spread_veto:
-                veto_triggers.append(spread_veto)
-
-            # 4. Анализ каскадов ликвидации
-            liquidation_veto = await self._check_liquidation_cascade(market_data, symbol)
-            if liquidation_veto:
-                veto_triggers.append(liquidation_veto)
-
-            # 5. Анализ стабильности рынка
-            stability_veto = await self._check_market_stability(market_data, symbol)
-            if stability_veto:
-                veto_triggers.append(stability_veto)
-
-            # 6. Анализ манипуляций orderbook
-            manipulation_veto = await self._check_orderbook_manipulation(market_data, symbol)
-            if manipulation_veto:
-                veto_triggers.append(manipulation_veto)
-
-            # 7. Анализ конфликтов новостей
+            # Результат того же состояния рынка (сканер, генератор, дашборды)
+            fingerprints = self._input_fingerprints(symbol, market_data, news_sentiment)
+            by_family = dict(zip(VETO_FAMILIES, fingerprints))
+            cached = self._result_memo.get(symbol)
+            if (
+                cached is not None
+                and cached[0] == (fingerprints, self._active_version)
+                and current_time < cached[1].next_check_time
+            ):
+                self.memo_stats["results_reused"] += 1
+                return cached[1]
+
+            # Выполняем различные проверки (только при смене входов семейства)
+            checks = {
+                "funding": lambda: self._check_funding_rate(market_data, symbol),
+                "volume": lambda: self._check_volume_anomaly(market_data, volume_profile, symbol),
+                "spread": lambda: self._check_spread_conditions(market_data, symbol),
+                "liquidation": lambda: self._check_liquidation_cascade(market_data, symbol),
+                "stability": lambda: self._check_market_stability(market_data, symbol),
+                "orderbook": lambda: self._check_orderbook_manipulation(market_data, symbol),
+            }
             if news_sentiment:
-                news_veto = await self._check_news_conflicts(news_sentiment, symbol)
-                if news_veto:
-                    veto_triggers.append(news_veto)
+                checks["news"] = lambda: self._check_news_conflicts(news_sentiment, symbol)
+
+            veto_triggers = []
+            fresh_triggers = []
+            for family, check in checks.items():
+                trigger, fresh = await self._run_check(
+                    symbol, family, by_family[family], check, current_time
+                )
+                if trigger:
+                    veto_triggers.append(trigger)
+                    if fresh:
+                        fresh_triggers.append(trigger)
 
-            # Обновляем активные вето
-            await self._update_active_vetos(veto_triggers, current_time)
+            # Обновляем активные вето (в историю - только новые срабатывания)
+            await self._update_active_vetos(veto_triggers, current_time, fresh_triggers)
 
             # Рассчитываем общий риск-скор
             risk_score = self._calculate_risk_score(veto_triggers, market_data)
@@ -187,6 +206,8 @@ class EnhancedVetoSystem:
                 veto_history_summary=self._get_veto_history_summary()
             )
 
+            self._result_memo[symbol] = ((fingerprints, self._active_version), result)
+
             # Логируем результат если есть активные вето
             if is_vetoed:
                 self._log_veto_result(result, symbol)
@@ -197,6 +218,108 @@ class EnhancedVetoSystem:
             logger.error(f"❌ Ошибка анализа veto системы: {e}")
             return self._create_error_result(current_time, str(e))
 
+    def _input_fingerprints(
+        self, symbol: str, market_data: Dict, news_sentiment: Optional[Dict]
+    ) -> Tuple:
+        """
+        Отпечатки входов по семействам (порядок VETO_FAMILIES)
+
+        В отпечаток входят и пороги: смена adaptive_thresholds /
+        sensitivity_settings тоже перезапускает проверку. Общая история
+        объёма в отпечаток не входит: тот же объём не дописывается в неё
+        повторно, а её сдвиг учитывается через VETO_MEMO_MAX_AGE_MS.
+        """
+        thresholds = self.adaptive_thresholds
+        sensitivity = self.sensitivity_settings
+        ticker = market_data.get("ticker") or {}
+        orderbook = market_data.get("orderbook") or {}
+        funding = market_data.get("funding_rate") or {}
+
+        def safe(build):
+            try:
+                return build()
+            except Exception:
+                return object()  # Не сравнится ни с чем - проверка выполнится
+
+        funding_rate = safe(lambda: safe_float(funding.get("funding_rate", 0)))
+        spread = safe(
+            lambda: (
+                safe_float(orderbook.get("spread_bps", 0)),
+                safe_float(orderbook.get("mid_price", 0)),
+            )
+        )
+
+        def top_sizes(side):
+            return tuple(safe_float(level.get("size", 0)) for level in orderbook.get(side, [])[:5])
+
+        def news():
+            item = news_sentiment.get(symbol) if news_sentiment else None
+            if item is None:
+                return None
+            return (
+                item.bullish_count,
+                item.bearish_count,
+                item.total_news_count,
+                item.confidence,
+                item.overall_sentiment,
+            )
+
+        return (
+            (funding_rate, thresholds["funding_rate"], sensitivity["funding_rate"]),
+            (
+                safe(lambda: safe_float(ticker.get("volume_24h", 0))),
+                thresholds["volume_anomaly"],
+                sensitivity["volume_anomaly"],
+            ),
+            (spread, thresholds["spread"], sensitivity["spread"]),
+            (
+                self.liquidations.version(symbol),
+                current_epoch_ms() // 60000,  # Окно в час сдвигается поминутно
+                thresholds["liquidation_cascade"],
+                sensitivity["liquidation"],
+            ),
+            (
+                spread,
+                safe(lambda: safe_float(ticker.get("price_24h_pcnt", 0))),
+                funding_rate,
+                thresholds["market_stability"],
+                sensitivity["market_stability"],
+            ),
+            safe(lambda: (top_sizes("bids"), top_sizes("asks"))),
+            safe(news),
+        )
+
+    async def _run_check(
+        self, symbol: str, family: str, fingerprint: Any, check, current_time: int
+    ) -> Tuple[Optional[VetoTrigger], bool]:
+        """
+        Проверка семейства или её прошлый результат
+
+        Returns:
+            (trigger, fresh) - fresh=False, если результат взят из мемо
+        """
+        key = (symbol, family)
+        memo = self._check_memo.get(key)
+        if (
+            memo is not None
+            and memo[0] == fingerprint
+            and current_time - memo[2] < VETO_MEMO_MAX_AGE_MS
+        ):
+            self.memo_stats["checks_reused"] += 1
+            return memo[1], False
+
+        trigger = await check()
+        self.memo_stats["checks_run"] += 1
+        self._check_memo[key] = (fingerprint, trigger, current_time)
+        return trigger, True
+
+    def get_cached_result(self, symbol: str) -> Optional[VetoAnalysisResult]:
+        """Последний результат символа, пока не наступил next_check_time (дашборды)"""
+        cached = self._result_memo.get(symbol)
+        if cached is None or current_epoch_ms() >= cached[1].next_check_time:
+            return None
+        return cached[1]
+
     async def _check_funding_rate(self, market_data: Dict, symbol: str) -> Optional[VetoTrigger]:
         """Проверка funding rate на экстремальные значения"""
         try:
@@ -400,48 +523,44 @@ class EnhancedVetoSystem:
             return VetoSeverityEnum.LOW
 
     async def _check_liquidation_cascade(self, market_data: Dict, symbol: str) -> Optional[VetoTrigger]:
-        """Проверка каскадов ликвидации"""
-        try:
-            # Для упрощения, используем анализ резких движений цены как индикатор ликвидации
-            ticker = market_data.get("ticker", {})
-            price_change = safe_float(ticker.get("price_24h_pcnt", 0))
+        """
+        Проверка каскадов ликвидации
 
-            if abs(price_change) == 0:
+        Каскад = число минут за последний час, в которые ликвидировано
+        >= LIQUIDATION_VOLUME_THRESHOLD. Считается по поминутным бакетам
+        LiquidationAggregator (без сети и без хранения событий).
+        """
+        try:
+            if not self.liquidations.has_data(symbol):
                 return None
 
-            # Добавляем событие в историю
-            liquidation_event = {
-                "price_change": price_change,
-                "timestamp": current_epoch_ms(),
-                "symbol": symbol,
-                "severity": "high" if abs(price_change) > 10 else "medium" if abs(price_change) > 5 else "low"
-            }
-
-            self.liquidation_events.append(liquidation_event)
-
-            # Подсчитываем количество значительных событий за последний час
-            current_time = current_epoch_ms()
-            hour_ago = current_time - 3600000
-
-            recent_events = [
-                event for event in self.liquidation_events
-                if event["timestamp"] > hour_ago and abs(event["price_change"]) > 3
-            ]
+            window = self.liquidations.heavy_minutes(symbol, 60, LIQUIDATION_VOLUME_THRESHOLD)
+            heavy_minutes = window["minutes"]
+            if heavy_minutes == 0:
+                return None
 
             threshold = self.adaptive_thresholds["liquidation_cascade"] * self.sensitivity_settings["liquidation"]
 
-            if len(recent_events) > threshold:
-                cascade_severity = self._determine_liquidation_severity(len(recent_events), threshold)
+            if heavy_minutes > threshold:
+                cascade_severity = self._determine_liquidation_severity(heavy_minutes, threshold)
+
+                self.liquidation_events.append({
+                    "symbol": symbol,
+                    "timestamp": current_epoch_ms(),
+                    "heavy_minutes": heavy_minutes,
+                    "total_usd": window["total"],
+                })
 
                 return VetoTrigger(
                     reason=VetoReasonEnum.LIQUIDATION_CASCADE,
                     severity=cascade_severity,
-                    confidence=min(1.0, len(recent_events) / (threshold * 2)),
-                    message=f"Каскад ликвидации: {len(recent_events)} событий за час (порог: {threshold})",
+                    confidence=min(1.0, heavy_minutes / (threshold * 2)),
+                    message=f"Каскад ликвидации: {heavy_minutes} минут с ликвидациями за час (порог: {threshold})",
                     data={
-                        "events_count": len(recent_events),
+                        "events_count": heavy_minutes,
                         "threshold": threshold,
-                        "max_price_change": max(abs(e["price_change"]) for e in recent_events),
+                        "max_minute_usd": window["max_usd"],
+                        "total_usd": window["total"],
                         "timeframe": "1h"
                     },
                     affected_symbols=[symbol],
@@ -633,14 +752,31 @@ class EnhancedVetoSystem:
         else:
             return VetoSeverityEnum.LOW
 
-    async def _update_active_vetos(self, new_triggers: List[VetoTrigger], current_time: int):
-        """Обновление активных вето"""
+    async def _update_active_vetos(
+        self,
+        new_triggers: List[VetoTrigger],
+        current_time: int,
+        recorded: Optional[List[VetoTrigger]] = None,
+    ):
+        """
+        Обновление активных вето
+
+        Args:
+            recorded: Триггеры для истории и статистики (по умолчанию все);
+                      повторно использованные из мемо не записываются дважды
+        """
         try:
+            active_before = set(self.active_vetos)
+            recorded_ids = {id(t) for t in (new_triggers if recorded is None else recorded)}
+
             # Добавляем новые триггеры
             for trigger in new_triggers:
                 veto_key = f"{trigger.reason.value}_{trigger.affected_symbols[0] if trigger.affected_symbols else 'global'}"
                 self.active_vetos[veto_key] = trigger
 
+                if id(trigger) not in recorded_ids:
+                    continue
+
                 # Добавляем в историю
                 self.veto_history.append(trigger)
 
@@ -657,6 +793,9 @@ class EnhancedVetoSystem:
                 expired_veto = self.active_vetos.pop(key)
                 logger.info(f"⏰ Вето истекло: {expired_veto.reason.value} для {expired_veto.affected_symbols}")
 
+            if set(self.active_vetos) != active_before:
+                self._active_version += 1
+
         except Exception as e:
             logger.error(f"❌ Ошибка обновления active vetos: {e}")
 
@@ -912,7 +1051,10 @@ class EnhancedVetoSystem:
             }
 
             if result.active_vetos:
-                max_severity = max(veto.severity for veto in result.active_vetos)
+                order = list(severity_colors)
+                max_severity = max(
+                    (veto.severity for veto in result.active_vetos), key=order.index
+                )
                 color = severity_colors.get(max_severity, Colors.ALERT)
             else:
                 color = Colors.ALERT
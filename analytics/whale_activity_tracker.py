@@ -5,12 +5,141 @@ Whale Activity Tracker
 Отслеживание крупных ордеров (китов) с сохранением в БД
 """
 
+import asyncio
+import math
 import sqlite3
+import time
 from datetime import datetime, timedelta, UTC
 from typing import Dict, List, Optional
 from collections import deque
-from config.settings import logger
+
+import numpy as np
+
+from config.settings import STORAGE_RETENTION_CONFIG, logger
 from connectors.whale_log_batcher import WhaleLogBatcher  # ✅ ПРОВЕРИТЬ ПУТЬ!
+from data.time_partitions import (
+    PartitionCompactor,
+    Rollup,
+    TimePartitionedTable,
+    enable_incremental_vacuum,
+)
+
+
+def large_trades_table() -> TimePartitionedTable:
+    """large_trades: партиции по дням (UTC) + view large_trades"""
+    return TimePartitionedTable(
+        "large_trades",
+        [
+            ("symbol", "TEXT NOT NULL"),
+            ("side", "TEXT NOT NULL"),
+            ("size", "REAL NOT NULL"),
+            ("price", "REAL NOT NULL"),
+            ("size_usd", "REAL NOT NULL"),
+            ("timestamp", "DATETIME"),
+            ("ts", "INTEGER NOT NULL"),
+        ],
+        time_column="ts",
+        period="day",
+        indexes=[("symbol", "ts")],
+    )
+
+
+def large_trades_rollups() -> List[Rollup]:
+    """Агрегаты китов 1m / 1h для партиций старше retention сырых сделок"""
+    rollups = []
+    for name, bucket_ms in (("large_trades_1m", 60_000), ("large_trades_1h", 3_600_000)):
+        target = TimePartitionedTable(
+            name,
+            [
+                ("symbol", "TEXT NOT NULL"),
+                ("side", "TEXT NOT NULL"),
+                ("bucket_ts", "INTEGER NOT NULL"),
+                ("trades", "INTEGER NOT NULL"),
+                ("size", "REAL NOT NULL"),
+                ("volume_usd", "REAL NOT NULL"),
+                ("max_usd", "REAL NOT NULL"),
+            ],
+            time_column="bucket_ts",
+            period="week",
+            indexes=[("symbol", "bucket_ts")],
+            unique=("symbol", "side", "bucket_ts"),
+        )
+        rollups.append(
+            Rollup(
+                target,
+                bucket_ms,
+                keys=("symbol", "side"),
+                aggregates={
+                    "trades": "COUNT(*)",
+                    "size": "SUM(size)",
+                    "volume_usd": "SUM(size_usd)",
+                    "max_usd": "MAX(size_usd)",
+                },
+            )
+        )
+    return rollups
+
+
+class _WhaleBuckets:
+    """
+    Поминутные агрегаты китов одного символа (кольцо на ring_minutes)
+
+    Слот = minute % size; обновляется на вставке, сводка за N минут
+    читает ровно N слотов.
+    """
+
+    __slots__ = ("size", "minute", "buy_count", "sell_count", "buy_volume",
+                 "sell_volume", "max_value", "max_trade")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.minute = np.full(size, -1, dtype=np.int64)
+        self.buy_count = np.zeros(size, dtype=np.int64)
+        self.sell_count = np.zeros(size, dtype=np.int64)
+        self.buy_volume = np.zeros(size, dtype=np.float64)
+        self.sell_volume = np.zeros(size, dtype=np.float64)
+        self.max_value = np.zeros(size, dtype=np.float64)
+        self.max_trade: List[Optional[Dict]] = [None] * size
+
+    def add(self, trade: Dict, minute: int):
+        slot = minute % self.size
+        if self.minute[slot] != minute:
+            self.minute[slot] = minute
+            self.buy_count[slot] = self.sell_count[slot] = 0
+            self.buy_volume[slot] = self.sell_volume[slot] = 0.0
+            self.max_value[slot] = 0.0
+            self.max_trade[slot] = None
+
+        if trade["side"] == "BUY":
+            self.buy_count[slot] += 1
+            self.buy_volume[slot] += trade["value"]
+        else:
+            self.sell_count[slot] += 1
+            self.sell_volume[slot] += trade["value"]
+
+        if trade["value"] > self.max_value[slot]:
+            self.max_value[slot] = trade["value"]
+            self.max_trade[slot] = trade
+
+    def aggregate(self, minutes: int, now_minute: int) -> Dict:
+        """Сумма по последним minutes минутам (текущая минута включена)"""
+        minutes = max(1, min(minutes, self.size))
+        wanted = now_minute - np.arange(minutes, dtype=np.int64)
+        slots = wanted % self.size
+        slots = slots[self.minute[slots] == wanted]
+
+        largest = None
+        if slots.size:
+            best = slots[np.argmax(self.max_value[slots])]
+            largest = self.max_trade[best]
+
+        return {
+            "buy_count": int(self.buy_count[slots].sum()),
+            "sell_count": int(self.sell_count[slots].sum()),
+            "buy_volume": float(self.buy_volume[slots].sum()),
+            "sell_volume": float(self.sell_volume[slots].sum()),
+            "largest_trade": largest,
+        }
 
 
 class WhaleActivityTracker:
@@ -24,10 +153,20 @@ class WhaleActivityTracker:
     ✅ С ПОДДЕРЖКОЙ БАЗЫ ДАННЫХ SQLite!CVD!
     """
 
-    def __init__(self, window_minutes: int = 15, db_path: Optional[str] = None, enable_batcher: bool = True):
+    def __init__(
+        self,
+        window_minutes: int = 15,
+        db_path: Optional[str] = None,
+        enable_batcher: bool = True,
+        bucket_minutes: int = 24 * 60,
+    ):
         self.window_minutes = window_minutes
         self.whale_trades = {}
 
+        # Поминутные агрегаты для get_whale_summary / get_whale_activity
+        self.bucket_minutes = max(bucket_minutes, window_minutes)
+        self.whale_buckets: Dict[str, _WhaleBuckets] = {}
+
         self.whale_thresholds = {
             "BTCUSDT": 10000,  # $10,000
             "ETHUSDT": 5000,   # $5,000
@@ -65,41 +204,47 @@ class WhaleActivityTracker:
 
 
     def _init_database(self):
-        """Создать таблицу large_trades"""
+        """Подготовить партиционированную large_trades и таблицы агрегатов"""
         if not self.db_path:
             return
+
+        self.large_trades = large_trades_table()
+        rollups = large_trades_rollups()
+        self.compactor = PartitionCompactor(
+            self.large_trades,
+            rollups,
+            raw_days=STORAGE_RETENTION_CONFIG["large_trades_days"],
+            rollup_days={
+                "large_trades_1m": STORAGE_RETENTION_CONFIG["large_trades_1m_days"],
+                "large_trades_1h": STORAGE_RETENTION_CONFIG["large_trades_1h_days"],
+            },
+        )
         try:
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute("PRAGMA journal_mode=WAL")
                 cursor.execute("PRAGMA synchronous=NORMAL")
-                cursor.execute(
+
+                # Старая таблица large_trades становится партицией large_trades_legacy
+                self.large_trades.setup(conn)
+                for rollup in rollups:
+                    rollup.target.setup(conn)
+
+                if "legacy" in self.large_trades.partitions(conn):
+                    # Заполнить ts у старых строк (timestamp хранился в локальном времени)
+                    cursor.execute(
+                        """
+                        UPDATE large_trades_legacy
+                        SET ts = CAST(strftime('%s', timestamp, 'utc') AS INTEGER) * 1000
+                        WHERE ts IS NULL
                     """
-                    CREATE TABLE IF NOT EXISTS large_trades (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        symbol TEXT NOT NULL,
-                        side TEXT NOT NULL,
-                        size REAL NOT NULL,
-                        price REAL NOT NULL,
-                        size_usd REAL NOT NULL,
-                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
                     )
-                """
-                )
-                cursor.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_large_trades_timestamp
-                    ON large_trades(timestamp)
-                """
-                )
-                cursor.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_large_trades_symbol
-                    ON large_trades(symbol)
-                """
-                )
+                    if cursor.rowcount > 0:
+                        logger.info(f"🔄 large_trades: заполнен ts для {cursor.rowcount} строк")
                 conn.commit()
-                logger.info("✅ Таблица large_trades готова (WAL режим)")
+                # Компактор только вызывает incremental_vacuum - перевод здесь
+                enable_incremental_vacuum(conn)
+                logger.info("✅ Таблица large_trades готова (WAL режим, партиции по дням)")
         except Exception as e:
             logger.error(f"❌ _init_database: {e}", exc_info=True)
 
@@ -195,6 +340,11 @@ class WhaleActivityTracker:
                 }
                 self.whale_trades[symbol].append(trade)
 
+                buckets = self.whale_buckets.get(symbol)
+                if buckets is None:
+                    buckets = self.whale_buckets[symbol] = _WhaleBuckets(self.bucket_minutes)
+                buckets.add(trade, int(timestamp.timestamp()) // 60)
+
                 # 2. ✅ Сохранить в БД
                 if self.db_path:
                     self._save_to_database(
@@ -224,16 +374,12 @@ class WhaleActivityTracker:
         conn = None
         try:
             conn = sqlite3.connect(self.db_path, timeout=10.0)
-            cursor = conn.cursor()
             timestamp_local = timestamp.astimezone()
             timestamp_str = timestamp_local.strftime("%Y-%m-%d %H:%M:%S")
+            ts = int(timestamp.timestamp() * 1000)
 
-            cursor.execute(
-                """
-                INSERT INTO large_trades (symbol, side, size, price, size_usd, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """,
-                (symbol, side, size, price, size_usd, timestamp_str),
+            self.large_trades.insert_many(
+                conn, [(symbol, side, size, price, size_usd, timestamp_str, ts)]
             )
             conn.commit()
 
@@ -254,13 +400,13 @@ class WhaleActivityTracker:
             if minutes is None:
                 minutes = self.window_minutes
 
+            # deque упорядочен по времени: идём с конца до cutoff
             cutoff_time = datetime.now(UTC) - timedelta(minutes=minutes)
-            recent = [
-                trade
-                for trade in self.whale_trades[symbol]
-                if trade["timestamp"] >= cutoff_time
-            ]
-            recent.sort(key=lambda x: x["timestamp"], reverse=True)
+            recent = []
+            for trade in reversed(self.whale_trades[symbol]):
+                if trade["timestamp"] < cutoff_time:
+                    break
+                recent.append(trade)
             return recent
 
         except Exception as e:
@@ -278,57 +424,24 @@ class WhaleActivityTracker:
             if minutes is None:
                 minutes = self.window_minutes
 
-            # ✅ ИСПРАВЛЕНИЕ: Используем STRFTIME БЕЗ TIMEZONE!
-            seconds = int(minutes * 60)
-            # Используем ЛОКАЛЬНОЕ время, т.к. SQLite не хранит timezone
-            cutoff_local = datetime.now() - timedelta(seconds=seconds)
-            cutoff_str = cutoff_local.strftime("%Y-%m-%d %H:%M:%S")
-
-            # ✅ ДОБАВИТЬ DEBUG!
-            logger.info(f"🔍 [DEBUG] Querying DB for {symbol}")
-            logger.info(f"🔍 [DEBUG] DB path: {self.db_path}")  # ✅ ДОБАВИТЬ
-            logger.info(f"🔍 [DEBUG] cutoff_str: {cutoff_str}")
+            cutoff_ts = int((time.time() - minutes * 60) * 1000)
 
             with sqlite3.connect(self.db_path, timeout=10.0) as conn:
+                # Только партиции, пересекающие окно
+                source = self.large_trades.source(conn, since_ms=cutoff_ts)
                 cursor = conn.cursor()
-
-                # ✅ ДОБАВИТЬ: Показать ВСЕ записи в БД (без фильтра symbol)
-                cursor.execute("SELECT COUNT(*) FROM large_trades")
-                total_all = cursor.fetchone()[0]
-                logger.info(f"🔍 [DEBUG] DB TOTAL (all symbols): {total_all} trades")
-
-                # Старый запрос (с фильтром symbol)
                 cursor.execute(
-                    """
-                    SELECT COUNT(*), MIN(timestamp), MAX(timestamp)
-                    FROM large_trades
-                    WHERE symbol = ?
+                    f"""
+                    SELECT symbol, side, size, price, size_usd, ts
+                    FROM {source}
+                    WHERE symbol = ? AND ts > ?
+                    ORDER BY ts DESC
                 """,
-                    (symbol,),
+                    (symbol, cutoff_ts),
                 )
 
-                count_row = cursor.fetchone()
-                logger.info(f"🔍 [DEBUG] DB total: {count_row[0]} trades")
-                logger.info(f"🔍 [DEBUG] DB min timestamp: {count_row[1]}")
-                logger.info(f"🔍 [DEBUG] DB max timestamp: {count_row[2]}")
-
-                # ✅ ИСПРАВЛЕНИЕ: Сравниваем DATETIME strings в UTC!
-                cursor.execute(
-                    """
-                    SELECT symbol, side, size, price, size_usd, timestamp
-                    FROM large_trades
-                    WHERE symbol = ?
-                    AND datetime(timestamp) > datetime(?)
-                    ORDER BY timestamp DESC
-                """,
-                    (symbol, cutoff_str),
-                )
-
-                rows = cursor.fetchall()
-                logger.info(f"🔍 [DEBUG] DB returned {len(rows)} trades")
-
                 trades = []
-                for row in rows:
+                for row in cursor.fetchall():
                     trades.append(
                         {
                             "symbol": row[0],
@@ -336,7 +449,7 @@ class WhaleActivityTracker:
                             "size": row[2],
                             "price": row[3],
                             "value": row[4],
-                            "timestamp": datetime.fromisoformat(row[5]),
+                            "timestamp": datetime.fromtimestamp(row[5] / 1000),
                         }
                     )
                 return trades
@@ -345,17 +458,40 @@ class WhaleActivityTracker:
             logger.error(f"❌ get_recent_whales_from_db: {e}", exc_info=True)
             return []
 
+    def _aggregate_whales(self, symbol: str, minutes: Optional[float] = None) -> Dict:
+        """
+        Агрегаты китов за последние minutes минут
+
+        Из поминутных бакетов (O(minutes)); если в памяти пусто (например,
+        после рестарта) - из БД по индексу (symbol, ts).
+        """
+        if minutes is None:
+            minutes = self.window_minutes
+
+        buckets = self.whale_buckets.get(symbol)
+        if buckets is not None:
+            data = buckets.aggregate(math.ceil(minutes), int(time.time()) // 60)
+            if data["buy_count"] or data["sell_count"]:
+                return data
+
+        whales = self.get_recent_whales_from_db(symbol, minutes) if self.db_path else []
+        buy_trades = [t for t in whales if t["side"] == "BUY"]
+        sell_trades = [t for t in whales if t["side"] == "SELL"]
+        return {
+            "buy_count": len(buy_trades),
+            "sell_count": len(sell_trades),
+            "buy_volume": sum(t["value"] for t in buy_trades),
+            "sell_volume": sum(t["value"] for t in sell_trades),
+            "largest_trade": max(whales, key=lambda x: x["value"]) if whales else None,
+        }
+
     def get_whale_summary(self, symbol: str, minutes: Optional[int] = None) -> Dict:
-        """Получить сводку по китам"""
+        """Получить сводку по китам (поминутные бакеты, БД если в памяти пусто)"""
         try:
-            # Сначала из памяти
-            whales = self.get_recent_whales(symbol, minutes)
+            data = self._aggregate_whales(symbol, minutes)
+            count = data["buy_count"] + data["sell_count"]
 
-            # Если пусто, из БД
-            if not whales and self.db_path:
-                whales = self.get_recent_whales_from_db(symbol, minutes)
-
-            if not whales:
+            if not count:
                 return {
                     "count": 0,
                     "buy_count": 0,
@@ -367,11 +503,8 @@ class WhaleActivityTracker:
                     "sentiment": "NEUTRAL",
                 }
 
-            buy_trades = [t for t in whales if t["side"] == "BUY"]
-            sell_trades = [t for t in whales if t["side"] == "SELL"]
-
-            buy_volume = sum(t["value"] for t in buy_trades)
-            sell_volume = sum(t["value"] for t in sell_trades)
+            buy_volume = data["buy_volume"]
+            sell_volume = data["sell_volume"]
             net_volume = buy_volume - sell_volume
 
             if net_volume > 0:
@@ -385,16 +518,14 @@ class WhaleActivityTracker:
             else:
                 sentiment = "NEUTRAL"
 
-            largest = max(whales, key=lambda x: x["value"])
-
             return {
-                "count": len(whales),
-                "buy_count": len(buy_trades),
-                "sell_count": len(sell_trades),
+                "count": count,
+                "buy_count": data["buy_count"],
+                "sell_count": data["sell_count"],
                 "buy_volume": buy_volume,
                 "sell_volume": sell_volume,
                 "net_volume": net_volume,
-                "largest_trade": largest,
+                "largest_trade": data["largest_trade"],
                 "sentiment": sentiment,
             }
 
@@ -414,15 +545,10 @@ class WhaleActivityTracker:
     def get_whale_activity(self, symbol: str, timeframe_seconds: int = 300) -> Dict:
         """Получить активность китов за последние N секунд"""
         try:
-            minutes = timeframe_seconds / 60
-
-            # Приоритет БД
-            if self.db_path:
-                whales = self.get_recent_whales_from_db(symbol, minutes=minutes)
-            else:
-                whales = self.get_recent_whales(symbol, minutes=minutes)
+            data = self._aggregate_whales(symbol, timeframe_seconds / 60)
+            trades = data["buy_count"] + data["sell_count"]
 
-            if not whales:
+            if not trades:
                 return {
                     "trades": 0,
                     "buy_volume": 0,
@@ -431,11 +557,8 @@ class WhaleActivityTracker:
                     "dominant_side": "neutral",
                 }
 
-            buy_trades = [t for t in whales if t["side"] == "BUY"]
-            sell_trades = [t for t in whales if t["side"] == "SELL"]
-
-            buy_volume = sum(t["value"] for t in buy_trades)
-            sell_volume = sum(t["value"] for t in sell_trades)
+            buy_volume = data["buy_volume"]
+            sell_volume = data["sell_volume"]
             net = buy_volume - sell_volume
 
             if buy_volume > sell_volume * 1.2:
@@ -446,7 +569,7 @@ class WhaleActivityTracker:
                 dominant_side = "neutral"
 
             return {
-                "trades": len(whales),
+                "trades": trades,
                 "buy_volume": buy_volume,
                 "sell_volume": sell_volume,
                 "net": net,
@@ -482,33 +605,39 @@ class WhaleActivityTracker:
                 else:
                     del self.whale_trades[symbol]
 
-            # Очистка БД (старше 7 дней)
+            # Retention БД (удаление партиций)
             if self.db_path:
                 self._cleanup_old_db_trades()
 
         except Exception as e:
             logger.error(f"❌ cleanup_old_trades: {e}", exc_info=True)
 
-    def _cleanup_old_db_trades(self, keep_days: int = 7):
-        """Удалить старые записи из БД"""
+    def _cleanup_old_db_trades(self) -> Dict:
+        """
+        Retention large_trades: партиции старше large_trades_days
+        сворачиваются в large_trades_1m / large_trades_1h и удаляются целиком
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    DELETE FROM large_trades
-                    WHERE timestamp < datetime('now', '-' || ? || ' days')
-                """,
-                    (keep_days,),
-                )
-                deleted = cursor.rowcount
-                conn.commit()
+            with sqlite3.connect(self.db_path, timeout=10.0) as conn:
+                result = self.compactor.compact(conn, int(time.time() * 1000))
 
-                if deleted > 0:
-                    logger.info(f"🗑️ Удалено {deleted} старых whale trades")
+            if result["dropped"]:
+                logger.info(
+                    f"🗑️ Whale storage: удалено партиций {len(result['dropped'])}, "
+                    f"агрегатов {result['rolled_up']}"
+                )
+            return result
 
         except Exception as e:
             logger.error(f"❌ _cleanup_old_db_trades: {e}", exc_info=True)
+            return {"dropped": [], "rolled_up": 0}
+
+    async def compact_storage(self) -> Dict:
+        """Фоновая компакция БД (в executor, не блокирует event loop)"""
+        if not self.db_path:
+            return {"dropped": [], "rolled_up": 0}
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._cleanup_old_db_trades)
 
     def format_whale_info(self, symbol: str, minutes: Optional[int] = None) -> str:
         """Форматирование инфо о китах"""
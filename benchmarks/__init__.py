@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""
+Офлайн micro-бенчмарки горячих путей с порогами регрессий
+
+Запуск: python -m benchmarks --help
+"""
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+CLI бенчмарков горячих путей
+
+    python -m benchmarks list
+    python -m benchmarks run [--only cvd_update,indicators] [--save results.json]
+    python -m benchmarks run --save-baseline          # обновить baseline
+    python -m benchmarks compare [--results results.json] [--max-regression 25]
+                                 [--threshold scenario_match=40] [--metric median_us]
+    python -m benchmarks record                       # пересоздать фикстуры
+
+compare без --results сначала прогоняет бенчмарки; код выхода 1 - есть регрессия
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "baseline.json")
+
+
+def _print_progress(name, result):
+    print(
+        f"  {name:<18} {result['min_us']:>12.2f} µs/op (min)  "
+        f"{result['median_us']:>12.2f} µs/op (median)  ±{result['spread_pct']:.0f}%  "
+        f"[{result['ops']} ops × {result['repeat']}]"
+    )
+
+
+def _run(args):
+    from benchmarks.hot_paths import run_benchmarks
+
+    names = args.only.split(",") if args.only else None
+    print(f"🏁 Бенчмарки (repeat={args.repeat}):")
+    return run_benchmarks(names, repeat=args.repeat, warmup=args.warmup, progress=_print_progress)
+
+
+def _parse_thresholds(values):
+    from benchmarks.hot_paths import BENCHMARKS
+
+    thresholds = {}
+    for item in values or []:
+        name, _, pct = item.partition("=")
+        if name not in BENCHMARKS or not pct:
+            raise SystemExit(f"❌ Неверный --threshold: {item} (ожидается имя=процент)")
+        thresholds[name] = float(pct)
+    return thresholds
+
+
+def cmd_list(args):
+    from benchmarks.hot_paths import BENCHMARKS
+
+    for name, bench in BENCHMARKS.items():
+        limit = f" (порог {bench.max_regression_pct:.0f}%)" if bench.max_regression_pct else ""
+        print(f"  {name:<18} {bench.description}{limit}")
+    return 0
+
+
+def cmd_run(args):
+    from benchmarks.hot_paths import save_results
+
+    results = _run(args)
+    if args.save:
+        save_results(results, args.save)
+        print(f"💾 Результаты: {args.save}")
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        save_results(results, args.baseline)
+        print(f"💾 Baseline обновлён: {args.baseline}")
+    return 0
+
+
+def cmd_compare(args):
+    from benchmarks.hot_paths import compare, environment_mismatch, load_results
+
+    if not os.path.exists(args.baseline):
+        print(f"❌ Baseline не найден: {args.baseline} (python -m benchmarks run --save-baseline)")
+        return 2
+
+    baseline = load_results(args.baseline)
+    current = load_results(args.results) if args.results else _run(args)
+    thresholds = _parse_thresholds(args.threshold)
+
+    for line in environment_mismatch(current, baseline):
+        print(f"⚠️ Окружение отличается от baseline - {line}")
+
+    names = args.only.split(",") if args.only else None
+    rows = compare(current, baseline, args.max_regression, thresholds, args.metric, names)
+    icons = {"ok": "✅", "regression": "❌", "improved": "🚀", "new": "🆕", "missing": "⚪"}
+    print(f"\n📊 Сравнение с baseline ({args.metric}):")
+    for row in rows:
+        change = f"{row['change_pct']:+.1f}%" if row["change_pct"] is not None else "—"
+        base = f"{row['baseline']:.2f}" if row["baseline"] is not None else "—"
+        cur = f"{row['current']:.2f}" if row["current"] is not None else "—"
+        print(
+            f"  {icons[row['status']]} {row['name']:<18} {base:>12} → {cur:>12} µs/op  "
+            f"{change:>8} (порог {row['threshold_pct']:.0f}%)"
+        )
+
+    regressions = [row["name"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\n❌ Регрессии: {', '.join(regressions)}")
+        return 1
+    print("\n✅ Регрессий нет")
+    return 0
+
+
+def cmd_record(args):
+    from benchmarks.fixtures import record_all
+
+    for name, path in record_all().items():
+        print(f"💾 {name}: {path}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verbose", action="store_true", help="Не глушить логи бота")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="Список бенчмарков")
+    sub.add_parser("record", help="Пересоздать фикстуры")
+
+    for command in ("run", "compare"):
+        p = sub.add_parser(command)
+        p.add_argument("--only", help="Имена через запятую")
+        p.add_argument("--repeat", type=int, default=5)
+        p.add_argument("--warmup", type=int, default=1)
+        p.add_argument("--baseline", default=BASELINE_PATH)
+
+    run_parser = sub.choices["run"]
+    run_parser.add_argument("--save", help="Сохранить результаты в JSON")
+    run_parser.add_argument("--save-baseline", action="store_true", help="Записать как baseline")
+
+    compare_parser = sub.choices["compare"]
+    compare_parser.add_argument("--results", help="Готовые результаты (иначе прогон)")
+    compare_parser.add_argument("--max-regression", type=float, default=25.0,
+                                help="Допустимое замедление, %% (по умолчанию 25)")
+    compare_parser.add_argument("--threshold", action="append",
+                                help="Порог бенчмарка: имя=процент (можно несколько)")
+    compare_parser.add_argument("--metric", choices=("min_us", "median_us"), default="min_us")
+
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        # Логи инициализации и вето не должны мешать замерам и выводу
+        # (модули бота импортируются лениво - уже после этого)
+        logging.disable(logging.WARNING)
+
+    commands = {"list": cmd_list, "run": cmd_run, "compare": cmd_compare, "record": cmd_record}
+    return commands[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Фикстуры бенчмарков: записанные входные данные горячих путей
+- candles: последние свечи BTCUSDT 1h из data/historical
+- trades: поток сделок (seed) вокруг цен этих свечей, ~2% - киты
+  крупнее WHALE_CONFIG["btc_threshold"] (ветка детекции и записи в БД)
+- orderbook: snapshot depth=200 + поток delta в формате Bybit v5
+- veto_states: снимки ticker/orderbook/funding (funding из истории)
+
+Файлы лежат в benchmarks/fixtures/*.json и не меняются между запусками;
+пересоздать: python -m benchmarks record
+"""
+
+import csv
+import json
+import os
+import random
+from typing import Any, Dict, List
+
+from config.settings import DATA_DIR
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+HISTORICAL_DIR = os.path.join(DATA_DIR, "historical")
+
+SEED = 42
+CANDLES = 500
+TRADES = 3000
+# Доля китовых сделок и их размер в BTC (~$0.5M-1.6M при ~$105k)
+WHALE_SHARE = 0.02
+WHALE_SIZE_BTC = (5.0, 15.0)
+BOOK_DEPTH = 200
+BOOK_DELTAS = 1000
+VETO_STATES = 200
+
+
+def _read_csv(name: str) -> List[Dict[str, str]]:
+    with open(os.path.join(HISTORICAL_DIR, name), encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def record_candles() -> List[Dict[str, Any]]:
+    rows = _read_csv("BTCUSDT_1h_90d.csv")[-CANDLES:]
+    return [
+        {
+            "timestamp": row["timestamp"],
+            "open": float(row["open"]),
+            "high": float(row["high"]),
+            "low": float(row["low"]),
+            "close": float(row["close"]),
+            "volume": float(row["volume"]),
+        }
+        for row in rows
+    ]
+
+
+def record_trades(candles: List[Dict]) -> List[List]:
+    """[timestamp_ms, side, size, price] - цены внутри диапазона свечей"""
+    rng = random.Random(SEED)
+    ts = 1_760_000_000_000
+    trades = []
+    for i in range(TRADES):
+        candle = candles[i * len(candles) // TRADES]
+        price = round(rng.uniform(candle["low"], candle["high"]), 1)
+        if rng.random() < WHALE_SHARE:
+            # Киты выше любого порога BTC (и $10k по умолчанию, и $500k из настроек)
+            size = round(rng.uniform(*WHALE_SIZE_BTC), 4)
+        else:
+            # Хвост крупных сделок - часть проходит порог кита по умолчанию
+            size = round(rng.paretovariate(1.5) * 0.01, 4)
+        ts += rng.randint(1, 400)
+        trades.append([ts, "BUY" if rng.random() < 0.5 else "SELL", size, price])
+    return trades
+
+
+def record_orderbook() -> Dict[str, Any]:
+    """Snapshot + delta: изменения у вершины, удаления и новые уровни"""
+    rng = random.Random(SEED + 1)
+    mid = 104_466.5
+    tick = 0.1
+    bids = [[round(mid - tick * (i + 1), 1), round(rng.uniform(0.01, 5), 3)] for i in range(BOOK_DEPTH)]
+    asks = [[round(mid + tick * i, 1), round(rng.uniform(0.01, 5), 3)] for i in range(BOOK_DEPTH)]
+
+    def level(side_mid: float, sign: int) -> List[str]:
+        # Большинство изменений у лучших цен, как в живом потоке
+        offset = int(rng.expovariate(1 / 15))
+        price = round(side_mid + sign * tick * offset, 1)
+        size = 0.0 if rng.random() < 0.2 else round(rng.uniform(0.01, 5), 3)
+        return [f"{price:.1f}", f"{size:.3f}"]
+
+    ts = 1_762_243_200_000
+    deltas = []
+    for u in range(BOOK_DELTAS):
+        mid += tick * rng.choice((-1, 0, 0, 1))
+        ts += 100
+        deltas.append({
+            "topic": "orderbook.200.BTCUSDT",
+            "type": "delta",
+            "ts": ts,
+            "data": {
+                "s": "BTCUSDT",
+                "b": [level(mid - tick, -1) for _ in range(rng.randint(1, 6))],
+                "a": [level(mid, 1) for _ in range(rng.randint(1, 6))],
+                "u": u + 2,
+            },
+        })
+
+    snapshot = {
+        "topic": "orderbook.200.BTCUSDT",
+        "type": "snapshot",
+        "ts": 1_762_243_200_000,
+        "data": {
+            "s": "BTCUSDT",
+            "b": [[f"{p:.1f}", f"{s:.3f}"] for p, s in bids],
+            "a": [[f"{p:.1f}", f"{s:.3f}"] for p, s in asks],
+            "u": 1,
+        },
+    }
+    return {"snapshot": snapshot, "deltas": deltas}
+
+
+def record_veto_states(candles: List[Dict]) -> List[Dict[str, Any]]:
+    """Снимки входов VetoSystem: каждый следующий отличается (нет повторного использования)"""
+    rng = random.Random(SEED + 2)
+    funding = [float(row["fundingRate"]) for row in _read_csv("BTCUSDT_funding_30d.csv")]
+    states = []
+    for i in range(VETO_STATES):
+        candle = candles[-VETO_STATES + i]
+        mid = candle["close"]
+        spread_bps = round(rng.uniform(0.5, 12), 2)
+        half = mid * spread_bps / 20000
+        states.append({
+            "ticker": {
+                "volume_24h": round(candle["volume"] * 24 * rng.uniform(0.5, 3), 1),
+                "price_24h_pcnt": round((candle["close"] / candle["open"] - 1) * 100, 3),
+            },
+            "orderbook": {
+                "spread_bps": spread_bps,
+                "mid_price": mid,
+                "bids": [{"price": round(mid - half - j, 1), "size": round(rng.uniform(0.1, 20), 2)} for j in range(20)],
+                "asks": [{"price": round(mid + half + j, 1), "size": round(rng.uniform(0.1, 20), 2)} for j in range(20)],
+            },
+            "funding_rate": {"funding_rate": funding[i % len(funding)]},
+        })
+    return states
+
+
+def record_all() -> Dict[str, str]:
+    """Записать все фикстуры, вернуть {имя: путь}"""
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    candles = record_candles()
+    fixtures = {
+        "candles": candles,
+        "trades": record_trades(candles),
+        "orderbook": record_orderbook(),
+        "veto_states": record_veto_states(candles),
+    }
+    paths = {}
+    for name, data in fixtures.items():
+        path = os.path.join(FIXTURES_DIR, f"{name}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        paths[name] = path
+    return paths
+
+
+_cache: Dict[str, Any] = {}
+
+
+def load_fixture(name: str) -> Any:
+    """Загрузить фикстуру (кэшируется на процесс; бенчмарки её не изменяют)"""
+    if name not in _cache:
+        with open(os.path.join(FIXTURES_DIR, f"{name}.json"), encoding="utf-8") as f:
+            _cache[name] = json.load(f)
+    return _cache[name]
+
+
+# Экспорт
+__all__ = ["FIXTURES_DIR", "load_fixture", "record_all"]
@@ -0,0 +1,411 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-бенчмарки горячих путей бота (офлайн, на записанных фикстурах)
+- Каждый бенчмарк: setup() вне замера → прогон всей фикстуры → время на операцию
+- Несколько повторов с прогревом, GC выключен на время замера
+- Результат - JSON (baseline); compare() сравнивает с baseline и
+  помечает регрессии сверх порога (общего или своего у бенчмарка)
+"""
+
+import asyncio
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.fixtures import load_fixture
+
+
+# Окна для расчётов по свечам (как в сканере: последние N свечей)
+INDICATOR_WINDOW = 200
+VP_WINDOW = 200
+MATCHER_WINDOW = 50
+
+
+@dataclass
+class Benchmark:
+    """
+    Описание бенчмарка
+
+    setup() (функция или корутина) возвращает (run, ops, teardown):
+    run() - прогон всей фикстуры (функция или корутина), ops - число
+    операций в прогоне, teardown - освобождение ресурсов или None
+    """
+
+    name: str
+    setup: Callable[[], Tuple[Callable, int, Optional[Callable]]]
+    description: str = ""
+    # Допустимое замедление, % (None - общий порог compare)
+    max_regression_pct: Optional[float] = None
+
+
+# ========== БЕНЧМАРКИ ==========
+
+
+async def _setup_orderbook_delta():
+    from connectors.bybit_orderbook_ws import BybitOrderbookWebSocket
+
+    fixture = load_fixture("orderbook")
+    ws = BybitOrderbookWebSocket("BTCUSDT", depth=200)
+    deltas = fixture["deltas"]
+
+    # Snapshot - часть подготовки: в прогоне только delta
+    await ws._process_message(fixture["snapshot"])
+
+    async def run():
+        for message in deltas:
+            await ws._process_message(message)
+
+    async def teardown():
+        await ws.dispatcher.stop()
+
+    return run, len(deltas), teardown
+
+
+def _setup_cvd_update():
+    from analytics.cvd_calculator import CVDCalculator
+
+    trades = load_fixture("trades")
+    cvd = CVDCalculator(window_size=100)
+
+    def run():
+        update = cvd.update
+        for ts, side, size, price in trades:
+            update("BTCUSDT", side, size, price, ts)
+
+    return run, len(trades), None
+
+
+def _setup_whale_add_trade():
+    from analytics.whale_activity_tracker import WhaleActivityTracker
+
+    trades = load_fixture("trades")
+    # Киты пишутся в БД, как в боте - во временный файл, не в рабочую БД
+    tmp_dir = tempfile.mkdtemp(prefix="bench_whales_")
+    tracker = WhaleActivityTracker(
+        enable_batcher=False, db_path=os.path.join(tmp_dir, "whales.db")
+    )
+
+    def run():
+        add_trade = tracker.add_trade
+        for _, side, size, price in trades:
+            add_trade("BTCUSDT", side, size, price)
+
+    def teardown():
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return run, len(trades), teardown
+
+
+def _setup_indicators():
+    from indicators.technical import AdvancedTechnicalIndicators as ti
+
+    candles = load_fixture("candles")
+    windows = [
+        candles[end - INDICATOR_WINDOW:end]
+        for end in range(INDICATOR_WINDOW, len(candles) + 1, 10)
+    ]
+
+    def run():
+        for window in windows:
+            ti.calculate_atr(window)
+            ti.calculate_rsi(window)
+            ti.calculate_macd(window)
+
+    return run, len(windows), None
+
+
+def _setup_volume_profile():
+    from analytics.volume_profile import calculate_candle_volume_profile
+
+    candles = load_fixture("candles")
+    windows = [
+        candles[end - VP_WINDOW:end]
+        for end in range(VP_WINDOW, len(candles) + 1, 25)
+    ]
+
+    def run():
+        for window in windows:
+            calculate_candle_volume_profile(window)
+
+    return run, len(windows), None
+
+
+_matcher = None
+
+
+def _setup_scenario_match():
+    global _matcher
+    from core.scenario_matcher import UnifiedScenarioMatcher
+
+    # Загрузка сценариев и индекс - не горячий путь, matcher один на процесс
+    if _matcher is None:
+        _matcher = UnifiedScenarioMatcher()
+        # Отладочный print первых вызовов - не часть рабочего пути
+        _matcher.debug_counter = 5
+    matcher = _matcher
+
+    candles = load_fixture("candles")
+    cases = []
+    for end in range(MATCHER_WINDOW, len(candles) + 1, 25):
+        window = candles[end - MATCHER_WINDOW:end]
+        last = window[-1]
+        trend = "bullish" if last["close"] >= window[0]["close"] else "bearish"
+        cases.append({
+            "market_data": {
+                "price": last["close"],
+                "close": last["close"],
+                "volume": last["volume"],
+                "ohlcv": window,
+                "candles": window,
+                "cvd": {"cvd_percent": round((last["close"] / last["open"] - 1) * 1000, 2)},
+                "clusters": {},
+            },
+            "indicators": {"rsi": 55.0, "adx": 28.0, "atr": last["high"] - last["low"]},
+            "mtf_trends": {"1h": trend, "4h": trend, "1d": "neutral"},
+            "volume_profile": {"poc": last["close"], "vah": last["high"], "val": last["low"]},
+            "news_sentiment": {"overall": "neutral", "score": 0.5},
+            "veto_checks": {},
+        })
+
+    def run():
+        for case in cases:
+            matcher.match_scenario(symbol="BTCUSDT", **case)
+
+    return run, len(cases), None
+
+
+def _setup_veto_analyze():
+    from analytics.veto_system import EnhancedVetoSystem
+
+    states = load_fixture("veto_states")
+    veto = EnhancedVetoSystem()
+
+    async def run():
+        # Каждый снимок отличается - проверки выполняются, а не берутся из памяти
+        for state in states:
+            await veto.analyze_market_conditions("BTCUSDT", state)
+
+    return run, len(states), None
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    b.name: b
+    for b in [
+        Benchmark("orderbook_delta", _setup_orderbook_delta,
+                  "BybitOrderbookWebSocket._process_message, delta depth=200"),
+        Benchmark("cvd_update", _setup_cvd_update, "CVDCalculator.update"),
+        Benchmark("whale_add_trade", _setup_whale_add_trade,
+                  "WhaleActivityTracker.add_trade (киты пишутся во временную БД)",
+                  max_regression_pct=35.0),
+        Benchmark("indicators", _setup_indicators,
+                  f"ATR+RSI+MACD (indicators/technical.py), окно {INDICATOR_WINDOW}",
+                  max_regression_pct=35.0),
+        Benchmark("volume_profile", _setup_volume_profile,
+                  f"calculate_candle_volume_profile, окно {VP_WINDOW}",
+                  max_regression_pct=35.0),
+        Benchmark("scenario_match", _setup_scenario_match,
+                  "UnifiedScenarioMatcher.match_scenario", max_regression_pct=35.0),
+        Benchmark("veto_analyze", _setup_veto_analyze,
+                  "EnhancedVetoSystem.analyze_market_conditions (без повторов)",
+                  max_regression_pct=35.0),
+    ]
+}
+
+
+# ========== ЗАПУСК ==========
+
+
+def _call(loop: asyncio.AbstractEventLoop, func: Optional[Callable]):
+    if func is None:
+        return None
+    result = func()
+    if asyncio.iscoroutine(result):
+        return loop.run_until_complete(result)
+    return result
+
+
+def run_benchmark(
+    bench: Benchmark,
+    repeat: int = 5,
+    warmup: int = 1,
+    loop: Optional[asyncio.AbstractEventLoop] = None,
+) -> Dict[str, Any]:
+    """
+    Прогнать бенчмарк repeat раз (каждый на свежем состоянии)
+
+    Returns:
+        {"ops", "repeat", "min_us", "median_us", "max_us", "spread_pct"} - время на операцию
+    """
+    own_loop = loop is None
+    loop = loop or asyncio.new_event_loop()
+    timings = []
+    try:
+        for i in range(warmup + repeat):
+            # setup внутри loop: объекты с asyncio-частями создаются в нём
+            run, ops, teardown = loop.run_until_complete(_async_setup(bench))
+
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                _call(loop, run)
+                elapsed = time.perf_counter() - start
+            finally:
+                gc.enable()
+                _call(loop, teardown)
+
+            if i >= warmup:
+                timings.append(elapsed / ops * 1e6)
+    finally:
+        if own_loop:
+            loop.close()
+
+    median = statistics.median(timings)
+    return {
+        "ops": ops,
+        "repeat": repeat,
+        "min_us": round(min(timings), 3),
+        "median_us": round(median, 3),
+        "max_us": round(max(timings), 3),
+        "spread_pct": round((max(timings) - min(timings)) / median * 100, 1) if median else 0.0,
+    }
+
+
+async def _async_setup(bench: Benchmark):
+    result = bench.setup()
+    if asyncio.iscoroutine(result):
+        result = await result
+    return result
+
+
+def run_benchmarks(
+    names: Optional[List[str]] = None,
+    repeat: int = 5,
+    warmup: int = 1,
+    progress: Optional[Callable[[str, Dict], None]] = None,
+) -> Dict[str, Any]:
+    """Прогнать выбранные (или все) бенчмарки, результат в формате baseline"""
+    names = names or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        raise KeyError(f"Неизвестные бенчмарки: {', '.join(unknown)}")
+
+    loop = asyncio.new_event_loop()
+    results = {}
+    try:
+        for name in names:
+            results[name] = run_benchmark(BENCHMARKS[name], repeat=repeat, warmup=warmup, loop=loop)
+            if progress:
+                progress(name, results[name])
+    finally:
+        loop.close()
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "implementation": sys.implementation.name,
+            "machine": platform.machine(),
+            "processor": platform.processor() or platform.machine(),
+            "repeat": repeat,
+        },
+        "benchmarks": results,
+    }
+
+
+# ========== СРАВНЕНИЕ ==========
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    max_regression_pct: float = 25.0,
+    thresholds: Optional[Dict[str, float]] = None,
+    metric: str = "min_us",
+    names: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Сравнить результаты с baseline
+
+    Порог бенчмарка: thresholds[name] → Benchmark.max_regression_pct → max_regression_pct
+    names - сравнить только эти бенчмарки (частичный прогон --only)
+
+    Returns:
+        Строки {"name", "baseline", "current", "change_pct", "threshold_pct", "status"},
+        status: ok | regression | improved | new | missing
+    """
+    thresholds = thresholds or {}
+    rows = []
+    current_results = current.get("benchmarks", {})
+    baseline_results = baseline.get("benchmarks", {})
+
+    for name in sorted(names or set(current_results) | set(baseline_results)):
+        bench = BENCHMARKS.get(name)
+        threshold = thresholds.get(name)
+        if threshold is None and bench is not None and bench.max_regression_pct is not None:
+            threshold = bench.max_regression_pct
+        if threshold is None:
+            threshold = max_regression_pct
+
+        row = {
+            "name": name,
+            "baseline": baseline_results.get(name, {}).get(metric),
+            "current": current_results.get(name, {}).get(metric),
+            "change_pct": None,
+            "threshold_pct": threshold,
+        }
+        if row["baseline"] is None:
+            row["status"] = "new"
+        elif row["current"] is None:
+            row["status"] = "missing"
+        else:
+            change = (row["current"] - row["baseline"]) / row["baseline"] * 100
+            row["change_pct"] = round(change, 1)
+            if change > threshold:
+                row["status"] = "regression"
+            elif change < -threshold:
+                row["status"] = "improved"
+            else:
+                row["status"] = "ok"
+        rows.append(row)
+    return rows
+
+
+def environment_mismatch(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Отличия окружения: сравнение с baseline другой машины/версии Python ненадёжно"""
+    keys = ("python", "implementation", "machine", "processor")
+    cur, base = current.get("meta", {}), baseline.get("meta", {})
+    return [f"{k}: {base.get(k)} → {cur.get(k)}" for k in keys if cur.get(k) != base.get(k)]
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_results(results: Dict[str, Any], path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+# Экспорт
+__all__ = [
+    "BENCHMARKS",
+    "Benchmark",
+    "compare",
+    "environment_mismatch",
+    "load_results",
+    "run_benchmark",
+    "run_benchmarks",
+    "save_results",
+]
@@ -10,6 +10,8 @@ import pandas as pd
 from datetime import datetime
 from bot.live_signal_tracker import LiveSignalTracker
 from bot.telegram_sender import TelegramSender
+from trading.exit_simulator import simulate_exit
+from data.dataset_cache import read_csv_cached
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -40,91 +42,100 @@ class PaperTradingRunner:
         logger.info(f"   Period: {df.iloc[0]['timestamp']} to {df.iloc[-1]['timestamp']}")
         logger.info("")
 
-        for i in range(100, len(df), bars_per_iteration):
+        highs = df['high'].to_numpy(dtype=float)
+        lows = df['low'].to_numpy(dtype=float)
+        closes = df['close'].to_numpy(dtype=float)
+
+        i = 100
+        while i < len(df):
             current_bar = df.iloc[i]
             window = df.iloc[i-100:i+1]
 
             # === ENTRY LOGIC ===
-            if self.position is None:
-                signal = self.tracker.check_signal(
-                    window['close'],
-                    window['high'],
-                    window['low'],
-                    window['volume']
-                )
-
-                if signal:
-                    # SIMPLE POSITION (2% of capital)
-                    position_size_usd = self.current_capital * 0.02
-                    position_size_btc = position_size_usd / signal['entry']
-
-                    self.position = {
-                        'entry_bar': i,
-                        'entry_time': current_bar['timestamp'],
-                        'entry_price': signal['entry'],
-                        'sl_price': signal['sl_price'],
-                        'tp': signal['tp'],
-                        'scenario': signal['scenario'],
-                        'size_usd': position_size_usd,
-                        'size_btc': position_size_btc,
-                    }
-
-                    logger.info(f"[{i:4d}] 🟢 ENTRY @ ${signal['entry']:,.2f} | {signal['scenario']}")
-                    logger.info(f"       SL: ${signal['sl_price']:,.2f} | TP: ${signal['tp']:,.2f}")
-
-                    # Send telegram
-                    try:
-                        self.telegram.send_signal(signal)
-                    except:
-                        pass  # Ignore telegram errors
-
-            # === EXIT LOGIC ===
-            elif self.position is not None:
-                high = current_bar['high']
-                low = current_bar['low']
-                tp = self.position['tp']
-                sl_price = self.position['sl_price']
-
-                exit_price = None
-                exit_reason = None
-
-                if high >= tp:
-                    exit_price = tp
-                    exit_reason = 'TP'
-                elif low <= sl_price:
-                    exit_price = sl_price
-                    exit_reason = 'SL'
-
-                if exit_price:
-                    # Calculate PnL
-                    entry = self.position['entry_price']
-                    pnl_pct = ((exit_price - entry) / entry) * 100
-                    pnl_usd = self.position['size_usd'] * (pnl_pct / 100)
-
-                    # Update capital
-                    self.current_capital += pnl_usd
-
-                    # Save trade
-                    trade = {
-                        'entry_time': self.position['entry_time'],
-                        'exit_time': current_bar['timestamp'],
-                        'entry_price': entry,
-                        'exit_price': exit_price,
-                        'exit_reason': exit_reason,
-                        'scenario': self.position['scenario'],
-                        'pnl_pct': pnl_pct,
-                        'pnl_usd': pnl_usd,
-                        'capital_after': self.current_capital,
-                    }
-
-                    self.trades.append(trade)
-
-                    status = "✅ WIN" if pnl_usd > 0 else "❌ LOSS"
-                    logger.info(f"[{i:4d}] 🔴 EXIT @ ${exit_price:,.2f} | {exit_reason} | {status} {pnl_pct:+.2f}%")
-                    logger.info(f"       Capital: ${self.current_capital:,.2f}")
-                    logger.info("")
-
-                    self.position = None
+            signal = self.tracker.check_signal(
+                window['close'],
+                window['high'],
+                window['low'],
+                window['volume']
+            )
+
+            if not signal:
+                i += bars_per_iteration
+                continue
+
+            # SIMPLE POSITION (2% of capital)
+            position_size_usd = self.current_capital * 0.02
+            position_size_btc = position_size_usd / signal['entry']
+
+            self.position = {
+                'entry_bar': i,
+                'entry_time': current_bar['timestamp'],
+                'entry_price': signal['entry'],
+                'sl_price': signal['sl_price'],
+                'tp': signal['tp'],
+                'scenario': signal['scenario'],
+                'size_usd': position_size_usd,
+                'size_btc': position_size_btc,
+            }
+
+            logger.info(f"[{i:4d}] 🟢 ENTRY @ ${signal['entry']:,.2f} | {signal['scenario']}")
+            logger.info(f"       SL: ${signal['sl_price']:,.2f} | TP: ${signal['tp']:,.2f}")
+
+            # Send telegram
+            try:
+                self.telegram.send_signal(signal)
+            except:
+                pass  # Ignore telegram errors
+
+            # === EXIT LOGIC (общий first-touch движок) ===
+            result = simulate_exit(
+                highs, lows, closes,
+                entry_bar=i,
+                direction='LONG',
+                entry_price=signal['entry'],
+                stop_loss=signal['sl_price'],
+                tp1=signal['tp'],
+            )
+
+            exit_bar = result['exit_bar']
+            if result['exit_reason'] == 'TIMEOUT':
+                # Позиция не закрылась до конца данных
+                self.position = None
+                break
+
+            exit_price = result['exit_price']
+            exit_reason = result['exit_reason']
+
+            # Calculate PnL
+            entry = self.position['entry_price']
+            pnl_pct = ((exit_price - entry) / entry) * 100
+            pnl_usd = self.position['size_usd'] * (pnl_pct / 100)
+
+            # Update capital
+            self.current_capital += pnl_usd
+
+            # Save trade
+            trade = {
+                'entry_time': self.position['entry_time'],
+                'exit_time': df.iloc[exit_bar]['timestamp'],
+                'entry_price': entry,
+                'exit_price': exit_price,
+                'exit_reason': exit_reason,
+                'scenario': self.position['scenario'],
+                'pnl_pct': pnl_pct,
+                'pnl_usd': pnl_usd,
+                'capital_after': self.current_capital,
+            }
+
+            self.trades.append(trade)
+
+            status = "✅ WIN" if pnl_usd > 0 else "❌ LOSS"
+            logger.info(f"[{exit_bar:4d}] 🔴 EXIT @ ${exit_price:,.2f} | {exit_reason} | {status} {pnl_pct:+.2f}%")
+            logger.info(f"       Capital: ${self.current_capital:,.2f}")
+            logger.info("")
+
+            self.position = None
+            i = exit_bar + 1
 
         self._print_final_report()
 
@@ -174,7 +185,7 @@ def main():
     logger.info("="*80 + "\n")
 
     # Load historical data
-    df = pd.read_csv('data/historical/BTCUSDT_1h_90d.csv')
+    df = read_csv_cached('data/historical/BTCUSDT_1h_90d.csv')
 
     # Create runner
     runner = PaperTradingRunner(capital=10000)
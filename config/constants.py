@@ -4,7 +4,7 @@
 """
 
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from typing import List, Optional, Dict, Any
 
 
@@ -208,6 +208,18 @@ SYMBOL_FILTERS = {
     "BNB": ["binance", "bnb", "BNB"],
 }
 
+# Символы и их ключевые слова для привязки новостей (sentiment + NewsStore)
+SYMBOL_KEYWORDS = {
+    "BTC": ["bitcoin", "btc", "btcusd", "btcusdt", "xbt"],
+    "ETH": ["ethereum", "eth", "ether", "ethusdt", "vitalik"],
+    "BNB": ["binance", "bnb"],
+    "SOL": ["solana", "sol"],
+    "XRP": ["ripple", "xrp"],
+    "ADA": ["cardano", "ada"],
+    "DOGE": ["dogecoin", "doge"],
+    "ALT": ["altcoin", "alt", "crypto", "cryptocurrency", "defi", "nft"],
+}
+
 
 # ======================= ФОРМАТЫ ВРЕМЕНИ =======================
 
@@ -565,7 +577,7 @@ DEFAULT_CONFIG = {
 # ======================= DATA CLASSES =======================
 
 
-@dataclass
+@dataclass(slots=True)
 class EnhancedTradingSignal:
     """Расширенный торговый сигнал"""
 
@@ -603,6 +615,10 @@ class EnhancedTradingSignal:
         if self.volume_profile_context is None:
             self.volume_profile_context = {}
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Словарь полей (slotted класс без __dict__)"""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
 
 # ======================= ЭКСПОРТ ВСЕХ КОНСТАНТ =======================
 
@@ -627,6 +643,7 @@ __all__ = [
     # API и настройки
     "API_ENDPOINTS",
     "SYMBOL_FILTERS",
+    "SYMBOL_KEYWORDS",
     "TIME_FORMATS",
     # Анализ новостей
     "WEIGHTED_KEYWORDS",
@@ -104,6 +104,20 @@ TELEGRAM_CONFIG = {
     "commands_enabled": True,
 }
 
+# Очередь исходящих Telegram сообщений (лимиты Bot API: ~1 msg/s на чат, ~30 msg/s всего)
+TELEGRAM_QUEUE_CONFIG = {
+    "per_chat_rate": 1.0,
+    "per_chat_burst": 3.0,
+    "global_rate": 25.0,
+    "max_queue": 500,
+    # Алерты одного типа в этом окне склеиваются в digest (секунды)
+    "coalesce_window": 2.0,
+    "coalesce_max": 10,
+    # Не-critical сообщения старше отбрасываются (секунды)
+    "max_age_seconds": 600.0,
+    "max_retries": 3,
+}
+
 # ============================================================================
 # НАСТРОЙКИ ЛОГИРОВАНИЯ (ОПТИМИЗИРОВАНО ДЛЯ RAILWAY)
 # ============================================================================
@@ -253,6 +267,54 @@ SCANNER_CONFIG = {
     "observation_threshold": float(os.getenv("OBSERVATION_THRESHOLD", "0.35")),
 }
 
+# Loop Monitor: лаг event loop, блокирующие вызовы (со стеком), инвентарь задач
+LOOP_MONITOR_CONFIG = {
+    "enabled": os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true",
+    # Период замера лага (секунды)
+    "interval": 0.5,
+    # Loop без ответа дольше - блокировка, снимается стек (секунды)
+    "block_threshold": float(os.getenv("LOOP_BLOCK_THRESHOLD", "0.25")),
+    "max_events": 50,
+    # Запоминать место create_task для группировки задач
+    "track_creators": True,
+    "stack_limit": 25,
+}
+
+# Сэмплирующий профайлер (запуск по /profile или /profile/start)
+PROFILER_CONFIG = {
+    "output_dir": DATA_DIR / "profiles",
+    "rate_hz": float(os.getenv("PROFILER_RATE_HZ", "100")),
+    "max_rate_hz": 250.0,
+    "default_duration": 30.0,
+    "max_duration": 300.0,
+    # Замер не дороже этой доли интервала, иначе частота снижается
+    "max_overhead_pct": 5.0,
+    "max_stack_depth": 64,
+    "top_n": 20,
+    "include_idle": False,
+    # Токен для /profile/* на health-server (пусто - эндпоинты закрыты)
+    "token": os.getenv("PROFILER_TOKEN", ""),
+}
+
+# Адаптивное расписание AutoScanner: горячие символы чаще, холодные реже
+SCAN_SCHEDULER_CONFIG = {
+    "enabled": os.getenv("SCAN_SCHEDULER_ENABLED", "true").lower() == "true",
+    # Шаг планировщика (секунды)
+    "tick_seconds": 10,
+    # Общий бюджет анализов в минуту
+    "budget_per_minute": int(os.getenv("SCAN_BUDGET_PER_MINUTE", "30")),
+    # Интервал самого горячего символа
+    "min_interval_seconds": 60,
+    # Гарантия свежести (None - интервал сканера)
+    "max_staleness_seconds": None,
+    "weights": {"volatility": 0.35, "volume": 0.25, "imbalance": 0.2, "levels": 0.2},
+    # Нормировка признаков: значение, дающее максимальную оценку
+    "volatility_ref": 0.005,
+    "volume_surge_ref": 2.0,
+    "imbalance_ref": 0.3,
+    "level_proximity_pct": 1.0,
+}
+
 # ============================================================================
 # BINANCE CONFIGURATION
 # ============================================================================
@@ -447,6 +509,61 @@ CORRELATION_CONFIG = {
         "SOLUSDT",
         "XRPUSDT",
     ],
+    # Rolling correlation engine (1h/4h/24h/7d по закрытым свечам)
+    "engine_interval_minutes": int(os.getenv("CORR_ENGINE_INTERVAL", "5")),
+    # Доля окна (в барах), после которой engine отдаёт матрицу; до этого - API
+    "engine_min_coverage": float(os.getenv("CORR_ENGINE_MIN_COVERAGE", "1.0")),
+    "engine_symbols": [
+        "BTCUSDT",
+        "ETHUSDT",
+        "BNBUSDT",
+        "SOLUSDT",
+        "XRPUSDT",
+        "DOGEUSDT",
+        "ADAUSDT",
+        "AVAXUSDT",
+    ],
+}
+
+# ML Signal Scorer Config (XGBoost по закрытым 5m свечам)
+ML_SCORER_CONFIG = {
+    "enabled": os.getenv("ML_SCORER_ENABLED", "true").lower() == "true",
+    "model_path": str(BASE_DIR / "models" / "xgboost_trading_model.json"),
+    "scaler_path": str(BASE_DIR / "models" / "scaler.pkl"),
+    "interval_minutes": int(os.getenv("ML_SCORER_INTERVAL", "5")),
+    "latency_budget_ms": int(os.getenv("ML_SCORER_BUDGET_MS", "50")),
+    "history_bars": 200,  # Свечей для прогрева состояния символа
+    "symbols": [
+        "BTCUSDT",
+        "ETHUSDT",
+        "BNBUSDT",
+        "SOLUSDT",
+        "XRPUSDT",
+        "DOGEUSDT",
+        "ADAUSDT",
+        "AVAXUSDT",
+    ],
+}
+
+# Ticker Snapshot Config (все linear тикеры Bybit одним запросом)
+TICKER_SNAPSHOT_CONFIG = {
+    "enabled": os.getenv("TICKER_SNAPSHOT_ENABLED", "true").lower() == "true",
+    "category": "linear",
+    "interval_seconds": int(os.getenv("TICKER_SNAPSHOT_INTERVAL", "5")),
+    # Снимок старше - get_ticker() идёт в REST по символу
+    "max_age_seconds": int(os.getenv("TICKER_SNAPSHOT_MAX_AGE", "15")),
+}
+
+# Consolidated Order Book (сводный стакан Bybit / Binance / OKX / Coinbase)
+CONSOLIDATED_BOOK_CONFIG = {
+    "depth": int(os.getenv("CONSOLIDATED_BOOK_DEPTH", "50")),  # Уровней с каждой биржи
+    # Стакан биржи старше - не участвует в NBBO
+    "max_age_seconds": int(os.getenv("CONSOLIDATED_BOOK_MAX_AGE", "10")),
+    "imbalance_levels": 20,
+    # Шаг сетки; для остальных символов - ~1e-5 от цены
+    "tick_sizes": {"BTCUSDT": 0.1, "ETHUSDT": 0.01, "SOLUSDT": 0.01},
+    # BTC-USD (Coinbase) и BTCUSDT сводятся в одну книгу
+    "quote_aliases": {"USD": "USDT", "USDC": "USDT"},
 }
 
 # Whale Activity Tracker Config
@@ -458,6 +575,70 @@ WHALE_CONFIG = {
     ),  # $100K для остальных
 }
 
+# Хранение временных рядов: партиции по времени, retention = удаление партиций
+STORAGE_RETENTION_CONFIG = {
+    "large_trades_days": int(os.getenv("RETENTION_LARGE_TRADES_DAYS", "7")),
+    "large_trades_1m_days": int(os.getenv("RETENTION_LARGE_TRADES_1M_DAYS", "30")),
+    "large_trades_1h_days": int(os.getenv("RETENTION_LARGE_TRADES_1H_DAYS", "365")),
+    "candles_days": int(os.getenv("RETENTION_CANDLES_DAYS", "90")),
+    "analytics_days": int(os.getenv("RETENTION_ANALYTICS_DAYS", "90")),
+    "alerts_days": int(os.getenv("RETENTION_ALERTS_DAYS", "30")),
+    "compact_interval_hours": int(os.getenv("STORAGE_COMPACT_INTERVAL_HOURS", "1")),
+}
+
+# Rate Limiter: token bucket на биржу (вес запросов + заголовки лимитов)
+RATE_LIMIT_CONFIG = {
+    "exchanges": {
+        # Bybit: 600 запросов / 5s на IP, X-Bapi-Limit-Status
+        "bybit": {"capacity": 600, "window_seconds": 5, "weights": {}},
+        # Binance: вес запросов / 1m, X-MBX-USED-WEIGHT-1M
+        "binance": {
+            "capacity": int(os.getenv("BINANCE_WEIGHT_LIMIT", "6000")),
+            "window_seconds": 60,
+            "weights": {"time": 1, "klines": 2, "ticker": 2, "orderbook": 5, "trades": 25},
+        },
+        # Endpoint без префикса биржи
+        "default": {"capacity": 20, "window_seconds": 2, "weights": {}},
+    },
+    # Доля ёмкости, недоступная классу: остаток бережём для торговых запросов
+    "priority_reserve": {"critical": 0.0, "normal": 0.2, "low": 0.5},
+    # Пауза после 429/418 без Retry-After (секунды)
+    "penalty_seconds": 5.0,
+}
+
+# Cache Manager: бюджет памяти и квоты namespace (байты, оценка размера)
+CACHE_CONFIG = {
+    "max_bytes": int(os.getenv("CACHE_MAX_MB", "64")) * 1024 * 1024,
+    "max_entries": 10000,
+    "default_ttl": 10.0,
+    # Квота namespace без явной записи
+    "default_namespace_bytes": 8 * 1024 * 1024,
+    "namespace_bytes": {
+        "orderbook": 16 * 1024 * 1024,
+        "ticker": 4 * 1024 * 1024,
+        "liquidity": 4 * 1024 * 1024,
+        "correlation": 2 * 1024 * 1024,
+        "news": 4 * 1024 * 1024,
+    },
+    # get_or_compute: β ранней вероятностной перезагрузки (0 - только по истечении)
+    "early_refresh_beta": 1.0,
+}
+
+# Конвейер фильтров сигнала: заявленная стоимость этапов (мс) и адаптивный порядок
+FILTER_PIPELINE_CONFIG = {
+    "adaptive": True,
+    # Замеров до перехода с заявленной стоимости на измеренную
+    "min_samples": 20,
+    # Пересортировка этапов каждые N кандидатов
+    "reorder_every": 50,
+    "stage_costs": {
+        "min_rr": 0.01,
+        "multi_tf": 250.0,
+        "confirm": 50.0,
+        "cluster": 20.0,
+    },
+}
+
 logger.info("✅ Analyzer configurations loaded")
 logger.info(
     f"   📊 S/R Detector: ATR={SR_DETECTOR_CONFIG['atr_multiplier']}, Volume={SR_DETECTOR_CONFIG['volume_threshold']}"
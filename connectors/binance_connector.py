@@ -11,11 +11,33 @@ import traceback
 from typing import Dict, List, Optional
 from collections import deque
 from config.settings import logger
+from utils.rate_limiter import get_rate_limiter
+from utils.request_coalescer import coalesced
 from utils.validators import DataValidator
+from utils.candle_frame import parse_klines
 from connectors.binance_orderbook_websocket import BinanceOrderbookWebSocket
 from connectors.binance_trade_websocket import BinanceTradeWebSocket
 
 
+# Дополнительные поля Binance kline: {имя: (индекс, dtype)}
+BINANCE_KLINE_EXTRA = {
+    "close_time": (6, "int64"),
+    "quote_volume": (7, "float64"),
+    "trades": (8, "int64"),
+}
+
+
+def depth_weight(limit: int) -> int:
+    """Вес /api/v3/depth зависит от глубины"""
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 25
+    if limit <= 1000:
+        return 50
+    return 250
+
+
 class BinanceConnector:
     """
     Полнофункциональный коннектор к Binance
@@ -53,6 +75,9 @@ class BinanceConnector:
         self.orderbook_data = {}
         self.large_trades = deque(maxlen=1000)
 
+        # Общий лимит веса запросов (X-MBX-USED-WEIGHT-1M)
+        self.rate_limiter = get_rate_limiter()
+
         # Statistics
         self.stats = {
             "rest_requests": 0,
@@ -100,8 +125,10 @@ class BinanceConnector:
         url = f"{self.base_url}/api/v3/time"
 
         try:
+            await self.rate_limiter.acquire("binance_time")
             self.stats["rest_requests"] += 1
             async with self.session.get(url) as response:
+                self.rate_limiter.update_from_headers("binance", response.headers, response.status)
                 if response.status == 200:
                     data = await response.json()
                     return data["serverTime"]
@@ -115,6 +142,7 @@ class BinanceConnector:
             self.stats["rest_errors"] += 1
             return None
 
+    @coalesced("binance_klines")
     async def get_klines(
         self, symbol: str, interval: str, limit: int = 100
     ) -> List[Dict]:
@@ -123,27 +151,17 @@ class BinanceConnector:
         params = {"symbol": symbol, "interval": interval, "limit": min(limit, 1000)}
 
         try:
+            await self.rate_limiter.acquire("binance_klines")
             self.stats["rest_requests"] += 1
             async with self.session.get(url, params=params) as response:
+                self.rate_limiter.update_from_headers("binance", response.headers, response.status)
                 if response.status == 200:
                     data = await response.json()
 
-                    candles = []
-                    for item in data:
-                        candle = {
-                            "timestamp": int(item[0]),
-                            "open": float(item[1]),
-                            "high": float(item[2]),
-                            "low": float(item[3]),
-                            "close": float(item[4]),
-                            "volume": float(item[5]),
-                            "close_time": int(item[6]),
-                            "quote_volume": float(item[7]),
-                            "trades": int(item[8]),
-                        }
-
-                        if DataValidator.validate_candle(candle):
-                            candles.append(candle)
+                    frame = parse_klines(
+                        data, extra_columns=BINANCE_KLINE_EXTRA, label=symbol
+                    )
+                    candles = frame.to_dicts()
 
                     return candles
 
@@ -161,14 +179,17 @@ class BinanceConnector:
             self.stats["rest_errors"] += 1
             return []
 
+    @coalesced("binance_ticker")
     async def get_ticker(self, symbol: str) -> Optional[Dict]:
         """Получить 24h ticker статистику"""
         url = f"{self.base_url}/api/v3/ticker/24hr"
         params = {"symbol": symbol}
 
         try:
+            await self.rate_limiter.acquire("binance_ticker")
             self.stats["rest_requests"] += 1
             async with self.session.get(url, params=params) as response:
+                self.rate_limiter.update_from_headers("binance", response.headers, response.status)
                 if response.status == 200:
                     data = await response.json()
 
@@ -220,6 +241,7 @@ class BinanceConnector:
             logger.error(f"❌ Ошибка getcurrentpricesymbol для {symbol}: {e}")
             return None
 
+    @coalesced("binance_orderbook")
     async def get_orderbook(self, symbol: str, limit: int = 100) -> Optional[Dict]:
         """Получить L2 orderbook через REST API"""
         url = f"{self.base_url}/api/v3/depth"
@@ -228,8 +250,10 @@ class BinanceConnector:
         params = {"symbol": symbol, "limit": limit}
 
         try:
+            await self.rate_limiter.acquire("binance_orderbook", weight=depth_weight(limit))
             self.stats["rest_requests"] += 1
             async with self.session.get(url, params=params) as response:
+                self.rate_limiter.update_from_headers("binance", response.headers, response.status)
                 if response.status == 200:
                     data = await response.json()
 
@@ -261,8 +285,10 @@ class BinanceConnector:
         params = {"symbol": symbol, "limit": min(limit, 1000)}
 
         try:
+            await self.rate_limiter.acquire("binance_trades")
             self.stats["rest_requests"] += 1
             async with self.session.get(url, params=params) as response:
+                self.rate_limiter.update_from_headers("binance", response.headers, response.status)
                 if response.status == 200:
                     data = await response.json()
 
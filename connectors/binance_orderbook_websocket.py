@@ -8,8 +8,10 @@ Binance Orderbook WebSocket
 import asyncio
 import time
 from typing import List, Dict, Optional
+from models.compact_data import BookSide
 from utils.websocket_manager import WebSocketManager
 from config.settings import logger
+from analytics.consolidated_book import get_consolidated_book
 
 
 class BinanceOrderbookWebSocket:
@@ -30,6 +32,7 @@ class BinanceOrderbookWebSocket:
         self.connector = connector
         self.depth = depth
         self.orderbook_data = {}
+        self.consolidated_book = get_consolidated_book()
         self.last_pressure_log: Dict[str, float] = {}  # Throttling для логов
 
         # Создание streams для futures
@@ -49,6 +52,9 @@ class BinanceOrderbookWebSocket:
             reconnect_delay=5,
             max_reconnect_attempts=10,
             name="Binance-Orderbook",
+            # depth20 - полный снимок: при отставании нужен только последний
+            topic_of=self._topic_of,
+            conflate_topics=("depth",),
         )
 
         logger.info(
@@ -64,6 +70,11 @@ class BinanceOrderbookWebSocket:
         """Остановка WebSocket"""
         await self.ws_manager.stop()
 
+    @staticmethod
+    def _topic_of(data: Dict):
+        """Тема и ключ conflation: снимок стакана по символу"""
+        return "depth", data.get("data", {}).get("s")
+
     async def _on_connect(self):
         """Callback при подключении"""
         logger.info(f"🎉 Binance Orderbook WS подключён: {len(self.symbols)} потоков")
@@ -84,16 +95,18 @@ class BinanceOrderbookWebSocket:
             if not symbol:
                 return
 
-            # Обновляем orderbook
+            # Обновляем orderbook (уровни в array, без списка списков)
             self.orderbook_data[symbol] = {
-                "bids": [[float(bid[0]), float(bid[1])] for bid in msg.get("b", [])],
-                "asks": [[float(ask[0]), float(ask[1])] for ask in msg.get("a", [])],
+                "bids": BookSide.from_levels(msg.get("b", []), descending=True),
+                "asks": BookSide.from_levels(msg.get("a", [])),
                 "timestamp": msg.get("E", 0),
             }
+            book = self.orderbook_data[symbol]
+            self.consolidated_book.update("binance", symbol, book["bids"], book["asks"])
 
-            # Обновление в connector (для совместимости)
+            # Обновление в connector (для совместимости, формат [[price, size]])
             if hasattr(self.connector, "orderbook_data"):
-                self.connector.orderbook_data[symbol] = self.orderbook_data[symbol]
+                self.connector.orderbook_data[symbol] = self.get_orderbook(symbol)
 
             # Рассчитываем дисбаланс и логируем (throttled)
             imbalance = self._calculate_imbalance(symbol)
@@ -123,12 +136,12 @@ class BinanceOrderbookWebSocket:
             bids = orderbook["bids"]
             asks = orderbook["asks"]
 
-            if not bids or not asks:
+            if not len(bids) or not len(asks):
                 return None
 
             # Сумма объёмов bid/ask
-            bid_volume = sum([bid[1] for bid in bids])
-            ask_volume = sum([ask[1] for ask in asks])
+            bid_volume = bids.total_size()
+            ask_volume = asks.total_size()
 
             total = bid_volume + ask_volume
             if total == 0:
@@ -143,8 +156,16 @@ class BinanceOrderbookWebSocket:
             return None
 
     def get_orderbook(self, symbol: str) -> Optional[Dict]:
-        """Получить orderbook для символа"""
-        return self.orderbook_data.get(symbol.upper())
+        """Получить orderbook для символа ({'bids': [[price, size]], ...})"""
+        orderbook = self.orderbook_data.get(symbol.upper())
+        if not orderbook:
+            return None
+
+        return {
+            "bids": orderbook["bids"].to_levels(),
+            "asks": orderbook["asks"].to_levels(),
+            "timestamp": orderbook["timestamp"],
+        }
 
     def get_stats(self) -> Dict:
         """Получить статистику WebSocket"""
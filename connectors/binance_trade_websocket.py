@@ -11,6 +11,7 @@ import time
 from typing import List, Optional, Dict
 import websockets
 from config.settings import logger
+from utils.dispatch_queue import TopicDispatcher
 
 
 class BinanceTradeWebSocket:
@@ -34,6 +35,10 @@ class BinanceTradeWebSocket:
         self.ws = None
         self.running = False
 
+        # Обработка вне цикла чтения, FIFO без потерь (whale tracker может писать в БД)
+        self.dispatcher = TopicDispatcher("Binance-Trades")
+        self.dispatcher.add_topic("trade")
+
         # Statistics
         self.stats = {
             "trades_received": 0,
@@ -69,7 +74,7 @@ class BinanceTradeWebSocket:
                     async for message in ws:
                         if not self.running:
                             break
-                        await self._handle_message(message)
+                        self.dispatcher.submit("trade", self._handle_message, message)
 
             except websockets.ConnectionClosed:
                 logger.warning("⚠️ Binance Trade WebSocket отключён, переподключение...")
@@ -86,6 +91,7 @@ class BinanceTradeWebSocket:
         self.running = False
         if self.ws:
             await self.ws.close()
+        await self.dispatcher.stop()
 
     # ===========================================
     # MESSAGE HANDLING
@@ -155,6 +161,7 @@ class BinanceTradeWebSocket:
             **self.stats,
             "uptime_seconds": uptime,
             "is_running": self.running,
+            "queues": self.dispatcher.get_stats(),
         }
 
 
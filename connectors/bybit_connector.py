@@ -14,12 +14,21 @@ import hashlib
 from typing import Dict, List, Optional, Any
 from collections import defaultdict, deque
 
-from config.settings import BYBIT_API_KEY, BYBIT_SECRET_KEY, logger
+from config.settings import (
+    BYBIT_API_KEY,
+    BYBIT_SECRET_KEY,
+    TICKER_SNAPSHOT_CONFIG,
+    logger,
+)
 from config.constants import API_ENDPOINTS, Colors
 from core.exceptions import APIConnectionError
 from utils.helpers import current_epoch_ms
 from utils.rate_limiter import get_rate_limiter, ExponentialBackoff
 from utils.cache_manager import get_cache_manager
+from utils.request_coalescer import coalesced, get_request_coalescer
+from connectors.bybit_ticker_snapshot import TickerSnapshot
+from connectors.bybit_liquidation_stream import get_liquidation_aggregator
+from utils.candle_frame import parse_klines
 
 
 class EnhancedBybitConnector:
@@ -44,6 +53,13 @@ class EnhancedBybitConnector:
         self.klines_cache = {}
         self.ticker_cache = {}
 
+        # Снимок всех тикеров (один запрос на все символы)
+        self.ticker_snapshot = TickerSnapshot(TICKER_SNAPSHOT_CONFIG["category"])
+        self.snapshot_max_age = TICKER_SNAPSHOT_CONFIG["max_age_seconds"]
+
+        # Поминутные бакеты ликвидаций (пополняет BybitLiquidationStream)
+        self.liquidations = get_liquidation_aggregator()
+
         # 🚀 БАТЧИНГ: Добавляем кеш для батчинга
         self.candle_cache = {}
         self.cache_ttl = 300  # 5 мин
@@ -109,6 +125,7 @@ class EnhancedBybitConnector:
             params = {"category": "linear", "symbol": "BTCUSDT"}
 
             async with self.session.get(url, params=params) as response:
+                self.rate_limiter.update_from_headers("bybit", response.headers, response.status)
                 if response.status != 200:
                     raise APIConnectionError(
                         f"API недоступен, статус: {response.status}"
@@ -182,20 +199,16 @@ class EnhancedBybitConnector:
             self.connection_health["error_count"] += 1
             return {}
 
+    @coalesced("bybit_orderbook")
     async def _get_orderbook(self, symbol: str, limit: int = 50) -> Optional[Dict]:
-        """Получение стакана заявок (с Rate Limiting и Cache)"""
+        """Получение стакана заявок (с Rate Limiting, single-flight и TTL 3s)"""
         try:
-            cache_key = f"{symbol}_{limit}"
-            cached_orderbook = await self.cache.get(cache_key, namespace="orderbook")
-            if cached_orderbook is not None:
-                logger.debug(f"💾 Orderbook {symbol} из кэша")
-                return cached_orderbook
-
             await self.rate_limiter.acquire("bybit_orderbook")
             url = f"{self.base_url}/v5/market/orderbook"
             params = {"category": "linear", "symbol": symbol, "limit": limit}
 
             async with self.session.get(url, params=params) as response:
+                self.rate_limiter.update_from_headers("bybit", response.headers, response.status)
                 if response.status == 200:
                     data = await response.json()
                     if data.get("retCode") == 0:
@@ -233,11 +246,6 @@ class EnhancedBybitConnector:
                                 (best_ask - best_bid) / orderbook["mid_price"]
                             ) * 10000
 
-                            # ✅ СОХРАНЯЕМ В КЭШ (TTL: 3 секунды)
-                        await self.cache.set(
-                            cache_key, orderbook, ttl=3.0, namespace="orderbook"
-                        )
-
                         self.orderbook_cache[symbol] = orderbook
                         return orderbook
 
@@ -245,17 +253,10 @@ class EnhancedBybitConnector:
             logger.error(f"Ошибка получения orderbook для {symbol}: {e}")
             return None
 
+    @coalesced("bybit_ticker")
     async def _get_ticker(self, symbol: str) -> Optional[Dict]:
-        """Получение данных тикера (с Rate Limiting и Cache)"""
+        """Получение данных тикера (с Rate Limiting, single-flight и TTL 5s)"""
         try:
-            # ✅ ИСПОЛЬЗУЕМ АСИНХРОННЫЙ КЭШ
-            cache_key = f"ticker:{symbol}"
-            cached_ticker = await self.cache.get(cache_key, namespace="ticker")
-
-            if cached_ticker:
-                logger.debug(f"💾 Ticker {symbol} из кэша")
-                return cached_ticker
-
             # ✅ RATE LIMITING
             await self.rate_limiter.acquire("bybit_ticker")
 
@@ -269,9 +270,11 @@ class EnhancedBybitConnector:
             for attempt in range(max_retries):
                 try:
                     async with self.session.get(url, params=params) as response:
+                        self.rate_limiter.update_from_headers("bybit", response.headers, response.status)
                         if response.status == 429:
                             logger.warning(f"⚠️ Rate Limit (429) для ticker {symbol}")
-                            await backoff.sleep()
+                            # Пауза по Retry-After выдерживается в ведре
+                            await self.rate_limiter.acquire("bybit_ticker")
                             continue
 
                         if response.status == 200:
@@ -294,17 +297,9 @@ class EnhancedBybitConnector:
                                         "fundingRate": ticker_data.get("fundingRate"),
                                     }
 
-                                    # ✅ СОХРАНЯЕМ В АСИНХРОННЫЙ КЭШ
-                                    await self.cache.set(
-                                        cache_key,
-                                        formatted_ticker,
-                                        ttl=5.0,
-                                        namespace="ticker",
-                                    )
-
                                     logger.debug(
                                         f"✅ Ticker для {symbol}: "
-                                        f"${formatted_ticker.get('lastPrice')} (cached)"
+                                        f"${formatted_ticker.get('lastPrice')}"
                                     )
 
                                     return formatted_ticker
@@ -331,6 +326,7 @@ class EnhancedBybitConnector:
             logger.error(f"❌ Критическая ошибка получения ticker для {symbol}: {e}")
             return None
 
+    @coalesced("bybit_klines")
     async def _get_klines(
         self, symbol: str, interval: str, limit: int = 200
     ) -> Optional[Dict]:
@@ -346,6 +342,7 @@ class EnhancedBybitConnector:
             Dict с валидированными свечами или None при ошибке
         """
         try:
+            await self.rate_limiter.acquire("bybit_klines")
             url = f"{self.base_url}/v5/market/kline"
             params = {
                 "category": "linear",
@@ -355,6 +352,7 @@ class EnhancedBybitConnector:
             }
 
             async with self.session.get(url, params=params) as response:
+                self.rate_limiter.update_from_headers("bybit", response.headers, response.status)
                 if response.status != 200:
                     logger.error(f"❌ HTTP ошибка {response.status} для {symbol}")
                     return None
@@ -378,99 +376,15 @@ class EnhancedBybitConnector:
                     logger.warning(f"⚠️ Нет данных свечей для {symbol}")
                     return None
 
-                # === ИНИЦИАЛИЗАЦИЯ ===
-                candles = []
-                invalid_count = 0
-
-                # === ОБРАБОТКА КАЖДОЙ СВЕЧИ С ВАЛИДАЦИЕЙ ===
-                for kline in klines_list:
-                    try:
-                        # Проверка минимальной длины массива
-                        if len(kline) < 6:
-                            logger.warning(
-                                f"⚠️ Неполная свеча для {symbol}: {len(kline)} полей"
-                            )
-                            invalid_count += 1
-                            continue
-
-                        # === ПАРСИНГ И ВАЛИДАЦИЯ ПОЛЕЙ ===
-                        timestamp = int(kline[0])
-                        open_price = float(kline[1])
-                        high_price = float(kline[2])
-                        low_price = float(kline[3])
-                        close_price = float(kline[4])
-                        volume = float(kline[5])
-
-                        # Проверка на NaN, None, отрицательные/нулевые значения
-                        if any(
-                            [
-                                timestamp is None or timestamp <= 0,
-                                open_price is None or open_price <= 0,
-                                high_price is None or high_price <= 0,
-                                low_price is None or low_price <= 0,
-                                close_price is None or close_price <= 0,
-                                volume is None or volume < 0,
-                            ]
-                        ):
-                            logger.debug(
-                                f"⚠️ Невалидные значения в свече для {symbol}: "
-                                f"T={timestamp} O={open_price} H={high_price} "
-                                f"L={low_price} C={close_price} V={volume}"
-                            )
-                            invalid_count += 1
-                            continue
-
-                        # === ПРОВЕРКА КОРРЕКТНОСТИ OHLC ===
-                        # High должен быть максимальным, Low - минимальным
-                        if not (
-                            low_price <= open_price <= high_price
-                            and low_price <= close_price <= high_price
-                        ):
-                            logger.warning(
-                                f"⚠️ Некорректная OHLC свеча для {symbol}: "
-                                f"L={low_price} O={open_price} "
-                                f"H={high_price} C={close_price}"
-                            )
-                            invalid_count += 1
-                            continue
-
-                        # === ДОПОЛНИТЕЛЬНАЯ ПРОВЕРКА: разумные значения ===
-                        # Проверяем что цены в разумных пределах (не экстремальные)
-                        price_spread = (high_price - low_price) / low_price
-                        if price_spread > 0.5:  # Спред больше 50% - подозрительно
-                            logger.warning(
-                                f"⚠️ Подозрительный спред {price_spread:.1%} для {symbol}"
-                            )
-                            # Не отбрасываем, но логируем
-
-                        # === ДОБАВЛЯЕМ ВАЛИДНУЮ СВЕЧУ ===
-                        candles.append(
-                            {
-                                "timestamp": timestamp,
-                                "open": open_price,
-                                "high": high_price,
-                                "low": low_price,
-                                "close": close_price,
-                                "volume": volume,
-                            }
-                        )
-
-                    except (ValueError, TypeError, IndexError) as e:
-                        logger.warning(f"⚠️ Ошибка парсинга свечи для {symbol}: {e}")
-                        invalid_count += 1
-                        continue
-                    except Exception as e:
-                        logger.error(
-                            f"❌ Неожиданная ошибка парсинга свечи для {symbol}: {e}"
-                        )
-                        invalid_count += 1
-                        continue
+                # === КОЛОНОЧНЫЙ ПАРСИНГ И ВАЛИДАЦИЯ (маски над массивами) ===
+                frame = parse_klines(klines_list, label=symbol)
+                invalid_count = frame.invalid_count
 
                 # === ФИНАЛЬНАЯ ВАЛИДАЦИЯ: достаточно ли валидных свечей ===
-                if len(candles) < limit * 0.5:  # Минимум 50% от запрошенных
+                if len(frame) < limit * 0.5:  # Минимум 50% от запрошенных
                     logger.error(
                         f"❌ Слишком много невалидных свечей для {symbol}: "
-                        f"валидных={len(candles)}, невалидных={invalid_count}, "
+                        f"валидных={len(frame)}, невалидных={invalid_count}, "
                         f"запрошено={limit}"
                     )
                     return None
@@ -479,11 +393,11 @@ class EnhancedBybitConnector:
                 if invalid_count > 0:
                     logger.info(
                         f"ℹ️ Отфильтровано {invalid_count} невалидных свечей "
-                        f"для {symbol} (осталось {len(candles)})"
+                        f"для {symbol} (осталось {len(frame)})"
                     )
 
                 # === СОРТИРОВКА ПО TIMESTAMP (от новых к старым) ===
-                candles.sort(key=lambda x: x["timestamp"], reverse=True)
+                candles = frame.to_dicts(descending=True)
 
                 # === ФОРМИРУЕМ РЕЗУЛЬТАТ ===
                 klines = {
@@ -582,14 +496,40 @@ class EnhancedBybitConnector:
         """
         Публичный метод для получения тикера
 
+        Берётся из снимка всех тикеров (O(1)), если он свежий; иначе
+        запрос по символу.
+
         Args:
             symbol: Торговая пара (BTCUSDT)
 
         Returns:
             Dict с данными тикера
         """
+        if self.ticker_snapshot.is_fresh(self.snapshot_max_age):
+            ticker = self.ticker_snapshot.get(symbol)
+            if ticker is not None:
+                return ticker
         return await self._get_ticker(symbol)
 
+    async def refresh_ticker_snapshot(self) -> bool:
+        """Обновить снимок всех тикеров одним запросом (задача планировщика)"""
+        if self.session is None or self.session.closed:
+            return False
+        await self.rate_limiter.acquire("bybit_ticker")
+        return await self.ticker_snapshot.refresh(self.session, self.base_url)
+
+    async def getcurrentpricesymbol(self, symbol: str) -> Optional[float]:
+        """Текущая цена символа (из снимка тикеров или REST)"""
+        if self.ticker_snapshot.is_fresh(self.snapshot_max_age):
+            price = self.ticker_snapshot.price(symbol)
+            if price:
+                return price
+
+        ticker = await self.get_ticker(symbol)
+        if ticker and ticker.get("lastPrice"):
+            return float(ticker["lastPrice"])
+        return None
+
     async def get_trades(self, symbol: str, limit: int = 1000) -> Optional[List[Dict]]:
         """
         Публичный метод для получения последних сделок
@@ -677,7 +617,7 @@ class EnhancedBybitConnector:
         Получить последние сделки для символа
         """
         try:
-            await self.rate_limiter.wait_if_needed("market_data")
+            await self.rate_limiter.acquire("bybit_trades")
 
             # Формируем запрос
             params = {
@@ -689,6 +629,7 @@ class EnhancedBybitConnector:
             async with self.session.get(
                 f"{self.base_url}/v5/market/recent-trade", params=params
             ) as response:
+                self.rate_limiter.update_from_headers("bybit", response.headers, response.status)
                 if response.status == 200:
                     data = await response.json()
 
@@ -745,13 +686,16 @@ class EnhancedBybitConnector:
             logger.error(f"Ошибка получения trades для {symbol}: {e}")
             return None
 
+    @coalesced("bybit_funding")
     async def _get_funding_rate(self, symbol: str) -> Optional[Dict]:
         """Получение данных по funding rate"""
         try:
+            await self.rate_limiter.acquire("bybit_funding")
             url = f"{self.base_url}/v5/market/funding/history"
             params = {"category": "linear", "symbol": symbol, "limit": 10}
 
             async with self.session.get(url, params=params) as response:
+                self.rate_limiter.update_from_headers("bybit", response.headers, response.status)
                 if response.status == 200:
                     data = await response.json()
                     if data.get("retCode") == 0 and data.get("result"):
@@ -834,6 +778,7 @@ class EnhancedBybitConnector:
         Docs: https://bybit-exchange.github.io/docs/v5/market/account-ratio
         """
         try:
+            await self.rate_limiter.acquire("bybit_long_short")
             url = f"{self.base_url}/v5/market/account-ratio"
             params = {
                 "category": "linear",
@@ -842,6 +787,7 @@ class EnhancedBybitConnector:
             }
 
             async with self.session.get(url, params=params) as response:
+                self.rate_limiter.update_from_headers("bybit", response.headers, response.status)
                 if response.status != 200:
                     logger.warning(
                         f"⚠️ HTTP {response.status} для Long/Short Ratio {symbol}"
@@ -898,6 +844,7 @@ class EnhancedBybitConnector:
             logger.error(f"❌ Ошибка получения Long/Short Ratio {symbol}: {e}")
             return None
 
+    @coalesced("bybit_open_interest")
     async def get_open_interest(self, symbol: str) -> Optional[Dict]:
         """
         Получить Open Interest для символа
@@ -909,6 +856,7 @@ class EnhancedBybitConnector:
             Dict с данными об открытом интересе
         """
         try:
+            await self.rate_limiter.acquire("bybit_open_interest")
             url = f"{self.base_url}/v5/market/open-interest"
             params = {
                 "category": "linear",
@@ -917,6 +865,7 @@ class EnhancedBybitConnector:
             }
 
             async with self.session.get(url, params=params) as response:
+                self.rate_limiter.update_from_headers("bybit", response.headers, response.status)
                 if response.status != 200:
                     logger.warning(
                         f"⚠️ HTTP {response.status} для Open Interest {symbol}"
@@ -1375,12 +1324,24 @@ class EnhancedBybitConnector:
         """
         return self.rate_limiter.get_all_stats()
 
+    def get_request_stats(self) -> Dict:
+        """
+        Статистика общего слоя REST запросов (по всем коннекторам)
+
+        Returns:
+            {endpoint: {requests, hits, coalesced, fetches, hit_rate, coalesce_rate, ...}}
+        """
+        return get_request_coalescer().get_stats()
+
     # ========== CVD МЕТОДЫ (НОВЫЕ) ==========
 
     async def get_liquidations_24h(self, symbol: str = "BTCUSDT") -> Dict:
         """
         Получить данные ликвидаций за 24 часа с Bybit
 
+        Данные копит BybitLiquidationStream (топик allLiquidation) в
+        поминутных бакетах - вызов не делает сетевых запросов.
+
         Args:
             symbol: Торговая пара (например, "BTCUSDT")
 
@@ -1395,121 +1356,22 @@ class EnhancedBybitConnector:
                 'symbol': str,
                 'timestamp': str
             }
-
-        Документация API:
-            https://bybit-exchange.github.io/docs/v5/market/recent-trade
         """
         try:
-            from datetime import datetime, timedelta
-
-            logger.info(f"📊 Получение ликвидаций за 24ч для {symbol}...")
+            liquidations = self.liquidations.summary(symbol)
 
-            # Bybit НЕ предоставляет прямой endpoint для ликвидаций
-            # Используем косвенные методы:
-            # 1. Analysing Large Trades (>$100k) как proxy для liquidations
-            # 2. Open Interest changes (резкие падения = liquidations)
-
-            now = datetime.now()
-            start_time = int((now - timedelta(hours=24)).timestamp() * 1000)
-
-            # МЕТОД 1: Получаем крупные сделки
-            url = f"{self.base_url}/v5/market/recent-trade"
-            params = {
-                "category": "linear",
-                "symbol": symbol,
-                "limit": 1000  # Максимум
-            }
-
-            async with self.session.get(url, params=params) as response:
-                if response.status != 200:
-                    logger.warning(f"⚠️ HTTP {response.status} для liquidations {symbol}")
-                    return self._empty_liquidation_data(symbol)
-
-                data = await response.json()
-
-                if data.get("retCode") != 0:
-                    logger.warning(
-                        f"⚠️ API ошибка liquidations {symbol}: "
-                        f"{data.get('retMsg', 'Unknown')}"
-                    )
-                    return self._empty_liquidation_data(symbol)
-
-                trades = data.get("result", {}).get("list", [])
-
-                if not trades:
-                    logger.warning(f"⚠️ Нет данных trades для {symbol}")
-                    return self._empty_liquidation_data(symbol)
-
-                # Анализируем крупные сделки как proxy для ликвидаций
-                long_liq = 0.0
-                short_liq = 0.0
-                count = 0
-
-                for trade in trades:
-                    try:
-                        side = trade.get("side", "").upper()
-                        size = float(trade.get("size", 0))
-                        price = float(trade.get("price", 0))
-                        trade_time = int(trade.get("time", 0))
-
-                        # Фильтруем только за последние 24ч
-                        if trade_time < start_time:
-                            continue
-
-                        volume_usd = size * price
-
-                        # Крупные сделки (>$50k) считаем как потенциальные ликвидации
-                        if volume_usd >= 50000:
-                            # Ликвидация лонга = SELL ордер (цена падает)
-                            # Ликвидация шорта = BUY ордер (цена растёт)
-                            if side == "SELL":
-                                long_liq += volume_usd
-                                count += 1
-                            elif side == "BUY":
-                                short_liq += volume_usd
-                                count += 1
-
-                    except (ValueError, TypeError, KeyError) as e:
-                        logger.debug(f"⚠️ Ошибка обработки trade: {e}")
-                        continue
-
-                total = long_liq + short_liq
-
-                if total == 0:
-                    logger.warning(f"⚠️ Нет ликвидаций для {symbol} за 24ч")
-                    return self._empty_liquidation_data(symbol)
-
-                long_pct = (long_liq / total * 100) if total > 0 else 0
-                short_pct = (short_liq / total * 100) if total > 0 else 0
-
-                liquidations = {
-                    "total_long": long_liq,
-                    "total_short": short_liq,
-                    "total": total,
-                    "count": count,
-                    "long_pct": long_pct,
-                    "short_pct": short_pct,
-                    "symbol": symbol,
-                    "timestamp": now.isoformat()
-                }
-
-                logger.info(
+            if liquidations["total"] > 0:
+                logger.debug(
                     f"💥 Liquidations {symbol}: "
-                    f"Total ${total:,.0f} | "
-                    f"Long: {long_pct:.1f}% | "
-                    f"Short: {short_pct:.1f}%"
+                    f"Total ${liquidations['total']:,.0f} | "
+                    f"Long: {liquidations['long_pct']:.1f}% | "
+                    f"Short: {liquidations['short_pct']:.1f}%"
                 )
 
-                return liquidations
-
-        except aiohttp.ClientError as e:
-            logger.error(f"❌ HTTP ошибка liquidations {symbol}: {e}")
-            return self._empty_liquidation_data(symbol)
+            return liquidations
 
         except Exception as e:
             logger.error(f"❌ Ошибка get_liquidations_24h для {symbol}: {e}")
-            import traceback
-            logger.debug(traceback.format_exc())
             return self._empty_liquidation_data(symbol)
 
 
@@ -1631,6 +1493,12 @@ class EnhancedBybitConnector:
             Funding rate у відсотках (0.01 = 0.01%)
         """
         try:
+            # Снимок всех тикеров (обновляется планировщиком)
+            if self.ticker_snapshot.is_fresh(self.snapshot_max_age):
+                funding_rate = self.ticker_snapshot.funding_rate(symbol)
+                if funding_rate is not None:
+                    return funding_rate * 100
+
             # Використовуємо ticker для отримання funding rate
             ticker_data = self.ticker_cache.get(symbol)
 
@@ -1674,6 +1542,12 @@ class EnhancedBybitConnector:
             float: Funding rate в процентах (0.0100 = 0.01%)
         """
         try:
+            # 0️⃣ СНИМОК ВСЕХ ТИКЕРОВ
+            if self.ticker_snapshot.is_fresh(self.snapshot_max_age):
+                funding_rate = self.ticker_snapshot.funding_rate(symbol)
+                if funding_rate is not None:
+                    return funding_rate * 100
+
             # 1️⃣ ПРОБУЄМО TICKER КЕШ
             ticker_data = self.ticker_cache.get(symbol)
 
@@ -1687,10 +1561,12 @@ class EnhancedBybitConnector:
             # 2️⃣ FALLBACK: Пряме звернення до REST API
             logger.info(f"⚠️ Funding Rate {symbol} НЕ в кеші → запит до API...")
 
+            await self.rate_limiter.acquire("bybit_ticker")
             url = f"{self.base_url}/v5/market/tickers"
             params = {"category": "linear", "symbol": symbol}
 
             async with self.session.get(url, params=params) as response:
+                self.rate_limiter.update_from_headers("bybit", response.headers, response.status)
                 if response.status == 200:
                     data = await response.json()
 
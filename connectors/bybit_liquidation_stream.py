@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bybit Liquidation Stream - ликвидации из WebSocket топика allLiquidation
+- Поминутные бакеты long/short ($) и количество событий, кольцо на 24ч
+- get_liquidations_24h и окна каскадов считаются по бакетам, без сети
+"""
+
+import asyncio
+import json
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import websockets
+
+from config.settings import logger
+
+
+MINUTE_MS = 60_000
+RING_MINUTES = 24 * 60
+
+
+class _SymbolRing:
+    """Кольцо поминутных бакетов одного символа"""
+
+    __slots__ = ("minute", "long_usd", "short_usd", "count", "version")
+
+    def __init__(self, size: int):
+        self.minute = np.full(size, -1, dtype=np.int64)  # Номер минуты в слоте
+        self.long_usd = np.zeros(size, dtype=np.float64)
+        self.short_usd = np.zeros(size, dtype=np.float64)
+        self.count = np.zeros(size, dtype=np.int64)
+        self.version = 0  # Растёт с каждым событием (ключ мемоизации вето)
+
+
+class LiquidationAggregator:
+    """
+    Агрегатор ликвидаций по символам
+
+    Каждая ликвидация попадает в бакет своей минуты (slot = minute % size).
+    Слот переиспользуется, когда в него приходит более новая минута, поэтому
+    память постоянна, а запрос окна - O(бакетов) без хранения событий.
+    """
+
+    def __init__(self, ring_minutes: int = RING_MINUTES):
+        self.ring_minutes = ring_minutes
+        self._rings: Dict[str, _SymbolRing] = {}
+        self.stats = {"events": 0, "late": 0}
+
+    def add(self, symbol: str, side: str, price: float, size: float, timestamp_ms: int) -> bool:
+        """
+        Добавить ликвидацию
+
+        Args:
+            side: Сторона ЛИКВИДИРОВАННОЙ позиции ("Buy" = лонг, "Sell" = шорт)
+
+        Returns:
+            False если событие старше кольца
+        """
+        minute = int(timestamp_ms) // MINUTE_MS
+        ring = self._rings.get(symbol)
+        if ring is None:
+            ring = self._rings[symbol] = _SymbolRing(self.ring_minutes)
+
+        slot = minute % self.ring_minutes
+        if ring.minute[slot] != minute:
+            if ring.minute[slot] > minute:
+                self.stats["late"] += 1
+                return False
+            ring.minute[slot] = minute
+            ring.long_usd[slot] = 0.0
+            ring.short_usd[slot] = 0.0
+            ring.count[slot] = 0
+
+        value = float(price) * float(size)
+        if side.upper() == "BUY":
+            ring.long_usd[slot] += value
+        else:
+            ring.short_usd[slot] += value
+        ring.count[slot] += 1
+        ring.version += 1
+        self.stats["events"] += 1
+        return True
+
+    def has_data(self, symbol: str) -> bool:
+        return symbol in self._rings
+
+    def version(self, symbol: str) -> int:
+        """Счётчик событий символа (0 - нет данных)"""
+        ring = self._rings.get(symbol)
+        return ring.version if ring is not None else 0
+
+    def symbols(self) -> List[str]:
+        return list(self._rings)
+
+    def _mask(self, ring: _SymbolRing, minutes: int, now_ms: Optional[int]) -> np.ndarray:
+        now_minute = int(now_ms if now_ms is not None else time.time() * 1000) // MINUTE_MS
+        return (ring.minute > now_minute - minutes) & (ring.minute <= now_minute)
+
+    def window(self, symbol: str, minutes: int = RING_MINUTES, now_ms: Optional[int] = None) -> Dict:
+        """Сумма ликвидаций за последние N минут (включая текущую)"""
+        ring = self._rings.get(symbol)
+        if ring is None:
+            return {"long": 0.0, "short": 0.0, "total": 0.0, "count": 0}
+
+        mask = self._mask(ring, min(minutes, self.ring_minutes), now_ms)
+        long_usd = float(ring.long_usd[mask].sum())
+        short_usd = float(ring.short_usd[mask].sum())
+        return {
+            "long": long_usd,
+            "short": short_usd,
+            "total": long_usd + short_usd,
+            "count": int(ring.count[mask].sum()),
+        }
+
+    def heavy_minutes(
+        self, symbol: str, minutes: int, min_usd: float, now_ms: Optional[int] = None
+    ) -> Dict:
+        """
+        Минуты окна с ликвидациями >= min_usd (признак каскада)
+
+        Returns:
+            {"minutes": int, "max_usd": float, "total": float}
+        """
+        ring = self._rings.get(symbol)
+        if ring is None:
+            return {"minutes": 0, "max_usd": 0.0, "total": 0.0}
+
+        mask = self._mask(ring, min(minutes, self.ring_minutes), now_ms)
+        totals = ring.long_usd[mask] + ring.short_usd[mask]
+        return {
+            "minutes": int((totals >= min_usd).sum()),
+            "max_usd": float(totals.max()) if totals.size else 0.0,
+            "total": float(totals.sum()),
+        }
+
+    def summary(self, symbol: str, minutes: int = RING_MINUTES, now_ms: Optional[int] = None) -> Dict:
+        """Ликвидации в формате EnhancedBybitConnector.get_liquidations_24h()"""
+        from datetime import datetime
+
+        data = self.window(symbol, minutes, now_ms)
+        total = data["total"]
+        return {
+            "total_long": data["long"],
+            "total_short": data["short"],
+            "total": total,
+            "count": data["count"],
+            "long_pct": data["long"] / total * 100 if total > 0 else 0.0,
+            "short_pct": data["short"] / total * 100 if total > 0 else 0.0,
+            "symbol": symbol,
+            "timestamp": datetime.now().isoformat(),
+        }
+
+
+class BybitLiquidationStream:
+    """WebSocket подписка на allLiquidation.{symbol} для списка символов"""
+
+    # Bybit принимает не больше 10 топиков в одном subscribe
+    SUBSCRIBE_CHUNK = 10
+
+    def __init__(
+        self,
+        symbols: List[str],
+        aggregator: Optional[LiquidationAggregator] = None,
+        testnet: bool = False,
+        reconnect_delay: float = 5.0,
+    ):
+        self.symbols = list(symbols)
+        self.aggregator = aggregator or get_liquidation_aggregator()
+        self.reconnect_delay = reconnect_delay
+
+        if testnet:
+            self.ws_url = "wss://stream-testnet.bybit.com/v5/public/linear"
+        else:
+            self.ws_url = "wss://stream.bybit.com/v5/public/linear"
+
+        self.websocket = None
+        self.is_running = False
+        self._task = None
+        self.callbacks: List[Callable] = []
+        self.stats = {"messages": 0, "reconnects": 0}
+
+    def add_callback(self, callback: Callable):
+        """
+        Добавить callback на каждую ликвидацию (синхронный, в цикле чтения):
+        callback(symbol, side, price, size, timestamp_ms)
+        """
+        self.callbacks.append(callback)
+
+    async def start(self):
+        """Запуск потока (переподключается до stop())"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"✅ Bybit Liquidation Stream запущен ({len(self.symbols)} пар)")
+
+    async def _run(self):
+        while self.is_running:
+            try:
+                async with websockets.connect(
+                    self.ws_url, ping_interval=20, ping_timeout=10
+                ) as websocket:
+                    self.websocket = websocket
+                    for i in range(0, len(self.symbols), self.SUBSCRIBE_CHUNK):
+                        chunk = self.symbols[i : i + self.SUBSCRIBE_CHUNK]
+                        await websocket.send(
+                            json.dumps(
+                                {
+                                    "op": "subscribe",
+                                    "args": [f"allLiquidation.{s}" for s in chunk],
+                                }
+                            )
+                        )
+
+                    async for message in websocket:
+                        try:
+                            self.process_message(json.loads(message))
+                        except json.JSONDecodeError as e:
+                            logger.error(f"❌ Liquidation stream: ошибка JSON: {e}")
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.warning(f"⚠️ Liquidation stream отключён: {e}")
+
+            self.websocket = None
+            if self.is_running:
+                self.stats["reconnects"] += 1
+                await asyncio.sleep(self.reconnect_delay)
+
+    def process_message(self, data: Dict) -> int:
+        """
+        Обработка сообщения allLiquidation
+
+        Returns:
+            Количество добавленных ликвидаций
+        """
+        if not data.get("topic", "").startswith("allLiquidation"):
+            return 0
+
+        self.stats["messages"] += 1
+        added = 0
+        for item in data.get("data", []):
+            try:
+                event = (
+                    item["s"],
+                    item["S"],
+                    float(item["p"]),
+                    float(item["v"]),
+                    int(item.get("T", data.get("ts", 0))),
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                logger.debug(f"⚠️ Некорректная ликвидация {item}: {e}")
+                continue
+
+            if not self.aggregator.add(*event):
+                continue
+            added += 1
+            for callback in self.callbacks:
+                try:
+                    callback(*event)
+                except Exception as e:
+                    logger.error(f"❌ Liquidation callback: {e}", exc_info=True)
+        return added
+
+    async def stop(self):
+        """Остановка потока"""
+        self.is_running = False
+        if self.websocket is not None:
+            await self.websocket.close()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        logger.info("🛑 Bybit Liquidation Stream остановлен")
+
+
+# Глобальный агрегатор (пишет стрим, читают коннектор и вето)
+_global_aggregator: Optional[LiquidationAggregator] = None
+
+
+def get_liquidation_aggregator() -> LiquidationAggregator:
+    """Получить глобальный LiquidationAggregator (Singleton)"""
+    global _global_aggregator
+    if _global_aggregator is None:
+        _global_aggregator = LiquidationAggregator()
+    return _global_aggregator
+
+
+__all__ = [
+    "LiquidationAggregator",
+    "BybitLiquidationStream",
+    "get_liquidation_aggregator",
+]
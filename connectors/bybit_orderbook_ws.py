@@ -10,6 +10,7 @@ import websockets
 import json
 from typing import Dict, List, Callable, Optional
 from config.settings import logger
+from utils.dispatch_queue import TopicDispatcher
 
 
 class BybitOrderbookWebSocket:
@@ -49,6 +50,10 @@ class BybitOrderbookWebSocket:
         self.is_running = False
         self._task = None
 
+        # Callbacks вне цикла чтения: при отставании - только последнее состояние
+        self.dispatcher = TopicDispatcher(f"Bybit-Orderbook-{symbol}")
+        self.dispatcher.add_topic("orderbook", conflate=True)
+
         # === Хранение полного orderbook ===
         self._orderbook = None
         self._snapshot_received = False
@@ -159,7 +164,7 @@ class BybitOrderbookWebSocket:
                 self._snapshot_received = True
 
                 # Вызываем callbacks с ПОЛНЫМ orderbook
-                await self._notify_callbacks()
+                self.dispatcher.submit("orderbook", self._notify_callbacks, key=self.symbol)
                 return
 
             # === DELTA: Обновление существующих уровней ===
@@ -243,7 +248,7 @@ class BybitOrderbookWebSocket:
                 log_batcher.log_orderbook_update('Bybit', self.symbol)
 
                 # Вызываем callbacks с ОБНОВЛЁННЫМ orderbook
-                await self._notify_callbacks()
+                self.dispatcher.submit("orderbook", self._notify_callbacks, key=self.symbol)
 
         except Exception as e:
             logger.error(f"❌ Ошибка обработки сообщения: {e}")
@@ -257,13 +262,20 @@ class BybitOrderbookWebSocket:
             if not self._orderbook:
                 return
 
+            # Снимок: reader продолжает применять delta, пока callbacks ждут
+            orderbook = {
+                **self._orderbook,
+                "bids": list(self._orderbook["bids"]),
+                "asks": list(self._orderbook["asks"]),
+            }
+
             # Вызываем все callbacks с ПОЛНЫМ orderbook
             for callback in self.callbacks:
                 try:
                     if asyncio.iscoroutinefunction(callback):
-                        await callback(self._orderbook)
+                        await callback(orderbook)
                     else:
-                        callback(self._orderbook)
+                        callback(orderbook)
                 except Exception as e:
                     logger.error(f"❌ Ошибка в callback: {e}")
 
@@ -287,6 +299,8 @@ class BybitOrderbookWebSocket:
             if self.websocket:
                 await self.websocket.close()
 
+            await self.dispatcher.stop()
+
             logger.info("✅ WebSocket Orderbook закрыт")
 
         except Exception as e:
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bybit Ticker Snapshot - таблица тикеров ВСЕХ linear контрактов
+- Один запрос /v5/market/tickers (без symbol) вместо N запросов по символам
+- Колонки хранятся в NumPy массивах, индекс symbol → строка
+- Поиск цены/изменения/объёма/funding/OI за O(1) для всех потребителей
+"""
+
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config.settings import logger
+
+
+# Колонка таблицы → поле ответа Bybit
+SNAPSHOT_FIELDS = {
+    "last_price": "lastPrice",
+    "change_pct": "price24hPcnt",
+    "high_24h": "highPrice24h",
+    "low_24h": "lowPrice24h",
+    "volume_24h": "volume24h",
+    "turnover_24h": "turnover24h",
+    "open_interest": "openInterest",
+    "open_interest_value": "openInterestValue",
+    "funding_rate": "fundingRate",
+    "next_funding_time": "nextFundingTime",
+    "bid": "bid1Price",
+    "ask": "ask1Price",
+}
+
+
+class TickerSnapshot:
+    """
+    Снимок всех тикеров категории (обновляется целиком)
+
+    Таблица заменяется атомарно: читатели всегда видят согласованный снимок.
+    """
+
+    def __init__(self, category: str = "linear"):
+        self.category = category
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.empty(0) for name in SNAPSHOT_FIELDS
+        }
+        self.updated_at = 0.0  # time.monotonic() последнего обновления
+        self.exchange_ts = 0  # Время биржи (ms) из ответа
+
+        self.stats = {"refreshes": 0, "errors": 0, "lookups": 0, "misses": 0}
+
+    # ========== ОБНОВЛЕНИЕ ==========
+
+    def load(self, tickers: List[Dict], exchange_ts: int = 0) -> int:
+        """
+        Заменить таблицу списком тикеров из result.list
+
+        Returns:
+            Количество символов
+        """
+        frame = pd.DataFrame.from_records(tickers)
+        if frame.empty or "symbol" not in frame.columns:
+            return 0
+
+        symbols = frame["symbol"].astype(str).tolist()
+        columns = {}
+        for name, field in SNAPSHOT_FIELDS.items():
+            if field in frame.columns:
+                columns[name] = pd.to_numeric(frame[field], errors="coerce").to_numpy(
+                    np.float64
+                )
+            else:
+                columns[name] = np.full(len(symbols), np.nan)
+
+        # Атомарная замена (одно присваивание на атрибут, без await между ними)
+        self.columns = columns
+        self.index = {symbol: i for i, symbol in enumerate(symbols)}
+        self.symbols = symbols
+        self.exchange_ts = int(exchange_ts or 0)
+        self.updated_at = time.monotonic()
+        self.stats["refreshes"] += 1
+        return len(symbols)
+
+    async def refresh(self, session, base_url: str) -> bool:
+        """Загрузить все тикеры одним запросом"""
+        try:
+            url = f"{base_url}/v5/market/tickers"
+            params = {"category": self.category}
+
+            async with session.get(url, params=params) as response:
+                if response.status != 200:
+                    logger.warning(f"⚠️ Ticker snapshot: HTTP {response.status}")
+                    self.stats["errors"] += 1
+                    return False
+
+                data = await response.json()
+                if data.get("retCode") != 0 or not data.get("result"):
+                    logger.warning(f"⚠️ Ticker snapshot: {data.get('retMsg', 'Unknown')}")
+                    self.stats["errors"] += 1
+                    return False
+
+                count = self.load(data["result"].get("list", []), data.get("time", 0))
+                logger.debug(f"📋 Ticker snapshot: {count} контрактов")
+                return count > 0
+
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"❌ Ошибка обновления ticker snapshot: {e}")
+            return False
+
+    # ========== ЧТЕНИЕ ==========
+
+    @property
+    def age(self) -> float:
+        """Возраст снимка (секунды); inf если ещё не загружен"""
+        return time.monotonic() - self.updated_at if self.updated_at else float("inf")
+
+    def is_fresh(self, max_age: float) -> bool:
+        return self.age <= max_age
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.index
+
+    def value(self, symbol: str, column: str) -> Optional[float]:
+        """Значение колонки для символа (None если нет символа/значения)"""
+        self.stats["lookups"] += 1
+        row = self.index.get(symbol)
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+        value = self.columns[column][row]
+        return None if np.isnan(value) else float(value)
+
+    def price(self, symbol: str) -> Optional[float]:
+        return self.value(symbol, "last_price")
+
+    def change_pct(self, symbol: str) -> Optional[float]:
+        """Изменение за 24ч в процентах"""
+        change = self.value(symbol, "change_pct")
+        return None if change is None else change * 100
+
+    def volume(self, symbol: str) -> Optional[float]:
+        return self.value(symbol, "volume_24h")
+
+    def funding_rate(self, symbol: str) -> Optional[float]:
+        """Funding rate в долях (0.0001 = 0.01%)"""
+        return self.value(symbol, "funding_rate")
+
+    def open_interest(self, symbol: str) -> Optional[float]:
+        return self.value(symbol, "open_interest")
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        """Тикер в формате EnhancedBybitConnector.get_ticker()"""
+        self.stats["lookups"] += 1
+        row = self.index.get(symbol)
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+
+        def field(name):
+            value = self.columns[name][row]
+            return None if np.isnan(value) else float(value)
+
+        return {
+            "symbol": symbol,
+            "lastPrice": field("last_price"),
+            "price24hPcnt": field("change_pct"),
+            "volume24h": field("volume_24h"),
+            "highPrice24h": field("high_24h"),
+            "lowPrice24h": field("low_24h"),
+            "turnover24h": field("turnover_24h"),
+            "openInterest": field("open_interest"),
+            "fundingRate": field("funding_rate"),
+        }
+
+    def prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Цены нескольких символов (отсутствующие пропускаются)"""
+        result = {}
+        for symbol in symbols:
+            price = self.price(symbol)
+            if price:
+                result[symbol] = price
+        return result
+
+    def top_by_turnover(self, limit: int = 10, quote: str = "USDT") -> List[Dict]:
+        """Топ символов по обороту за 24ч (quote - фильтр по котируемой валюте)"""
+        if not self.symbols:
+            return []
+
+        turnover = np.nan_to_num(self.columns["turnover_24h"], nan=-1.0)
+        order = np.argsort(-turnover, kind="stable")
+        result = []
+        for row in order:
+            symbol = self.symbols[row]
+            if quote and not symbol.endswith(quote):
+                continue
+            result.append({"symbol": symbol, "volume": float(turnover[row])})
+            if len(result) >= limit:
+                break
+        return result
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, "symbols": len(self.symbols), "age": self.age}
+
+
+__all__ = ["TickerSnapshot", "SNAPSHOT_FIELDS"]
@@ -16,7 +16,11 @@ from typing import Dict, List, Optional, Callable, Any
 from datetime import datetime
 from collections import deque
 from config.settings import logger
+from analytics.consolidated_book import get_consolidated_book
+from utils.request_coalescer import coalesced
 from utils.validators import DataValidator
+from utils.dispatch_queue import TopicDispatcher
+from utils.candle_frame import parse_candle_records
 
 
 class CoinbaseConnector:
@@ -55,12 +59,14 @@ class CoinbaseConnector:
         self.ws_connections: Dict[str, Any] = {}
         self.is_ws_running = False
 
-        # WebSocket callbacks
+        # WebSocket callbacks (вне цикла чтения: стакан/тикер conflating, сделки FIFO)
         self.callbacks: Dict[str, Callable] = {}
+        self.dispatcher = TopicDispatcher("Coinbase")
 
         # Orderbook cache для WebSocket
         self.orderbooks: Dict[str, Dict] = {}
         self.orderbook_initialized: Dict[str, bool] = {}
+        self.consolidated_book = get_consolidated_book()
         self.last_pressure_log: Dict[str, float] = {}
         self.orderbook_data = {}
         self.large_trades = deque(maxlen=1000)
@@ -212,6 +218,7 @@ class CoinbaseConnector:
             self.stats["rest_errors"] += 1
             return None
 
+    @coalesced("coinbase_ticker")
     async def get_ticker(self, symbol: str) -> Optional[Dict]:
         """
         Получить ticker статистику
@@ -255,6 +262,7 @@ class CoinbaseConnector:
             self.stats["rest_errors"] += 1
             return None
 
+    @coalesced("coinbase_orderbook")
     async def get_orderbook(self, symbol: str, level: int = 2) -> Optional[Dict]:
         """
         Получить L2 orderbook через REST API
@@ -300,6 +308,7 @@ class CoinbaseConnector:
             self.stats["rest_errors"] += 1
             return None
 
+    @coalesced("coinbase_candles")
     async def get_candles(
         self, symbol: str, granularity: int = 60, limit: int = 300
     ) -> List[Dict]:
@@ -332,19 +341,12 @@ class CoinbaseConnector:
                 if response.status == 200:
                     data = await response.json()
 
-                    candles = []
-                    for candle in data.get("candles", []):
-                        c = {
-                            "timestamp": int(candle["start"]),
-                            "open": float(candle["open"]),
-                            "high": float(candle["high"]),
-                            "low": float(candle["low"]),
-                            "close": float(candle["close"]),
-                            "volume": float(candle["volume"]),
-                        }
-
-                        if DataValidator.validate_candle(c):
-                            candles.append(c)
+                    frame = parse_candle_records(
+                        data.get("candles", []),
+                        fields={"timestamp": "start"},
+                        label=symbol,
+                    )
+                    candles = frame.to_dicts(descending=True)
 
                     logger.debug(f"✅ Получено {len(candles)} валидных свечей {symbol}")
                     return candles
@@ -516,6 +518,7 @@ class CoinbaseConnector:
 
         self.orderbooks[symbol] = orderbook
         self.orderbook_initialized[symbol] = True
+        self.consolidated_book.update("coinbase", symbol, orderbook["bids"], orderbook["asks"])
 
         logger.info(f"📊 Coinbase orderbook snapshot: {symbol} initialized")
 
@@ -523,7 +526,9 @@ class CoinbaseConnector:
         self.stats["ws_orderbook_updates"] += 1
 
         if "on_orderbook_update" in self.callbacks:
-            await self.callbacks["on_orderbook_update"](symbol, orderbook)
+            self.dispatcher.submit(
+                "orderbook", self.callbacks["on_orderbook_update"], symbol, orderbook, key=symbol
+            )
 
     async def _handle_orderbook_update(self, data: Dict):
         """Обработка orderbook updates"""
@@ -551,6 +556,7 @@ class CoinbaseConnector:
                     orderbook["asks"][price] = size
 
         orderbook["timestamp"] = datetime.utcnow()
+        self.consolidated_book.update("coinbase", symbol, orderbook["bids"], orderbook["asks"])
 
         self.stats["ws_messages"] += 1
         self.stats["ws_orderbook_updates"] += 1
@@ -587,7 +593,9 @@ class CoinbaseConnector:
             logger.debug(f"⚠️ Coinbase imbalance calc error: {e}")
 
         if "on_orderbook_update" in self.callbacks:
-            await self.callbacks["on_orderbook_update"](symbol, orderbook)
+            self.dispatcher.submit(
+                "orderbook", self.callbacks["on_orderbook_update"], symbol, orderbook, key=symbol
+            )
 
     async def _handle_ticker(self, data: Dict):
         """Обработка ticker updates"""
@@ -604,7 +612,13 @@ class CoinbaseConnector:
         self.stats["ws_ticker_updates"] += 1
 
         if "on_ticker" in self.callbacks:
-            await self.callbacks["on_ticker"](ticker_data["symbol"], ticker_data)
+            self.dispatcher.submit(
+                "ticker",
+                self.callbacks["on_ticker"],
+                ticker_data["symbol"],
+                ticker_data,
+                key=ticker_data["symbol"],
+            )
 
     async def _handle_trade(self, data: Dict):
         """Обработка trades"""
@@ -629,7 +643,9 @@ class CoinbaseConnector:
             )
 
         if "on_trade" in self.callbacks:
-            await self.callbacks["on_trade"](trade_data["symbol"], trade_data)
+            self.dispatcher.submit(
+                "trade", self.callbacks["on_trade"], trade_data["symbol"], trade_data
+            )
 
     # ===========================================
     # HELPER METHODS
@@ -676,6 +692,7 @@ class CoinbaseConnector:
             "ws_running": self.is_ws_running,
             "ws_symbols": len(self.symbols),
             "orderbooks_cached": len(self.orderbooks),
+            "queues": self.dispatcher.get_stats(),
         }
 
     # ===========================================
@@ -689,6 +706,7 @@ class CoinbaseConnector:
 
             # Stop WebSocket
             self.is_ws_running = False
+            await self.dispatcher.stop()
 
             for name, ws in list(self.ws_connections.items()):
                 try:
@@ -7,15 +7,14 @@
 
 import asyncio
 import aiohttp
-import json
 import re
 from datetime import datetime
 from typing import Dict, List, Optional, Set
 from collections import deque
-from pathlib import Path
 from config.settings import CRYPTOPANIC_API_KEY, CRYPTOCOMPARE_API_KEY, logger
 from config.constants import API_ENDPOINTS, SYMBOL_FILTERS, TIME_FORMATS
 from core.exceptions import APIConnectionError
+from data.news_store import NewsStore
 from utils.helpers import current_epoch_ms, datetime_to_epoch_ms
 from utils.validators import validate_news_data
 
@@ -65,8 +64,13 @@ class SmartRateLimiter:
 class UnifiedNewsConnector:
     """Унифицированный коннектор для получения новостей из разных источников"""
 
-    def __init__(self):
-        """Инициализация коннектора"""
+    def __init__(self, news_store: Optional[NewsStore] = None):
+        """
+        Инициализация коннектора
+
+        Args:
+            news_store: Общее хранилище новостей (по умолчанию - своё на DATABASE_PATH)
+        """
         self.cryptopanic_key = CRYPTOPANIC_API_KEY
         self.cryptocompare_key = CRYPTOCOMPARE_API_KEY
 
@@ -76,11 +80,13 @@ class UnifiedNewsConnector:
         # Ограничители запросов
         self.rate_limiter = SmartRateLimiter(requests_per_minute=30, burst_allowance=10)
 
-        # Кэш новостей (УЛУЧШЕНО)
-        self.cryptopanic_cache = (
-            {}
-        )  # {cache_key: {'data': [], 'timestamp': int, 'ttl': int}}
-        self.cryptocompare_cache = {}
+        # ✅ PERSISTENT CACHE: SQLite хранилище вместо JSON файлов
+        self.news_store = news_store or NewsStore()
+
+        # Кэш новостей в RAM, восстанавливается из хранилища при старте
+        # {cache_key: {'data': [], 'timestamp': int, 'ttl': int}}
+        self.cryptopanic_cache = self.news_store.load_fetch_cache("cryptopanic_")
+        self.cryptocompare_cache = self.news_store.load_fetch_cache("cryptocompare_")
         self.news_cache = deque(maxlen=1000)
         self.seen_news_ids: Set[str] = set()
 
@@ -89,42 +95,11 @@ class UnifiedNewsConnector:
         self.last_cryptocompare_request = 0
         self.cryptopanic_retry_after = 0  # Timestamp когда можно снова делать запрос
 
-        logger.info("✅ UnifiedNewsConnector инициализирован")
-
-        # ✅ PERSISTENT CACHE (НОВЫЙ КОД)
-        self.cryptopanic_cache_file = Path("data/cryptopanic_cache.json")
-        self.cryptocompare_cache_file = Path("data/cryptocompare_cache.json")
-
-        # Создаём директорию data если не существует
-        self.cryptopanic_cache_file.parent.mkdir(exist_ok=True)
-
-        # Загружаем CryptoPanic кэш с диска при старте
-        if self.cryptopanic_cache_file.exists():
-            try:
-                with open(self.cryptopanic_cache_file, "r", encoding="utf-8") as f:
-                    cache_data = json.load(f)
-                    self.cryptopanic_cache = cache_data.get("cryptopanic_cache", {})
-                    cache_count = len(self.cryptopanic_cache)
-                    logger.info(
-                        f"✅ CryptoPanic cache loaded from disk ({cache_count} entries)"
-                    )
-            except Exception as e:
-                logger.error(f"❌ Failed to load CryptoPanic cache: {e}")
-                self.cryptopanic_cache = {}
-
-        # Загружаем CryptoCompare кэш с диска при старте
-        if self.cryptocompare_cache_file.exists():
-            try:
-                with open(self.cryptocompare_cache_file, "r", encoding="utf-8") as f:
-                    cache_data = json.load(f)
-                    self.cryptocompare_cache = cache_data.get("cryptocompare_cache", {})
-                    cache_count = len(self.cryptocompare_cache)
-                    logger.info(
-                        f"✅ CryptoCompare cache loaded from disk ({cache_count} entries)"
-                    )
-            except Exception as e:
-                logger.error(f"❌ Failed to load CryptoCompare cache: {e}")
-                self.cryptocompare_cache = {}
+        logger.info(
+            f"✅ UnifiedNewsConnector инициализирован "
+            f"(кэш: CryptoPanic={len(self.cryptopanic_cache)}, "
+            f"CryptoCompare={len(self.cryptocompare_cache)})"
+        )
 
     async def get_session(self):
         """Получение HTTP сессии"""
@@ -402,19 +377,8 @@ class UnifiedNewsConnector:
                             "ttl": 900,
                         }
 
-                        # ✅ СОХРАНЕНИЕ КЭША НА ДИСК (НОВЫЙ КОД)
-                        try:
-                            cache_data = {
-                                "cryptopanic_cache": self.cryptopanic_cache,
-                                "saved_at": current_epoch_ms(),
-                            }
-                            with open(
-                                self.cryptopanic_cache_file, "w", encoding="utf-8"
-                            ) as f:
-                                json.dump(cache_data, f, ensure_ascii=False, indent=2)
-                            logger.debug(f"💾 CryptoPanic cache saved to disk")
-                        except Exception as e:
-                            logger.error(f"❌ Failed to save CryptoPanic cache: {e}")
+                        # ✅ СОХРАНЕНИЕ В ХРАНИЛИЩЕ (только новые новости)
+                        self.news_store.save_fetch(cache_key, news_items, ttl=900)
 
                         logger.info(
                             f"📰 CryptoPanic: {len(news_items)} новостей (cached)"
@@ -571,19 +535,8 @@ class UnifiedNewsConnector:
                         "ttl": 900,
                     }
 
-                    # ✅ СОХРАНЕНИЕ КЭША НА ДИСК (НОВЫЙ КОД)
-                    try:
-                        cache_data = {
-                            "cryptocompare_cache": self.cryptocompare_cache,
-                            "saved_at": current_epoch_ms(),
-                        }
-                        with open(
-                            self.cryptocompare_cache_file, "w", encoding="utf-8"
-                        ) as f:
-                            json.dump(cache_data, f, ensure_ascii=False, indent=2)
-                        logger.debug(f"💾 CryptoCompare cache saved to disk")
-                    except Exception as e:
-                        logger.error(f"❌ Failed to save CryptoCompare cache: {e}")
+                    # ✅ СОХРАНЕНИЕ В ХРАНИЛИЩЕ (только новые новости)
+                    self.news_store.save_fetch(cache_key, processed_news, ttl=900)
 
                     logger.info(
                         f"📰 CryptoCompare: {len(processed_news)} новостей (cached)"
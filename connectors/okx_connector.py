@@ -15,7 +15,10 @@ import time  # ← ДОБАВЛЕНО В НАЧАЛО!
 from typing import Dict, List, Optional, Callable, Any
 from datetime import datetime
 from config.settings import logger
+from analytics.consolidated_book import get_consolidated_book
+from utils.request_coalescer import coalesced
 from utils.validators import DataValidator
+from utils.dispatch_queue import TopicDispatcher
 
 
 class OKXConnector:
@@ -66,12 +69,14 @@ class OKXConnector:
         self.ws_connections: Dict[str, Any] = {}
         self.is_ws_running = False
 
-        # WebSocket callbacks
+        # WebSocket callbacks (вне цикла чтения: стакан conflating, сделки FIFO)
         self.callbacks: Dict[str, Callable] = {}
+        self.dispatcher = TopicDispatcher("OKX")
 
         # Orderbook cache для WebSocket
         self.orderbooks: Dict[str, Dict] = {}
         self.orderbook_initialized: Dict[str, bool] = {}
+        self.consolidated_book = get_consolidated_book()
         self.last_pressure_log: Dict[str, float] = {}
         self.orderbook_pressure: Dict[str, float] = {}
         self.orderbook_data: Dict[str, Dict] = {}
@@ -306,6 +311,7 @@ class OKXConnector:
             self.stats["rest_errors"] += 1
             return None
 
+    @coalesced("okx_ticker")
     async def get_ticker(self, symbol: str) -> Optional[Dict]:
         """
         Получить 24h ticker статистику
@@ -363,6 +369,7 @@ class OKXConnector:
             self.stats["rest_errors"] += 1
             return None
 
+    @coalesced("okx_orderbook")
     async def get_orderbook(self, symbol: str, depth: int = 100) -> Optional[Dict]:
         """
         Получить L2 orderbook через REST API
@@ -600,6 +607,7 @@ class OKXConnector:
 
             self.orderbooks[symbol] = orderbook
             self.orderbook_initialized[symbol] = True
+            self.consolidated_book.update("okx", symbol, orderbook["bids"], orderbook["asks"])
 
             self.stats["ws_messages"] += 1
             self.stats["ws_orderbook_updates"] += 1
@@ -658,7 +666,9 @@ class OKXConnector:
 
             # Callback
             if "on_orderbook_update" in self.callbacks:
-                await self.callbacks["on_orderbook_update"](symbol, orderbook)
+                self.dispatcher.submit(
+                    "orderbook", self.callbacks["on_orderbook_update"], symbol, orderbook, key=symbol
+                )
 
 
 
@@ -733,7 +743,7 @@ class OKXConnector:
             self.stats["ws_trade_updates"] += 1
 
             if "on_trade" in self.callbacks:
-                await self.callbacks["on_trade"](symbol, trade_data)
+                self.dispatcher.submit("trade", self.callbacks["on_trade"], symbol, trade_data)
 
 
 
@@ -780,6 +790,7 @@ class OKXConnector:
             "ws_running": self.is_ws_running,
             "ws_symbols": len(self.symbols),
             "orderbooks_cached": len(self.orderbooks),
+            "queues": self.dispatcher.get_stats(),
         }
 
     # ===========================================
@@ -793,6 +804,7 @@ class OKXConnector:
 
             # Stop WebSocket
             self.is_ws_running = False
+            await self.dispatcher.stop()
 
             for name, ws in self.ws_connections.items():
                 try:
@@ -21,6 +21,10 @@ from config.settings import (
     DATABASE_PATH,
     TRACKED_SYMBOLS,
     SCANNER_CONFIG,
+    ML_SCORER_CONFIG,
+    TICKER_SNAPSHOT_CONFIG,
+    STORAGE_RETENTION_CONFIG,
+    LOOP_MONITOR_CONFIG,
 )
 from config.constants import TrendDirectionEnum, Colors
 
@@ -33,12 +37,15 @@ from core.exceptions import (
 from utils.validators import DataValidator
 from utils.helpers import ensure_directory_exists, current_epoch_ms, safe_float
 from utils.performance import async_timed, get_process_executor
+from utils.loop_monitor import get_loop_monitor
 
 # Коннекторы
 from connectors.bybit_connector import EnhancedBybitConnector
 from connectors.binance_connector import BinanceConnector
 from connectors.binance_orderbook_websocket import BinanceOrderbookWebSocket
 from connectors.news_connector import UnifiedNewsConnector
+from data.news_store import NewsStore
+from models.compact_data import TradeBuffer
 
 # Core модули
 from core.memory_manager import AdvancedMemoryManager
@@ -67,8 +74,10 @@ from analytics.orderbook_analyzer import OrderbookAnalyzer
 from analytics.enhanced_sentiment_analyzer import UnifiedSentimentAnalyzer
 from analytics.cluster_detector import ClusterDetector
 from analytics.whale_activity_tracker import WhaleActivityTracker
+from analytics.consolidated_book import get_consolidated_book
 from analytics.market_heat_indicator import MarketHeatIndicator
 from analytics.correlation_analyzer import CorrelationAnalyzer
+from trading.ml_signal_scorer import MLSignalScorer
 from handlers.correlation_handler import CorrelationHandler
 from analytics.liquidity_depth_analyzer import LiquidityDepthAnalyzer
 from handlers.liquidity_handler import LiquidityHandler
@@ -119,12 +128,17 @@ class GIOCryptoBot:
 
         # Компоненты
         self.memory_manager = None
+        self.loop_monitor = None
         self.bybit_connector = None
         self.binance_connector = None
         self.okx_connector = None
         self.coinbase_connector = None
         self.news_connector = None
+        self.news_store = None
         self.orderbook_ws = None
+        self.liquidation_stream = None
+        # Сводный стакан всех бирж (коннекторы пишут сами, Bybit - process_orderbook)
+        self.consolidated_book = get_consolidated_book()
         self.scenario_manager = None
         self.scenario_matcher = None
         self.veto_system = None
@@ -150,6 +164,7 @@ class GIOCryptoBot:
         self.ml_sentiment = None
         self.enhanced_alerts = None
         self.cluster_detector = None
+        self.ml_scorer = None
 
         self.tracked_symbols = [
             "BTCUSDT", "ETHUSDT", "XRPUSDT",
@@ -293,8 +308,9 @@ class GIOCryptoBot:
             else:
                 logger.warning("   ⚠️ Binance initialization failed")
 
-            # News
-            self.news_connector = UnifiedNewsConnector()
+            # News (общее SQLite хранилище для коннектора и sentiment анализа)
+            self.news_store = NewsStore(db_path=DATABASE_PATH)
+            self.news_connector = UnifiedNewsConnector(news_store=self.news_store)
 
             # 2.3 OKX (REST + WebSocket) - ВСТАВИТЬ ЗДЕСЬ!
             logger.info("2️⃣.3 Инициализация OKX Connector...")
@@ -399,6 +415,10 @@ class GIOCryptoBot:
                     if not bids or not asks:
                         return
 
+                    self.consolidated_book.update(
+                        "bybit", orderbook.get("symbol", "BTCUSDT"), bids, asks
+                    )
+
                     bid_volume = sum(float(q) for p, q in bids if q)
                     ask_volume = sum(float(q) for p, q in asks if q)
                     total_volume = bid_volume + ask_volume
@@ -419,6 +439,16 @@ class GIOCryptoBot:
                             "depth": 200,
                         }
 
+                        # Алерты по событию стакана (вместо опроса) - по символу самого стакана
+                        alerts = self._get_alerts_system()
+                        if alerts:
+                            alerts.on_orderbook(
+                                str(orderbook.get("symbol") or "BTCUSDT").upper(),
+                                imbalance * 100,
+                                bid_pct=bid_volume / total_volume * 100,
+                                ask_pct=ask_volume / total_volume * 100,
+                            )
+
                         # Сохраняем дисбаланс для Cluster Detector
                         if hasattr(self, "l2_imbalances"):
                             if "BTCUSDT" not in self.l2_imbalances:
@@ -463,6 +493,12 @@ class GIOCryptoBot:
                     f"   ✅ Bybit WebSocket Orderbook запущен для {ws.symbol} (depth=200)"
                 )
 
+            # 2.6. Поток ликвидаций Bybit (allLiquidation) для всех пар
+            self.liquidation_stream = self._create_liquidation_stream(
+                [ws.symbol for ws in self.orderbook_ws_list]
+            )
+            await self.liquidation_stream.start()
+
             # 3. Сценарии и VETO
             logger.info("3️⃣ Инициализация сценариев и VETO...")
             self.scenario_manager = ScenarioManager(db_path=DATABASE_PATH)
@@ -573,6 +609,11 @@ class GIOCryptoBot:
             self.correlation_analyzer = CorrelationAnalyzer(self)
             logger.info("✅ CorrelationAnalyzer инициализирован")
 
+            # ML Signal Scorer (XGBoost по закрытым свечам)
+            self.ml_scorer = (
+                MLSignalScorer() if ML_SCORER_CONFIG["enabled"] else None
+            )
+
             # Liquidity Depth Analyzer
             self.liquidity_depth_analyzer = LiquidityDepthAnalyzer(self)
             logger.info("✅ LiquidityDepthAnalyzer инициализирован")
@@ -592,7 +633,9 @@ class GIOCryptoBot:
             self.scenario_matcher = EnhancedScenarioMatcher()
 
             self.scenario_matcher.scenarios = self.scenario_manager.scenarios
-            self.enhanced_sentiment = UnifiedSentimentAnalyzer()
+            self.enhanced_sentiment = UnifiedSentimentAnalyzer(
+                news_store=self.news_store
+            )
 
             # ⭐ ML Sentiment Analyzer
             logger.info("6️⃣.2 Инициализация ML Sentiment Analyzer...")
@@ -889,6 +932,11 @@ class GIOCryptoBot:
             asyncio.create_task(self._health_monitor())
             logger.info("   ✅ Health Monitor запущен")
 
+            # Loop Monitor: лаг event loop, блокировки, инвентарь задач
+            if LOOP_MONITOR_CONFIG.get("enabled", True):
+                self.loop_monitor = get_loop_monitor()
+                self.loop_monitor.start()
+
             # 9. Планировщик
             # logger.info("9️⃣ Настройка планировщика...")
             self.setup_scheduler()
@@ -955,6 +1003,17 @@ class GIOCryptoBot:
                     },
                 )
 
+            # Алерты по событию сделки (крупные сделки / ликвидации)
+            alerts = self._get_alerts_system()
+            if alerts:
+                alerts.on_trade(
+                    symbol_normalized.upper(),
+                    side,
+                    trade["price"],
+                    trade["quantity"],
+                    trade.get("T"),
+                )
+
             # ✅ Whale Tracker: добавляем КАЖДУЮ сделку (фильтр внутри tracker)
             if hasattr(self, "whale_tracker"):
                 self.whale_tracker.add_trade(
@@ -976,25 +1035,17 @@ class GIOCryptoBot:
                 if not hasattr(self, "large_trades_cache"):
                     self.large_trades_cache = {}
 
+                # Кольцевой буфер на последние 100 сделок (USD = price * size)
                 if symbol_normalized not in self.large_trades_cache:
-                    self.large_trades_cache[symbol_normalized] = []
+                    self.large_trades_cache[symbol_normalized] = TradeBuffer(100)
 
                 self.large_trades_cache[symbol_normalized].append(
-                    {
-                        "timestamp": time.time(),
-                        "side": side.lower(),  # "buy" или "sell"
-                        "volume": value,  # USD value
-                        "price": trade["price"],
-                        "quantity": trade["quantity"],
-                    }
+                    int(time.time() * 1000),
+                    trade["price"],
+                    trade["quantity"],
+                    side.upper() == "BUY",
                 )
 
-                # Ограничиваем размер кеша (последние 100 сделок)
-                if len(self.large_trades_cache[symbol_normalized]) > 100:
-                    self.large_trades_cache[symbol_normalized] = (
-                        self.large_trades_cache[symbol_normalized][-100:]
-                    )
-
         except Exception as e:
             logger.error(f"❌ Binance trade handler error: {e}", exc_info=True)
 
@@ -1010,9 +1061,34 @@ class GIOCryptoBot:
                     f"V:{kline['volume']:.2f}"
                 )
 
+                # Алерты по закрытой свече (всплеск объёма, пробой VP)
+                alerts = self._get_alerts_system()
+                if alerts:
+                    alerts.on_kline(symbol.upper(), kline)
+
         except Exception as e:
             logger.error(f"❌ Binance kline handler error: {e}", exc_info=True)
 
+    def _get_alerts_system(self):
+        """EnhancedAlertsSystem (создаётся в main.py или в боте)"""
+        return getattr(self, "alerts_system", None) or self.enhanced_alerts
+
+    def _create_liquidation_stream(self, symbols: List[str]):
+        """Поток ликвидаций Bybit: агрегатор для вето + событие для алертов"""
+        from connectors.bybit_liquidation_stream import BybitLiquidationStream
+
+        stream = BybitLiquidationStream(symbols)
+        stream.add_callback(self.handle_liquidation)
+        return stream
+
+    def handle_liquidation(
+        self, symbol: str, side: str, price: float, size: float, timestamp_ms: int
+    ):
+        """Ликвидация Bybit → алерт о всплеске крупных ликвидаций"""
+        alerts = self._get_alerts_system()
+        if alerts:
+            alerts.on_trade(symbol.upper(), side.upper(), price, size, timestamp_ms)
+
     async def handle_okx_orderbook(self, symbol: str, orderbook: Dict):
         """Обработка OKX orderbook обновлений"""
         try:
@@ -1411,6 +1487,11 @@ class GIOCryptoBot:
 
             logger.info(f"✅ {symbol}: Найден сигнал {signal_data.get('signal_id')}")
 
+            # Вероятность успеха от ML модели (в пределах latency budget)
+            ml_scorer = getattr(self, "ml_scorer", None)
+            if ml_scorer:
+                signal_data['ml_probability'] = await ml_scorer.score(symbol)
+
             # ✅ ШАГ 4: РАСЧЁТ СТОП-ЛОССА (НОВОЕ!)
             entry_price = signal_data.get('entry_price', 0)
             direction = signal_data.get('direction', 'LONG')
@@ -1595,6 +1676,8 @@ class GIOCryptoBot:
                     "position_size": signal.get('position_size', 1.0)
                 },
 
+                "ml_probability": signal.get('ml_probability'),
+
                 "timestamp": datetime.now().isoformat()
             }
 
@@ -1821,6 +1904,18 @@ class GIOCryptoBot:
 
             if volume_profile:
                 logger.debug(f"✅ L2 Orderbook Volume Profile (200 levels)")
+
+                # Уровни для алертов пробоя VP (проверяются на закрытых свечах)
+                alerts = self._get_alerts_system()
+                if alerts:
+                    alerts.update_vp_levels(
+                        symbol,
+                        {
+                            "POC": volume_profile.get("poc"),
+                            "VAH": volume_profile.get("vah"),
+                            "VAL": volume_profile.get("val"),
+                        },
+                    )
                 return volume_profile
             else:
                 logger.warning("❌ Volume Profile calculation failed")
@@ -1923,6 +2018,73 @@ class GIOCryptoBot:
             )
             logger.info("✅ Задача обновления новостей добавлена (каждые 5 минут)")
 
+            # ==========================================
+            # ЗАДАЧА 1.0: Снимок всех тикеров Bybit (один запрос)
+            # ==========================================
+            if TICKER_SNAPSHOT_CONFIG["enabled"] and self.bybit_connector:
+                self.scheduler.add_job(
+                    self.bybit_connector.refresh_ticker_snapshot,
+                    "interval",
+                    seconds=TICKER_SNAPSHOT_CONFIG["interval_seconds"],
+                    id="refresh_ticker_snapshot",
+                    name="Снимок тикеров",
+                    max_instances=1,
+                    coalesce=True,
+                    next_run_time=datetime.now(pytz.UTC),
+                )
+                logger.info(
+                    f"✅ Задача снимка тикеров добавлена "
+                    f"(каждые {TICKER_SNAPSHOT_CONFIG['interval_seconds']}с)"
+                )
+
+            # ==========================================
+            # ЗАДАЧА 1.1: Rolling корреляции (закрытые свечи)
+            # ==========================================
+            if getattr(self, "correlation_analyzer", None):
+                self.scheduler.add_job(
+                    self.correlation_analyzer.update_engine,
+                    "interval",
+                    minutes=self.correlation_analyzer.engine.interval_minutes,
+                    id="update_correlations",
+                    name="Обновление корреляций",
+                    max_instances=1,
+                    next_run_time=datetime.now(pytz.UTC),
+                )
+                logger.info("✅ Задача обновления корреляций добавлена")
+
+            # ==========================================
+            # ЗАДАЧА 1.2: ML скоринг (один predict на все символы)
+            # ==========================================
+            ml_scorer = getattr(self, "ml_scorer", None)
+            if ml_scorer and ml_scorer.enabled:
+                self.scheduler.add_job(
+                    ml_scorer.update_bars,
+                    "interval",
+                    minutes=ml_scorer.interval_minutes,
+                    args=[self.bybit_connector, ML_SCORER_CONFIG["symbols"]],
+                    id="update_ml_scores",
+                    name="ML скоринг символов",
+                    max_instances=1,
+                    next_run_time=datetime.now(pytz.UTC),
+                )
+                logger.info("✅ Задача ML скоринга добавлена")
+
+            # ==========================================
+            # ЗАДАЧА 1.3: Компактор БД (retention = удаление партиций)
+            # ==========================================
+            whale_tracker = getattr(self, "whale_tracker", None)
+            if whale_tracker and whale_tracker.db_path:
+                self.scheduler.add_job(
+                    whale_tracker.compact_storage,
+                    "interval",
+                    hours=STORAGE_RETENTION_CONFIG["compact_interval_hours"],
+                    id="compact_storage",
+                    name="Компакция large_trades",
+                    max_instances=1,
+                    coalesce=True,
+                )
+                logger.info("✅ Задача компакции хранилища добавлена")
+
             # ==========================================
             # ЗАДАЧА 2: АВТОМАТИЧЕСКАЯ ГЕНЕРАЦИЯ СИГНАЛОВ (НОВОЕ!)
             # ==========================================
@@ -2095,52 +2257,27 @@ class GIOCryptoBot:
                 except Exception as e:
                     logger.debug(f"⚠️ Bybit price unavailable: {e}")
 
-            # Binance
-            if self.binance_connector:
-                try:
-                    binance_orderbook = self.binance_connector.orderbooks.get(
-                        symbol.lower()
-                    )
-                    if binance_orderbook and "last_price" in binance_orderbook:
-                        prices["Binance"] = PriceData(
-                            exchange="Binance",
-                            symbol=symbol,
-                            price=float(binance_orderbook["last_price"]),
-                            timestamp=datetime.utcnow(),
-                            volume_24h=binance_orderbook.get("volume_24h"),
-                        )
-                except Exception as e:
-                    logger.debug(f"⚠️ Binance price unavailable: {e}")
-
-            # OKX
-            if self.okx_connector:
-                try:
-                    okx_symbol = f"{symbol[:3]}-{symbol[3:]}"  # BTCUSDT -> BTC-USDT
-                    okx_orderbook = self.okx_connector.orderbooks.get(okx_symbol)
-                    if okx_orderbook and "last_price" in okx_orderbook:
-                        prices["OKX"] = PriceData(
-                            exchange="OKX",
-                            symbol=symbol,
-                            price=float(okx_orderbook["last_price"]),
-                            timestamp=datetime.utcnow(),
-                        )
-                except Exception as e:
-                    logger.debug(f"⚠️ OKX price unavailable: {e}")
-
-            # Coinbase
-            if self.coinbase_connector:
-                try:
-                    cb_symbol = f"{symbol[:3]}-USD"  # BTCUSDT -> BTC-USD
-                    cb_orderbook = self.coinbase_connector.orderbooks.get(cb_symbol)
-                    if cb_orderbook and "last_price" in cb_orderbook:
-                        prices["Coinbase"] = PriceData(
-                            exchange="Coinbase",
-                            symbol=symbol,
-                            price=float(cb_orderbook["last_price"]),
-                            timestamp=datetime.utcnow(),
-                        )
-                except Exception as e:
-                    logger.debug(f"⚠️ Coinbase price unavailable: {e}")
+            # Binance / OKX / Coinbase (и Bybit без тикера) - из сводного стакана
+            venue_names = {
+                "bybit": "Bybit",
+                "binance": "Binance",
+                "okx": "OKX",
+                "coinbase": "Coinbase",
+            }
+            for venue, quote in self.consolidated_book.venue_quotes(symbol).items():
+                exchange = venue_names.get(venue, venue)
+                if exchange in prices or quote["bid"] is None or quote["ask"] is None:
+                    continue
+                if time.time() - quote["updated"] > self.consolidated_book.max_age_seconds:
+                    continue
+                prices[exchange] = PriceData(
+                    exchange=exchange,
+                    symbol=symbol,
+                    price=(quote["bid"] + quote["ask"]) / 2,
+                    timestamp=datetime.utcnow(),
+                    bid=quote["bid"],
+                    ask=quote["ask"],
+                )
 
             # 2. Валидация
             if self.cross_validator and len(prices) >= 2:
@@ -2514,17 +2651,27 @@ class GIOCryptoBot:
                 if hasattr(self, "scanner") and self.scanner:
                     if hasattr(self.scanner, "get_stats"):
                         stats = self.scanner.get_stats()
-                        self.logger.info(f"🔍 Scanner: {stats}")
+                        logger.info(f"🔍 Scanner: {stats}")
                     else:
-                        self.logger.debug("⚠️ Scanner не имеет метода get_stats")
+                        logger.debug("⚠️ Scanner не имеет метода get_stats")
 
                 # Проверка ROI Tracker
                 if hasattr(self, "roi_tracker") and self.roi_tracker:
                     if hasattr(self.roi_tracker, "get_stats"):
                         stats = self.roi_tracker.get_stats()
-                        self.logger.info(f"💰 ROI Tracker: {stats}")
+                        logger.info(f"💰 ROI Tracker: {stats}")
                     else:
-                        self.logger.debug("⚠️ ROI Tracker не имеет метода get_stats")
+                        logger.debug("⚠️ ROI Tracker не имеет метода get_stats")
+
+                # Проверка Event Loop
+                if self.loop_monitor:
+                    lag = self.loop_monitor.get_lag_stats()
+                    tasks = self.loop_monitor.get_task_inventory(limit=3)
+                    logger.info(
+                        f"⏱️ Event loop: lag p99={lag['p99_ms']:.1f}ms "
+                        f"max={lag['max_lag_ms']:.0f}ms, блокировок={lag['blocks']}, "
+                        f"задач={tasks['total']}"
+                    )
 
                 # Проверка Connectors
                 for name in ["okx", "bybit", "binance", "coinbase"]:
@@ -2532,10 +2679,10 @@ class GIOCryptoBot:
                         connector = getattr(self, name, None)
                         if connector and hasattr(connector, "is_connected"):
                             status = "✅" if connector.is_connected() else "❌"
-                            self.logger.info(f"{status} {name.upper()} connector")
+                            logger.info(f"{status} {name.upper()} connector")
 
             except Exception as e:
-                self.logger.error(f"❌ Health monitor error: {e}")
+                logger.error(f"❌ Health monitor error: {e}")
 
     async def shutdown(self):
         """Корректная остановка бота"""
@@ -2551,6 +2698,9 @@ class GIOCryptoBot:
             if self.auto_scanner:
                 await self.auto_scanner.stop()
 
+            if self.loop_monitor:
+                await self.loop_monitor.stop()
+
             if self.auto_roi_tracker:
                 await self.auto_roi_tracker.stop()
 
@@ -2592,12 +2742,18 @@ class GIOCryptoBot:
             if self.news_connector:
                 await self.news_connector.close()
 
+            if self.news_store:
+                self.news_store.close()
+
             # Останавливаем ВСЕ Bybit Orderbook WebSocket
             if hasattr(self, "orderbook_ws_list") and self.orderbook_ws_list:
                 for ws in self.orderbook_ws_list:
                     await ws.stop()
                     logger.info(f"🛑 Bybit Orderbook WS для {ws.symbol} остановлен")
 
+            if self.liquidation_stream:
+                await self.liquidation_stream.stop()
+
             logger.info(f"{Colors.OKGREEN}✅ Бот успешно остановлен{Colors.ENDC}")
 
         except Exception as e:
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Scenario Index - индекс применимости сценариев
+Строится при загрузке: стратегия, направление, режим и MTF паттерн → битовая
+маска сценариев. Матчер оценивает только кандидатов из пересечения масок.
+"""
+
+from itertools import product
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+TRENDS = ("bullish", "bearish", "neutral")
+MTF_KEYS = ("1H", "4H", "1D")
+
+
+def scenario_direction(scenario: Dict) -> Optional[str]:
+    """LONG / SHORT из direction, tactics.direction или opinion (None - любое)"""
+    direction = scenario.get("direction") or scenario.get("tactics", {}).get("direction")
+    if not direction:
+        direction = {"bullish": "LONG", "bearish": "SHORT"}.get(scenario.get("opinion", ""))
+    if not direction:
+        return None
+    direction = str(direction).upper()
+    return direction if direction in ("LONG", "SHORT") else None
+
+
+def mtf_pattern(mtf_trends: Dict) -> Optional[Tuple[str, ...]]:
+    """Ключ паттерна (1H, 4H, 1D) или None, если тренд вне TRENDS"""
+    if not isinstance(mtf_trends, dict):
+        return None
+    pattern = tuple(mtf_trends.get(key, "neutral") for key in MTF_KEYS)
+    if any(trend not in TRENDS for trend in pattern):
+        return None
+    return pattern
+
+
+class ScenarioIndex:
+    """
+    Индекс сценариев для отсечения заведомо неподходящих до оценки
+
+    Маски - int, где бит i = сценарий i в порядке загрузки. Таблица MTF
+    паттернов (27 комбинаций bullish/bearish/neutral) заполняется один раз
+    функцией mtf_check матчера, поэтому отсечение по MTF точное.
+    """
+
+    def __init__(
+        self,
+        strategy_field: str = "strategy",
+        mtf_check: Optional[Callable[[Dict, Dict], bool]] = None,
+        mtf_indexable: Optional[Callable[[Dict], bool]] = None,
+    ):
+        """
+        Args:
+            strategy_field: Поле сценария со стратегией ("strategy" / "type")
+            mtf_check: Проверка MTF матчера (scenario, mtf_trends) -> bool
+            mtf_indexable: Можно ли свести проверку сценария к ключам MTF_KEYS
+        """
+        self.strategy_field = strategy_field
+        self.mtf_check = mtf_check
+        self.mtf_indexable = mtf_indexable or (lambda scenario: True)
+
+        self.scenarios: List[Dict] = []
+        self._source = None
+        self._size = -1
+        self.all_mask = 0
+        self.by_strategy: Dict[str, int] = {}
+        self.by_direction: Dict[Optional[str], int] = {}
+        self.by_regime: Dict[str, int] = {}
+        self.all_weather_mask = 0
+        self.by_pattern: Dict[Tuple[str, ...], int] = {}
+        # Сценарии, которые MTF проверяются на месте (паттерн не применим)
+        self.mtf_runtime_mask = 0
+
+        self.stats = {"calls": 0, "evaluated": 0, "pruned": 0, "last_pruned": 0, "builds": 0}
+
+    def build(
+        self,
+        scenarios: List[Dict],
+        regime_strategies: Optional[Dict[str, Iterable[str]]] = None,
+        all_weather: Iterable[str] = (),
+    ):
+        """
+        Построить индекс
+
+        Args:
+            regime_strategies: {режим: [стратегии]} (strategy_selector.market_regime)
+            all_weather: Стратегии, подходящие для любого режима
+        """
+        self.scenarios = scenarios
+        self._source = scenarios
+        self._size = len(scenarios)
+        self.all_mask = (1 << len(scenarios)) - 1
+        self.by_strategy = {}
+        self.by_direction = {}
+        self.mtf_runtime_mask = 0
+
+        for i, scenario in enumerate(scenarios):
+            bit = 1 << i
+            strategy = scenario.get(self.strategy_field, "UNKNOWN")
+            self.by_strategy[strategy] = self.by_strategy.get(strategy, 0) | bit
+            direction = scenario_direction(scenario)
+            self.by_direction[direction] = self.by_direction.get(direction, 0) | bit
+            if self.mtf_check is None or not self.mtf_indexable(scenario):
+                self.mtf_runtime_mask |= bit
+
+        self.by_regime = {}
+        self.all_weather_mask = self.strategy_mask(all_weather)
+        if regime_strategies is not None:
+            for regime, strategies in regime_strategies.items():
+                self.by_regime[regime] = self.strategy_mask(strategies) | self.all_weather_mask
+
+        self.by_pattern = {}
+        if self.mtf_check is not None:
+            for pattern in product(TRENDS, repeat=len(MTF_KEYS)):
+                trends = dict(zip(MTF_KEYS, pattern))
+                mask = self.mtf_runtime_mask
+                for i, scenario in enumerate(scenarios):
+                    bit = 1 << i
+                    if not mask & bit and self.mtf_check(scenario, trends):
+                        mask |= bit
+                self.by_pattern[pattern] = mask
+
+        self.stats["builds"] += 1
+
+    def ensure(self, scenarios: List[Dict], **kwargs):
+        """Перестроить индекс, если список сценариев заменён или изменился"""
+        if scenarios is not self._source or len(scenarios) != self._size:
+            self.build(scenarios, **kwargs)
+
+    def strategy_mask(self, strategies: Iterable[str]) -> int:
+        mask = 0
+        for strategy in strategies:
+            mask |= self.by_strategy.get(strategy, 0)
+        return mask
+
+    def direction_mask(self, direction: Optional[str]) -> int:
+        """Сценарии направления + сценарии без направления"""
+        if direction is None:
+            return self.all_mask
+        return self.by_direction.get(direction.upper(), 0) | self.by_direction.get(None, 0)
+
+    def pattern_mask(self, mtf_trends: Dict) -> int:
+        """Сценарии, MTF условия которых выполнимы при данных трендах"""
+        pattern = mtf_pattern(mtf_trends)
+        if pattern is None or not self.by_pattern:
+            return self.all_mask
+        return self.by_pattern[pattern]
+
+    def mtf_check_mask(self, mtf_trends: Dict) -> int:
+        """Сценарии, для которых MTF нужно проверить на месте"""
+        if mtf_pattern(mtf_trends) is None or not self.by_pattern:
+            return self.all_mask
+        return self.mtf_runtime_mask
+
+    def candidates(
+        self,
+        strategies: Optional[Iterable[str]] = None,
+        regime: Optional[str] = None,
+        direction: Optional[str] = None,
+        mtf_trends: Optional[Dict] = None,
+    ) -> int:
+        """Маска кандидатов (пересечение всех заданных ключей)"""
+        mask = self.all_mask
+        if strategies is not None:
+            mask &= self.strategy_mask(strategies)
+        if regime is not None:
+            # Неизвестный режим - только all_weather стратегии
+            mask &= self.by_regime.get(regime, self.all_weather_mask)
+        if direction is not None:
+            mask &= self.direction_mask(direction)
+        if mtf_trends is not None:
+            mask &= self.pattern_mask(mtf_trends)
+        return mask
+
+    def iter_mask(self, mask: int) -> Iterable[Tuple[int, Dict]]:
+        """(позиция, сценарий) для установленных битов в порядке загрузки"""
+        while mask:
+            low = mask & -mask
+            i = low.bit_length() - 1
+            yield i, self.scenarios[i]
+            mask ^= low
+
+    def record(self, evaluated: int) -> int:
+        """Учёт вызова матчера; возвращает число отсечённых сценариев"""
+        pruned = self._size - evaluated
+        self.stats["calls"] += 1
+        self.stats["evaluated"] += evaluated
+        self.stats["pruned"] += pruned
+        self.stats["last_pruned"] = pruned
+        return pruned
+
+    def get_stats(self) -> Dict:
+        calls = self.stats["calls"]
+        return {
+            **self.stats,
+            "scenarios": self._size,
+            "avg_pruned": self.stats["pruned"] / calls if calls else 0.0,
+        }
+
+
+__all__ = ["ScenarioIndex", "mtf_pattern", "scenario_direction"]
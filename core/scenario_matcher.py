@@ -16,6 +16,7 @@ from enum import Enum
 from dataclasses import dataclass
 from config.settings import logger, DATA_DIR
 from core.scenario_selector import ScenarioSelector
+from core.scenario_index import ScenarioIndex
 
 
 class SignalStatus(Enum):
@@ -175,6 +176,10 @@ class UnifiedScenarioMatcher:
         # === ИНИЦИАЛИЗИРУЕМ SCENARIO SELECTOR ===
         self.scenario_selector = ScenarioSelector(top_k=3, diversity_weight=0.2)
 
+        # Индекс применимости (ADX фильтр работает по полю "type")
+        self.scenario_index = ScenarioIndex(strategy_field="type")
+        self.scenario_index.build(self.scenarios)
+
     def check_mtf_rule(self, trend_1h, trend_4h, trend_1d):
         """
         MTF Rule v3.1: 1H+4H same, 1D same/neutral
@@ -537,7 +542,24 @@ class UnifiedScenarioMatcher:
 
                 logger.debug(f"=" * 70)
 
-            for scenario in self.scenarios:
+            # Сценарии стратегий, заблокированных ADX фильтром, не оцениваем:
+            # их score всё равно 0 (селектор берёт 0.0 для отсутствующих)
+            index = self.scenario_index
+            index.ensure(self.scenarios)
+            allowed_strategies = [
+                strategy
+                for strategy in index.by_strategy
+                if self.apply_adx_filter(
+                    strategy, adx_data.get("adx", 0), adx_data.get("adx_4h", 0)
+                )[0]
+            ]
+            mtf_result = None
+            evaluated_count = 0
+
+            for _, scenario in index.iter_mask(
+                index.candidates(strategies=allowed_strategies)
+            ):
+                evaluated_count += 1
                 try:
                     scenario_id = scenario.get("id", "UNKNOWN")
                     scenario_type = scenario.get("type", "UNKNOWN")
@@ -621,6 +643,11 @@ class UnifiedScenarioMatcher:
                     logger.error(f"❌ Ошибка оценки сценария {scenario.get('id')}: {e}")
                     continue
 
+            pruned = index.record(evaluated_count)
+            logger.debug(
+                f"✂️ {symbol}: индекс отсёк {pruned}/{len(self.scenarios)} сценариев (ADX)"
+            )
+
             # ============================================
             # 3. ВЫБОР ЛУЧШЕГО СЦЕНАРИЯ
             # ============================================
@@ -773,6 +800,7 @@ class UnifiedScenarioMatcher:
                 "conditions": best_match.get("conditions", {}),
                 "description": best_match.get("description", ""),
                 "timeframe": best_match.get("timeframe", "1H"),
+                "phase": best_match.get("phase", ""),
                 "tp1_price": tp1_price,
                 "tp2_price": tp2_price,
                 "tp3_price": tp3_price,
@@ -1,21 +1,84 @@
 import aiosqlite
+import asyncio
 import logging
 import os
 import json
-from typing import List, Dict, Optional, Any
-from config.settings import DB_FILE, BATCH_SIZE
+import sqlite3
+from typing import Callable, List, Dict, Optional, Any
+from config.settings import DB_FILE, BATCH_SIZE, STORAGE_RETENTION_CONFIG
+from data.time_partitions import TimePartitionedTable, enable_incremental_vacuum
 from models.data_classes import EnhancedTradingSignal, Alert
 from utils.helpers import current_epoch_ms, validate_candle_data, validate_news_data
 
 logger = logging.getLogger(__name__)
 
 
+# Крупные таблицы временных рядов: недельные партиции + view с тем же именем
+PARTITIONED_TABLES = {
+    "candles": dict(
+        columns=[
+            ("symbol", "TEXT NOT NULL"),
+            ("timeframe", "TEXT NOT NULL"),
+            ("timestamp", "INTEGER NOT NULL"),
+            ("open", "REAL NOT NULL"),
+            ("high", "REAL NOT NULL"),
+            ("low", "REAL NOT NULL"),
+            ("close", "REAL NOT NULL"),
+            ("volume", "REAL NOT NULL"),
+            ("created_at", "INTEGER NOT NULL"),
+        ],
+        time_column="timestamp",
+        indexes=[("symbol", "timeframe", "timestamp")],
+        unique=("symbol", "timeframe", "timestamp"),
+    ),
+    "alerts": dict(
+        columns=[
+            ("alert_type", "TEXT NOT NULL"),
+            ("symbol", "TEXT NOT NULL"),
+            ("message", "TEXT NOT NULL"),
+            ("severity", "TEXT NOT NULL"),
+            ("data", "TEXT"),
+            ("resolved", "BOOLEAN DEFAULT 0"),
+            ("timestamp", "INTEGER NOT NULL"),
+        ],
+        time_column="timestamp",
+        indexes=[("timestamp",), ("resolved", "severity")],
+    ),
+    "analytics": dict(
+        columns=[
+            ("symbol", "TEXT NOT NULL"),
+            ("timeframe", "TEXT NOT NULL"),
+            ("indicator_name", "TEXT NOT NULL"),
+            ("indicator_value", "REAL NOT NULL"),
+            ("additional_data", "TEXT"),
+            ("timestamp", "INTEGER NOT NULL"),
+            ("created_at", "INTEGER NOT NULL"),
+        ],
+        time_column="timestamp",
+        indexes=[("symbol", "indicator_name", "timestamp")],
+    ),
+}
+
+
 class EnhancedDatabase:
     """Расширенная база данных с оптимизированными запросами и аналитикой"""
 
     def __init__(self, db_path: str = DB_FILE):
         self.db_path = db_path
         self.connection_pool = {}
+        self.partitioned = {
+            name: TimePartitionedTable(name, period="week", **spec)
+            for name, spec in PARTITIONED_TABLES.items()
+        }
+
+    def _run_sync(self, func: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Выполнить func на sqlite3 соединении (DDL партиций / маршрутизация)"""
+        with sqlite3.connect(self.db_path, timeout=10.0) as conn:
+            return func(conn)
+
+    async def _in_executor(self, func: Callable[[sqlite3.Connection], Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._run_sync, func)
 
     async def init_database(self):
         """Инициализация базы данных с созданием всех необходимых таблиц"""
@@ -30,11 +93,8 @@ class EnhancedDatabase:
                 await db.execute("PRAGMA temp_store=memory")
 
                 # Создание основных таблиц
-                await self._create_candles_table(db)
                 await self._create_signals_table(db)
                 await self._create_news_table(db)
-                await self._create_alerts_table(db)
-                await self._create_analytics_table(db)
                 await self._create_roi_table(db)
                 await self._create_volume_profile_table(db)
                 await self._create_scenarios_table(db)
@@ -47,42 +107,21 @@ class EnhancedDatabase:
                     pass
 
                 await db.commit()
-                logger.info("✅ База данных инициализирована успешно")
+
+            # candles / alerts / analytics - партиции по неделям
+            await self._in_executor(self._setup_partitioned_tables)
+            logger.info("✅ База данных инициализирована успешно")
 
         except Exception as e:
             logger.error(f"Ошибка инициализации базы данных: {e}")
             raise
 
-    async def _create_candles_table(self, db):
-        """Создание таблицы свечей с оптимизированными индексами"""
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS candles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                symbol TEXT NOT NULL,
-                timeframe TEXT NOT NULL,
-                timestamp INTEGER NOT NULL,
-                open REAL NOT NULL,
-                high REAL NOT NULL,
-                low REAL NOT NULL,
-                close REAL NOT NULL,
-                volume REAL NOT NULL,
-                created_at INTEGER NOT NULL,
-                UNIQUE(symbol, timeframe, timestamp)
-            )
-        """
-        )
-
-        # Создаем индексы для быстрого поиска
-        await db.execute(
-            "CREATE INDEX IF NOT EXISTS idx_candles_symbol_timeframe ON candles(symbol, timeframe)"
-        )
-        await db.execute(
-            "CREATE INDEX IF NOT EXISTS idx_candles_timestamp ON candles(timestamp)"
-        )
-        await db.execute(
-            "CREATE INDEX IF NOT EXISTS idx_candles_created_at ON candles(created_at)"
-        )
+    def _setup_partitioned_tables(self, conn: sqlite3.Connection):
+        """Старые таблицы становятся партицией <name>_legacy, поверх - view"""
+        for table in self.partitioned.values():
+            table.setup(conn)
+        # Разовый VACUUM для auto_vacuum=INCREMENTAL - на старте, до писателей
+        enable_incremental_vacuum(conn)
 
     async def _create_signals_table(self, db):
         """Создание таблицы торговых сигналов"""
@@ -161,57 +200,6 @@ class EnhancedDatabase:
             "CREATE INDEX IF NOT EXISTS idx_news_importance ON news(importance_score)"
         )
 
-    async def _create_alerts_table(self, db):
-        """Создание таблицы системных алертов"""
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS alerts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                alert_type TEXT NOT NULL,
-                symbol TEXT NOT NULL,
-                message TEXT NOT NULL,
-                severity TEXT NOT NULL,
-                data TEXT,
-                resolved BOOLEAN DEFAULT 0,
-                timestamp INTEGER NOT NULL
-            )
-        """
-        )
-
-        await db.execute(
-            "CREATE INDEX IF NOT EXISTS idx_alerts_timestamp ON alerts(timestamp)"
-        )
-        await db.execute(
-            "CREATE INDEX IF NOT EXISTS idx_alerts_severity ON alerts(severity)"
-        )
-        await db.execute(
-            "CREATE INDEX IF NOT EXISTS idx_alerts_resolved ON alerts(resolved)"
-        )
-
-    async def _create_analytics_table(self, db):
-        """Создание таблицы аналитических данных"""
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS analytics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                symbol TEXT NOT NULL,
-                timeframe TEXT NOT NULL,
-                indicator_name TEXT NOT NULL,
-                indicator_value REAL NOT NULL,
-                additional_data TEXT,
-                timestamp INTEGER NOT NULL,
-                created_at INTEGER NOT NULL
-            )
-        """
-        )
-
-        await db.execute(
-            "CREATE INDEX IF NOT EXISTS idx_analytics_symbol_indicator ON analytics(symbol, indicator_name)"
-        )
-        await db.execute(
-            "CREATE INDEX IF NOT EXISTS idx_analytics_timestamp ON analytics(timestamp)"
-        )
-
     async def _create_roi_table(self, db):
         """Создание таблицы для отслеживания ROI"""
         await db.execute(
@@ -282,7 +270,7 @@ class EnhancedDatabase:
                         (
                             candle["symbol"],
                             candle["timeframe"],
-                            candle["timestamp"],
+                            int(candle["timestamp"]),
                             candle["open"],
                             candle["high"],
                             candle["low"],
@@ -296,17 +284,11 @@ class EnhancedDatabase:
                 logger.warning("Нет валидных свечей для сохранения")
                 return 0
 
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.executemany(
-                    """
-                    INSERT OR REPLACE INTO candles
-                    (symbol, timeframe, timestamp, open, high, low, close, volume, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                    valid_candles,
+            await self._in_executor(
+                lambda conn: self.partitioned["candles"].insert_many(
+                    conn, valid_candles, on_conflict="OR REPLACE"
                 )
-
-                await db.commit()
+            )
 
             logger.info(
                 f"✅ Сохранено {len(valid_candles)} свечей из {len(candles_batch)}"
@@ -415,24 +397,19 @@ class EnhancedDatabase:
     async def save_alert(self, alert: Alert) -> bool:
         """Сохранение системного алерта"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.execute(
-                    """
-                    INSERT INTO alerts (alert_type, symbol, message, severity, data, timestamp)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        alert.alert_type.value,
-                        alert.symbol,
-                        alert.message,
-                        alert.severity,
-                        json.dumps(alert.data),
-                        alert.timestamp,
-                    ),
-                )
-
-                await db.commit()
-                return True
+            row = (
+                alert.alert_type.value,
+                alert.symbol,
+                alert.message,
+                alert.severity,
+                json.dumps(alert.data),
+                0,
+                alert.timestamp,
+            )
+            await self._in_executor(
+                lambda conn: self.partitioned["alerts"].insert_many(conn, [row])
+            )
+            return True
 
         except Exception as e:
             logger.error(f"Ошибка сохранения алерта: {e}")
@@ -600,42 +577,46 @@ class EnhancedDatabase:
             return {}
 
     async def cleanup_old_data(self, days_to_keep: int = 90):
-        """Очистка старых данных для оптимизации базы"""
+        """
+        Retention: партиции candles/analytics/alerts удаляются целиком
+        (DROP TABLE вместо DELETE), затем incremental_vacuum
+        """
         try:
-            cutoff_time = current_epoch_ms() - (days_to_keep * 24 * 3600 * 1000)
-
-            async with aiosqlite.connect(self.db_path) as db:
-                # Удаляем старые свечи
-                await db.execute(
-                    "DELETE FROM candles WHERE created_at < ?", (cutoff_time,)
-                )
-                candles_deleted = db.total_changes
+            now = current_epoch_ms()
+            day_ms = 24 * 3600 * 1000
+            retention_days = {
+                "candles": STORAGE_RETENTION_CONFIG["candles_days"] or days_to_keep,
+                "analytics": STORAGE_RETENTION_CONFIG["analytics_days"] or days_to_keep,
+                "alerts": STORAGE_RETENTION_CONFIG["alerts_days"],
+            }
+
+            def drop_partitions(conn: sqlite3.Connection) -> Dict[str, int]:
+                dropped = {}
+                with conn:
+                    for name, days in retention_days.items():
+                        dropped[name] = len(
+                            self.partitioned[name].drop_before(conn, now - days * day_ms)
+                        )
+                conn.execute("PRAGMA incremental_vacuum(2000)")
+                return dropped
 
-                # Удаляем старые новости
-                await db.execute(
-                    "DELETE FROM news WHERE processed_at < ?", (cutoff_time,)
-                )
-                news_deleted = db.total_changes - candles_deleted
+            dropped = await self._in_executor(drop_partitions)
 
-                # Удаляем решенные алерты старше месяца
-                month_cutoff = current_epoch_ms() - (30 * 24 * 3600 * 1000)
-                await db.execute(
-                    """
-                    DELETE FROM alerts
-                    WHERE resolved = 1 AND timestamp < ?
-                """,
-                    (month_cutoff,),
+            # Новости - небольшая таблица, обычный DELETE
+            async with aiosqlite.connect(self.db_path) as db:
+                cursor = await db.execute(
+                    "DELETE FROM news WHERE processed_at < ?",
+                    (now - days_to_keep * day_ms,),
                 )
-                alerts_deleted = db.total_changes - candles_deleted - news_deleted
-
+                news_deleted = cursor.rowcount
                 await db.commit()
 
-                # Сжатие базы данных
-                await db.execute("VACUUM")
-
-                logger.info(
-                    f"🧹 Очистка БД: свечи={candles_deleted}, новости={news_deleted}, алерты={alerts_deleted}"
-                )
+            logger.info(
+                f"🧹 Очистка БД: партиции свечи={dropped['candles']}, "
+                f"аналитика={dropped['analytics']}, алерты={dropped['alerts']}, "
+                f"новости={news_deleted}"
+            )
+            return dropped
 
         except Exception as e:
             logger.error(f"Ошибка очистки БД: {e}")
@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+Колоночный кэш исторических CSV датасетов
+- CSV парсится ОДИН раз и сохраняется по колонкам в .npy (типизированно,
+  даты уже datetime64[ns])
+- Ключ кэша - SHA-256 содержимого исходного файла (изменился файл - новый кэш)
+- Свечи OHLCV валидируются при конвертации (utils.candle_frame)
+- Колонки открываются через np.load(mmap_mode="r"): срезы по времени без
+  копирования, страницы файла общие для всех процессов (read-only)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from config.settings import CACHE_DIR, logger
+from utils.candle_frame import validate_ohlcv_frame
+
+
+COLUMNAR_CACHE_DIR = CACHE_DIR / "columnar"
+
+# Колонки, которые парсятся как даты при конвертации
+DEFAULT_TIME_COLUMNS = (
+    "timestamp",
+    "entry_time",
+    "exit_time",
+    "fundingRateTimestamp",
+)
+
+_INDEX_FILE = "index.json"
+_META_FILE = "meta.json"
+# Версия формата кэша (v2: свечи OHLCV валидируются при конвертации)
+_FORMAT_VERSION = "v2"
+
+
+def file_sha256(path: Union[str, Path], chunk_size: int = 1 << 20) -> str:
+    """SHA-256 содержимого файла"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ColumnarDataset:
+    """
+    Read-only датасет из memory-mapped колонок
+
+    columns: {имя: np.ndarray (memmap)}; если есть колонка времени и она
+    отсортирована, доступен срез по диапазону времени через бинарный поиск.
+    """
+
+    def __init__(
+        self,
+        columns: Dict[str, np.ndarray],
+        order: List[str],
+        time_column: Optional[str] = None,
+        source: str = "",
+    ):
+        self.columns = columns
+        self.order = order
+        self.time_column = time_column
+        self.source = source
+
+    def __len__(self) -> int:
+        return len(self.columns[self.order[0]]) if self.order else 0
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def _bounds(self, start=None, end=None) -> slice:
+        """Индексы строк [start, end) по колонке времени"""
+        if start is None and end is None:
+            return slice(0, len(self))
+        if self.time_column is None:
+            raise ValueError(f"{self.source}: нет отсортированной колонки времени")
+
+        times = self.columns[self.time_column]
+        lo = 0 if start is None else int(np.searchsorted(times, np.datetime64(pd.Timestamp(start)), "left"))
+        hi = len(times) if end is None else int(np.searchsorted(times, np.datetime64(pd.Timestamp(end)), "left"))
+        return slice(lo, hi)
+
+    def slice(self, start=None, end=None) -> Dict[str, np.ndarray]:
+        """Срез колонок по времени [start, end) - views на memmap, без копирования"""
+        rows = self._bounds(start, end)
+        return {name: self.columns[name][rows] for name in self.order}
+
+    def to_frame(self, start=None, end=None, copy: bool = False) -> pd.DataFrame:
+        """
+        DataFrame по диапазону времени
+
+        copy=False - колонки остаются read-only views на memmap (изменять
+        существующие колонки нельзя, добавлять новые можно).
+        """
+        data = self.slice(start, end)
+        if copy:
+            data = {name: np.array(col) for name, col in data.items()}
+        return pd.DataFrame(data, columns=self.order, copy=False)
+
+
+class DatasetCache:
+    """
+    Конвертация CSV → колоночный .npy кэш и открытие через memmap
+
+    Индекс (index.json) хранит размер/mtime исходника → hash, поэтому при
+    неизменном файле хэш не пересчитывается.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path] = COLUMNAR_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._opened: Dict[str, ColumnarDataset] = {}
+
+    # ========== ИНДЕКС ==========
+
+    def _load_index(self) -> Dict:
+        try:
+            with open(self.cache_dir / _INDEX_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self, index: Dict):
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp, self.cache_dir / _INDEX_FILE)
+
+    def source_key(self, csv_path: Union[str, Path]) -> str:
+        """Hash исходника (из индекса, если размер и mtime не изменились)"""
+        path = Path(csv_path).resolve()
+        stat = path.stat()
+
+        with self._lock:
+            index = self._load_index()
+            entry = index.get(str(path))
+            if (
+                entry
+                and entry.get("size") == stat.st_size
+                and entry.get("mtime_ns") == stat.st_mtime_ns
+            ):
+                return entry["hash"]
+
+            digest = file_sha256(path)
+            index[str(path)] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "hash": digest,
+            }
+            self._save_index(index)
+            return digest
+
+    # ========== КОНВЕРТАЦИЯ ==========
+
+    def _convert(
+        self, csv_path: Path, target: Path, time_columns: Iterable[str], read_csv_kwargs: Dict
+    ):
+        """CSV → директория с колонками .npy (атомарно)"""
+        df = pd.read_csv(csv_path, **read_csv_kwargs)
+
+        parsed_times = []
+        for name in time_columns:
+            if name in df.columns:
+                df[name] = pd.to_datetime(df[name])
+                parsed_times.append(name)
+
+        # Невалидные свечи отбрасываются один раз - при построении кэша
+        df, invalid_candles = validate_ohlcv_frame(df, label=csv_path.name)
+
+        tmp = Path(tempfile.mkdtemp(dir=self.cache_dir, prefix=".build_"))
+        try:
+            files = {}
+            for i, name in enumerate(df.columns):
+                values = df[name].to_numpy()
+                if values.dtype == object:
+                    # Строки → фиксированная ширина (mmap не поддерживает object)
+                    values = values.astype(str)
+                if values.dtype.kind == "M":
+                    values = values.astype("datetime64[ns]")
+                filename = f"{i:03d}.npy"
+                np.save(tmp / filename, np.ascontiguousarray(values), allow_pickle=False)
+                files[name] = filename
+
+            # Колонка для срезов по времени - первая отсортированная
+            time_column = None
+            for name in parsed_times:
+                values = df[name].to_numpy()
+                if len(values) < 2 or bool(np.all(values[1:] >= values[:-1])):
+                    time_column = name
+                    break
+
+            meta = {
+                "source": str(csv_path),
+                "rows": len(df),
+                "columns": list(df.columns),
+                "files": files,
+                "time_column": time_column,
+                "invalid_candles": invalid_candles,
+            }
+            with open(tmp / _META_FILE, "w", encoding="utf-8") as f:
+                json.dump(meta, f, indent=2)
+
+            try:
+                os.replace(tmp, target)
+            except OSError:
+                # Параллельный процесс уже создал кэш
+                shutil.rmtree(tmp, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+        logger.info(f"✅ Dataset cache: {csv_path.name} → {target.name} ({len(df)} строк)")
+
+    # ========== ОТКРЫТИЕ ==========
+
+    def open(
+        self,
+        csv_path: Union[str, Path],
+        time_columns: Iterable[str] = DEFAULT_TIME_COLUMNS,
+        **read_csv_kwargs,
+    ) -> ColumnarDataset:
+        """Открыть CSV через колоночный кэш (конвертация при первом обращении)"""
+        path = Path(csv_path).resolve()
+        digest = self.source_key(path)
+        target = self.cache_dir / f"{digest}.{_FORMAT_VERSION}"
+
+        cached = self._opened.get(digest)
+        if cached is not None:
+            return cached
+
+        if not (target / _META_FILE).exists():
+            self._convert(path, target, time_columns, read_csv_kwargs)
+
+        with open(target / _META_FILE, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        columns = {
+            name: np.load(target / filename, mmap_mode="r", allow_pickle=False)
+            for name, filename in meta["files"].items()
+        }
+        dataset = ColumnarDataset(
+            columns, meta["columns"], meta.get("time_column"), source=str(path)
+        )
+        self._opened[digest] = dataset
+        return dataset
+
+    def clear(self):
+        """Удалить весь кэш"""
+        self._opened.clear()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+
+_default_cache: Optional[DatasetCache] = None
+
+
+def get_dataset_cache() -> DatasetCache:
+    """Общий экземпляр кэша (data/cache/columnar)"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = DatasetCache()
+    return _default_cache
+
+
+def load_dataset(csv_path: Union[str, Path], **kwargs) -> ColumnarDataset:
+    """Открыть CSV как memory-mapped колоночный датасет"""
+    return get_dataset_cache().open(csv_path, **kwargs)
+
+
+def read_csv_cached(
+    csv_path: Union[str, Path], start=None, end=None, copy: bool = False, **kwargs
+) -> pd.DataFrame:
+    """
+    Замена pd.read_csv + pd.to_datetime для исторических данных
+
+    Колонки времени уже datetime64; при copy=False DataFrame ссылается на memmap.
+    """
+    return load_dataset(csv_path, **kwargs).to_frame(start, end, copy=copy)
+
+
+__all__ = [
+    "ColumnarDataset",
+    "DatasetCache",
+    "get_dataset_cache",
+    "load_dataset",
+    "read_csv_cached",
+    "file_sha256",
+    "COLUMNAR_CACHE_DIR",
+]
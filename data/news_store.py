@@ -0,0 +1,499 @@
+# -*- coding: utf-8 -*-
+"""
+Персистентное хранилище новостей на SQLite
+- Дедупликация по news_id и URL
+- FTS5 индекс по заголовкам и текстам
+- Предрассчитанное отображение символ → новости
+- Кэш ответов API (заменяет полную перезапись JSON файлов)
+"""
+
+import json
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from config.settings import DATABASE_PATH, logger
+from config.constants import SYMBOL_KEYWORDS
+from utils.helpers import current_epoch_ms, datetime_to_epoch_ms
+
+
+class NewsStore:
+    """
+    Хранилище новостей поверх таблицы `news`
+
+    Символы новости определяются ОДИН раз при записи (теми же правилами,
+    что и UnifiedSentimentAnalyzer.filter_news_by_symbol), поэтому выборка
+    новостей по символу - это индексный запрос, а не перебор всего списка.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DATABASE_PATH,
+        symbol_keywords: Optional[Dict[str, List[str]]] = None,
+    ):
+        self.db_path = db_path
+        self.symbol_keywords = symbol_keywords or SYMBOL_KEYWORDS
+        self.fts_enabled = False
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+        self._init_schema()
+        logger.info(
+            f"✅ NewsStore инициализирован (FTS5: {'✅' if self.fts_enabled else '❌'})"
+        )
+
+    # ========== СХЕМА ==========
+
+    def _connect(self) -> sqlite3.Connection:
+        """Ленивое открытие постоянного соединения"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+
+    def _init_schema(self):
+        """Создание таблиц, индексов, FTS и миграция старой таблицы news"""
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.cursor()
+
+            # Та же схема, что в EnhancedDatabase._create_news_table
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS news (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    news_id TEXT UNIQUE NOT NULL,
+                    title TEXT NOT NULL,
+                    url TEXT,
+                    source TEXT,
+                    published_at INTEGER NOT NULL,
+                    sentiment_score REAL DEFAULT 0.0,
+                    importance_score REAL DEFAULT 0.0,
+                    relevance_score REAL DEFAULT 0.0,
+                    categories TEXT,
+                    keywords TEXT,
+                    processed_at INTEGER NOT NULL,
+                    market_impact TEXT
+                )
+            """
+            )
+
+            # Миграция: колонки для текста и исходного объекта новости
+            cursor.execute("PRAGMA table_info(news)")
+            columns = [row[1] for row in cursor.fetchall()]
+            if "body" not in columns:
+                cursor.execute("ALTER TABLE news ADD COLUMN body TEXT")
+                logger.info("✅ Колонка 'body' добавлена в news")
+            if "payload" not in columns:
+                cursor.execute("ALTER TABLE news ADD COLUMN payload TEXT")
+                logger.info("✅ Колонка 'payload' добавлена в news")
+
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_news_published_at ON news(published_at)"
+            )
+
+            # Дедупликация по URL (пустые URL не участвуют)
+            try:
+                cursor.execute(
+                    """
+                    CREATE UNIQUE INDEX IF NOT EXISTS idx_news_url
+                    ON news(url) WHERE url IS NOT NULL AND url != ''
+                """
+                )
+            except sqlite3.IntegrityError:
+                logger.warning(
+                    "⚠️ В news есть дубликаты URL, уникальный индекс не создан"
+                )
+
+            # Символ → новости (покрывающий ключ для выборки свежих новостей)
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS news_symbols (
+                    symbol TEXT NOT NULL,
+                    published_at INTEGER NOT NULL,
+                    news_rowid INTEGER NOT NULL,
+                    PRIMARY KEY (symbol, published_at, news_rowid)
+                ) WITHOUT ROWID
+            """
+            )
+
+            # Кэш ответов API: cache_key → список news_id
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS news_fetch_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    fetched_at INTEGER NOT NULL,
+                    ttl INTEGER NOT NULL,
+                    news_ids TEXT NOT NULL
+                )
+            """
+            )
+
+            self.fts_enabled = self._init_fts(cursor)
+            conn.commit()
+
+    def _init_fts(self, cursor) -> bool:
+        """Создание FTS5 индекса (external content) с триггерами синхронизации"""
+        try:
+            cursor.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5(
+                    title, body, content='news', content_rowid='id'
+                )
+            """
+            )
+            cursor.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS news_fts_ai AFTER INSERT ON news BEGIN
+                    INSERT INTO news_fts(rowid, title, body)
+                    VALUES (new.id, new.title, new.body);
+                END
+            """
+            )
+            cursor.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS news_fts_ad AFTER DELETE ON news BEGIN
+                    INSERT INTO news_fts(news_fts, rowid, title, body)
+                    VALUES ('delete', old.id, old.title, old.body);
+                END
+            """
+            )
+            cursor.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS news_fts_au AFTER UPDATE ON news BEGIN
+                    INSERT INTO news_fts(news_fts, rowid, title, body)
+                    VALUES ('delete', old.id, old.title, old.body);
+                    INSERT INTO news_fts(rowid, title, body)
+                    VALUES (new.id, new.title, new.body);
+                END
+            """
+            )
+            return True
+
+        except sqlite3.OperationalError as e:
+            logger.warning(f"⚠️ FTS5 недоступен, поиск через LIKE: {e}")
+            return False
+
+    # ========== НОРМАЛИЗАЦИЯ ==========
+
+    @staticmethod
+    def _news_id(item: Dict) -> str:
+        """Стабильный ID новости: источник + ID API (или URL)"""
+        raw_id = str(item.get("id") or "").strip()
+        source = str(item.get("source") or "").lower()
+
+        if raw_id:
+            return raw_id if raw_id.startswith("cp_") else f"{source}_{raw_id}"
+
+        return item.get("url") or f"{source}_{item.get('title', '').lower().strip()}"
+
+    @staticmethod
+    def _published_ms(item: Dict) -> int:
+        """Время публикации в миллисекундах (ISO строка, секунды или мс)"""
+        timestamp = item.get("timestamp")
+        if isinstance(timestamp, (int, float)) and timestamp > 0:
+            return int(timestamp)
+
+        published = item.get("published_at") or item.get("published_on") or 0
+        if isinstance(published, str):
+            return datetime_to_epoch_ms(published) if published else current_epoch_ms()
+
+        published = int(published or 0)
+        if published <= 0:
+            return current_epoch_ms()
+        # Секунды → миллисекунды
+        return published * 1000 if published < 10**12 else published
+
+    def match_symbols(self, item: Dict) -> List[str]:
+        """
+        Символы новости - те же правила, что в filter_news_by_symbol:
+        подстрока ключевого слова в title + body, ALT = не BTC и не ETH
+        """
+        title = (item.get("title") or "").lower()
+        body = (item.get("body") or item.get("content") or "").lower()
+        text = f"{title} {body}"
+
+        symbols = [
+            symbol
+            for symbol, keywords in self.symbol_keywords.items()
+            if symbol != "ALT" and any(kw in text for kw in keywords)
+        ]
+
+        if "BTC" not in symbols and "ETH" not in symbols:
+            symbols.append("ALT")
+
+        return symbols
+
+    @staticmethod
+    def normalize_symbol(symbol: str) -> str:
+        """BTCUSDT → BTC"""
+        symbol = symbol.upper()
+        for quote in ("USDT", "USDC", "USD"):
+            if symbol.endswith(quote) and len(symbol) > len(quote):
+                return symbol[: -len(quote)]
+        return symbol
+
+    # ========== ЗАПИСЬ ==========
+
+    def save_news(self, news_list: Iterable[Dict]) -> int:
+        """
+        Сохранение новостей с дедупликацией (news_id / URL)
+
+        Returns:
+            Количество НОВЫХ новостей
+        """
+        inserted = 0
+        now = current_epoch_ms()
+
+        try:
+            with self._lock:
+                conn = self._connect()
+                cursor = conn.cursor()
+
+                for item in news_list:
+                    if not isinstance(item, dict) or not item.get("title"):
+                        continue
+
+                    published_at = self._published_ms(item)
+                    cursor.execute(
+                        """
+                        INSERT OR IGNORE INTO news (
+                            news_id, title, url, source, published_at,
+                            sentiment_score, categories, processed_at, body, payload
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                        (
+                            self._news_id(item),
+                            item["title"],
+                            item.get("url") or None,
+                            item.get("source", ""),
+                            published_at,
+                            item.get("enhanced_sentiment", 0.0),
+                            json.dumps(item.get("categories", [])),
+                            now,
+                            item.get("body") or item.get("content") or "",
+                            json.dumps(item, ensure_ascii=False, default=str),
+                        ),
+                    )
+
+                    if cursor.rowcount == 0:
+                        continue  # Дубликат
+
+                    rowid = cursor.lastrowid
+                    cursor.executemany(
+                        "INSERT OR IGNORE INTO news_symbols VALUES (?, ?, ?)",
+                        [(s, published_at, rowid) for s in self.match_symbols(item)],
+                    )
+                    inserted += 1
+
+                conn.commit()
+
+            if inserted:
+                logger.debug(f"💾 NewsStore: сохранено {inserted} новых новостей")
+            return inserted
+
+        except Exception as e:
+            logger.error(f"❌ NewsStore: ошибка сохранения новостей: {e}")
+            return inserted
+
+    def save_fetch(self, cache_key: str, news_items: List[Dict], ttl: int = 900):
+        """Сохранение ответа API: новости в news, ссылки на них в news_fetch_cache"""
+        self.save_news(news_items)
+
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO news_fetch_cache VALUES (?, ?, ?, ?)",
+                    (
+                        cache_key,
+                        current_epoch_ms(),
+                        ttl,
+                        json.dumps([self._news_id(item) for item in news_items]),
+                    ),
+                )
+                conn.commit()
+
+        except Exception as e:
+            logger.error(f"❌ NewsStore: ошибка сохранения кэша {cache_key}: {e}")
+
+    # ========== ЧТЕНИЕ ==========
+
+    @staticmethod
+    def _row_to_news(row: sqlite3.Row) -> Dict:
+        """Восстановление исходного словаря новости"""
+        if row["payload"]:
+            try:
+                return json.loads(row["payload"])
+            except (TypeError, ValueError):
+                pass
+
+        return {
+            "id": row["news_id"],
+            "title": row["title"],
+            "body": row["body"] or "",
+            "url": row["url"] or "",
+            "source": row["source"],
+            "published_at": row["published_at"],
+        }
+
+    def load_fetch_cache(self, prefix: str = "") -> Dict[str, Dict]:
+        """
+        Загрузка кэша ответов API в формате UnifiedNewsConnector:
+        {cache_key: {'data': [...], 'timestamp': int, 'ttl': int}}
+        """
+        cache = {}
+
+        try:
+            with self._lock:
+                conn = self._connect()
+                entries = conn.execute(
+                    "SELECT * FROM news_fetch_cache WHERE cache_key LIKE ?",
+                    (f"{prefix}%",),
+                ).fetchall()
+
+                for entry in entries:
+                    news_ids = json.loads(entry["news_ids"])
+                    rows = {}
+                    if news_ids:
+                        placeholders = ",".join("?" * len(news_ids))
+                        for row in conn.execute(
+                            f"SELECT * FROM news WHERE news_id IN ({placeholders})",
+                            news_ids,
+                        ):
+                            rows[row["news_id"]] = self._row_to_news(row)
+
+                    cache[entry["cache_key"]] = {
+                        "data": [rows[nid] for nid in news_ids if nid in rows],
+                        "timestamp": entry["fetched_at"],
+                        "ttl": entry["ttl"],
+                    }
+
+        except Exception as e:
+            logger.error(f"❌ NewsStore: ошибка загрузки кэша: {e}")
+
+        return cache
+
+    def get_news_for_symbol(
+        self, symbol: str, hours: int = 24, limit: int = 100
+    ) -> List[Dict]:
+        """
+        Новости по символу за период (индексный запрос, новые первыми)
+
+        Args:
+            symbol: BTC, ETH, ALT или торговая пара (BTCUSDT)
+            hours: Глубина в часах
+            limit: Максимум новостей
+        """
+        cutoff = current_epoch_ms() - hours * 3600 * 1000
+        symbol = self.normalize_symbol(symbol)
+
+        try:
+            with self._lock:
+                rows = (
+                    self._connect()
+                    .execute(
+                        """
+                    SELECT n.* FROM news_symbols s
+                    JOIN news n ON n.id = s.news_rowid
+                    WHERE s.symbol = ? AND s.published_at > ?
+                    ORDER BY s.published_at DESC
+                    LIMIT ?
+                """,
+                        (symbol, cutoff, limit),
+                    )
+                    .fetchall()
+                )
+
+            news = [self._row_to_news(row) for row in rows]
+            for item in news:
+                item["matched_symbol"] = symbol
+            return news
+
+        except Exception as e:
+            logger.error(f"❌ NewsStore: ошибка выборки новостей {symbol}: {e}")
+            return []
+
+    def search(self, query: str, hours: int = 24 * 7, limit: int = 50) -> List[Dict]:
+        """Полнотекстовый поиск по заголовкам и текстам"""
+        cutoff = current_epoch_ms() - hours * 3600 * 1000
+
+        try:
+            with self._lock:
+                conn = self._connect()
+                if self.fts_enabled:
+                    # Каждое слово - отдельный токен в кавычках (без синтаксиса FTS)
+                    fts_query = " ".join(
+                        '"' + token.replace('"', '""') + '"'
+                        for token in query.split()
+                    )
+                    rows = conn.execute(
+                        """
+                        SELECT n.* FROM news_fts f
+                        JOIN news n ON n.id = f.rowid
+                        WHERE news_fts MATCH ? AND n.published_at > ?
+                        ORDER BY rank
+                        LIMIT ?
+                    """,
+                        (fts_query, cutoff, limit),
+                    ).fetchall()
+                else:
+                    pattern = f"%{query}%"
+                    rows = conn.execute(
+                        """
+                        SELECT * FROM news
+                        WHERE (title LIKE ? OR body LIKE ?) AND published_at > ?
+                        ORDER BY published_at DESC
+                        LIMIT ?
+                    """,
+                        (pattern, pattern, cutoff, limit),
+                    ).fetchall()
+
+            return [self._row_to_news(row) for row in rows]
+
+        except Exception as e:
+            logger.error(f"❌ NewsStore: ошибка поиска '{query}': {e}")
+            return []
+
+    def count(self) -> int:
+        """Количество новостей в хранилище"""
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM news").fetchone()[0]
+
+    # ========== ОБСЛУЖИВАНИЕ ==========
+
+    def cleanup(self, days_to_keep: int = 30) -> int:
+        """Удаление старых новостей (FTS чистится триггером)"""
+        cutoff = current_epoch_ms() - days_to_keep * 24 * 3600 * 1000
+
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("DELETE FROM news_symbols WHERE published_at < ?", (cutoff,))
+                deleted = conn.execute(
+                    "DELETE FROM news WHERE published_at < ?", (cutoff,)
+                ).rowcount
+                conn.execute(
+                    "DELETE FROM news_fetch_cache WHERE fetched_at < ?", (cutoff,)
+                )
+                conn.commit()
+
+            logger.info(f"🧹 NewsStore: удалено {deleted} старых новостей")
+            return deleted
+
+        except Exception as e:
+            logger.error(f"❌ NewsStore: ошибка очистки: {e}")
+            return 0
+
+    def close(self):
+        """Закрытие соединения"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+__all__ = ["NewsStore"]
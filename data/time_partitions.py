@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+"""
+Партиционирование по времени для больших SQLite таблиц
+- Таблица = набор партиций <name>_pYYYYMMDD (день или неделя) + view <name>
+- Запись маршрутизируется в партицию по колонке времени (epoch ms)
+- Retention = DROP TABLE партиции вместо DELETE (без фрагментации и блокировок)
+- Компактор: старые тики сворачиваются в 1m/1h агрегаты, затем партиция удаляется
+- incremental_vacuum возвращает освободившиеся страницы файлу порциями
+  (перевод БД в auto_vacuum=INCREMENTAL - один раз на старте)
+- Кэш партиций общий для потока loop (запись) и executor (retention) -
+  под блокировкой; пересоздание view - одна транзакция
+"""
+
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config.settings import logger
+
+
+DAY_MS = 86_400_000
+PERIOD_DAYS = {"day": 1, "week": 7}
+LEGACY_KEY = "legacy"
+
+
+class TimePartitionedTable:
+    """
+    Логическая таблица из партиций по времени
+
+    Args:
+        name: Имя view (под ним таблицу читают все потребители)
+        columns: [(колонка, SQL тип)] без id
+        time_column: Колонка времени в epoch ms (ключ партиции)
+        period: "day" или "week" (неделя начинается в понедельник, UTC)
+        indexes: Индексы каждой партиции, например [("symbol", "ts")]
+        unique: Уникальный ключ внутри партиции (для upsert)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        columns: Sequence[Tuple[str, str]],
+        time_column: str,
+        period: str = "day",
+        indexes: Sequence[Sequence[str]] = (),
+        unique: Optional[Sequence[str]] = None,
+    ):
+        if period not in PERIOD_DAYS:
+            raise ValueError(f"Неизвестный период партиций: {period}")
+
+        self.name = name
+        self.columns = list(columns)
+        self.column_names = [c for c, _ in self.columns]
+        self.time_column = time_column
+        self.time_index = self.column_names.index(time_column)
+        self.period = period
+        self.indexes = [tuple(i) for i in indexes]
+        self.unique = tuple(unique) if unique else None
+
+        self._known: Optional[Dict[str, str]] = None  # key -> имя таблицы
+        self._legacy_max: Optional[int] = None
+        # Кэш и DDL партиций: insert_many из loop, drop_before из executor
+        self._lock = threading.RLock()
+
+    # ========== КЛЮЧИ ==========
+
+    def partition_key(self, ts_ms: int) -> str:
+        day = datetime.fromtimestamp(int(ts_ms) / 1000, tz=timezone.utc).date()
+        if self.period == "week":
+            day -= timedelta(days=day.weekday())
+        return day.strftime("%Y%m%d")
+
+    def partition_table(self, key: str) -> str:
+        return f"{self.name}_{key}" if key == LEGACY_KEY else f"{self.name}_p{key}"
+
+    def partition_bounds(self, key: str) -> Tuple[int, int]:
+        """[начало, конец) партиции в epoch ms"""
+        start = datetime.strptime(key, "%Y%m%d").replace(tzinfo=timezone.utc)
+        start_ms = int(start.timestamp() * 1000)
+        return start_ms, start_ms + PERIOD_DAYS[self.period] * DAY_MS
+
+    # ========== СХЕМА ==========
+
+    def partitions(self, conn: sqlite3.Connection) -> Dict[str, str]:
+        """Существующие партиции {key: table} (копия кэша)"""
+        with self._lock:
+            return dict(self._load_known(conn))
+
+    def _load_known(self, conn: sqlite3.Connection) -> Dict[str, str]:
+        """Кэш партиций (вызывать под self._lock)"""
+        if self._known is None:
+            prefix = f"{self.name}_p"
+            rows = conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ?",
+                (f"{self.name}_%",),
+            ).fetchall()
+            known = {}
+            for (table,) in rows:
+                if table == self.partition_table(LEGACY_KEY):
+                    known[LEGACY_KEY] = table
+                elif table.startswith(prefix) and table[len(prefix):].isdigit():
+                    known[table[len(prefix):]] = table
+            self._known = known
+        return self._known
+
+    def setup(self, conn: sqlite3.Connection):
+        """
+        Подготовить партиционированную таблицу
+
+        Обычная таблица с именем name (старая схема) переименовывается
+        в партицию <name>_legacy и остаётся доступной через view.
+        """
+        with self._lock:
+            row = conn.execute(
+                "SELECT type FROM sqlite_master WHERE name = ?", (self.name,)
+            ).fetchone()
+            legacy = self.partition_table(LEGACY_KEY)
+            if row and row[0] == "table":
+                conn.execute(f"ALTER TABLE {self.name} RENAME TO {legacy}")
+                logger.info(f"🔄 {self.name}: таблица перенесена в партицию {legacy}")
+
+            self._known = None
+            if LEGACY_KEY in self._load_known(conn):
+                # Недостающие колонки старой схемы (значения NULL)
+                existing = {r[1] for r in conn.execute(f"PRAGMA table_info({legacy})")}
+                for column, sql_type in self.columns:
+                    if column not in existing:
+                        sql_type = sql_type.replace("NOT NULL", "").strip()
+                        conn.execute(f"ALTER TABLE {legacy} ADD COLUMN {column} {sql_type}")
+                self._create_indexes(conn, legacy)
+            self.refresh_view(conn)
+
+    def ensure_partition(self, conn: sqlite3.Connection, key: str) -> str:
+        """Создать партицию при необходимости; view обновляется сразу"""
+        with self._lock:
+            known = self._load_known(conn)
+            table = known.get(key)
+            if table is not None:
+                return table
+
+            table = self.partition_table(key)
+            columns_sql = ", ".join(f"{c} {t}" for c, t in self.columns)
+            unique_sql = f", UNIQUE({', '.join(self.unique)})" if self.unique else ""
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                f"(id INTEGER PRIMARY KEY, {columns_sql}{unique_sql})"
+            )
+            self._create_indexes(conn, table)
+            known[key] = table
+            self.refresh_view(conn)
+            return table
+
+    def _create_indexes(self, conn: sqlite3.Connection, table: str):
+        for columns in self.indexes:
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_{'_'.join(columns)} "
+                f"ON {table}({', '.join(columns)})"
+            )
+
+    def refresh_view(self, conn: sqlite3.Connection):
+        """
+        Пересоздать view как UNION ALL всех партиций (явный список колонок)
+
+        DROP + CREATE в одной транзакции (BEGIN IMMEDIATE, если своей ещё
+        нет): читатели на других соединениях не видят момент без view.
+        """
+        known = self.partitions(conn)
+        columns = ", ".join(["id"] + self.column_names)
+        tables = [known[k] for k in sorted(known)]
+        if tables:
+            body = " UNION ALL ".join(f"SELECT {columns} FROM {t}" for t in tables)
+        else:
+            body = "SELECT " + ", ".join(
+                f"NULL AS {c}" for c in ["id"] + self.column_names
+            ) + " WHERE 0"
+
+        own_transaction = not conn.in_transaction
+        if own_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(f"DROP VIEW IF EXISTS {self.name}")
+            conn.execute(f"CREATE VIEW {self.name} AS {body}")
+        except Exception:
+            if own_transaction:
+                conn.rollback()
+            raise
+        if own_transaction:
+            conn.commit()
+
+    # ========== ЗАПИСЬ / ЧТЕНИЕ ==========
+
+    def insert_many(
+        self,
+        conn: sqlite3.Connection,
+        rows: Sequence[Sequence],
+        on_conflict: str = "",
+    ) -> int:
+        """
+        Вставить строки (значения в порядке columns), разложив по партициям
+
+        Args:
+            on_conflict: "" | "OR REPLACE" | "OR IGNORE" | "upsert"
+                (upsert: ON CONFLICT(unique) DO UPDATE с суммированием
+                числовых колонок - для агрегатов)
+        """
+        groups: Dict[str, List[Sequence]] = {}
+        for row in rows:
+            groups.setdefault(self.partition_key(row[self.time_index]), []).append(row)
+
+        # Партиции создаются до первой вставки: с открытой транзакцией
+        # записи не ждать self._lock (его держатель может ждать запись)
+        tables = {key: self.ensure_partition(conn, key) for key in groups}
+
+        columns = ", ".join(self.column_names)
+        placeholders = ", ".join("?" for _ in self.column_names)
+        for key, group in groups.items():
+            table = tables[key]
+            if on_conflict == "upsert":
+                conn.executemany(
+                    f"INSERT INTO {table} ({columns}) VALUES ({placeholders}) "
+                    f"{self._upsert_clause()}",
+                    group,
+                )
+            else:
+                conn.executemany(
+                    f"INSERT {on_conflict} INTO {table} ({columns}) VALUES ({placeholders})",
+                    group,
+                )
+        return len(rows)
+
+    def _upsert_clause(self) -> str:
+        merges = []
+        for column in self.column_names:
+            if column in self.unique:
+                continue
+            if column.startswith("max_"):
+                merges.append(f"{column} = MAX({column}, excluded.{column})")
+            else:
+                merges.append(f"{column} = {column} + excluded.{column}")
+        return f"ON CONFLICT({', '.join(self.unique)}) DO UPDATE SET {', '.join(merges)}"
+
+    def source(
+        self,
+        conn: sqlite3.Connection,
+        since_ms: Optional[int] = None,
+        until_ms: Optional[int] = None,
+    ) -> str:
+        """
+        FROM-источник только по партициям, пересекающим [since, until)
+
+        Одна партиция - её имя (индексы обслуживают и WHERE, и ORDER BY),
+        несколько - подзапрос UNION ALL (WHERE проталкивается внутрь).
+        """
+        tables = []
+        known = self.partitions(conn)
+        for key in sorted(known):
+            if key == LEGACY_KEY:
+                if since_ms is None or self._legacy_max_ts(conn) >= since_ms:
+                    tables.append(known[key])
+                continue
+            start, end = self.partition_bounds(key)
+            if since_ms is not None and end <= since_ms:
+                continue
+            if until_ms is not None and start >= until_ms:
+                continue
+            tables.append(known[key])
+
+        if not tables:
+            return self.name
+        if len(tables) == 1:
+            return tables[0]
+        columns = ", ".join(["id"] + self.column_names)
+        return "(" + " UNION ALL ".join(f"SELECT {columns} FROM {t}" for t in tables) + ")"
+
+    def _legacy_max_ts(self, conn: sqlite3.Connection) -> int:
+        # В legacy партицию больше не пишут - максимум вычисляется один раз
+        if self._legacy_max is None:
+            table = self.partition_table(LEGACY_KEY)
+            value = conn.execute(f"SELECT MAX({self.time_column}) FROM {table}").fetchone()[0]
+            self._legacy_max = int(value or 0)
+        return self._legacy_max
+
+    # ========== RETENTION ==========
+
+    def expired_partitions(self, conn: sqlite3.Connection, cutoff_ms: int) -> List[str]:
+        """Ключи партиций, целиком старше cutoff"""
+        expired = []
+        for key in sorted(self.partitions(conn)):
+            if key == LEGACY_KEY:
+                if self._legacy_max_ts(conn) < cutoff_ms:
+                    expired.append(key)
+            elif self.partition_bounds(key)[1] <= cutoff_ms:
+                expired.append(key)
+        return expired
+
+    def drop_partition(self, conn: sqlite3.Connection, key: str):
+        with self._lock:
+            table = self._load_known(conn).pop(key)
+            if key == LEGACY_KEY:
+                self._legacy_max = None
+            self.refresh_view(conn)
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def drop_before(self, conn: sqlite3.Connection, cutoff_ms: int) -> List[str]:
+        """Удалить партиции целиком старше cutoff (retention)"""
+        expired = self.expired_partitions(conn, cutoff_ms)
+        for key in expired:
+            self.drop_partition(conn, key)
+        return expired
+
+
+@dataclass
+class Rollup:
+    """
+    Свёртка тиковой таблицы в агрегаты по бакетам времени
+
+    aggregates: {колонка цели: SQL агрегат по исходной партиции}.
+    Колонки max_* при повторной свёртке берут максимум, остальные суммируются.
+    """
+
+    target: TimePartitionedTable
+    bucket_ms: int
+    keys: Tuple[str, ...]
+    aggregates: Dict[str, str] = field(default_factory=dict)
+
+
+class PartitionCompactor:
+    """
+    Фоновый компактор: свёртка и удаление старых партиций сырых данных
+
+    1. Партиции source старше raw_days сворачиваются во все rollups и удаляются
+    2. Партиции агрегатов старше своего retention удаляются
+    3. PRAGMA incremental_vacuum отдаёт свободные страницы (только если БД
+       уже в auto_vacuum=INCREMENTAL - перевод делает enable_incremental_vacuum
+       на старте, полный VACUUM в периодическом проходе не выполняется)
+    """
+
+    def __init__(
+        self,
+        source: TimePartitionedTable,
+        rollups: Sequence[Rollup] = (),
+        raw_days: int = 7,
+        rollup_days: Optional[Dict[str, int]] = None,
+        vacuum_pages: int = 2000,
+    ):
+        self.source = source
+        self.rollups = list(rollups)
+        self.raw_days = raw_days
+        self.rollup_days = rollup_days or {}
+        self.vacuum_pages = vacuum_pages
+        self.stats = {"runs": 0, "partitions_dropped": 0, "rows_rolled_up": 0}
+
+    def compact(self, conn: sqlite3.Connection, now_ms: int) -> Dict:
+        """Один проход компактора (вызывается из фоновой задачи)"""
+        result = {"dropped": [], "rolled_up": 0}
+
+        cutoff = now_ms - self.raw_days * DAY_MS
+        for key in self.source.expired_partitions(conn, cutoff):
+            table = self.source.partitions(conn)[key]
+            # Блокировка source до транзакции: порядок как у insert_many
+            with self.source._lock, conn:
+                for rollup in self.rollups:
+                    rows = self._rollup_rows(conn, table, rollup)
+                    rollup.target.insert_many(conn, rows, on_conflict="upsert")
+                    result["rolled_up"] += len(rows)
+                self.source.drop_partition(conn, key)
+            result["dropped"].append(table)
+
+        with conn:
+            for rollup in self.rollups:
+                days = self.rollup_days.get(rollup.target.name)
+                if days:
+                    dropped = rollup.target.drop_before(conn, now_ms - days * DAY_MS)
+                    result["dropped"].extend(dropped)
+
+        conn.execute(f"PRAGMA incremental_vacuum({self.vacuum_pages})")
+
+        self.stats["runs"] += 1
+        self.stats["partitions_dropped"] += len(result["dropped"])
+        self.stats["rows_rolled_up"] += result["rolled_up"]
+        return result
+
+    def _rollup_rows(self, conn: sqlite3.Connection, table: str, rollup: Rollup) -> List[tuple]:
+        """Агрегаты одной партиции (порядок колонок = rollup.target.columns)"""
+        time_column = self.source.time_column
+        bucket = f"({time_column} / {rollup.bucket_ms}) * {rollup.bucket_ms}"
+        select = {key: key for key in rollup.keys}
+        select[rollup.target.time_column] = bucket
+        select.update(rollup.aggregates)
+
+        expressions = ", ".join(select[c] for c in rollup.target.column_names)
+        group_by = ", ".join(list(rollup.keys) + [bucket])
+        return conn.execute(
+            f"SELECT {expressions} FROM {table} "
+            f"WHERE {time_column} IS NOT NULL GROUP BY {group_by}"
+        ).fetchall()
+
+
+def enable_incremental_vacuum(conn: sqlite3.Connection) -> bool:
+    """
+    Перевести БД в auto_vacuum=INCREMENTAL
+
+    Для уже существующего файла требуется один полный VACUUM - он
+    выполняется один раз, на старте (до фоновых писателей). Периодическая
+    компакция только вызывает PRAGMA incremental_vacuum.
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        return False
+    if conn.in_transaction:
+        conn.commit()  # VACUUM невозможен внутри транзакции
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    logger.info("🧹 auto_vacuum=INCREMENTAL включён")
+    return True
+
+
+__all__ = [
+    "TimePartitionedTable",
+    "Rollup",
+    "PartitionCompactor",
+    "enable_incremental_vacuum",
+]
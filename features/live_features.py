@@ -0,0 +1,428 @@
+# -*- coding: utf-8 -*-
+"""
+Live ML Features для GIO Bot
+Инкрементальный расчёт того же вектора признаков, что и MLFeaturesExtractor,
+по одной закрытой свече за раз (O(1) на бар, без пересчёта DataFrame)
+
+Рекурсии повторяют pandas/ta: EWM (adjust=True/False), сглаживание Уайлдера
+для ATR/ADX, rolling-окна - поэтому значения совпадают с офлайн-экстрактором
+(см. tests/test_live_features.py).
+"""
+
+import math
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+
+NAN = float("nan")
+
+# Порядок колонок = feature_cols, на которых обучены scaler.pkl и XGBoost модель
+MODEL_FEATURE_COLUMNS = [
+    'open', 'high', 'low', 'close', 'volume',
+    'rsi', 'rsi_overbought', 'rsi_oversold',
+    'adx', 'adx_strong_trend',
+    'macd', 'macd_signal', 'macd_diff', 'macd_bullish',
+    'ema_20', 'ema_50', 'ema_200', 'price_above_ema20', 'price_above_ema50',
+    'bb_upper', 'bb_lower', 'bb_middle', 'bb_position',
+    'volume_sma_20', 'volume_ratio', 'volume_above_avg',
+    'buy_pressure', 'sell_pressure', 'cvd_approx', 'cvd_ma_20', 'cvd_direction',
+    'atr', 'atr_sma_20', 'atr_ratio', 'high_volatility', 'low_volatility', 'atr_pct',
+    'return_1', 'return_5', 'return_20',
+    'high_20', 'low_20', 'price_position',
+    'candle_body', 'candle_upper_wick', 'candle_lower_wick', 'bullish_candle',
+    'hour', 'day_of_week', 'is_weekend',
+    'session_ny', 'session_london', 'session_tokyo',
+]
+
+# Баров до первого полного вектора (MACD signal = 26 + 9 - 1, ADX = 2 * 14 - 1)
+WARMUP_BARS = 50
+
+
+def _div(a: float, b: float) -> float:
+    """Деление с семантикой pandas (x/0 = ±inf, 0/0 = NaN)"""
+    if a != a or b != b:
+        return NAN
+    if b == 0:
+        return NAN if a == 0 else math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+def _flag(condition: bool) -> float:
+    return 1.0 if condition else 0.0
+
+
+class _Ewm:
+    """pandas ewm().mean() по одному значению (ignore_na=False)"""
+
+    __slots__ = ("alpha", "adjust", "min_periods", "value", "old_wt", "nobs")
+
+    def __init__(self, alpha: float, adjust: bool, min_periods: int = 0):
+        self.alpha = alpha
+        self.adjust = adjust
+        self.min_periods = max(min_periods, 1)
+        self.value = NAN
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, x: float) -> float:
+        if x == x:
+            self.nobs += 1
+            if self.nobs == 1:
+                self.value = x
+            else:
+                new_wt = 1.0 if self.adjust else self.alpha
+                self.old_wt *= 1.0 - self.alpha
+                if self.value != x:
+                    self.value = (self.old_wt * self.value + new_wt * x) / (self.old_wt + new_wt)
+                if self.adjust:
+                    self.old_wt += new_wt
+                else:
+                    self.old_wt = 1.0
+        return self.value if self.nobs >= self.min_periods else NAN
+
+
+class _Rolling:
+    """Окно последних N значений (rolling(N) с min_periods=N)"""
+
+    __slots__ = ("window", "values")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+
+    def push(self, x: float):
+        self.values.append(x)
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.window
+
+    def mean(self) -> float:
+        return math.fsum(self.values) / self.window if self.full else NAN
+
+    def std(self) -> float:
+        """Стандартное отклонение с ddof=0"""
+        if not self.full:
+            return NAN
+        mean = math.fsum(self.values) / self.window
+        return math.sqrt(math.fsum((x - mean) ** 2 for x in self.values) / self.window)
+
+    def max(self) -> float:
+        return max(self.values) if self.full else NAN
+
+    def min(self) -> float:
+        return min(self.values) if self.full else NAN
+
+
+class _SymbolState:
+    """Состояние индикаторов одного символа"""
+
+    WINDOW = 14  # RSI / ATR / ADX
+
+    def __init__(self):
+        w = self.WINDOW
+        self.bars = 0
+        self.last_timestamp = None
+        self.prev = None  # (open, high, low, close)
+
+        self.rsi_up = _Ewm(1 / w, adjust=False, min_periods=w)
+        self.rsi_down = _Ewm(1 / w, adjust=False, min_periods=w)
+
+        self.macd_fast = _Ewm(2 / 13, adjust=False, min_periods=12)
+        self.macd_slow = _Ewm(2 / 27, adjust=False, min_periods=26)
+        self.macd_sign = _Ewm(2 / 10, adjust=False, min_periods=9)
+
+        self.ema = {span: _Ewm(2 / (span + 1), adjust=True) for span in (20, 50, 200)}
+
+        self.closes_20 = _Rolling(20)
+        self.volumes_20 = _Rolling(20)
+        self.highs_20 = _Rolling(20)
+        self.lows_20 = _Rolling(20)
+        self.cvd_20 = _Rolling(20)
+        self.atr_20 = _Rolling(20)
+        self.closes = deque(maxlen=21)
+        self.cvd = 0.0
+
+        # ATR (Уайлдер): первые w TR → среднее, далее рекурсия
+        self.tr_seed: List[float] = []
+        self.atr = 0.0
+
+        # ADX (ta.trend.ADXIndicator)
+        self.dm_seed = [0.0, 0.0, 0.0]  # Суммы TR/+DM/-DM за первые w баров
+        self.trs = self.dip = self.din = 0.0
+        self.dx_seed: List[float] = []
+        self.adx = 0.0
+
+        self.features: Dict[str, float] = {}
+
+    # ---------- ИНДИКАТОРЫ ----------
+
+    def _update_adx(self, high: float, low: float, prev) -> float:
+        w = self.WINDOW
+        t = self.bars  # Индекс текущего бара (0-based)
+        if prev is None:
+            return 0.0
+
+        _, prev_high, prev_low, prev_close = prev
+        dm = max(high, prev_close) - min(low, prev_close)
+        diff_up = high - prev_high
+        diff_down = prev_low - low
+        pos = abs(diff_up) if (diff_up > diff_down and diff_up > 0) else 0.0
+        neg = abs(diff_down) if (diff_down > diff_up and diff_down > 0) else 0.0
+
+        if t <= w:
+            seed = self.dm_seed
+            seed[0] += dm
+            seed[1] += pos
+            seed[2] += neg
+            if t < w:
+                return 0.0
+            self.trs, self.dip, self.din = seed
+        else:
+            self.trs = self.trs - self.trs / w + dm
+            self.dip = self.dip - self.dip / w + pos
+            self.din = self.din - self.din / w + neg
+
+        di_plus = 100 * (self.dip / self.trs) if self.trs != 0 else 0.0
+        di_minus = 100 * (self.din / self.trs) if self.trs != 0 else 0.0
+        total = di_plus + di_minus
+        dx = 100 * abs((di_plus - di_minus) / total) if total != 0 else 0.0
+
+        if t < 2 * w - 1:
+            self.dx_seed.append(dx)
+            return 0.0
+        if t == 2 * w - 1:
+            self.dx_seed.append(dx)
+            self.adx = float(np.mean(self.dx_seed))
+        else:
+            self.adx = (self.adx * (w - 1) + dx) / w
+        return self.adx
+
+    def _update_atr(self, high: float, low: float, prev) -> float:
+        w = self.WINDOW
+        if prev is None:
+            true_range = high - low
+        else:
+            prev_close = prev[3]
+            true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+        if self.bars < w:
+            self.tr_seed.append(true_range)
+            if self.bars == w - 1:
+                self.atr = float(np.mean(self.tr_seed))
+            return self.atr
+        self.atr = (self.atr * (w - 1) + true_range) / w
+        return self.atr
+
+    # ---------- ОБНОВЛЕНИЕ ----------
+
+    def update(self, timestamp, o: float, h: float, l: float, c: float, v: float) -> Dict[str, float]:
+        prev = self.prev
+        f: Dict[str, float] = {"open": o, "high": h, "low": l, "close": c, "volume": v}
+
+        # RSI
+        diff = c - prev[3] if prev is not None else NAN
+        ema_up = self.rsi_up.update(diff if diff > 0 else 0.0)
+        ema_down = self.rsi_down.update(-diff if diff < 0 else 0.0)
+        if ema_down == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - 100 / (1 + _div(ema_up, ema_down))
+        f["rsi"] = rsi
+        f["rsi_overbought"] = _flag(rsi > 70)
+        f["rsi_oversold"] = _flag(rsi < 30)
+
+        # ADX
+        adx = self._update_adx(h, l, prev)
+        f["adx"] = adx
+        f["adx_strong_trend"] = _flag(adx > 30)
+
+        # MACD
+        macd = self.macd_fast.update(c) - self.macd_slow.update(c)
+        macd_signal = self.macd_sign.update(macd)
+        f["macd"] = macd
+        f["macd_signal"] = macd_signal
+        f["macd_diff"] = macd - macd_signal
+        f["macd_bullish"] = _flag(f["macd_diff"] > 0)
+
+        # EMA
+        for span, ema in self.ema.items():
+            f[f"ema_{span}"] = ema.update(c)
+        f["price_above_ema20"] = _flag(c > f["ema_20"])
+        f["price_above_ema50"] = _flag(c > f["ema_50"])
+
+        # Bollinger Bands (20, 2σ)
+        self.closes_20.push(c)
+        bb_middle = self.closes_20.mean()
+        bb_std = self.closes_20.std()
+        f["bb_upper"] = bb_middle + 2 * bb_std
+        f["bb_lower"] = bb_middle - 2 * bb_std
+        f["bb_middle"] = bb_middle
+        f["bb_position"] = _div(c - f["bb_lower"], f["bb_upper"] - f["bb_lower"])
+
+        # Volume / CVD
+        self.volumes_20.push(v)
+        f["volume_sma_20"] = self.volumes_20.mean()
+        f["volume_ratio"] = _div(v, f["volume_sma_20"])
+        f["volume_above_avg"] = _flag(f["volume_ratio"] > 1.2)
+        buy_pressure = _div(c - l, h - l)
+        if buy_pressure != buy_pressure:
+            buy_pressure = 0.5
+        f["buy_pressure"] = buy_pressure
+        f["sell_pressure"] = 1 - buy_pressure
+        self.cvd += buy_pressure * v
+        self.cvd_20.push(self.cvd)
+        f["cvd_approx"] = self.cvd
+        f["cvd_ma_20"] = self.cvd_20.mean()
+        f["cvd_direction"] = _flag(self.cvd > f["cvd_ma_20"])
+
+        # Volatility
+        atr = self._update_atr(h, l, prev)
+        self.atr_20.push(atr)
+        f["atr"] = atr
+        f["atr_sma_20"] = self.atr_20.mean()
+        f["atr_ratio"] = _div(atr, f["atr_sma_20"])
+        f["high_volatility"] = _flag(f["atr_ratio"] > 1.2)
+        f["low_volatility"] = _flag(f["atr_ratio"] < 0.8)
+        f["atr_pct"] = _div(atr, c) * 100
+
+        # Price action
+        self.closes.append(c)
+        for k in (1, 5, 20):
+            f[f"return_{k}"] = (
+                _div(c, self.closes[-1 - k]) - 1 if len(self.closes) > k else NAN
+            )
+        self.highs_20.push(h)
+        self.lows_20.push(l)
+        f["high_20"] = self.highs_20.max()
+        f["low_20"] = self.lows_20.min()
+        f["price_position"] = _div(c - f["low_20"], f["high_20"] - f["low_20"])
+        f["candle_body"] = abs(c - o)
+        f["candle_upper_wick"] = h - max(o, c)
+        f["candle_lower_wick"] = min(o, c) - l
+        f["bullish_candle"] = _flag(c > o)
+
+        # Temporal (UTC)
+        hour, day_of_week = _hour_and_weekday(timestamp)
+        f["hour"] = float(hour)
+        f["day_of_week"] = float(day_of_week)
+        f["is_weekend"] = _flag(day_of_week >= 5)
+        f["session_ny"] = _flag(14 <= hour < 21)
+        f["session_london"] = _flag(8 <= hour < 16)
+        f["session_tokyo"] = _flag(0 <= hour < 9)
+
+        self.prev = (o, h, l, c)
+        self.bars += 1
+        self.features = f
+        return f
+
+
+def _hour_and_weekday(timestamp):
+    """Час и день недели (Пн=0) из epoch ms/сек или datetime-подобного объекта"""
+    if hasattr(timestamp, "hour"):
+        return timestamp.hour, timestamp.weekday()
+    seconds = float(timestamp)
+    if seconds > 1e11:  # Миллисекунды
+        seconds /= 1000
+    tm = time.gmtime(seconds)
+    return tm.tm_hour, tm.tm_wday
+
+
+class LiveFeatureBuilder:
+    """
+    Инкрементальные ML признаки по символам
+
+    update() вызывается на КАЖДОЙ закрытой свече (по возрастанию времени);
+    повторная/старая свеча игнорируется.
+    """
+
+    def __init__(
+        self,
+        feature_columns: Sequence[str] = MODEL_FEATURE_COLUMNS,
+        warmup_bars: int = WARMUP_BARS,
+    ):
+        self.feature_columns = list(feature_columns)
+        self.warmup_bars = warmup_bars
+        self._states: Dict[str, _SymbolState] = {}
+
+    def update(self, symbol: str, candle: Dict) -> bool:
+        """
+        Добавить закрытую свечу
+
+        Args:
+            candle: {'timestamp', 'open', 'high', 'low', 'close', 'volume'}
+
+        Returns:
+            True если свеча новая и состояние обновлено
+        """
+        state = self._states.get(symbol)
+        if state is None:
+            state = self._states[symbol] = _SymbolState()
+
+        timestamp = candle["timestamp"]
+        if state.last_timestamp is not None and timestamp <= state.last_timestamp:
+            return False
+
+        state.update(
+            timestamp,
+            float(candle["open"]),
+            float(candle["high"]),
+            float(candle["low"]),
+            float(candle["close"]),
+            float(candle.get("volume", 0.0)),
+        )
+        state.last_timestamp = timestamp
+        return True
+
+    def extend(self, symbol: str, candles: Iterable[Dict]) -> int:
+        """Добавить историю свечей (по возрастанию времени), вернуть число новых"""
+        return sum(self.update(symbol, candle) for candle in candles)
+
+    def is_ready(self, symbol: str) -> bool:
+        state = self._states.get(symbol)
+        return state is not None and state.bars >= self.warmup_bars
+
+    def bar_count(self, symbol: str) -> int:
+        state = self._states.get(symbol)
+        return state.bars if state else 0
+
+    def last_timestamp(self, symbol: str):
+        state = self._states.get(symbol)
+        return state.last_timestamp if state else None
+
+    def features(self, symbol: str) -> Dict[str, float]:
+        """Признаки последней свечи по имени"""
+        state = self._states.get(symbol)
+        return dict(state.features) if state else {}
+
+    def vector(self, symbol: str) -> Optional[np.ndarray]:
+        """Вектор признаков последней свечи в порядке feature_columns"""
+        state = self._states.get(symbol)
+        if state is None or not state.features:
+            return None
+        features = state.features
+        return np.fromiter(
+            (features[name] for name in self.feature_columns),
+            dtype=np.float64,
+            count=len(self.feature_columns),
+        )
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._states)
+
+    def reset(self, symbol: Optional[str] = None):
+        if symbol:
+            self._states.pop(symbol, None)
+        else:
+            self._states.clear()
+
+
+__all__ = [
+    "LiveFeatureBuilder",
+    "MODEL_FEATURE_COLUMNS",
+    "WARMUP_BARS",
+]
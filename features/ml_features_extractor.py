@@ -6,10 +6,14 @@ ML Features Extractor для GIO Bot
 
 import sys
 import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import pandas as pd
 import numpy as np
 import ta
 
+from data.dataset_cache import read_csv_cached
+
 class MLFeaturesExtractor:
     """Извлечение ML features из market data"""
 
@@ -184,8 +188,7 @@ class MLFeaturesExtractor:
 def main():
     """Test feature extraction"""
     # Загрузить данные
-    df = pd.read_csv("data/ml_training/BTCUSDT_5min_180d.csv")
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    df = read_csv_cached("data/ml_training/BTCUSDT_5min_180d.csv")
 
     # Extract features
     extractor = MLFeaturesExtractor()
@@ -14,6 +14,7 @@ from datetime import datetime, timedelta
 from telebot.async_telebot import AsyncTeleBot
 from telebot.types import Message
 from config.settings import logger, TRACKED_SYMBOLS
+from utils.telegram_queue import get_telegram_queue
 
 
 class DashboardCommands:
@@ -284,31 +285,48 @@ class DashboardCommands:
 
             end_time = datetime.now() + timedelta(minutes=60)
             update_count = 0
+            outbound = get_telegram_queue()
+
+            async def edit(text: str):
+                # ✅ ПРАВИЛЬНЫЙ ФОРМАТ ДЛЯ TELEBOT
+                return await self.telegram_bot.edit_message_text(
+                    text,
+                    message.chat.id,
+                    message.message_id,
+                    parse_mode="HTML",  # ✅ Правильно
+                    disable_web_page_preview=True,  # ✅ Отключает превью ссылок
+                )
 
             while datetime.now() < end_time:
                 await asyncio.sleep(60)  # Ждём 60 секунд
 
                 try:
-                    update_count += 1
                     time_left = int((end_time - datetime.now()).total_seconds() / 60)
 
                     # Генерируем новый dashboard
-                    dashboard_text = await self.dashboard_handler._build_dashboard(
-                        symbol
-                    )
+                    body = await self.dashboard_handler._build_dashboard(symbol)
 
                     # Добавляем индикатор
-                    dashboard_text += f"\n\n🔄 <i>Обновлено #{update_count} | Осталось ~{time_left} мин</i>"
+                    dashboard_text = (
+                        body
+                        + f"\n\n🔄 <i>Обновлено #{update_count + 1} | Осталось ~{time_left} мин</i>"
+                    )
 
-                    # ✅ ПРАВИЛЬНЫЙ ФОРМАТ ДЛЯ TELEBOT
-                    await self.telegram_bot.edit_message_text(
+                    # Через очередь: неизменённые данные не редактируются
+                    edited = await outbound.edit(
+                        (message.chat.id, message.message_id),
                         dashboard_text,
-                        message.chat.id,
-                        message.message_id,
-                        parse_mode="HTML",  # ✅ Правильно
-                        disable_web_page_preview=True,  # ✅ Отключает превью ссылок
+                        edit,
+                        fingerprint=body,
+                        wait=True,
                     )
+                    if edited is False:
+                        logger.debug("Dashboard unchanged, skipping")
+                        continue
+                    if edited is None:
+                        break
 
+                    update_count += 1
                     logger.info(
                         f"🔄 Dashboard updated #{update_count} for user {user_id}"
                     )
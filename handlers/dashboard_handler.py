@@ -12,6 +12,8 @@ from telegram import Update
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 from config.settings import logger
+from utils.rate_limiter import request_priority
+from utils.telegram_queue import get_telegram_queue
 
 
 class GIODashboardHandler:
@@ -45,8 +47,9 @@ class GIODashboardHandler:
                 f"🔍 Загружаю GIO Intelligence для {symbol}..."
             )
 
-            # Собираем данные
-            dashboard = await self.build_dashboard(symbol)
+            # Собираем данные (дашборд не отнимает квоту у торговых запросов)
+            with request_priority("low"):
+                dashboard = await self.build_dashboard(symbol)
 
             # Отправляем дашборд
             await loading.delete()
@@ -239,22 +242,43 @@ class GIODashboardHandler:
 
             end_time = datetime.now() + timedelta(minutes=60)
             update_count = 0
+            outbound = get_telegram_queue()
+
+            async def edit(text: str):
+                return await message.edit_text(text, parse_mode="HTML")
 
             while datetime.now() < end_time:
                 await asyncio.sleep(60)  # Ждём 60 секунд
 
                 try:
-                    update_count += 1
                     time_left = int((end_time - datetime.now()).total_seconds() / 60)
 
                     # Генерируем новый dashboard
-                    dashboard_text = await self._build_dashboard(symbol)
+                    with request_priority("low"):
+                        body = await self._build_dashboard(symbol)
 
                     # Добавляем индикатор с счётчиком
-                    dashboard_text += f"\n\n🔄 <i>Обновлено #{update_count} | Осталось ~{time_left} мин</i>"
+                    dashboard_text = (
+                        body
+                        + f"\n\n🔄 <i>Обновлено #{update_count + 1} | Осталось ~{time_left} мин</i>"
+                    )
+
+                    # Пытаемся обновить сообщение (без счётчика в сравнении: данные те же - не редактируем)
+                    edited = await outbound.edit(
+                        (message.chat_id, message.message_id),
+                        dashboard_text,
+                        edit,
+                        fingerprint=body,
+                        wait=True,
+                    )
+                    if edited is False:
+                        logger.debug("Dashboard data unchanged, skipping update")
+                        continue
+                    if edited is None:
+                        # Ошибка уже залогирована очередью (или сообщение отброшено)
+                        break
 
-                    # Пытаемся обновить сообщение
-                    await message.edit_text(dashboard_text, parse_mode="HTML")
+                    update_count += 1
                     logger.info(
                         f"🔄 Dashboard updated #{update_count} for user {user_id}"
                     )
@@ -382,21 +406,16 @@ class GIODashboardHandler:
     async def _get_top_pairs_by_volume(self, limit: int = 10) -> list:
         """Получить топ пары по объёму торгов за 24ч"""
         try:
-            # ✅ ИСПРАВЛЕНИЕ: Используем _client (приватный атрибут)
-            response = await self.bot.bybit_connector._client.get_tickers(
-                category="linear"
-            )
-            tickers = response.get("result", {}).get("list", [])
-
-            usdt_pairs = []
-            for t in tickers:
-                if t.get("symbol", "").endswith("USDT"):
-                    volume = float(t.get("volume24h", 0)) * float(t.get("lastPrice", 0))
-                    usdt_pairs.append({"symbol": t["symbol"], "volume": volume})
-
-            # Сортируем по объёму
-            usdt_pairs.sort(key=lambda x: x["volume"], reverse=True)
-            return usdt_pairs[:limit]
+            # Снимок всех тикеров (один запрос на все контракты)
+            connector = self.bot.bybit_connector
+            snapshot = connector.ticker_snapshot
+            if not snapshot.is_fresh(connector.snapshot_max_age):
+                await connector.refresh_ticker_snapshot()
+
+            top_pairs = snapshot.top_by_turnover(limit, quote="USDT")
+            if not top_pairs:
+                raise ValueError("ticker snapshot пуст")
+            return top_pairs
         except Exception as e:
             logger.error(f"Error fetching top pairs: {e}")
             # Возвращаем заглушку
@@ -2,7 +2,7 @@ import pandas as pd
 import numpy as np
 import logging
 from typing import Dict, List, Optional, Tuple
-from utils.helpers import validate_candle_data
+from utils.validators import validate_candle_data
 
 logger = logging.getLogger(__name__)
 
@@ -96,22 +96,10 @@ def init_database():
     # ============================================
     # ТАБЛИЦЯ 3: large_trades
     # ============================================
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS large_trades (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        symbol TEXT NOT NULL,
-        side TEXT NOT NULL,
-        size REAL NOT NULL,
-        size_usd REAL NOT NULL,
-        price REAL NOT NULL,
-        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-    )
-    """
-    )
+    # Партиции по дням (large_trades_pYYYYMMDD) + view large_trades
+    from analytics.whale_activity_tracker import large_trades_table
 
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_large_trades_symbol ON large_trades(symbol)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_large_trades_timestamp ON large_trades(timestamp)")
+    large_trades_table().setup(conn)
 
     print("✅ Таблиця 'large_trades' створена")
 
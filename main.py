@@ -107,7 +107,7 @@ try:
         logger.warning("   Бот будет работать БЕЗ автоматического отслеживания TP/SL")
 
     try:
-        from systems.enhanced_alerts_system import EnhancedAlertsSystem  # type: ignore
+        from alerts.enhanced_alerts_system import EnhancedAlertsSystem  # type: ignore
 
         logger.info("✅ EnhancedAlertsSystem импортирован")
     except ImportError as e:
@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+Компактная модель данных для горячих путей
+- TradeRecord / Fill: slotted неизменяемые записи
+- TradeBuffer: кольцевой буфер сделок struct-of-arrays (array('d'/'q'/'b'))
+- BookSide: сторона стакана struct-of-arrays вместо [[price, size], ...]
+
+Словари остаются только на границах (API, Telegram, БД): to_dict / to_dicts /
+to_levels и from_dict / from_levels.
+"""
+
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class TradeRecord:
+    """Одна сделка (вид на элемент TradeBuffer)"""
+
+    timestamp: int
+    price: float
+    size: float
+    is_buy: bool
+
+    @property
+    def side(self) -> str:
+        return "BUY" if self.is_buy else "SELL"
+
+    @property
+    def delta(self) -> float:
+        return self.size if self.is_buy else -self.size
+
+    def to_dict(self) -> Dict:
+        return {
+            "timestamp": self.timestamp,
+            "side": self.side,
+            "volume": self.size,
+            "price": self.price,
+            "delta": self.delta,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class Fill:
+    """Исполнение (крупная сделка, whale event, fill позиции)"""
+
+    symbol: str
+    side: str  # "BUY" / "SELL"
+    price: float
+    quantity: float
+    timestamp: float
+    exchange: str = ""
+
+    @property
+    def value(self) -> float:
+        """USD объём"""
+        return self.price * self.quantity
+
+    @classmethod
+    def from_dict(cls, data: Dict, symbol: str = "", exchange: str = "") -> "Fill":
+        return cls(
+            symbol=data.get("symbol", symbol),
+            side=str(data.get("side", "")).upper(),
+            price=float(data.get("price", 0.0)),
+            quantity=float(data.get("quantity", data.get("size", 0.0))),
+            timestamp=data.get("timestamp", 0),
+            exchange=data.get("exchange", exchange),
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "symbol": self.symbol,
+            "side": self.side,
+            "price": self.price,
+            "quantity": self.quantity,
+            "value": self.value,
+            "timestamp": self.timestamp,
+            "exchange": self.exchange,
+        }
+
+
+class TradeBuffer:
+    """
+    Кольцевой буфер сделок фиксированной ёмкости (struct-of-arrays)
+
+    25 байт на сделку против ~200 байт у dict с 5 ключами.
+    Суммы по всему буферу (delta / volume / buy) поддерживаются инкрементально.
+    """
+
+    __slots__ = (
+        "capacity",
+        "_ts",
+        "_price",
+        "_size",
+        "_side",
+        "_head",
+        "_count",
+        "_appends",
+        "delta_total",
+        "volume_total",
+        "buy_total",
+    )
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+
+        self.capacity = capacity
+        self._ts = array("q", bytes(8 * capacity))
+        self._price = array("d", bytes(8 * capacity))
+        self._size = array("d", bytes(8 * capacity))
+        self._side = array("b", bytes(capacity))  # +1 BUY / -1 SELL
+        self._head = 0  # Индекс следующей записи
+        self._count = 0
+        self._appends = 0
+
+        self.delta_total = 0.0
+        self.volume_total = 0.0
+        self.buy_total = 0.0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: int, price: float, size: float, is_buy: bool):
+        """Добавление сделки (вытесняет самую старую при заполнении)"""
+        i = self._head
+        side = 1 if is_buy else -1
+
+        if self._count == self.capacity:
+            old_size = self._size[i]
+            self.delta_total -= old_size * self._side[i]
+            self.volume_total -= old_size
+            if self._side[i] > 0:
+                self.buy_total -= old_size
+        else:
+            self._count += 1
+
+        self._ts[i] = int(timestamp)
+        self._price[i] = price
+        self._size[i] = size
+        self._side[i] = side
+
+        self.delta_total += size * side
+        self.volume_total += size
+        if is_buy:
+            self.buy_total += size
+
+        self._head = (i + 1) % self.capacity
+
+        # Полный пересчёт раз в capacity вставок (сброс ошибки float)
+        self._appends += 1
+        if self._appends >= self.capacity:
+            self._recompute_totals()
+
+    def append_dict(self, trade: Dict):
+        """Граница: dict сделки → буфер"""
+        side = str(trade.get("side", "")).upper()
+        self.append(
+            trade.get("timestamp", 0),
+            float(trade.get("price", 0.0)),
+            float(trade.get("volume", trade.get("size", 0.0))),
+            side == "BUY",
+        )
+
+    def _indices(self, n: Optional[int] = None) -> range:
+        """Физические индексы последних n сделок (от старых к новым)"""
+        n = self._count if n is None else max(0, min(n, self._count))
+        start = self._head - n
+        return range(start, start + n)
+
+    def _recompute_totals(self):
+        delta = volume = buy = 0.0
+        for j in self._indices():
+            i = j % self.capacity
+            size = self._size[i]
+            volume += size
+            if self._side[i] > 0:
+                delta += size
+                buy += size
+            else:
+                delta -= size
+        self.delta_total, self.volume_total, self.buy_total = delta, volume, buy
+        self._appends = 0
+
+    def sums(self, n: Optional[int] = None) -> Tuple[float, float, float]:
+        """(delta, volume, buy_volume) по последним n сделкам"""
+        if n is None or n >= self._count:
+            return self.delta_total, self.volume_total, self.buy_total
+
+        delta = volume = buy = 0.0
+        cap = self.capacity
+        for j in self._indices(n):
+            i = j % cap
+            size = self._size[i]
+            volume += size
+            if self._side[i] > 0:
+                delta += size
+                buy += size
+            else:
+                delta -= size
+        return delta, volume, buy
+
+    def last(self, n: Optional[int] = None) -> Iterator[TradeRecord]:
+        """Последние n сделок (от старых к новым)"""
+        cap = self.capacity
+        for j in self._indices(n):
+            i = j % cap
+            yield TradeRecord(
+                self._ts[i], self._price[i], self._size[i], self._side[i] > 0
+            )
+
+    def __iter__(self) -> Iterator[TradeRecord]:
+        return self.last()
+
+    def to_dicts(self, n: Optional[int] = None) -> List[Dict]:
+        """Граница: буфер → список dict"""
+        return [trade.to_dict() for trade in self.last(n)]
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+        self._appends = 0
+        self.delta_total = self.volume_total = self.buy_total = 0.0
+
+    def nbytes(self) -> int:
+        """Размер данных буфера в байтах"""
+        return sum(
+            a.itemsize * len(a) for a in (self._ts, self._price, self._size, self._side)
+        )
+
+
+class BookSide:
+    """
+    Сторона стакана struct-of-arrays: цены и объёмы в двух array('d')
+
+    Уровни хранятся в порядке лучшей цены: bids по убыванию, asks по возрастанию.
+    """
+
+    __slots__ = ("prices", "sizes")
+
+    def __init__(self, prices: Optional[array] = None, sizes: Optional[array] = None):
+        self.prices = prices if prices is not None else array("d")
+        self.sizes = sizes if sizes is not None else array("d")
+
+    @classmethod
+    def from_levels(cls, levels: Iterable, descending: bool = False) -> "BookSide":
+        """
+        Граница: [[price, size], ...] / [["price", "size"]] (строки API) /
+        [{"price": .., "size": ..}] → BookSide
+        """
+        prices = array("d")
+        sizes = array("d")
+        for level in levels:
+            if isinstance(level, dict):
+                price, size = level.get("price", 0.0), level.get("size", 0.0)
+            else:
+                price, size = level[0], level[1]
+            prices.append(float(price))
+            sizes.append(float(size))
+
+        # API обычно присылает уже отсортированные уровни
+        ordered = all(
+            (prices[i] >= prices[i + 1]) if descending else (prices[i] <= prices[i + 1])
+            for i in range(len(prices) - 1)
+        )
+        if not ordered:
+            pairs = sorted(zip(prices, sizes), reverse=descending)
+            prices = array("d", (p for p, _ in pairs))
+            sizes = array("d", (s for _, s in pairs))
+
+        return cls(prices, sizes)
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def best(self) -> Optional[Tuple[float, float]]:
+        """Лучший уровень (price, size)"""
+        if not self.prices:
+            return None
+        return self.prices[0], self.sizes[0]
+
+    def total_size(self, depth: Optional[int] = None) -> float:
+        """Суммарный объём первых depth уровней"""
+        return sum(self.sizes[:depth] if depth else self.sizes)
+
+    def notional(self, depth: Optional[int] = None) -> float:
+        """Суммарный USD объём первых depth уровней"""
+        n = len(self.prices) if depth is None else min(depth, len(self.prices))
+        prices, sizes = self.prices, self.sizes
+        return sum(prices[i] * sizes[i] for i in range(n))
+
+    def to_levels(self) -> List[List[float]]:
+        """Граница: BookSide → [[price, size], ...]"""
+        return [[p, s] for p, s in zip(self.prices, self.sizes)]
+
+    def nbytes(self) -> int:
+        return self.prices.itemsize * len(self.prices) + self.sizes.itemsize * len(
+            self.sizes
+        )
+
+
+def levels_from_book(book: Dict) -> Tuple[BookSide, BookSide]:
+    """Граница: {'bids': [...], 'asks': [...]} → (bids, asks)"""
+    return (
+        BookSide.from_levels(book.get("bids", []), descending=True),
+        BookSide.from_levels(book.get("asks", []), descending=False),
+    )
+
+
+__all__ = [
+    "TradeRecord",
+    "Fill",
+    "TradeBuffer",
+    "BookSide",
+    "levels_from_book",
+]
@@ -1,4 +1,4 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from enum import Enum
 from typing import Dict, List, Optional, Union, Any
 from datetime import datetime
@@ -56,7 +56,7 @@ class AlertTypeEnum(Enum):
     DATABASE_ERROR = "database_error"
 
 
-@dataclass
+@dataclass(slots=True)
 class TradingSignal:
     """Базовый торговый сигнал"""
     symbol: str
@@ -75,8 +75,12 @@ class TradingSignal:
     timestamp: int = field(default_factory=current_epoch_ms)
     reason: str = ""
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Словарь полей (slotted класс без __dict__)"""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
 
-@dataclass
+
+@dataclass(slots=True)
 class EnhancedTradingSignal(TradingSignal):
     """Расширенный торговый сигнал с дополнительным контекстом"""
     indicators: Dict[str, Any] = field(default_factory=dict)
@@ -87,7 +91,7 @@ class EnhancedTradingSignal(TradingSignal):
     veto_reasons: List[VetoReasonEnum] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class Alert:
     """Системный алерт"""
     alert_type: AlertTypeEnum
@@ -98,5 +102,9 @@ class Alert:
     data: Dict[str, Any] = field(default_factory=dict)
     resolved: bool = False
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Словарь полей (slotted класс без __dict__)"""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
 
 # Остальные dataclass'ы...
@@ -14,6 +14,8 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 import pickle
 
+from data.dataset_cache import read_csv_cached
+
 class TrainingDataPreparer:
     """Подготовка данных для обучения ML модели"""
 
@@ -23,8 +25,7 @@ class TrainingDataPreparer:
     def load_features(self, features_path):
         """Загрузить вычисленные features"""
         print(f"📥 Загружаю features из {features_path}...")
-        df_features = pd.read_csv(features_path)
-        df_features['timestamp'] = pd.to_datetime(df_features['timestamp'])
+        df_features = read_csv_cached(features_path)
 
         # ✅ НОВОЕ: Очистить inf/nan сразу
         print(f"   🧹 Очистка inf/nan в features...")
@@ -42,8 +43,7 @@ class TrainingDataPreparer:
     def load_backtest_results(self, backtest_csv):
         """Загрузить результаты backtesta"""
         print(f"📥 Загружаю результаты backtesta из {backtest_csv}...")
-        df_trades = pd.read_csv(backtest_csv)
-        df_trades['entry_time'] = pd.to_datetime(df_trades['entry_time'])
+        df_trades = read_csv_cached(backtest_csv, copy=True)
         print(f"   ✅ Загружено {len(df_trades)} сделок")
         return df_trades
 
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк памяти: dict/list модель vs компактная (models.compact_data)
+Байт на сделку (CVD буфер) и на уровень стакана (tracemalloc)
+
+Запуск: python scripts/benchmark_compact_memory.py [--trades 100000] [--levels 20]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import tracemalloc
+from collections import deque
+
+from models.compact_data import BookSide, TradeBuffer
+
+
+def measure(build):
+    """Аллоцированные байты, удерживаемые результатом build()"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    obj = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del obj
+    return allocated
+
+
+def make_trades(n):
+    rng = random.Random(42)
+    ts = 1_700_000_000_000
+    return [
+        (ts + i, 50_000 + rng.uniform(-500, 500), rng.uniform(0.001, 2.0), rng.random() < 0.5)
+        for i in range(n)
+    ]
+
+
+def trades_as_dicts(trades):
+    buf = deque(maxlen=len(trades))
+    for ts, price, size, is_buy in trades:
+        buf.append(
+            {
+                "timestamp": ts,
+                "side": "BUY" if is_buy else "SELL",
+                "volume": size,
+                "price": price,
+                "delta": size if is_buy else -size,
+            }
+        )
+    return buf
+
+
+def trades_as_buffer(trades):
+    buf = TradeBuffer(len(trades))
+    for ts, price, size, is_buy in trades:
+        buf.append(ts, price, size, is_buy)
+    return buf
+
+
+def make_books(count, depth):
+    rng = random.Random(7)
+    return [
+        [[f"{50_000 - i * 0.1:.1f}", f"{rng.uniform(0.01, 5):.3f}"] for i in range(depth)]
+        for _ in range(count)
+    ]
+
+
+def books_as_lists(raw):
+    return [[[float(p), float(s)] for p, s in book] for book in raw]
+
+
+def books_as_arrays(raw):
+    return [BookSide.from_levels(book, descending=True) for book in raw]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact data model memory benchmark")
+    parser.add_argument("--trades", type=int, default=100_000)
+    parser.add_argument("--levels", type=int, default=20)
+    parser.add_argument("--books", type=int, default=1_000)
+    args = parser.parse_args()
+
+    trades = make_trades(args.trades)
+    dict_bytes = measure(lambda: trades_as_dicts(trades))
+    buffer_bytes = measure(lambda: trades_as_buffer(trades))
+
+    raw_books = make_books(args.books, args.levels)
+    total_levels = args.books * args.levels
+    list_bytes = measure(lambda: books_as_lists(raw_books))
+    array_bytes = measure(lambda: books_as_arrays(raw_books))
+
+    print(f"{'':24}{'before':>12}{'after':>12}{'ratio':>8}")
+    print(
+        f"{'bytes / trade':24}{dict_bytes / args.trades:>12.1f}"
+        f"{buffer_bytes / args.trades:>12.1f}{dict_bytes / buffer_bytes:>7.1f}x"
+    )
+    print(
+        f"{'bytes / book level':24}{list_bytes / total_levels:>12.1f}"
+        f"{array_bytes / total_levels:>12.1f}{list_bytes / array_bytes:>7.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
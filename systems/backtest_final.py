@@ -4,11 +4,16 @@
 SL=1.2x TP=3.0x ADX=20-70 RSI=40-70 Vol=1.0x EMA=True
 """
 
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import pandas as pd
 import numpy as np
 import ta
 from datetime import datetime
-import os
+
+from data.dataset_cache import read_csv_cached
 
 
 class FinalBacktest:
@@ -21,7 +26,7 @@ class FinalBacktest:
 
     def load_and_prep(self):
         """Загрузка + индикаторы"""
-        self.df = pd.read_csv(self.csv_path)
+        self.df = read_csv_cached(self.csv_path)
 
         atr_ind = ta.volatility.AverageTrueRange(
             self.df['high'], self.df['low'], self.df['close'], window=14
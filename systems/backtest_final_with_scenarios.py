@@ -4,12 +4,18 @@
 Использует TOP-1 параметры + TOP-5 сценарии (SCN_001-005)
 """
 
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import pandas as pd
 import numpy as np
 import ta
 import json
 from datetime import datetime
-import os
+
+from trading.exit_simulator import simulate_exit
+from data.dataset_cache import read_csv_cached
 
 
 class FinalBacktestWithScenarios:
@@ -45,7 +51,7 @@ class FinalBacktestWithScenarios:
 
     def load_and_prep(self):
         """Загрузка + индикаторы"""
-        self.df = pd.read_csv(self.csv_path)
+        self.df = read_csv_cached(self.csv_path)
 
         atr_ind = ta.volatility.AverageTrueRange(
             self.df['high'], self.df['low'], self.df['close'], window=14
@@ -84,106 +90,110 @@ class FinalBacktestWithScenarios:
         print(f"✅ TOP-5 сценарии: {[s.get('id', 'UNKNOWN') for s in self.scenarios]}")
         print("="*100 + "\n")
 
-        position = None
         trade_num = 0
         scenario_idx = 0  # Для ротации по сценариям
+        busy_until = -1  # Бар выхода открытой позиции
+
+        highs = self.df['high'].to_numpy(dtype=float)
+        lows = self.df['low'].to_numpy(dtype=float)
+        closes = self.df['close'].to_numpy(dtype=float)
 
         for i in range(100, len(self.df)):
+            if i <= busy_until:
+                continue
+
             row = self.df.iloc[i]
 
             # ВХОД
-            if position is None:
-                try:
-                    # TOP-1 ФИЛЬТРЫ
-                    if pd.isna(row['adx']) or not (MIN_ADX <= row['adx'] <= MAX_ADX):
-                        continue
-
-                    if pd.isna(row['volume_sma']) or row['volume_sma'] == 0:
-                        continue
-                    vol_ratio = row['volume'] / row['volume_sma']
-                    if vol_ratio < MIN_VOL_MULT:
-                        continue
+            try:
+                # TOP-1 ФИЛЬТРЫ
+                if pd.isna(row['adx']) or not (MIN_ADX <= row['adx'] <= MAX_ADX):
+                    continue
 
-                    if pd.isna(row['rsi']) or not (MIN_RSI <= row['rsi'] <= MAX_RSI):
-                        continue
+                if pd.isna(row['volume_sma']) or row['volume_sma'] == 0:
+                    continue
+                vol_ratio = row['volume'] / row['volume_sma']
+                if vol_ratio < MIN_VOL_MULT:
+                    continue
 
-                    if USE_EMA:
-                        if not (row['close'] > row['ema_20'] > row['ema_50']):
-                            continue
-
-                    # ВХОД - используем TOP-5 сценарии по ротации
-                    trade_num += 1
-                    scenario = self.scenarios[scenario_idx % len(self.scenarios)]
-                    scenario_id = scenario.get('id', f'SCN_{scenario_idx}')
-                    scenario_name = scenario.get('name', 'Unknown')
-
-                    atr_value = row['atr']
-
-                    position = {
-                        'trade_num': trade_num,
-                        'entry_time': row['timestamp'],
-                        'entry_price': row['close'],
-                        'entry_atr': atr_value,
-                        'entry_adx': row['adx'],
-                        'entry_rsi': row['rsi'],
-                        'entry_bar': i,
-                        'tp': row['close'] + (atr_value * TP_MULT),
-                        'sl_price': row['close'] - (atr_value * SL_MULT),
-                        'scenario_id': scenario_id,
-                        'scenario_name': scenario_name,
-                    }
-
-                    scenario_idx += 1
-
-                    print(f"[{trade_num:2d}] ENTRY @ ${row['close']:>10.2f} | {scenario_id} ({scenario_name}) | ADX={row['adx']:>5.1f} RSI={row['rsi']:>5.1f}")
-
-                except Exception as e:
-                    print(f"❌ Error entry: {e}")
+                if pd.isna(row['rsi']) or not (MIN_RSI <= row['rsi'] <= MAX_RSI):
                     continue
 
-            # ВЫХОД
-            elif position is not None:
-                try:
-                    tp = position['tp']
-                    sl_price = position['sl_price']
-
-                    if row['high'] >= tp:
-                        exit_price = tp
-                        exit_reason = "TP"
-                    elif row['low'] <= sl_price:
-                        exit_price = sl_price
-                        exit_reason = "SL"
-                    else:
+                if USE_EMA:
+                    if not (row['close'] > row['ema_20'] > row['ema_50']):
                         continue
 
-                    pnl = exit_price - position['entry_price']
-                    pnl_pct = (pnl / position['entry_price']) * 100
-                    duration_bars = i - position['entry_bar']
-
-                    self.trades.append({
-                        'trade_num': position['trade_num'],
-                        'entry_time': position['entry_time'],
-                        'entry_price': position['entry_price'],
-                        'exit_time': row['timestamp'],
-                        'exit_price': exit_price,
-                        'exit_reason': exit_reason,
-                        'pnl': pnl,
-                        'pnl_pct': pnl_pct,
-                        'duration_bars': duration_bars,
-                        'scenario_id': position['scenario_id'],
-                        'scenario_name': position['scenario_name'],
-                        'tp_level': position['tp'],
-                        'sl_level': position['sl_price'],
-                        'result': 'WIN' if pnl > 0 else 'LOSS',
-                    })
-
-                    status = "✅" if pnl > 0 else "❌"
-                    print(f"    EXIT @ ${exit_price:>10.2f} | {exit_reason} | {status} {pnl_pct:+6.2f}%")
-
-                    position = None
-
-                except:
-                    continue
+                # ВХОД - используем TOP-5 сценарии по ротации
+                trade_num += 1
+                scenario = self.scenarios[scenario_idx % len(self.scenarios)]
+                scenario_id = scenario.get('id', f'SCN_{scenario_idx}')
+                scenario_name = scenario.get('name', 'Unknown')
+
+                atr_value = row['atr']
+
+                position = {
+                    'trade_num': trade_num,
+                    'entry_time': row['timestamp'],
+                    'entry_price': row['close'],
+                    'entry_atr': atr_value,
+                    'entry_adx': row['adx'],
+                    'entry_rsi': row['rsi'],
+                    'entry_bar': i,
+                    'tp': row['close'] + (atr_value * TP_MULT),
+                    'sl_price': row['close'] - (atr_value * SL_MULT),
+                    'scenario_id': scenario_id,
+                    'scenario_name': scenario_name,
+                }
+
+                scenario_idx += 1
+
+                print(f"[{trade_num:2d}] ENTRY @ ${row['close']:>10.2f} | {scenario_id} ({scenario_name}) | ADX={row['adx']:>5.1f} RSI={row['rsi']:>5.1f}")
+
+            except Exception as e:
+                print(f"❌ Error entry: {e}")
+                continue
+
+            # ВЫХОД (общий first-touch движок)
+            result = simulate_exit(
+                highs, lows, closes,
+                entry_bar=i,
+                direction='LONG',
+                entry_price=position['entry_price'],
+                stop_loss=position['sl_price'],
+                tp1=position['tp'],
+            )
+
+            if result['exit_reason'] == 'TIMEOUT':
+                break  # Позиция не закрылась до конца данных
+
+            exit_bar = result['exit_bar']
+            exit_price = result['exit_price']
+            exit_reason = result['exit_reason']
+            busy_until = exit_bar
+
+            pnl = exit_price - position['entry_price']
+            pnl_pct = (pnl / position['entry_price']) * 100
+            duration_bars = exit_bar - position['entry_bar']
+
+            self.trades.append({
+                'trade_num': position['trade_num'],
+                'entry_time': position['entry_time'],
+                'entry_price': position['entry_price'],
+                'exit_time': self.df.iloc[exit_bar]['timestamp'],
+                'exit_price': exit_price,
+                'exit_reason': exit_reason,
+                'pnl': pnl,
+                'pnl_pct': pnl_pct,
+                'duration_bars': duration_bars,
+                'scenario_id': position['scenario_id'],
+                'scenario_name': position['scenario_name'],
+                'tp_level': position['tp'],
+                'sl_level': position['sl_price'],
+                'result': 'WIN' if pnl > 0 else 'LOSS',
+            })
+
+            status = "✅" if pnl > 0 else "❌"
+            print(f"    EXIT @ ${exit_price:>10.2f} | {exit_reason} | {status} {pnl_pct:+6.2f}%")
 
         print(f"\n✅ Завершено! Всего сделок: {len(self.trades)}")
 
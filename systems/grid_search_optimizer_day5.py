@@ -19,6 +19,7 @@ import ccxt.async_support as ccxt
 from core.scenario_matcher import UnifiedScenarioMatcher as ScenarioMatcher
 from tests.market_data_simulator import MarketDataSimulator
 from analytics.advanced_indicators import AdvancedIndicators
+from trading.exit_simulator import simulate_exit
 
 
 class GridSearchOptimizerDay5:
@@ -174,46 +175,38 @@ class GridSearchOptimizerDay5:
         open_position = None
         warmup = 100
 
+        highs_arr = df["high"].to_numpy(dtype=float)
+        lows_arr = df["low"].to_numpy(dtype=float)
+        closes_arr = df["close"].to_numpy(dtype=float)
+
         for i in range(warmup, len(df)):
             current_candle = df.iloc[i]
             price = current_candle["close"]
 
-            # Check SL/TP
-            if open_position:
+            # Закрытие на баре выхода, рассчитанном при входе
+            if (
+                open_position
+                and i == open_position["exit"]["exit_bar"]
+                and open_position["exit"]["exit_reason"] != "TIMEOUT"
+            ):
                 pos = open_position
-                hit_sl = False
-                hit_tp = False
+                exit_price = pos["exit"]["exit_price"]
 
                 if pos["type"] == "LONG":
-                    if price <= pos["stop_loss"]:
-                        hit_sl = True
-                    elif price >= pos["take_profit"]:
-                        hit_tp = True
+                    pnl = (exit_price - pos["entry_price"]) * pos["size"]
                 else:
-                    if price >= pos["stop_loss"]:
-                        hit_sl = True
-                    elif price <= pos["take_profit"]:
-                        hit_tp = True
-
-                if hit_sl or hit_tp:
-                    # Close position
-                    if pos["type"] == "LONG":
-                        exit_price = pos["stop_loss"] if hit_sl else pos["take_profit"]
-                        pnl = (exit_price - pos["entry_price"]) * pos["size"]
-                    else:
-                        exit_price = pos["stop_loss"] if hit_sl else pos["take_profit"]
-                        pnl = (pos["entry_price"] - exit_price) * pos["size"]
-
-                    current_capital += pnl
-                    pnl_pct = (pnl / (pos["entry_price"] * pos["size"])) * 100
-
-                    trades.append({
-                        "pnl": pnl,
-                        "pnl_pct": pnl_pct,
-                        "exit_reason": "SL" if hit_sl else "TP"
-                    })
-
-                    open_position = None
+                    pnl = (pos["entry_price"] - exit_price) * pos["size"]
+
+                current_capital += pnl
+                pnl_pct = (pnl / (pos["entry_price"] * pos["size"])) * 100
+
+                trades.append({
+                    "pnl": pnl,
+                    "pnl_pct": pnl_pct,
+                    "exit_reason": pos["exit"]["exit_reason"]
+                })
+
+                open_position = None
 
             # Generate signal
             full_market_data = simulator.generate_full_market_data(df, i, {})
@@ -294,6 +287,15 @@ class GridSearchOptimizerDay5:
                     "size": size,
                     "stop_loss": stop_loss,
                     "take_profit": take_profit,
+                    # Первое касание SL/TP по high/low (общий движок)
+                    "exit": simulate_exit(
+                        highs_arr, lows_arr, closes_arr,
+                        entry_bar=i,
+                        direction=signal_type.upper(),
+                        entry_price=price,
+                        stop_loss=stop_loss,
+                        tp1=take_profit,
+                    ),
                 }
 
         await exchange.close()
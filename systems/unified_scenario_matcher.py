@@ -50,6 +50,7 @@ except ImportError:
     FILTERS_AVAILABLE = False
 
 from analytics.confidence_booster import ConfidenceBooster
+from core.scenario_index import MTF_KEYS, ScenarioIndex
 
 
 class EnhancedScenarioMatcher:
@@ -67,10 +68,15 @@ class EnhancedScenarioMatcher:
         self.strategies = {}
         self.regime_detector = MarketRegimeDetector()
         self.confidence_booster = ConfidenceBooster()
+        self.scenario_index = ScenarioIndex(
+            mtf_check=self._check_mtf_conditions,
+            mtf_indexable=self._mtf_indexable,
+        )
 
         # Загружаем данные
         self._load_scenarios()
         self._load_strategies()
+        self._build_index()
 
         logger.info("✅ EnhancedScenarioMatcher v2.0 инициализирован with ConfidenceBooster")
 
@@ -125,6 +131,25 @@ class EnhancedScenarioMatcher:
             logger.error(f"❌ Ошибка загрузки стратегий: {e}")
             self.strategies = {}
 
+    def _index_kwargs(self) -> Dict:
+        selector = self.strategies.get("strategy_selector", {})
+        return {
+            "regime_strategies": selector.get("market_regime", {}),
+            "all_weather": selector.get("all_weather", []),
+        }
+
+    def _build_index(self):
+        """Индекс применимости сценариев (стратегия / режим / MTF паттерн)"""
+        self.scenario_index.build(self.scenarios, **self._index_kwargs())
+
+    @staticmethod
+    def _mtf_indexable(scenario: Dict) -> bool:
+        """MTF проверка сценария зависит только от трендов 1H/4H/1D"""
+        if "if" in scenario and "mtf_alignment" in scenario["if"]:
+            return True
+        conditions = scenario.get("mtf", {}).get("conditions", {})
+        return all(tf in MTF_KEYS for tf in conditions)
+
     def match_scenario(
         self,
         symbol: str,
@@ -297,7 +322,7 @@ class EnhancedScenarioMatcher:
         regime_map = selector.get("market_regime", {})
         all_weather = selector.get("all_weather", [])
 
-        strategies = regime_map.get(market_regime, [])
+        strategies = list(regime_map.get(market_regime, []))
         strategies.extend(all_weather)
 
         return list(set(strategies))  # Убираем дубликаты
@@ -318,29 +343,30 @@ class EnhancedScenarioMatcher:
         logger.debug(f"   Подходящие стратегии: {suitable_strategies}")
         logger.debug(f"   MTF trends: {mtf_trends}")
 
+        # Кандидаты из индекса: стратегия ∩ выполнимый MTF паттерн
+        index = self.scenario_index
+        index.ensure(self.scenarios, **self._index_kwargs())
+        strategy_mask = index.strategy_mask(suitable_strategies)
+        pattern_mask = index.pattern_mask(mtf_trends)
+        runtime_mtf = index.mtf_check_mask(mtf_trends)
+
         rejected_reasons = {
-            "strategy_mismatch": 0,
-            "mtf_mismatch": 0,
+            "strategy_mismatch": len(self.scenarios) - strategy_mask.bit_count(),
+            "mtf_mismatch": (strategy_mask & ~pattern_mask).bit_count(),
             "low_trigger_score": 0
         }
 
-        for i, scenario in enumerate(self.scenarios):
-            # Проверяем что стратегия подходит
-            strategy_match = scenario["strategy"] in suitable_strategies
-            if not strategy_match:
-                rejected_reasons["strategy_mismatch"] += 1
-                if i < 3:
-                    logger.debug(f"   ❌ {scenario['id']}: strategy '{scenario['strategy']}' не в {suitable_strategies}")
-                continue
-
-            # Проверяем MTF условия
-            mtf_match = self._check_mtf_conditions(scenario, mtf_trends)
-            if not mtf_match:
+        evaluated = 0
+        for i, scenario in index.iter_mask(strategy_mask & pattern_mask):
+            # MTF условия вне паттернов индекса проверяем на месте
+            if runtime_mtf >> i & 1 and not self._check_mtf_conditions(scenario, mtf_trends):
                 rejected_reasons["mtf_mismatch"] += 1
                 if i < 3:
                     logger.debug(f"   ❌ {scenario['id']}: MTF не совпадает")
                 continue
 
+            evaluated += 1
+
             # ✅ ИСПРАВЛЕНО: Проверяем triggers/scoring_system
             # Новый формат использует "scoring_system", старый "triggers"
             if "scoring_system" in scenario:
@@ -367,6 +393,9 @@ class EnhancedScenarioMatcher:
             else:
                 rejected_reasons["low_trigger_score"] += 1
 
+        pruned = index.record(evaluated)
+        logger.debug(f"   ✂️ Индекс отсёк {pruned}/{len(self.scenarios)} сценариев")
+
         # Итоговая диагностика
         if not matches:
             logger.warning(f"⚠️ {symbol}: Ни один сценарий не подошёл из {len(self.scenarios)}!")
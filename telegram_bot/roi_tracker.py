@@ -9,6 +9,7 @@ from typing import Dict, List, Optional
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from config.settings import logger, DATABASE_PATH
+from utils.rate_limiter import request_priority
 
 
 # ✅ ДОБАВЬТЕ ЭТУ ФУНКЦИЮ ЗДЕСЬ
@@ -173,9 +174,10 @@ class ROITracker:
     async def _fetch_price(self, symbol: str) -> float:
         """Отримати ціну з біржі (викликається тільки price_updater)"""
         try:
-            # Спробувати Bybit
+            # Спробувати Bybit (ціни для TP/SL - критичний пріоритет ліміту)
             if hasattr(self.bot, "bybit_connector") and self.bot.bybit_connector:
-                ticker = await self.bot.bybit_connector.get_ticker(symbol)
+                with request_priority("critical"):
+                    ticker = await self.bot.bybit_connector.get_ticker(symbol)
                 if ticker:
                     price = float(
                         ticker.get("lastPrice", 0) or ticker.get("last_price", 0)
@@ -185,7 +187,8 @@ class ROITracker:
 
             # Fallback на Binance
             if hasattr(self.bot, "binance_connector") and self.bot.binance_connector:
-                ticker = await self.bot.binance_connector.get_ticker(symbol)
+                with request_priority("critical"):
+                    ticker = await self.bot.binance_connector.get_ticker(symbol)
                 if ticker and "price" in ticker:
                     price = float(ticker["price"])
                     if price > 0:
@@ -34,6 +34,10 @@ from ai.gemini_interpreter import GeminiInterpreter
 from analytics.news_sentiment import NewsSentimentAnalyzer
 
 from database import unified_signals_manager as signals_db
+from utils.request_coalescer import get_request_coalescer
+from utils.telegram_queue import get_telegram_queue
+from utils.loop_monitor import get_loop_monitor
+from utils.sampling_profiler import get_profiler, SamplingProfiler
 
 
 class TelegramBotHandler:
@@ -49,6 +53,10 @@ class TelegramBotHandler:
         self.application = None
         self.is_running = False
         self.gio_dashboard = GIODashboardHandler(bot_instance)
+        # Исходящие сообщения через очередь: 429/медленный API не тормозят торговый путь
+        self.outbound = get_telegram_queue()
+        self._profile_delivery: Optional[asyncio.Task] = None
+        self.outbound.sender = self._deliver_message
         self.db_path = os.path.join(DATA_DIR, "gio_crypto_bot.db")
         try:
             from core.market_dashboard import MarketDashboard
@@ -171,6 +179,8 @@ class TelegramBotHandler:
             )
             # self.application.add_handler(CommandHandler("refresh", self.cmd_refresh))
             self.application.add_handler(CommandHandler("roi", self.cmd_roi))
+            self.application.add_handler(CommandHandler("loop", self.cmd_loop_health))
+            self.application.add_handler(CommandHandler("profile", self.cmd_profile))
             self.application.add_handler(
                 CommandHandler(
                     "dashboard", self.unified_dashboard_handler.handle_dashboard
@@ -305,6 +315,9 @@ class TelegramBotHandler:
             return
 
         try:
+            # Досылаем очередь, пока application ещё работает
+            await self.outbound.stop()
+
             if self.application and self.application.updater:
                 await self.application.updater.stop()
 
@@ -317,46 +330,68 @@ class TelegramBotHandler:
         except Exception as e:
             logger.error(f"❌ Ошибка остановки: {e}")
 
-    async def send_alert(self, message: str, priority: str = "medium"):
+    async def _deliver_message(self, chat_id, text: str, parse_mode=None, **kwargs):
+        """Отправка из очереди (вызывается worker'ом OutboundMessageQueue)"""
+        return await self.application.bot.send_message(
+            chat_id=chat_id, text=text, parse_mode=parse_mode, **kwargs
+        )
+
+    async def send_alert(
+        self,
+        message: str,
+        priority: str = "medium",
+        alert_type: Optional[str] = None,
+    ):
         """
-        Отправка алерта в Telegram
+        Отправка алерта в Telegram (через очередь, без ожидания API)
 
         Args:
             message: Текст сообщения
-            priority: Приоритет (low, medium, high)
+            priority: Приоритет (low, medium, high, critical)
+            alert_type: Тип алерта - всплеск одного типа склеивается в digest
         """
         try:
-            if not self.enabled or not self.chat_id:
+            if not self.enabled or not self.chat_id or not self.application:
                 logger.warning("⚠️ Telegram bot не настроен для алертов")
                 return
 
             # Emoji по приоритету
-            priority_emoji = {"low": "ℹ️", "medium": "⚠️", "high": "🚨"}
+            priority_emoji = {"low": "ℹ️", "medium": "⚠️", "high": "🚨", "critical": "🚨"}
 
             emoji = priority_emoji.get(priority, "📢")
             formatted_message = f"{emoji} {message}"
 
-            await self.application.bot.send_message(
-                chat_id=self.chat_id,  # ← ИСПРАВЛЕНО!
-                text=formatted_message,
+            await self.outbound.send(
+                self.chat_id,  # ← ИСПРАВЛЕНО!
+                formatted_message,
+                priority=priority,
                 parse_mode=None,  # Без HTML, чтобы избежать проблем с символами
+                alert_type=alert_type,
             )
 
-            logger.info(f"✅ Алерт отправлен в Telegram (приоритет: {priority})")
+            logger.info(f"✅ Алерт поставлен в очередь Telegram (приоритет: {priority})")
 
         except Exception as e:
             logger.error(f"❌ Ошибка отправки алерта: {e}")
 
-    async def send_message(self, text: str, parse_mode: str = ParseMode.MARKDOWN):
-        """Отправка сообщения в Telegram"""
+    async def send_message(
+        self,
+        text: str,
+        parse_mode: str = ParseMode.MARKDOWN,
+        priority: str = "medium",
+        alert_type: Optional[str] = None,
+    ):
+        """Отправка сообщения в Telegram (через очередь)"""
         if not self.enabled or not self.application:
             return
 
         try:
-            await self.application.bot.send_message(
-                chat_id=self.chat_id,
-                text=text,
+            await self.outbound.send(
+                self.chat_id,
+                text,
+                priority=priority,
                 parse_mode=parse_mode,
+                alert_type=alert_type,
                 disable_web_page_preview=True,
             )
         except Exception as e:
@@ -408,6 +443,8 @@ class TelegramBotHandler:
 
     <b>🔧 Вспомогательные:</b>
     • /status — Статус системы
+    • /loop — Здоровье event loop (админ)
+    • /profile start|stop|status — Профайлер CPU (админ)
     • /pairs — Список отслеживаемых пар
 
     ━━━━━━━━━━━━━━━━━━━━━━
@@ -688,6 +725,17 @@ class TelegramBotHandler:
                     f"└─ Size: {total_size:.2f} MB\n\n"
                 )
 
+            # REST Coalescer (общий для всех коннекторов)
+            request_stats = get_request_coalescer().get_summary()
+            if request_stats["requests"]:
+                text += (
+                    f"🔁 *REST DEDUP:*\n"
+                    f"├─ Requests: {request_stats['requests']}\n"
+                    f"├─ Cache hits: {request_stats['hits']}\n"
+                    f"├─ Coalesced: {request_stats['coalesced']}\n"
+                    f"└─ Saved: {request_stats['saved_rate']:.1f}%\n\n"
+                )
+
             # ✅ НОВЫЙ КОД (ПРАВИЛЬНЫЙ):
             if rate_limiter_stats:
                 total_calls = rate_limiter_stats.get("total_requests", 0)
@@ -862,6 +910,139 @@ class TelegramBotHandler:
         except Exception as e:
             await update.message.reply_text(f"❌ Ошибка анализа: {str(e)}")
 
+    async def cmd_loop_health(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        /loop [tasks|blocks] - Здоровье event loop (только админ-чат)
+        """
+        try:
+            if str(update.effective_chat.id) != str(self.chat_id):
+                await update.message.reply_text("⛔ Команда доступна только администратору")
+                return
+
+            mode = context.args[0].lower() if context.args else ""
+            monitor = get_loop_monitor()
+            lag = monitor.get_lag_stats()
+            inventory = monitor.get_task_inventory(limit=15 if mode == "tasks" else 5)
+            blocks = monitor.get_block_events(limit=5 if mode == "blocks" else 3)
+
+            lines = [
+                "⏱️ EVENT LOOP",
+                "",
+                f"Лаг: avg {lag['avg_ms']:.1f}ms | p99 {lag['p99_ms']:.1f}ms | max {lag['max_lag_ms']:.0f}ms",
+                f"Замеров: {lag['samples']} | выше порога: {lag['lag_over_threshold']}",
+                f"Блокировок: {lag['blocks']}",
+                "",
+                f"📋 Задачи: {inventory['total']}",
+            ]
+            for group in inventory["groups"]:
+                age = f", {group['oldest_s']:.0f}s" if group["oldest_s"] is not None else ""
+                lines.append(f"  • {group['count']}× {group['coroutine']} ← {group['creator']}{age}")
+
+            if blocks:
+                lines += ["", "🧱 Последние блокировки:"]
+                for event in blocks:
+                    when = datetime.fromtimestamp(event["started_at"]).strftime("%H:%M:%S")
+                    ongoing = " (идёт)" if event.get("ongoing") else ""
+                    lines.append(f"  • {when} {event['duration_ms']:.0f}ms{ongoing}")
+                    lines.append(f"    {event['top_frame']}")
+                    if mode == "blocks":
+                        lines += [f"    {line.strip()}" for line in event["stack"][-4:-1]]
+
+            # Без parse_mode: в стеках встречаются символы разметки
+            await update.message.reply_text("\n".join(lines)[:4000])
+
+        except Exception as e:
+            logger.error(f"❌ Ошибка /loop: {e}", exc_info=True)
+            await update.message.reply_text(f"❌ Ошибка: {e}")
+
+    async def cmd_profile(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        /profile start [сек] [Hz] | stop | status - Профайлер CPU (только админ-чат)
+        """
+        try:
+            if str(update.effective_chat.id) != str(self.chat_id):
+                await update.message.reply_text("⛔ Команда доступна только администратору")
+                return
+
+            args = context.args or []
+            action = args[0].lower() if args else "status"
+            profiler = get_profiler()
+
+            if action == "start":
+                duration = float(args[1]) if len(args) > 1 else None
+                rate_hz = float(args[2]) if len(args) > 2 else None
+                status = profiler.start(duration=duration, rate_hz=rate_hz)
+                if not status["started"]:
+                    await update.message.reply_text(
+                        f"⚠️ Профайлер уже работает: {status['elapsed']:.0f}/{status['duration']:.0f}s"
+                    )
+                    return
+                await update.message.reply_text(
+                    f"🔬 Профайлер запущен: {status['duration']:.0f}s @ {status['rate_hz']:.0f}Hz\n"
+                    f"Отчёт придёт по завершении (или /profile stop)"
+                )
+                self._profile_delivery = asyncio.create_task(
+                    self._deliver_profile(update, profiler)
+                )
+
+            elif action == "stop":
+                if not profiler.is_running:
+                    await update.message.reply_text("ℹ️ Профайлер не запущен")
+                    return
+                result = await asyncio.to_thread(profiler.stop)
+                if result is None:
+                    await update.message.reply_text(
+                        "⚠️ Профайлер не остановился вовремя: поток сэмплера "
+                        "не завершился за 5с. Проверьте /profile status позже"
+                    )
+                    return
+                if self._profile_delivery is None or self._profile_delivery.done():
+                    # Запущен не из Telegram (health-server) - отчёт здесь
+                    await update.message.reply_text(
+                        SamplingProfiler.format_summary(result, limit=10)[:4000]
+                    )
+
+            else:
+                status = profiler.status()
+                if status["running"]:
+                    text = (
+                        f"🔬 Профайлер работает: {status['elapsed']:.0f}/{status['duration']:.0f}s, "
+                        f"{status['samples']} сэмплов @ {status['rate_hz']:.0f}Hz"
+                    )
+                elif status["last_result"]:
+                    text = SamplingProfiler.format_summary(status["last_result"], limit=10)
+                else:
+                    text = "ℹ️ Профайлер не запускался. /profile start [сек] [Hz]"
+                await update.message.reply_text(text[:4000])
+
+        except ValueError:
+            await update.message.reply_text("❌ Формат: /profile start [сек] [Hz] | stop | status")
+        except Exception as e:
+            logger.error(f"❌ Ошибка /profile: {e}", exc_info=True)
+            await update.message.reply_text(f"❌ Ошибка: {e}")
+
+    async def _deliver_profile(self, update: Update, profiler: SamplingProfiler):
+        """Дождаться конца сессии и отправить сводку + collapsed-файл"""
+        try:
+            while profiler.is_running:
+                await asyncio.sleep(1)
+
+            result = profiler.last_result
+            if not result:
+                return
+            await update.message.reply_text(
+                SamplingProfiler.format_summary(result, limit=10)[:4000]
+            )
+            if result["collapsed_file"]:
+                with open(result["collapsed_file"], "rb") as f:
+                    await update.message.reply_document(
+                        document=f,
+                        filename=os.path.basename(result["collapsed_file"]),
+                        caption="🔥 collapsed stacks (flamegraph.pl / speedscope)",
+                    )
+        except Exception as e:
+            logger.error(f"❌ Ошибка отправки профиля: {e}", exc_info=True)
+
     # МЕТОД С БАТЧИНГОМ
     async def cmd_analyze_batching(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
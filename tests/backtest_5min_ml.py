@@ -13,6 +13,8 @@ import numpy as np
 import ta
 from datetime import datetime
 
+from data.dataset_cache import read_csv_cached
+
 class Backtest5MinML:
     """Backtest на 5-minute data"""
 
@@ -29,8 +31,7 @@ class Backtest5MinML:
     def load_data(self):
         """Загрузить 5-minute данные"""
         try:
-            self.df = pd.read_csv("data/ml_training/BTCUSDT_5min_180d.csv")
-            self.df['timestamp'] = pd.to_datetime(self.df['timestamp'])
+            self.df = read_csv_cached("data/ml_training/BTCUSDT_5min_180d.csv")
             print(f"✅ Loaded: {len(self.df)} 5-minute bars")
             return True
         except Exception as e:
@@ -18,6 +18,7 @@ import json
 # Импортируем реальный matcher и симулятор
 from core.scenario_matcher import UnifiedScenarioMatcher as ScenarioMatcher
 from tests.market_data_simulator_real import RealMarketDataSimulator
+from trading.exit_simulator import simulate_exit
 
 
 
@@ -366,6 +367,15 @@ class FullSimulationBacktest:
                 "stop_loss": stop_loss,
                 "take_profit": take_profit,
                 "atr": atr,
+                # Первое касание SL/TP по high/low (общий движок)
+                "exit": simulate_exit(
+                    self.highs, self.lows, self.closes,
+                    entry_bar=self.current_bar,
+                    direction=signal_type.upper(),
+                    entry_price=price,
+                    stop_loss=stop_loss,
+                    tp1=take_profit,
+                ),
             }
 
 
@@ -404,22 +414,16 @@ class FullSimulationBacktest:
         self.open_position = None
 
     def check_stop_take(self, price, timestamp):
-        """Проверка SL/TP"""
+        """Проверка SL/TP (бар выхода рассчитан при входе)"""
         if not self.open_position:
             return
 
-        pos = self.open_position
+        exit_info = self.open_position["exit"]
+        if exit_info["exit_reason"] == "TIMEOUT" or self.current_bar != exit_info["exit_bar"]:
+            return
 
-        if pos["type"] == "LONG":
-            if price <= pos["stop_loss"]:
-                self.close_position(pos["stop_loss"], timestamp, "STOP_LOSS")
-            elif price >= pos["take_profit"]:
-                self.close_position(pos["take_profit"], timestamp, "TAKE_PROFIT")
-        else:
-            if price >= pos["stop_loss"]:
-                self.close_position(pos["stop_loss"], timestamp, "STOP_LOSS")
-            elif price <= pos["take_profit"]:
-                self.close_position(pos["take_profit"], timestamp, "TAKE_PROFIT")
+        reason = "STOP_LOSS" if exit_info["exit_reason"] == "SL" else "TAKE_PROFIT"
+        self.close_position(exit_info["exit_price"], timestamp, reason)
 
     async def run(self):
         """Основной цикл"""
@@ -434,7 +438,14 @@ class FullSimulationBacktest:
         print(f"📊 Testing on {total_candles - warmup} candles...\n")
 
 
+        candles = self.simulator.ohlcv_data
+        self.highs = np.array([c["high"] for c in candles], dtype=float)
+        self.lows = np.array([c["low"] for c in candles], dtype=float)
+        self.closes = np.array([c["close"] for c in candles], dtype=float)
+
         for i in range(warmup, total_candles):
+            self.current_bar = i
+
             # ✅ Получаем данные из RealMarketDataSimulator
             candle_data = self.simulator.get_data(i)
 
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для офлайн бенчмарков горячих путей
+Все бенчмарки идут без сети на фикстурах; compare ловит регрессии
+"""
+
+from benchmarks.fixtures import load_fixture
+from benchmarks.hot_paths import BENCHMARKS, compare, run_benchmarks
+from config.settings import WHALE_CONFIG
+
+
+def _results(**timings):
+    return {"benchmarks": {name: {"min_us": us} for name, us in timings.items()}}
+
+
+class TestHotPathBenchmarks:
+    """Тесты для benchmarks.hot_paths"""
+
+    def test_all_benchmarks_run_offline(self):
+        """Тест: каждый бенчмарк отрабатывает на фикстурах"""
+        results = run_benchmarks(repeat=1, warmup=0)
+
+        assert set(results["benchmarks"]) == set(BENCHMARKS)
+        for name, result in results["benchmarks"].items():
+            assert result["ops"] > 0, name
+            assert result["min_us"] > 0, name
+        assert results["meta"]["python"]
+
+    def test_trades_fixture_has_whales_above_configured_threshold(self):
+        """Тест: в потоке сделок есть киты - бенчмарк проходит ветку детекции"""
+        values = [size * price for _, _, size, price in load_fixture("trades")]
+        whales = [v for v in values if v >= WHALE_CONFIG["btc_threshold"]]
+        assert 0 < len(whales) < len(values) * 0.05
+
+    def test_compare_flags_regressions_with_thresholds(self):
+        """Тест: порог общий, свой у бенчмарка и из аргументов"""
+        baseline = _results(cvd_update=10.0, scenario_match=100.0, indicators=50.0, veto_analyze=5.0)
+        current = _results(cvd_update=13.0, scenario_match=130.0, indicators=80.0, orderbook_delta=1.0)
+
+        rows = {row["name"]: row for row in compare(current, baseline, max_regression_pct=25.0)}
+        assert rows["cvd_update"]["status"] == "regression"
+        assert rows["cvd_update"]["change_pct"] == 30.0
+        # Свой порог scenario_match - 35%
+        assert rows["scenario_match"]["status"] == "ok"
+        assert rows["indicators"]["status"] == "regression"
+        assert rows["orderbook_delta"]["status"] == "new"
+        assert rows["veto_analyze"]["status"] == "missing"
+
+        rows = {
+            row["name"]: row
+            for row in compare(current, baseline, thresholds={"cvd_update": 50.0}, names=["cvd_update"])
+        }
+        assert list(rows) == ["cvd_update"]
+        assert rows["cvd_update"]["status"] == "ok"
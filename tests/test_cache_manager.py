@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для CacheManager
+Байтовые квоты namespace, общий бюджет и защита от stampede
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+from utils.cache_manager import CacheManager, estimate_size
+
+
+def book(levels: int):
+    return {
+        "bids": [[60000.0 - i, 1.0] for i in range(levels)],
+        "asks": [[60001.0 + i, 1.0] for i in range(levels)],
+    }
+
+
+def test_estimate_size_scales_with_levels():
+    """Тест: оценка размера растёт с глубиной стакана"""
+    small, large = estimate_size(book(10)), estimate_size(book(200))
+    assert 10 * small < large < 20 * small
+    assert estimate_size(np.zeros(1000)) >= 8000
+
+
+class TestCacheManager:
+    """Тесты для CacheManager"""
+
+    @pytest.mark.asyncio
+    async def test_namespace_quota_isolates_evictions(self):
+        """Тест: глубокие стаканы вытесняют только свой namespace"""
+        entry = estimate_size(book(200))
+        cache = CacheManager(
+            max_bytes=100 * entry,
+            namespace_quotas={"orderbook": 3 * entry + 1024},
+        )
+
+        for i in range(10):
+            await cache.set(f"t{i}", {"lastPrice": 100.0 + i}, namespace="ticker")
+        for i in range(10):
+            await cache.set(f"BOOK{i}", book(200), namespace="orderbook")
+
+        stats = cache.get_stats()["namespaces"]
+        assert stats["orderbook"]["entries"] == 3
+        assert stats["orderbook"]["evictions"] == 7
+        assert stats["ticker"]["entries"] == 10
+        assert await cache.get("BOOK0", namespace="orderbook") is None
+        assert await cache.get("BOOK9", namespace="orderbook") is not None
+
+        # Больше квоты - не кэшируется вовсе
+        await cache.set("huge", book(2000), namespace="orderbook")
+        assert cache.get_stats()["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_global_budget_evicts_most_pressured_namespace(self):
+        """Тест: при общем бюджете вытесняется namespace с наибольшей загрузкой квоты"""
+        entry = estimate_size(book(50))
+        cache = CacheManager(
+            max_bytes=6 * entry,
+            namespace_quotas={"orderbook": 6 * entry, "liquidity": 6 * entry},
+        )
+        await cache.set("a", book(50), namespace="liquidity")
+        for i in range(6):
+            await cache.set(f"b{i}", book(50), namespace="orderbook")
+
+        stats = cache.get_stats()
+        assert stats["bytes"] <= cache.max_bytes
+        assert stats["namespaces"]["liquidity"]["entries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_get_or_compute_single_flight(self):
+        """Тест: одновременные промахи по ключу - одно вычисление; None не кэшируется"""
+        cache = CacheManager(early_refresh_beta=0)
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"value": len(calls)}
+
+        results = await asyncio.gather(
+            *(cache.get_or_compute("BTCUSDT", compute, ttl=60, namespace="liquidity") for _ in range(20))
+        )
+
+        assert len(calls) == 1
+        assert all(result == {"value": 1} for result in results)
+        assert cache.get_stats()["stampede_waits"] == 19
+
+        assert await cache.get_or_compute("ETHUSDT", lambda: None, namespace="liquidity") is None
+        assert await cache.get("ETHUSDT", namespace="liquidity") is None
+
+    @pytest.mark.asyncio
+    async def test_early_refresh_serves_current_value(self):
+        """Тест: раннее обновление делает один вызывающий, остальные получают текущее значение"""
+        cache = CacheManager()
+        version = 0
+
+        async def compute():
+            nonlocal version
+            version += 1
+            await asyncio.sleep(0.01)
+            return version
+
+        assert await cache.get_or_compute("k", compute, ttl=60, beta=0) == 1
+
+        # Огромный β: обновление начинается сразу, пока запись ещё жива
+        results = await asyncio.gather(
+            *(cache.get_or_compute("k", compute, ttl=60, beta=1e9) for _ in range(5))
+        )
+
+        assert sorted(results) == [1, 1, 1, 1, 2]
+        assert version == 2
+        assert cache.get_stats()["early_refreshes"] == 1
+        assert await cache.get("k") == 2
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для candle_frame
+Колоночный парсинг и валидация свечей
+"""
+
+import numpy as np
+import pandas as pd
+from utils.candle_frame import (
+    parse_candle_records,
+    parse_klines,
+    validate_ohlcv_frame,
+)
+
+
+# Формат Bybit result.list: строки, от новых к старым
+BYBIT_ROWS = [
+    ["1700000180000", "103", "104", "102", "103.5", "10", "1030"],
+    ["1700000120000", "102", "103", "101", "102.5", "12", "1224"],
+    ["1700000060000", "101", "102", "100", "101.5", "8", "812"],
+    ["1700000000000", "100", "101", "99", "100.5", "5", "502"],
+]
+
+
+class TestCandleFrame:
+    """Тесты для parse_klines / parse_candle_records"""
+
+    def test_parse_bybit_rows(self):
+        """Тест: строки парсятся в типизированные колонки по возрастанию времени"""
+        frame = parse_klines(BYBIT_ROWS)
+
+        assert len(frame) == 4
+        assert frame.timestamp.dtype == np.int64
+        assert list(frame.timestamp) == sorted(frame.timestamp)
+        assert frame.invalid_count == 0
+
+        newest = frame.to_dicts(descending=True)[0]
+        assert newest == {
+            "timestamp": 1700000180000,
+            "open": 103.0,
+            "high": 104.0,
+            "low": 102.0,
+            "close": 103.5,
+            "volume": 10.0,
+        }
+        assert type(newest["timestamp"]) is int
+
+    def test_invalid_rows_are_masked(self):
+        """Тест: неполные, нечисловые, отрицательные и не-OHLC свечи отбрасываются"""
+        rows = BYBIT_ROWS + [
+            ["1700000240000", "100", "101"],  # Неполная
+            ["1700000300000", "abc", "101", "99", "100", "1"],  # Мусор
+            ["1700000360000", "100", "101", "99", "100", "-1"],  # Объём < 0
+            ["1700000420000", "100", "99", "101", "100", "1"],  # high < low
+            ["1700000480000", "105", "104", "99", "100", "1"],  # open > high
+            ["0", "100", "101", "99", "100", "1"],  # timestamp
+        ]
+        frame = parse_klines(rows)
+
+        assert len(frame) == 4
+        assert frame.invalid_count == 6
+        assert frame.total_count == 10
+
+    def test_duplicates_and_suspicious_spread(self):
+        """Тест: дубли по времени схлопываются, большой спред только считается"""
+        rows = [
+            [1, 100, 101, 99, 100, 1],
+            [1, 100, 102, 99, 101, 2],
+            [2, 100, 200, 99, 150, 1],
+        ]
+        frame = parse_klines(rows)
+
+        assert list(frame.timestamp) == [1, 2]
+        assert frame.close[0] == 101
+        assert frame.suspicious_count == 1
+
+    def test_extra_columns(self):
+        """Тест: дополнительные поля Binance с приведением типов"""
+        rows = [[1, "1", "2", "0.5", "1.5", "10", 59999, "15.0", 42, "5", "7", "0"]]
+        frame = parse_klines(
+            rows,
+            extra_columns={"close_time": (6, "int64"), "quote_volume": (7, "float64"), "trades": (8, "int64")},
+        )
+        candle = frame.to_dicts()[0]
+
+        assert candle["close_time"] == 59999
+        assert candle["quote_volume"] == 15.0
+        assert candle["trades"] == 42
+
+    def test_records_and_empty(self):
+        """Тест: словари с переименованным полем времени и пустой ответ"""
+        records = [
+            {"start": "60", "open": "1", "high": "2", "low": "0.5", "close": "1.5", "volume": "3"},
+            {"start": "0", "open": "1", "high": "2", "low": "0.5", "close": "1.5", "volume": "3"},
+        ]
+        frame = parse_candle_records(records, fields={"timestamp": "start"})
+        assert len(frame) == 1 and frame.invalid_count == 1
+
+        empty = parse_klines([])
+        assert len(empty) == 0
+        assert empty.to_dicts() == []
+
+    def test_validate_ohlcv_frame(self):
+        """Тест: фильтрация DataFrame для CSV загрузчиков"""
+        df = pd.DataFrame(
+            {
+                "open": [100, 100, np.nan],
+                "high": [101, 99, 101],
+                "low": [99, 100, 99],
+                "close": [100, 100, 100],
+                "volume": [1, 1, 1],
+            }
+        )
+        valid, dropped = validate_ohlcv_frame(df)
+
+        assert dropped == 2
+        assert len(valid) == 1
+
+        features = pd.DataFrame({"rsi": [50.0]})
+        assert validate_ohlcv_frame(features)[1] == 0
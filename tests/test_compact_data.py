@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для компактной модели данных
+TradeBuffer / BookSide и совместимость CVDCalculator
+"""
+
+import pytest
+from models.compact_data import BookSide, Fill, TradeBuffer
+from models.data_classes import Alert, AlertTypeEnum
+from analytics.cvd_calculator import CVDCalculator
+
+
+class TestTradeBuffer:
+    """Тесты для TradeBuffer"""
+
+    def test_ring_eviction_and_totals(self):
+        """Тест: старые сделки вытесняются, суммы совпадают с пересчётом"""
+        buf = TradeBuffer(3)
+        for i, (size, is_buy) in enumerate([(1, True), (2, False), (3, True), (4, True)]):
+            buf.append(i, 100.0 + i, size, is_buy)
+
+        assert len(buf) == 3
+        assert [t.timestamp for t in buf] == [1, 2, 3]
+        assert buf.sums() == (5.0, 9.0, 7.0)
+        assert buf.sums(2) == (7.0, 7.0, 7.0)
+
+    def test_dict_boundary(self):
+        """Тест: dict → буфер → dict сохраняет поля"""
+        buf = TradeBuffer(10)
+        buf.append_dict({"timestamp": 5, "side": "SELL", "volume": 2.5, "price": 10.0})
+
+        assert buf.to_dicts() == [
+            {"timestamp": 5, "side": "SELL", "volume": 2.5, "price": 10.0, "delta": -2.5}
+        ]
+
+
+class TestBookSide:
+    """Тесты для BookSide"""
+
+    def test_from_api_levels(self):
+        """Тест: строки API сортируются, суммы и обратное преобразование"""
+        bids = BookSide.from_levels([["99.5", "2"], ["100", "1"]], descending=True)
+
+        assert bids.best() == (100.0, 1.0)
+        assert bids.total_size() == 3.0
+        assert bids.total_size(1) == 1.0
+        assert bids.to_levels() == [[100.0, 1.0], [99.5, 2.0]]
+
+
+class TestSlottedRecords:
+    """Тесты slotted dataclass'ов"""
+
+    def test_no_instance_dict(self):
+        """Тест: записи без __dict__, to_dict работает"""
+        alert = Alert(AlertTypeEnum.SYSTEM_HEALTH, "BTCUSDT", "msg", "LOW")
+        fill = Fill("BTCUSDT", "BUY", 100.0, 2.0, 1)
+
+        assert not hasattr(alert, "__dict__")
+        assert alert.to_dict()["symbol"] == "BTCUSDT"
+        assert fill.to_dict()["value"] == 200.0
+
+
+def test_cvd_calculator_results_unchanged():
+    """Тест: CVD на буфере совпадает с наивным расчётом"""
+    cvd = CVDCalculator(window_size=4)
+    trades = [("BUY", 1.0), ("SELL", 3.0), ("BUY", 2.0), ("BUY", 5.0), ("SELL", 1.0)]
+    for i, (side, volume) in enumerate(trades):
+        cvd.update("BTCUSDT", side, volume, 100.0, timestamp=i)
+
+    assert cvd.get_cvd("BTCUSDT") == pytest.approx(4.0)
+    assert cvd.get_rolling_cvd("BTCUSDT") == pytest.approx(3.0)
+
+    trend = cvd.get_cvd_trend("BTCUSDT", window=2)
+    assert trend["rolling_cvd"] == pytest.approx(4.0)
+    assert trend["trend"] == "BULLISH"
+
+    ratio = cvd.get_buy_sell_ratio("BTCUSDT")
+    assert ratio["buy_volume"] == pytest.approx(7.0)
+    assert ratio["sell_volume"] == pytest.approx(4.0)
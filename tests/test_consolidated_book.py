@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для ConsolidatedOrderBook
+Нормализация символов, сводная лестница по биржам, NBBO и арбитраж
+"""
+
+import pytest
+from analytics.consolidated_book import ConsolidatedOrderBook, normalize_symbol
+from analytics.cross_exchange_validator import CrossExchangeValidator
+from models.compact_data import BookSide
+
+
+NOW = 1_760_000_000.0
+
+
+def test_normalize_symbol():
+    """Тест: форматы бирж сводятся к одному символу"""
+    assert normalize_symbol("BTC-USDT") == "BTCUSDT"
+    assert normalize_symbol("BTC-USD") == "BTCUSDT"
+    assert normalize_symbol("eth-usdt-swap") == "ETHUSDT"
+    assert normalize_symbol("solusdc") == "SOLUSDT"
+    assert normalize_symbol("BTCUSDT") == "BTCUSDT"
+
+
+class TestConsolidatedOrderBook:
+    """Тесты для ConsolidatedOrderBook"""
+
+    def test_ladder_with_venue_attribution(self):
+        """Тест: уровни разных бирж на одном тике складываются с атрибуцией"""
+        book = ConsolidatedOrderBook(depth=10, max_age_seconds=5)
+        book.update(
+            "binance",
+            "BTCUSDT",
+            BookSide.from_levels([[60000.0, 1.0], [59999.9, 2.0]], descending=True),
+            BookSide.from_levels([[60000.1, 1.5]]),
+            timestamp=NOW,
+        )
+        book.update(
+            "okx",
+            "BTC-USDT",
+            [[60000.0, 0.5, 3], [59999.8, 4.0, 1]],
+            [[60000.2, 1.0, 2]],
+            timestamp=NOW,
+        )
+        # Coinbase: словарь {price: size}, шаг 0.01 сводится к сетке 0.1
+        book.update(
+            "coinbase", "BTC-USD", {59999.95: 1.0}, {60000.13: 2.0}, timestamp=NOW
+        )
+
+        depth = book.get_depth("BTCUSDT", levels=3)
+
+        assert depth["bids"][0]["price"] == pytest.approx(60000.0)
+        assert depth["bids"][0]["venues"] == {"binance": 1.0, "okx": 0.5}
+        assert depth["bids"][1]["venues"] == {"binance": 2.0, "coinbase": 1.0}
+        assert depth["asks"][1]["price"] == pytest.approx(60000.2)
+        assert depth["asks"][1]["size"] == pytest.approx(3.0)
+
+        quote = book.get_quote("BTC-USD")
+        assert quote["best_bid_venue"] == "binance"
+        assert quote["best_ask"] == pytest.approx(60000.1)
+        assert quote["imbalance"] == pytest.approx((8.5 - 4.5) / 13.0)
+        assert quote["arbitrage"] is None
+
+    def test_crossed_venues_and_stale_books(self):
+        """Тест: bid одной биржи выше ask другой - арбитраж; старые стаканы исключаются"""
+        book = ConsolidatedOrderBook(depth=10, max_age_seconds=5)
+        book.update("bybit", "ETHUSDT", [[3001.0, 10]], [[3001.5, 10]], timestamp=NOW - 60)
+        book.update("okx", "ETH-USDT", [[2999.0, 5]], [[2999.5, 5]], timestamp=NOW)
+        assert book.get_quote("ETHUSDT")["venues"] == ["okx"]
+
+        book.update("bybit", "ETHUSDT", [[3001.0, 10]], [[3001.5, 10]], timestamp=NOW)
+        arbitrage = book.arbitrage_spread("ETHUSDT")
+
+        assert arbitrage["buy_venue"] == "okx"
+        assert arbitrage["sell_venue"] == "bybit"
+        assert arbitrage["spread"] == pytest.approx(1.5)
+        (bid, bid_venue), (ask, ask_venue) = book.best_bid_ask("ETHUSDT")
+        assert (bid_venue, ask_venue) == ("bybit", "okx")
+
+    def test_validator_reads_nbbo(self):
+        """Тест: CrossExchangeValidator берёт лучшую цену из сводного стакана"""
+        validator = CrossExchangeValidator()
+        validator.consolidated_book = ConsolidatedOrderBook(max_age_seconds=1e12)
+        validator.consolidated_book.update("binance", "SOLUSDT", [[150.0, 1]], [[150.05, 1]])
+        validator.consolidated_book.update("coinbase", "SOL-USD", [[150.02, 1]], [[150.1, 1]])
+
+        assert validator.get_best_price("SOLUSDT", "buy") == ("binance", pytest.approx(150.05))
+        assert validator.get_best_price("SOLUSDT", "sell") == ("coinbase", pytest.approx(150.02))
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для RollingCorrelationEngine
+Сверка инкрементальных сумм с numpy.corrcoef
+"""
+
+import numpy as np
+import pytest
+from analytics.correlation_engine import RollingCorrelationEngine
+
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+INTERVAL_MS = 5 * 60_000
+
+
+def make_closes(bars: int, seed: int = 42) -> np.ndarray:
+    """Цены: ETH = 1.5 * BTC + шум, SOL независим"""
+    rng = np.random.default_rng(seed)
+    btc = rng.normal(0, 0.01, bars)
+    eth = 1.5 * btc + rng.normal(0, 0.005, bars)
+    sol = rng.normal(0, 0.01, bars)
+    returns = np.vstack([btc, eth, sol]).T
+    return 100.0 * np.exp(np.cumsum(returns, axis=0))
+
+
+class TestRollingCorrelationEngine:
+    """Тесты для RollingCorrelationEngine"""
+
+    @pytest.fixture
+    def engine(self):
+        return RollingCorrelationEngine(
+            SYMBOLS, interval_minutes=5, windows={"1h": 60, "4h": 240}
+        )
+
+    def feed(self, engine, closes):
+        for t, row in enumerate(closes):
+            for symbol, close in zip(SYMBOLS, row):
+                engine.on_closed_candle(symbol, (t + 1) * INTERVAL_MS, close)
+
+    def test_matches_corrcoef(self, engine):
+        """Тест: матрица совпадает с numpy на хвосте окна"""
+        closes = make_closes(500)
+        self.feed(engine, closes)
+
+        returns = np.diff(np.log(closes), axis=0)
+        for window, length in (("1h", 12), ("4h", 48)):
+            expected = np.corrcoef(returns[-length:].T)
+            actual = np.array(engine.correlation_matrix(window))
+            assert np.allclose(actual, expected, atol=1e-9)
+
+    def test_beta_to_btc(self, engine):
+        """Тест: beta ETH к BTC около 1.5"""
+        self.feed(engine, make_closes(300))
+
+        betas = engine.betas("4h")
+
+        assert betas["BTCUSDT"] == pytest.approx(1.0)
+        assert betas["ETHUSDT"] == pytest.approx(1.5, abs=0.3)
+
+    def test_alignment_waits_for_all_symbols(self, engine):
+        """Тест: бар фиксируется только когда закрыт у всех символов"""
+        assert not engine.on_closed_candle("BTCUSDT", INTERVAL_MS, 100.0)
+        assert not engine.on_closed_candle("ETHUSDT", INTERVAL_MS, 10.0)
+        assert engine.on_closed_candle("SOLUSDT", INTERVAL_MS, 1.0)
+
+        # Повторная/старая свеча игнорируется
+        assert not engine.on_closed_candle("BTCUSDT", INTERVAL_MS, 101.0)
+
+    def test_not_ready_until_min_samples(self, engine):
+        """Тест: недостаточно данных → None"""
+        self.feed(engine, make_closes(3))
+
+        assert engine.correlation_matrix("1h") is None
+        assert engine.betas("1h") == {}
+
+    def test_partial_window_not_ready(self, engine):
+        """Тест: окно отдаётся только заполненным (или на долю min_coverage)"""
+        self.feed(engine, make_closes(31))
+
+        assert engine.is_ready("1h")
+        assert engine.samples("4h") == 30
+        assert not engine.is_ready("4h")
+        assert engine.correlation_matrix("4h") is None
+
+        half = RollingCorrelationEngine(
+            SYMBOLS, interval_minutes=5, windows={"4h": 240}, min_coverage=0.5
+        )
+        self.feed(half, make_closes(25))
+        assert half.required_samples("4h") == 24
+        assert half.is_ready("4h")
+
+    def test_subset_matrix(self, engine):
+        """Тест: подматрица для части символов"""
+        self.feed(engine, make_closes(100))
+
+        full = np.array(engine.correlation_matrix("1h"))
+        subset = np.array(engine.correlation_matrix("1h", ["SOLUSDT", "BTCUSDT"]))
+
+        assert subset.shape == (2, 2)
+        assert subset[0][1] == pytest.approx(full[2][0])
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для DatasetCache
+Колоночный memmap кэш исторических CSV
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from data.dataset_cache import DatasetCache
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    """CSV со свечами и строковой колонкой"""
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2025-01-01", periods=48, freq="1h").astype(str),
+            "close": np.linspace(100, 147, 48),
+            "symbol": ["BTCUSDT"] * 48,
+        }
+    )
+    path = tmp_path / "BTCUSDT_1h.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DatasetCache(tmp_path / "columnar")
+
+
+class TestDatasetCache:
+    """Тесты для DatasetCache"""
+
+    def test_roundtrip_matches_read_csv(self, cache, csv_file):
+        """Тест: кэш совпадает с pd.read_csv + to_datetime"""
+        expected = pd.read_csv(csv_file)
+        expected["timestamp"] = pd.to_datetime(expected["timestamp"])
+
+        frame = cache.open(csv_file).to_frame()
+
+        pd.testing.assert_frame_equal(frame, expected)
+
+    def test_memmap_zero_copy_slice(self, cache, csv_file):
+        """Тест: срез по времени - read-only view на memmap"""
+        dataset = cache.open(csv_file)
+        part = dataset.slice("2025-01-01 10:00", "2025-01-01 20:00")
+
+        assert len(part["close"]) == 10
+        assert part["close"][0] == pytest.approx(110.0)
+        assert np.shares_memory(part["close"], dataset["close"])
+        assert not part["close"].flags.writeable
+
+    def test_key_follows_content(self, cache, csv_file):
+        """Тест: изменение файла даёт новый кэш, без изменений - тот же"""
+        first = cache.source_key(csv_file)
+        assert cache.source_key(csv_file) == first
+
+        with open(csv_file, "a") as f:
+            f.write("2025-01-03 00:00:00,148.0,BTCUSDT\n")
+
+        assert cache.source_key(csv_file) != first
+        assert len(cache.open(csv_file)) == 49
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для TopicDispatcher
+Conflation снимков, FIFO без потерь и независимость тем
+"""
+
+import asyncio
+
+import pytest
+from utils.dispatch_queue import TopicDispatcher
+from utils.websocket_manager import WebSocketManager
+
+
+class TestTopicDispatcher:
+    """Тесты для TopicDispatcher"""
+
+    @pytest.mark.asyncio
+    async def test_conflates_by_key(self):
+        """Тест: при отставании по ключу обрабатывается только последний снимок"""
+        dispatcher = TopicDispatcher("test")
+        seen = []
+
+        async def on_book(symbol, version):
+            seen.append((symbol, version))
+
+        for version in range(1, 4):
+            dispatcher.submit("book", on_book, "BTCUSDT", version, key="BTCUSDT")
+        dispatcher.submit("book", on_book, "ETHUSDT", 1, key="ETHUSDT")
+        await dispatcher.drain()
+
+        assert seen == [("BTCUSDT", 3), ("ETHUSDT", 1)]
+        stats = dispatcher.get_stats()["book"]
+        assert stats["conflated"] == 2
+        assert stats["processed"] == 2
+        assert stats["max_depth"] == 2
+        await dispatcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_slow_book_does_not_block_trades(self):
+        """Тест: сделки FIFO без потерь, пока обработчик стакана висит"""
+        dispatcher = TopicDispatcher("test")
+        release = asyncio.Event()
+        trades = []
+
+        async def slow_book(symbol):
+            await release.wait()
+
+        def on_trade(trade_id):
+            trades.append(trade_id)
+
+        dispatcher.submit("book", slow_book, "BTCUSDT", key="BTCUSDT")
+        for trade_id in range(500):
+            dispatcher.submit("trade", on_trade, trade_id)
+
+        for _ in range(50):
+            if len(trades) == 500:
+                break
+            await asyncio.sleep(0.01)
+
+        assert trades == list(range(500))
+        assert dispatcher.get_stats()["trade"]["dropped"] == 0
+        assert dispatcher.get_stats()["book"]["processed"] == 0
+
+        release.set()
+        await dispatcher.drain()
+        assert dispatcher.get_stats()["book"]["processed"] == 1
+        await dispatcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_websocket_manager_dispatch_is_non_blocking():
+    """Тест: WebSocketManager кладёт сообщения в очереди, не дожидаясь on_message"""
+    handled = []
+
+    async def on_message(data):
+        await asyncio.sleep(0.01)
+        handled.append(data["data"]["u"])
+
+    manager = WebSocketManager(
+        url="wss://example.invalid",
+        on_message=on_message,
+        topic_of=lambda data: ("depth", data["data"]["s"]),
+        conflate_topics=("depth",),
+        name="test",
+    )
+
+    for update_id in range(10):
+        manager._dispatch({"data": {"s": "BTCUSDT", "u": update_id}})
+    assert handled == []
+
+    await manager.dispatcher.drain()
+
+    assert handled == [9]
+    assert manager.get_stats()["queues"]["depth"]["conflated"] == 9
+    await manager.dispatcher.stop()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для EnhancedAlertsSystem
+Оценка правил по событиям, гистерезис и cooldown
+"""
+
+import asyncio
+import time
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+from alerts.enhanced_alerts_system import EnhancedAlertsSystem
+
+
+@pytest.fixture
+def alerts():
+    """Система алертов с mock Telegram"""
+    telegram = Mock()
+    telegram.send_alert = AsyncMock()
+    return EnhancedAlertsSystem(
+        bot_instance=Mock(), telegram_handler=telegram, tracked_symbols=["BTCUSDT"]
+    )
+
+
+async def flush(alerts):
+    """Дождаться фоновой отправки алертов"""
+    await asyncio.gather(*list(alerts._pending_tasks))
+
+
+@pytest.mark.asyncio
+async def test_l2_hysteresis(alerts):
+    """Тест: один алерт на выход за порог, повтор только после возврата ниже 70%"""
+    assert alerts.on_orderbook("BTCUSDT", 88.0)
+    assert not alerts.on_orderbook("BTCUSDT", 92.0)  # Ещё выше порога
+    assert not alerts.on_orderbook("BTCUSDT", 80.0)  # Между порогами
+    assert not alerts.on_orderbook("BTCUSDT", 86.0)
+    await flush(alerts)
+    alerts.on_orderbook("BTCUSDT", 50.0)  # Взведение
+    # Во время l2 cooldown пересечение не оценивается и не теряется
+    assert not alerts.on_orderbook("BTCUSDT", -91.0)
+    assert alerts.telegram_handler.send_alert.await_count == 1
+
+    alerts.last_alert_time["l2_BTCUSDT"] -= alerts.config["l2_cooldown"]
+    assert alerts.on_orderbook("BTCUSDT", -91.0)
+    await flush(alerts)
+    assert alerts.telegram_handler.send_alert.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_l2_rearmed_when_alert_not_sent(alerts):
+    """Тест: алерт не ушёл - правило снова взведено"""
+    alerts.telegram_handler.send_alert = AsyncMock(side_effect=RuntimeError("telegram down"))
+
+    assert alerts.on_orderbook("BTCUSDT", 88.0)
+    await flush(alerts)
+    assert alerts.rules["l2_imbalance"].armed["BTCUSDT"]
+
+    alerts.telegram_handler.send_alert = AsyncMock()
+    assert alerts.on_orderbook("BTCUSDT", 88.0)
+    await flush(alerts)
+    assert alerts.telegram_handler.send_alert.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_untracked_symbol_ignored(alerts):
+    """Тест: события неотслеживаемых пар не оцениваются"""
+    assert not alerts.on_orderbook("DOGEUSDT", 99.0)
+
+
+@pytest.mark.asyncio
+async def test_large_trade_burst(alerts):
+    """Тест: сумма крупных сделок за окно пересекает порог"""
+    assert not alerts.on_trade("BTCUSDT", "BUY", 50_000, 0.5, 1_000.0)  # $25K мелкая
+    assert alerts.on_trade("BTCUSDT", "SELL", 50_000, 3.0, 1_000.0)  # $150K
+    assert not alerts.on_trade("BTCUSDT", "SELL", 50_000, 3.0, 1_010.0)
+
+    await flush(alerts)
+    assert alerts.alert_stats["liquidations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_volume_spike_on_closed_kline(alerts):
+    """Тест: всплеск объёма оценивается только по закрытой свече"""
+    for _ in range(10):
+        alerts.on_kline("BTCUSDT", {"is_closed": True, "volume": 100.0, "close": 1.0})
+
+    assert not alerts.on_kline("BTCUSDT", {"is_closed": False, "volume": 900.0, "close": 1.0})
+    assert alerts.on_kline("BTCUSDT", {"is_closed": True, "volume": 400.0, "close": 1.0})
+
+    await flush(alerts)
+    assert alerts.alert_stats["volume_spike"] == 1
+
+
+@pytest.mark.asyncio
+async def test_vp_break_and_scenario_change(alerts):
+    """Тест: пробой VP уровня и смена сценария MM"""
+    alerts.update_vp_levels("BTCUSDT", {"POC": 100.0})
+
+    assert not alerts.on_kline("BTCUSDT", {"is_closed": True, "volume": 1, "close": 99.0})
+    assert not alerts.on_kline("BTCUSDT", {"is_closed": True, "volume": 1, "close": 100.05})
+    assert alerts.on_kline("BTCUSDT", {"is_closed": True, "volume": 1, "close": 101.0})
+
+    assert not alerts.on_scenario("BTCUSDT", "Accumulation")
+    assert alerts.on_scenario("BTCUSDT", "Squeeze", confidence=0.8, phase="Markup")
+
+    await flush(alerts)
+    assert alerts.alert_stats["vp_break"] == 1
+    assert alerts.alert_stats["mm_scenario"] == 1
+
+
+@pytest.mark.asyncio
+async def test_sustained_liquidation_burst_alerts_after_cooldown(alerts):
+    """Тест: пересечение во время liq_cooldown не теряется - алерт после cooldown"""
+    alerts.last_alert_time["liq_BTCUSDT"] = time.time()
+
+    assert not alerts.on_trade("BTCUSDT", "SELL", 50_000, 3.0)  # Cooldown
+    assert alerts.rules["liquidations"].armed.get("BTCUSDT", True)
+
+    alerts.last_alert_time["liq_BTCUSDT"] -= alerts.config["liq_cooldown"]
+    assert alerts.on_trade("BTCUSDT", "SELL", 50_000, 3.0)  # Всплеск продолжается
+    await flush(alerts)
+    assert alerts.alert_stats["liquidations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_liquidation_rearmed_and_not_logged_when_not_sent(alerts, caplog):
+    """Тест: алерт о ликвидации не ушёл - правило взведено, 💥 не логируется"""
+    alerts.send_alert = AsyncMock(return_value=False)
+
+    assert alerts.on_trade("BTCUSDT", "SELL", 50_000, 3.0)
+    await flush(alerts)
+
+    assert alerts.rules["liquidations"].armed["BTCUSDT"]
+    assert "Liquidation Alert" not in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_volume_spike_rearmed_when_not_sent(alerts):
+    """Тест: всплеск объёма не отправлен - правило снова взведено"""
+    for _ in range(10):
+        alerts.on_kline("BTCUSDT", {"is_closed": True, "volume": 100.0, "close": 1.0})
+    alerts.send_alert = AsyncMock(return_value=False)
+
+    assert alerts.on_kline("BTCUSDT", {"is_closed": True, "volume": 400.0, "close": 1.0})
+    await flush(alerts)
+    assert alerts.rules["volume_spike"].armed["BTCUSDT"]
+
+
+@pytest.mark.asyncio
+async def test_bybit_liquidation_stream_feeds_burst_rule(alerts):
+    """Тест: ликвидация из allLiquidation через поток бота доходит до алерта"""
+    from core.bot import GIOCryptoBot
+
+    bot = GIOCryptoBot.__new__(GIOCryptoBot)
+    bot.alerts_system = alerts
+    bot.enhanced_alerts = None
+    stream = bot._create_liquidation_stream(["BTCUSDT"])
+
+    now_ms = int(time.time() * 1000)
+    stream.process_message({
+        "topic": "allLiquidation.BTCUSDT",
+        "ts": now_ms,
+        "data": [{"T": now_ms, "s": "BTCUSDT", "S": "Sell", "v": "3.0", "p": "50000"}],
+    })
+
+    await flush(alerts)
+    assert alerts.alert_stats["liquidations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_scanner_klines_feed_volume_spike(alerts):
+    """Тест: свечи сканера - первая порция прогревает, новая закрытая свеча оценивается"""
+    from trading.unified_auto_scanner import UnifiedAutoScanner
+
+    hour_ms = 3_600_000
+    open_ts = int(time.time() * 1000) // hour_ms * hour_ms
+
+    def klines(hours_back, last_volume=100.0):
+        # Как get_klines: от новых к старым; 30 закрытых свечей, последняя
+        # закрыта hours_back часов назад, плюс текущая открытая
+        candles = [
+            {"timestamp": open_ts - (hours_back + i) * hour_ms, "open": 1.0, "high": 1.0,
+             "low": 1.0, "close": 1.0, "volume": 100.0}
+            for i in range(30)
+        ]
+        candles[0]["volume"] = last_volume
+        return [{**candles[0], "timestamp": open_ts, "volume": 5000.0}] + candles
+
+    bot = Mock()
+    bot._get_alerts_system = Mock(return_value=alerts)
+    bot.bybit_connector.get_ticker = AsyncMock(return_value={"lastPrice": "1.0"})
+    scanner = UnifiedAutoScanner(bot, bot.bybit_connector, None, None, None, None)
+
+    bot.bybit_connector.get_klines = AsyncMock(return_value=klines(2))
+    assert await scanner._get_market_data("BTCUSDT")
+    assert alerts.kline_volumes.count("BTCUSDT") > 0
+    await flush(alerts)
+    assert alerts.alert_stats["volume_spike"] == 0
+
+    # Повтор тех же свечей не оценивается повторно; новая закрытая - да
+    assert await scanner._get_market_data("BTCUSDT")
+    bot.bybit_connector.get_klines = AsyncMock(return_value=klines(1, last_volume=900.0))
+    assert await scanner._get_market_data("BTCUSDT")
+
+    await flush(alerts)
+    assert alerts.alert_stats["volume_spike"] == 1
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для exit_simulator
+First-touch TP/SL, частичное закрытие и trailing stop
+"""
+
+import numpy as np
+import pytest
+from trading.exit_simulator import simulate_exit, simulate_exits
+
+
+def bars(rows):
+    """[(high, low, close), ...] → три массива"""
+    arr = np.array(rows, dtype=float)
+    return arr[:, 0], arr[:, 1], arr[:, 2]
+
+
+class TestExitSimulator:
+    """Тесты для simulate_exits"""
+
+    def test_first_touch_long_and_short(self):
+        """Тест: LONG выходит по TP, SHORT по SL на том же баре"""
+        high, low, close = bars(
+            [(100, 100, 100), (101, 99.5, 100.5), (103, 100, 102), (102, 101, 101)]
+        )
+        result = simulate_exits(
+            high, low, close,
+            entry_bar=[0, 0],
+            direction=["LONG", "SHORT"],
+            entry_price=[100, 100],
+            stop_loss=[98, 102.5],
+            tp1=[102.5, 97],
+            weights=(1, 0, 0),
+        )
+
+        assert list(result.exit_bar) == [2, 2]
+        assert list(result.exit_reason) == ["TP", "SL"]
+        assert result.exit_price[0] == pytest.approx(102.5)
+        assert result.pnl_pct[1] == pytest.approx((100 / 102.5 - 1) * 100)
+
+    def test_same_bar_ordering(self):
+        """Тест: касание TP и SL в одном баре зависит от same_bar"""
+        high, low, close = bars([(100, 100, 100), (105, 95, 100)])
+        kwargs = dict(entry_bar=0, direction="LONG", entry_price=100, stop_loss=97, tp1=103)
+
+        assert simulate_exit(high, low, close, **kwargs)["exit_reason"] == "SL"
+        assert (
+            simulate_exit(high, low, close, same_bar="tp_first", **kwargs)["exit_reason"]
+            == "TP"
+        )
+
+    def test_partial_fills(self):
+        """Тест: TP1 закрывает 25%, остаток уходит по SL"""
+        high, low, close = bars([(100, 100, 100), (101.5, 100, 101), (101, 97, 98)])
+        result = simulate_exits(
+            high, low, close, [0], "LONG", [100], [98], [101], [103], [105]
+        )
+
+        assert list(result.tp_hit[0]) == [True, False, False]
+        assert result.exit_reason[0] == "SL"
+        assert result.exit_price[0] == pytest.approx(0.25 * 101 + 0.75 * 98)
+
+    def test_trailing_stop(self):
+        """Тест: trailing stop подтягивается после +0.5% и срабатывает"""
+        high, low, close = bars([(100, 100, 100), (102, 100.5, 101.5), (101.9, 101.5, 101.6)])
+        trade = simulate_exit(
+            high, low, close,
+            entry_bar=0, direction="LONG", entry_price=100, stop_loss=98, tp1=110,
+            trailing_trigger=0.5, trailing_distance=0.3,
+        )
+
+        assert trade["exit_bar"] == 2
+        assert trade["exit_price"] == pytest.approx(102 * 0.997)
+
+    def test_timeout_and_max_bars(self):
+        """Тест: без касания позиция закрывается по close последнего бара"""
+        high, low, close = bars([(100, 100, 100)] + [(100.5, 99.5, 100.2)] * 10)
+        trade = simulate_exit(
+            high, low, close, entry_bar=0, direction="LONG",
+            entry_price=100, stop_loss=95, tp1=105, max_bars=4,
+        )
+
+        assert trade["exit_reason"] == "TIMEOUT"
+        assert trade["exit_bar"] == 4
+        assert trade["exit_price"] == pytest.approx(100.2)
+
+    def test_blocks_match_single_pass(self):
+        """Тест: результат не зависит от размера блока"""
+        rng = np.random.default_rng(1)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, 2000)))
+        high, low = close * 1.002, close * 0.998
+        entries = rng.integers(0, 1900, 300)
+        direction = np.where(rng.random(300) < 0.5, 1, -1)
+        entry = close[entries]
+        args = (
+            high, low, close, entries, direction, entry,
+            entry * (1 - 0.01 * direction), entry * (1 + 0.01 * direction),
+            entry * (1 + 0.02 * direction), entry * (1 + 0.03 * direction),
+        )
+
+        small = simulate_exits(*args, block_size=7, trailing_trigger=0.5, trailing_distance=0.3)
+        large = simulate_exits(*args, block_size=4096, trailing_trigger=0.5, trailing_distance=0.3)
+
+        assert np.array_equal(small.exit_bar, large.exit_bar)
+        assert np.allclose(small.exit_price, large.exit_price)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для FilterPipeline
+Ранний выход, адаптивный порядок этапов и воронка AdvancedSignalGenerator
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from trading.filter_pipeline import FilterPipeline, FilterStage
+from trading.signal_generator import AdvancedSignalGenerator
+
+
+def make_stage(name, cost, reject, calls, blocking=True):
+    async def func(ctx):
+        calls.append(name)
+        return (not reject(ctx), f"{name} rejected")
+
+    return FilterStage(name, func, cost=cost, blocking=blocking)
+
+
+class TestFilterPipeline:
+    """Тесты для FilterPipeline"""
+
+    @pytest.mark.asyncio
+    async def test_declared_cost_order_and_early_exit(self):
+        """Тест: дешёвый этап первым, отказ останавливает конвейер"""
+        calls = []
+        pipeline = FilterPipeline(
+            [
+                make_stage("annotate", 1.0, lambda ctx: True, calls, blocking=False),
+                make_stage("expensive", 100.0, lambda ctx: False, calls),
+                make_stage("cheap", 0.1, lambda ctx: ctx["bad"], calls),
+            ]
+        )
+
+        assert pipeline.order == ["cheap", "expensive", "annotate"]
+        assert await pipeline.run({"bad": True}) == (False, "cheap: cheap rejected")
+        assert calls == ["cheap"]
+
+        # Неблокирующий этап не отклоняет
+        assert (await pipeline.run({"bad": False}))[0]
+        assert calls == ["cheap", "cheap", "expensive", "annotate"]
+
+        funnel = pipeline.get_funnel_stats()
+        assert funnel["candidates"] == 2 and funnel["accepted"] == 1
+        assert funnel["stages"]["cheap"]["rejected"] == 1
+        assert funnel["stages"]["expensive"]["evaluated"] == 1
+
+    @pytest.mark.asyncio
+    async def test_adaptive_reorder_by_rejection_rate(self):
+        """Тест: при равной стоимости вперёд выходит более избирательный этап"""
+        calls = []
+        pipeline = FilterPipeline(
+            [
+                make_stage("rarely", 1.0, lambda ctx: ctx["i"] % 10 == 0, calls),
+                make_stage("often", 1.0, lambda ctx: ctx["i"] % 2 == 0, calls),
+            ],
+            min_samples=1000,
+            reorder_every=10,
+        )
+        assert pipeline.order[0] == "rarely"
+
+        for i in range(40):
+            await pipeline.run({"i": i})
+
+        assert pipeline.order == ["often", "rarely"]
+        assert pipeline.reorders == 1
+        assert pipeline.get_funnel_stats()["stages"]["often"]["reject_rate"] > 0.4
+
+    @pytest.mark.asyncio
+    async def test_generator_skips_mtf_for_low_rr(self):
+        """Тест: сигнал с низким R/R не доходит до сетевого Multi-TF Filter"""
+        mtf_calls = []
+
+        class StubMTF:
+            async def validate(self, **kwargs):
+                mtf_calls.append(kwargs["symbol"])
+                return True, {}, "ok"
+
+        generator = AdvancedSignalGenerator(
+            bot=SimpleNamespace(), veto_system=None, multi_tf_filter=StubMTF()
+        )
+        signal = SimpleNamespace(rr1=0.5, side="long", confidence_score=0.7, market_conditions={})
+
+        passed, reason = await generator._apply_filters(signal, "BTCUSDT", {}, None)
+
+        assert not passed and reason.startswith("min_rr")
+        assert mtf_calls == []
+
+        signal.rr1 = 3.0
+        assert (await generator._apply_filters(signal, "BTCUSDT", {}, None))[0]
+        assert mtf_calls == ["BTCUSDT"]
+        assert signal.confidence_score == pytest.approx(0.8)
+
+        funnel = generator.get_generator_stats()["filter_funnel"]
+        assert funnel["stages"]["min_rr"]["rejected"] == 1
+        assert funnel["stages"]["confirm"]["skipped"] == 1
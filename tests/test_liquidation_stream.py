@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для LiquidationAggregator и BybitLiquidationStream
+Поминутные бакеты, окна 24ч/1ч и разбор allLiquidation
+"""
+
+import time
+
+import pytest
+from analytics.veto_system import EnhancedVetoSystem
+from connectors.bybit_connector import EnhancedBybitConnector
+from connectors.bybit_liquidation_stream import (
+    BybitLiquidationStream,
+    LiquidationAggregator,
+    MINUTE_MS,
+    get_liquidation_aggregator,
+)
+
+
+NOW_MS = 1_760_000_000_000
+
+
+class TestLiquidationAggregator:
+    """Тесты для LiquidationAggregator"""
+
+    def test_windows_and_sides(self):
+        """Тест: Buy = лонг, Sell = шорт, окно отсекает старые минуты"""
+        aggregator = LiquidationAggregator()
+        aggregator.add("BTCUSDT", "Buy", 60000, 2, NOW_MS)
+        aggregator.add("BTCUSDT", "Sell", 60000, 1, NOW_MS - 30 * MINUTE_MS)
+        aggregator.add("BTCUSDT", "Buy", 60000, 1, NOW_MS - 120 * MINUTE_MS)
+
+        hour = aggregator.window("BTCUSDT", 60, now_ms=NOW_MS)
+        day = aggregator.summary("BTCUSDT", now_ms=NOW_MS)
+
+        assert hour == {"long": 120000.0, "short": 60000.0, "total": 180000.0, "count": 2}
+        assert day["total_long"] == 180000.0
+        assert day["count"] == 3
+        assert day["long_pct"] == pytest.approx(75.0)
+        assert aggregator.window("ETHUSDT", 60, now_ms=NOW_MS)["count"] == 0
+
+    def test_ring_reuses_slots(self):
+        """Тест: через полный круг слот переиспользуется, опоздавшие события отбрасываются"""
+        aggregator = LiquidationAggregator(ring_minutes=60)
+        aggregator.add("ETHUSDT", "Sell", 3000, 100, NOW_MS)
+        aggregator.add("ETHUSDT", "Sell", 3000, 10, NOW_MS + 60 * MINUTE_MS)
+
+        assert aggregator.add("ETHUSDT", "Sell", 3000, 1, NOW_MS) is False
+        window = aggregator.window("ETHUSDT", 60, now_ms=NOW_MS + 60 * MINUTE_MS)
+        assert window["short"] == 30000.0
+        assert aggregator.stats["late"] == 1
+
+    def test_heavy_minutes(self):
+        """Тест: минуты с ликвидациями выше порога"""
+        aggregator = LiquidationAggregator()
+        for i in range(6):
+            aggregator.add("SOLUSDT", "Buy", 100, 20000, NOW_MS - i * MINUTE_MS)
+        aggregator.add("SOLUSDT", "Buy", 100, 10, NOW_MS - 10 * MINUTE_MS)
+
+        heavy = aggregator.heavy_minutes("SOLUSDT", 60, 1_000_000, now_ms=NOW_MS)
+
+        assert heavy["minutes"] == 6
+        assert heavy["max_usd"] == 2_000_000.0
+
+
+class TestLiquidationStream:
+    """Тесты разбора сообщений и чтения без сети"""
+
+    def test_process_message(self):
+        """Тест: сообщение allLiquidation попадает в бакеты"""
+        aggregator = LiquidationAggregator()
+        stream = BybitLiquidationStream(["ROSEUSDT"], aggregator=aggregator)
+
+        added = stream.process_message(
+            {
+                "topic": "allLiquidation.ROSEUSDT",
+                "type": "snapshot",
+                "ts": NOW_MS,
+                "data": [
+                    {"T": NOW_MS, "s": "ROSEUSDT", "S": "Sell", "v": "20000", "p": "0.045"},
+                    {"T": NOW_MS, "s": "ROSEUSDT", "S": "Buy", "v": "bad", "p": "0.045"},
+                ],
+            }
+        )
+
+        assert added == 1
+        assert aggregator.window("ROSEUSDT", 5, now_ms=NOW_MS)["short"] == pytest.approx(900.0)
+        assert stream.process_message({"topic": "orderbook.50.ROSEUSDT"}) == 0
+
+    @pytest.mark.asyncio
+    async def test_connector_and_veto_read_buckets(self):
+        """Тест: get_liquidations_24h и вето каскада читают общий агрегатор"""
+        aggregator = get_liquidation_aggregator()
+        now_ms = MINUTE_MS * (int(time.time() * 1000) // MINUTE_MS)
+        for i in range(8):
+            aggregator.add("AVAXUSDT", "Buy", 30, 50000, now_ms - i * MINUTE_MS)
+
+        connector = EnhancedBybitConnector()
+        liquidations = await connector.get_liquidations_24h("AVAXUSDT")
+        veto = await EnhancedVetoSystem()._check_liquidation_cascade({}, "AVAXUSDT")
+
+        assert liquidations["total_long"] == pytest.approx(12_000_000)
+        assert liquidations["count"] == 8
+        assert veto is not None
+        assert veto.data["events_count"] == 8
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для live_features и MLSignalScorer
+Паритет с офлайн MLFeaturesExtractor и батчевый скоринг
+"""
+
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+from features.live_features import LiveFeatureBuilder, MODEL_FEATURE_COLUMNS
+from features.ml_features_extractor import MLFeaturesExtractor
+from trading.ml_signal_scorer import MLSignalScorer
+
+
+def make_candles(n=400, seed=7):
+    """Синтетические 5m свечи"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.002, n)) * close
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2025-01-06", periods=n, freq="5min"),
+            "open": open_,
+            "high": np.maximum(open_, close) + spread,
+            "low": np.minimum(open_, close) - spread,
+            "close": close,
+            "volume": rng.uniform(10, 100, n),
+        }
+    )
+
+
+class TestLiveFeatures:
+    """Тесты для LiveFeatureBuilder"""
+
+    def test_parity_with_offline_extractor(self):
+        """Тест: инкрементальные признаки совпадают с офлайн расчётом на каждом баре"""
+        df = make_candles()
+        offline = MLFeaturesExtractor().calculate_all_features(df.copy())
+        expected = offline[MODEL_FEATURE_COLUMNS].to_numpy(dtype=float)
+
+        builder = LiveFeatureBuilder()
+        rows = []
+        for candle in df.to_dict("records"):
+            builder.update("BTCUSDT", candle)
+            rows.append(builder.vector("BTCUSDT"))
+
+        assert np.allclose(np.array(rows), expected, rtol=1e-7, atol=1e-9, equal_nan=True)
+
+    def test_duplicate_bars_ignored(self):
+        """Тест: повтор закрытой свечи не сдвигает состояние"""
+        candles = make_candles(60).to_dict("records")
+        builder = LiveFeatureBuilder()
+        builder.extend("ETHUSDT", candles)
+        before = builder.vector("ETHUSDT")
+
+        assert builder.update("ETHUSDT", candles[-1]) is False
+        assert builder.bar_count("ETHUSDT") == 60
+        assert builder.is_ready("ETHUSDT")
+        assert np.array_equal(builder.vector("ETHUSDT"), before, equal_nan=True)
+
+
+class TestMLSignalScorer:
+    """Тесты для MLSignalScorer (модель из models/)"""
+
+    @pytest.fixture
+    def scorer(self):
+        scorer = MLSignalScorer()
+        if not scorer.enabled:
+            pytest.skip("XGBoost модель недоступна")
+        return scorer
+
+    def test_one_predict_for_all_symbols(self, scorer):
+        """Тест: все символы с новой свечой скорятся одним predict"""
+        for i, symbol in enumerate(["BTCUSDT", "ETHUSDT", "SOLUSDT"]):
+            scorer.builder.extend(symbol, make_candles(80, seed=i).to_dict("records"))
+
+        scores = scorer.score_all()
+
+        assert set(scores) == {"BTCUSDT", "ETHUSDT", "SOLUSDT"}
+        assert all(0.0 <= p <= 1.0 for p in scores.values())
+        assert scorer.stats["batches"] == 1
+        assert scorer.score_all() == {}  # Новых свечей нет
+
+    @pytest.mark.asyncio
+    async def test_concurrent_scores_share_batch(self, scorer):
+        """Тест: параллельные score() ждут один батч, мало истории → None"""
+        for i, symbol in enumerate(["BTCUSDT", "ETHUSDT"]):
+            scorer.builder.extend(symbol, make_candles(80, seed=i).to_dict("records"))
+        scorer.builder.extend("XRPUSDT", make_candles(10).to_dict("records"))
+
+        btc, eth, xrp = await asyncio.gather(
+            scorer.score("BTCUSDT"), scorer.score("ETHUSDT"), scorer.score("XRPUSDT")
+        )
+
+        assert btc is not None and eth is not None
+        assert xrp is None
+        assert scorer.stats["batches"] == 1
+        assert scorer.get_probability("BTCUSDT") == btc
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для LoopMonitor
+Лаг event loop, стек блокирующего вызова и инвентарь задач по создателю
+"""
+
+import asyncio
+import random
+import time
+
+import pytest
+from utils.loop_monitor import LoopMonitor
+
+
+def blocking_sqlite_like_call(seconds: float):
+    """Синхронная работа в loop (как sqlite/pandas в обработчике)"""
+    time.sleep(seconds)
+
+
+async def listener():
+    await asyncio.sleep(10)
+
+
+class TestLoopMonitor:
+    """Тесты для LoopMonitor"""
+
+    @pytest.mark.asyncio
+    async def test_block_detected_with_stack(self):
+        """Тест: блокировка loop фиксируется вместе со стеком виновника"""
+        monitor = LoopMonitor(interval=0.05, block_threshold=0.1)
+        monitor.start()
+        await asyncio.sleep(0.2)
+
+        blocking_sqlite_like_call(0.4)
+        await asyncio.sleep(0.2)
+        await monitor.stop()
+
+        lag = monitor.get_lag_stats()
+        assert lag["max_lag_ms"] >= 300
+        assert lag["blocks"] == 1
+
+        event = monitor.get_block_events()[0]
+        assert "blocking_sqlite_like_call" in event["top_frame"]
+        assert event["duration_ms"] >= 250
+        assert any("test_block_detected_with_stack" in line for line in event["stack"])
+
+    @pytest.mark.asyncio
+    async def test_short_block_detected_at_production_ratio(self):
+        """Тест: блокировка чуть длиннее порога не теряется при interval > threshold"""
+        monitor = LoopMonitor(interval=0.5, block_threshold=0.25)
+        monitor.start()
+        try:
+            for _ in range(3):
+                # Случайная фаза относительно sampler и проб watchdog
+                await asyncio.sleep(random.uniform(0.05, 0.5))
+                blocking_sqlite_like_call(0.45)
+            await asyncio.sleep(0.15)
+        finally:
+            await monitor.stop()
+
+        events = monitor.get_block_events()
+        assert len(events) == 3
+        for event in events:
+            assert "blocking_sqlite_like_call" in event["top_frame"]
+            assert 400 <= event["duration_ms"] <= 560
+
+    @pytest.mark.asyncio
+    async def test_task_inventory_grouped_by_creator(self):
+        """Тест: задачи группируются по месту create_task"""
+        monitor = LoopMonitor(interval=0.05)
+        monitor.start()
+        try:
+            tasks = []
+            for _ in range(3):
+                tasks.append(asyncio.create_task(listener()))
+            await asyncio.sleep(0)
+
+            groups = monitor.get_task_inventory()["groups"]
+            top = groups[0]
+            assert top["count"] == 3
+            assert top["coroutine"] == "listener"
+            assert top["creator"].startswith("test_loop_monitor.py:")
+            assert top["creator"].endswith("test_task_inventory_grouped_by_creator")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await monitor.stop()
+
+        assert asyncio.get_running_loop().get_task_factory() is None
+
+    @pytest.mark.asyncio
+    async def test_ongoing_block_returned_as_snapshot(self):
+        """Тест: идущая блокировка отдаётся копией, сторож её не меняет"""
+        monitor = LoopMonitor(interval=0.05, block_threshold=0.1)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.1)
+            blocking_sqlite_like_call(0.3)
+            # Loop ещё не ответил на пробу - блокировка считается идущей
+            ongoing = monitor.get_block_events()[-1]
+            snapshot = dict(ongoing)
+            await asyncio.sleep(0.2)
+        finally:
+            await monitor.stop()
+
+        assert ongoing["ongoing"] is True
+        assert "_started" not in ongoing
+        assert ongoing == snapshot
+
+        finished = monitor.get_block_events()[-1]
+        assert "ongoing" not in finished
+        assert finished["duration_ms"] >= ongoing["duration_ms"]
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для NewsStore
+Дедупликация, FTS поиск и выборка новостей по символу
+"""
+
+import pytest
+from data.news_store import NewsStore
+from analytics.enhanced_sentiment_analyzer import UnifiedSentimentAnalyzer
+from utils.helpers import current_epoch_ms
+
+
+class TestNewsStore:
+    """Тесты для NewsStore"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """Фикстура хранилища во временной БД"""
+        store = NewsStore(db_path=str(tmp_path / "news.db"))
+        yield store
+        store.close()
+
+    @pytest.fixture
+    def news(self):
+        """Тестовые новости из двух источников"""
+        now = current_epoch_ms()
+        return [
+            {
+                "id": "cp_1",
+                "title": "Bitcoin ETF approval expected",
+                "content": "Bitcoin ETF approval expected",
+                "timestamp": now - 60_000,
+                "url": "https://example.com/btc-etf",
+                "source": "cryptopanic",
+            },
+            {
+                "id": "777",
+                "title": "Ethereum network upgrade",
+                "body": "Vitalik comments on the upgrade",
+                "published_at": (now - 120_000) // 1000,
+                "url": "https://example.com/eth-upgrade",
+                "source": "CryptoCompare",
+            },
+            {
+                "id": "778",
+                "title": "Solana validators report outage",
+                "body": "Network outage for several hours",
+                "published_at": (now - 180_000) // 1000,
+                "url": "https://example.com/sol-outage",
+                "source": "CryptoCompare",
+            },
+        ]
+
+    def test_save_and_dedup(self, store, news):
+        """Тест: повторное сохранение не создаёт дубликатов"""
+        assert store.save_news(news) == 3
+        assert store.save_news(news) == 0
+        assert store.count() == 3
+
+    def test_dedup_by_url(self, store, news):
+        """Тест: новость с тем же URL из другого источника отбрасывается"""
+        store.save_news(news)
+
+        duplicate = dict(news[0], id="999", source="CryptoCompare")
+        assert store.save_news([duplicate]) == 0
+
+    def test_news_for_symbol(self, store, news):
+        """Тест: выборка по символу совпадает с filter_news_by_symbol"""
+        store.save_news(news)
+        analyzer = UnifiedSentimentAnalyzer()
+
+        for symbol in ("BTC", "ETH", "SOL", "ALT"):
+            from_store = [n["id"] for n in store.get_news_for_symbol(symbol)]
+            scanned = [
+                n["id"] for n in analyzer.filter_news_by_symbol(list(news), symbol)
+            ]
+            assert sorted(from_store) == sorted(scanned)
+
+    def test_trading_pair_symbol(self, store, news):
+        """Тест: BTCUSDT нормализуется в BTC"""
+        store.save_news(news)
+        assert [n["id"] for n in store.get_news_for_symbol("BTCUSDT")] == ["cp_1"]
+
+    def test_full_text_search(self, store, news):
+        """Тест: полнотекстовый поиск по body"""
+        store.save_news(news)
+        results = store.search("outage")
+
+        assert [n["id"] for n in results] == ["778"]
+
+    def test_fetch_cache_roundtrip(self, store, news):
+        """Тест: кэш ответов API восстанавливается в формате коннектора"""
+        store.save_fetch("cryptocompare_all", news[1:], ttl=900)
+
+        cache = store.load_fetch_cache("cryptocompare_")
+
+        assert list(cache) == ["cryptocompare_all"]
+        assert cache["cryptocompare_all"]["ttl"] == 900
+        assert [n["id"] for n in cache["cryptocompare_all"]["data"]] == ["777", "778"]
+
+    def test_sentiment_uses_store(self, store, news):
+        """Тест: sentiment по символу берёт новости из хранилища"""
+        store.save_news(news)
+        analyzer = UnifiedSentimentAnalyzer(news_store=store)
+
+        result = analyzer.get_symbol_sentiment("BTCUSDT")
+
+        assert result["news_count"] == 1
+        assert result["sentiment"] in ("bullish", "neutral", "bearish")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для RateLimiter
+Вес запросов, резерв приоритетов и подстройка под заголовки биржи
+(локальный HTTP stub вместо Bybit / Binance)
+"""
+
+import asyncio
+import time
+
+import aiohttp
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from utils.rate_limiter import RateLimiter, request_priority
+
+
+EXCHANGES = {
+    "bybit": {"capacity": 100, "window_seconds": 100, "weights": {}},
+    "binance": {"capacity": 10, "window_seconds": 100, "weights": {"trades": 4}},
+}
+RESERVE = {"critical": 0.0, "normal": 0.2, "low": 0.5}
+
+
+@pytest_asyncio.fixture
+async def stub_server():
+    """Stub с заголовками лимитов Bybit и 429 Binance"""
+
+    async def bybit_tickers(request):
+        return web.json_response(
+            {"retCode": 0},
+            headers={"X-Bapi-Limit": "10", "X-Bapi-Limit-Status": "1"},
+        )
+
+    async def binance_klines(request):
+        return web.json_response([], status=429, headers={"Retry-After": "0.3"})
+
+    app = web.Application()
+    app.router.add_get("/v5/market/tickers", bybit_tickers)
+    app.router.add_get("/api/v3/klines", binance_klines)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}"
+    await runner.cleanup()
+
+
+class TestRateLimiter:
+    """Тесты для RateLimiter"""
+
+    @pytest.mark.asyncio
+    async def test_weights_and_priority_reserve(self):
+        """Тест: вес из таблицы биржи; low не трогает резерв, critical - может"""
+        limiter = RateLimiter(exchanges=EXCHANGES, priority_reserve=RESERVE)
+
+        await limiter.acquire("binance_trades")
+        assert limiter.get_bucket_stats("binance")["tokens"] == pytest.approx(6, abs=0.01)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(limiter.acquire("binance_klines", weight=2, priority="low"), 0.05)
+
+        with request_priority("critical"):
+            await asyncio.wait_for(limiter.acquire("binance_trades"), 0.05)
+
+        assert limiter.get_all_stats() == {"total_requests": 2, "binance_trades": 2}
+        assert limiter.get_stats("binance_trades")["weight"] == pytest.approx(8)
+
+    @pytest.mark.asyncio
+    async def test_adapts_to_response_headers(self, stub_server):
+        """Тест: остаток Bybit урезает ведро, 429 Binance ставит паузу Retry-After"""
+        exchanges = {**EXCHANGES, "binance": {"capacity": 1000, "window_seconds": 1}}
+        limiter = RateLimiter(exchanges=exchanges, priority_reserve=RESERVE)
+
+        async with aiohttp.ClientSession() as session:
+            await limiter.acquire("bybit_ticker")
+            async with session.get(f"{stub_server}/v5/market/tickers") as response:
+                fraction = limiter.update_from_headers("bybit", response.headers, response.status)
+
+            async with session.get(f"{stub_server}/api/v3/klines") as response:
+                limiter.update_from_headers("binance", response.headers, response.status)
+
+        assert fraction == pytest.approx(0.1)
+        bybit = limiter.get_bucket_stats("bybit")
+        assert bybit["tokens"] == pytest.approx(10, abs=0.1)
+        assert bybit["rate_factor"] < 1.0
+        assert bybit["server_adjustments"] == 1
+
+        start = time.monotonic()
+        await limiter.acquire("binance_klines", weight=1, priority="critical")
+        assert time.monotonic() - start >= 0.25
+        assert limiter.get_bucket_stats("binance")["rate_limited"] == 1
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для RequestCoalescer
+Single-flight, TTL кэш по endpoint и статистика
+"""
+
+import asyncio
+
+import pytest
+from utils.request_coalescer import RequestCoalescer, coalesced, get_request_coalescer
+
+
+class FakeLoader:
+    """Счётчик реальных "HTTP" запросов"""
+
+    def __init__(self, value="ok", delay=0.01, error=None):
+        self.calls = 0
+        self.value = value
+        self.delay = delay
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.value
+
+
+class TestRequestCoalescer:
+    """Тесты для RequestCoalescer"""
+
+    @pytest.mark.asyncio
+    async def test_inflight_requests_are_coalesced(self):
+        """Тест: 5 одинаковых запросов в полёте → 1 реальный вызов"""
+        coalescer = RequestCoalescer()
+        loader = FakeLoader({"lastPrice": "100"})
+
+        results = await asyncio.gather(
+            *(coalescer.fetch("bybit_ticker", "BTCUSDT", loader) for _ in range(5))
+        )
+
+        assert loader.calls == 1
+        assert all(r is results[0] for r in results)
+        stats = coalescer.get_stats()["bybit_ticker"]
+        assert stats["coalesced"] == 4
+        assert stats["coalesce_rate"] == pytest.approx(80.0)
+
+    @pytest.mark.asyncio
+    async def test_ttl_cache_and_expiry(self):
+        """Тест: повтор в пределах TTL из кэша, после TTL - новый запрос"""
+        coalescer = RequestCoalescer(ttls={"bybit_orderbook": 0.05})
+        loader = FakeLoader({"bids": [1]}, delay=0)
+
+        await coalescer.fetch("bybit_orderbook", ("BTCUSDT", 50), loader)
+        await coalescer.fetch("bybit_orderbook", ("BTCUSDT", 50), loader)
+        assert loader.calls == 1
+        assert coalescer.get_stats()["bybit_orderbook"]["hits"] == 1
+
+        await coalescer.fetch("bybit_orderbook", ("BTCUSDT", 200), loader)
+        assert loader.calls == 2  # Другие параметры - другой ключ
+
+        await asyncio.sleep(0.06)
+        await coalescer.fetch("bybit_orderbook", ("BTCUSDT", 50), loader)
+        assert loader.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_errors_and_empty_not_cached(self):
+        """Тест: ошибка отдаётся всем ожидающим, пустой ответ не кэшируется"""
+        coalescer = RequestCoalescer()
+        failing = FakeLoader(error=RuntimeError("boom"))
+
+        results = await asyncio.gather(
+            coalescer.fetch("bybit_klines", "k", failing),
+            coalescer.fetch("bybit_klines", "k", failing),
+            return_exceptions=True,
+        )
+        assert failing.calls == 1
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert coalescer.get_stats()["bybit_klines"]["errors"] == 1
+
+        empty = FakeLoader(value=None, delay=0)
+        await coalescer.fetch("bybit_klines", "k", empty)
+        await coalescer.fetch("bybit_klines", "k", empty)
+        assert empty.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_decorator_normalizes_arguments(self):
+        """Тест: позиционные и именованные аргументы дают один ключ"""
+
+        class Connector:
+            calls = 0
+
+            @coalesced("test_klines")
+            async def get_klines(self, symbol, interval="60", limit=100):
+                Connector.calls += 1
+                return [symbol, interval, limit]
+
+        get_request_coalescer().invalidate("test_klines")
+        connector = Connector()
+
+        first = await connector.get_klines("BTCUSDT")
+        second = await connector.get_klines("BTCUSDT", interval="60", limit=100)
+        third = await connector.get_klines("BTCUSDT", "240")
+
+        assert first == second == ["BTCUSDT", "60", 100]
+        assert third == ["BTCUSDT", "240", 100]
+        assert Connector.calls == 2
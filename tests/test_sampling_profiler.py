@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для SamplingProfiler
+Горячие функции, collapsed-stack файл и атрибуция по меткам
+"""
+
+import asyncio
+import time
+
+import pytest
+from utils.sampling_profiler import SamplingProfiler, profile_tag
+
+
+def hot_indicator_loop(seconds: float) -> int:
+    """CPU-нагрузка (как пересчёт индикаторов)"""
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(i * i for i in range(200))
+    return total
+
+
+async def analyze(seconds: float):
+    with profile_tag("symbol:BTCUSDT"):
+        hot_indicator_loop(seconds)
+
+
+class TestSamplingProfiler:
+    """Тесты для SamplingProfiler"""
+
+    def test_hot_function_in_summary_and_collapsed_file(self, tmp_path):
+        """Тест: CPU-горячая функция наверху сводки, файл в формате "стек N" """
+        # Над тестом ~30 кадров pytest со 100% inclusive - сводка шире их
+        profiler = SamplingProfiler(output_dir=tmp_path, rate_hz=200, top_n=100)
+        assert profiler.start(duration=5)["started"]
+        assert profiler.start()["started"] is False
+
+        hot_indicator_loop(0.4)
+        result = profiler.stop()
+
+        assert not profiler.is_running
+        assert result["samples"] > 20
+        inclusive = {row["function"]: row["pct"] for row in result["top_inclusive"]}
+        assert inclusive["test_sampling_profiler:hot_indicator_loop"] > 50
+
+        lines = open(result["collapsed_file"], encoding="utf-8").read().splitlines()
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert stack.startswith("thread:MainThread;")
+        assert "Top self:" in open(result["summary_file"], encoding="utf-8").read()
+
+    @pytest.mark.asyncio
+    async def test_samples_attributed_to_task_tag(self, tmp_path):
+        """Тест: сэмплы внутри profile_tag помечены символом"""
+        profiler = SamplingProfiler(output_dir=tmp_path, rate_hz=200)
+        profiler.start(duration=5)
+        await asyncio.create_task(analyze(0.3))
+        hot_indicator_loop(0.1)
+        result = await asyncio.to_thread(profiler.stop)
+
+        assert result["tags"]["symbol:BTCUSDT"] > 10
+        collapsed = open(result["collapsed_file"], encoding="utf-8").read()
+        assert "tag:symbol:BTCUSDT;thread:MainThread;" in collapsed
+
+    def test_stop_returns_none_when_sampler_hangs(self, tmp_path):
+        """Тест: поток сэмплера не завершился - stop() не отдаёт прошлый результат"""
+
+        class HungThread:
+            def join(self, timeout=None):
+                pass
+
+            def is_alive(self):
+                return True
+
+        profiler = SamplingProfiler(output_dir=tmp_path)
+        profiler.last_result = {"samples": 1}
+        profiler._thread = HungThread()
+
+        assert profiler.stop() is None
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для ActivityScheduler
+Горячие символы чаще, бюджет анализов и гарантия свежести
+"""
+
+import time
+
+from trading.scan_scheduler import ActivityScheduler
+
+
+def simulate(scheduler, seconds, step=10, on_tick=None):
+    """Прогон расписания на виртуальном времени; возвращает счётчик анализов"""
+    start = time.monotonic()
+    counts = {symbol: 0 for symbol in scheduler.activity}
+    for t in range(0, seconds, step):
+        now = start + t
+        if on_tick:
+            on_tick(scheduler, t, now)
+        for symbol in scheduler.next_batch(now):
+            counts[symbol] += 1
+            scheduler.mark_scanned(symbol, now)
+    return counts
+
+
+class TestActivityScheduler:
+    """Тесты для ActivityScheduler"""
+
+    def test_hot_symbol_scanned_more_often(self):
+        """Тест: волатильный символ у уровня сканируется чаще спокойного"""
+        scheduler = ActivityScheduler(
+            ["HOTUSDT", "COLDUSDT"],
+            budget_per_minute=60,
+            min_interval_seconds=30,
+            max_staleness_seconds=300,
+        )
+        scheduler.observe_scan("HOTUSDT", candles=[{"volume": 1}] * 20 + [{"volume": 5}], levels=[100.0])
+
+        def feed(s, t, now):
+            s.observe_price("HOTUSDT", 100.0 * (1.01 if (t // 10) % 2 else 1.0), now)
+            s.observe_price("COLDUSDT", 50.0, now)
+
+        counts = simulate(scheduler, 1200, on_tick=feed)
+
+        assert scheduler.score("HOTUSDT") > 0.5
+        assert scheduler.score("COLDUSDT") == 0.0
+        assert counts["HOTUSDT"] >= 5 * counts["COLDUSDT"]
+        # Холодный символ всё равно не старше max_staleness
+        assert counts["COLDUSDT"] >= 1200 // 300 - 1
+
+    def test_budget_caps_batch_and_staleness_first(self):
+        """Тест: бюджет ограничивает выборку, просроченные идут первыми"""
+        symbols = [f"S{i}USDT" for i in range(20)]
+        scheduler = ActivityScheduler(
+            symbols, budget_per_minute=6, min_interval_seconds=30, max_staleness_seconds=120
+        )
+        now = time.monotonic()
+
+        first = scheduler.next_batch(now)
+        assert len(first) == 6
+        for symbol in first:
+            scheduler.mark_scanned(symbol, now)
+
+        # Токены кончились - до пополнения ничего не выдаётся
+        assert scheduler.next_batch(now + 1) == []
+        assert scheduler.stats["budget_exhausted"] >= 1
+
+        # Через минуту бюджет восстановлен; никогда не сканированные - первыми
+        batch = scheduler.next_batch(now + 60)
+        assert len(batch) == 6
+        assert not set(batch) & set(first)
+
+        counts = simulate(scheduler, 3600)
+        assert sum(counts.values()) <= 6 * 61
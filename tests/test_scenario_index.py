@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для ScenarioIndex
+Отсечение сценариев по стратегии, режиму, направлению и MTF паттерну
+"""
+
+from itertools import product
+
+from core.scenario_index import MTF_KEYS, TRENDS, ScenarioIndex
+from systems.unified_scenario_matcher import EnhancedScenarioMatcher
+
+
+def scenario(sid, strategy, opinion, mtf_alignment):
+    return {
+        "id": sid,
+        "strategy": strategy,
+        "opinion": opinion,
+        "if": {"mtf_alignment": mtf_alignment},
+        "scoring_system": {"deal_threshold": 0.0},
+    }
+
+
+SCENARIOS = [
+    scenario("LONG_MOM", "momentum", "bullish", ["trend_1h == 'bullish'"]),
+    scenario("SHORT_MOM", "momentum", "bearish", ["trend_1h == 'bearish'"]),
+    scenario("LONG_REV", "mean_reversion", "bullish", ["trend_4h != 'bearish'"]),
+    {"id": "OLD_SQZ", "strategy": "squeeze", "mtf": {"conditions": {"1h": ["bullish"]}}},
+]
+
+
+class TestScenarioIndex:
+    """Тесты для ScenarioIndex"""
+
+    def test_keys_and_regimes(self):
+        """Тест: маски стратегий, направлений и режимов"""
+        index = ScenarioIndex()
+        index.build(
+            SCENARIOS,
+            regime_strategies={"trending": ["momentum"], "ranging": ["mean_reversion"]},
+            all_weather=["squeeze"],
+        )
+
+        def ids(mask):
+            return [s["id"] for _, s in index.iter_mask(mask)]
+
+        assert ids(index.candidates(regime="trending")) == ["LONG_MOM", "SHORT_MOM", "OLD_SQZ"]
+        assert ids(index.candidates(regime="unknown")) == ["OLD_SQZ"]
+        assert ids(index.candidates(strategies=["momentum"], direction="short")) == ["SHORT_MOM"]
+        # Сценарий без направления подходит обоим
+        assert "OLD_SQZ" in ids(index.candidates(direction="LONG"))
+
+    def test_pattern_table_matches_mtf_check(self):
+        """Тест: таблица паттернов совпадает с _check_mtf_conditions на всех 27 комбинациях"""
+        matcher = EnhancedScenarioMatcher()
+        matcher.scenarios = list(SCENARIOS)
+        index = matcher.scenario_index
+        index.ensure(matcher.scenarios)
+
+        # Старый формат с ключом "1h" не сводится к паттерну - проверка на месте
+        assert index.mtf_runtime_mask == 1 << 3
+
+        for pattern in product(TRENDS, repeat=3):
+            trends = dict(zip(MTF_KEYS, pattern))
+            mask = index.pattern_mask(trends)
+            for i, item in enumerate(SCENARIOS[:3]):
+                assert bool(mask >> i & 1) == matcher._check_mtf_conditions(item, trends)
+
+    def test_find_best_scenario_counts_pruned(self):
+        """Тест: _find_best_scenario оценивает только кандидатов и считает отсечённые"""
+        matcher = EnhancedScenarioMatcher()
+        matcher.scenarios = list(SCENARIOS)
+        trends = {"1H": "bearish", "4H": "bearish", "1D": "neutral"}
+
+        best = matcher._find_best_scenario(
+            "BTCUSDT", {}, ["momentum", "mean_reversion"], trends
+        )
+
+        assert best["id"] == "SHORT_MOM"
+        stats = matcher.scenario_index.get_stats()
+        assert stats["last_pruned"] == 3  # squeeze - стратегия, LONG_* - MTF
+        assert stats["calls"] == 1
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для OutboundMessageQueue
+Приоритеты, склейка алертов, 429 RetryAfter и дедупликация редактирований
+"""
+
+import asyncio
+import time
+
+import pytest
+from utils.telegram_queue import OutboundMessageQueue
+
+
+class RetryAfter(Exception):
+    """Как telegram.error.RetryAfter"""
+
+    def __init__(self, seconds: float):
+        super().__init__(f"Flood control exceeded. Retry in {seconds} seconds")
+        self.retry_after = seconds
+
+
+class TestOutboundMessageQueue:
+    """Тесты для OutboundMessageQueue"""
+
+    @pytest.mark.asyncio
+    async def test_burst_coalesced_and_critical_first(self):
+        """Тест: всплеск алертов одного типа - один digest; critical не ждёт"""
+        sent = []
+
+        async def sender(chat_id, text, parse_mode, **kwargs):
+            sent.append(text)
+            return len(sent)
+
+        queue = OutboundMessageQueue(sender, coalesce_window=0.05)
+        for i in range(5):
+            assert await queue.send(1, f"liq {i}", priority="medium", alert_type="liquidations")
+        critical = await queue.send(1, "STOP", priority="critical", wait=True)
+        await asyncio.sleep(0.15)
+        await queue.stop()
+
+        assert critical == 1 and sent[0] == "STOP"
+        assert len(sent) == 2
+        assert sent[1].startswith("📦 liquidations: 5") and "liq 4" in sent[1]
+
+        stats = queue.get_stats()
+        assert stats["coalesced"] == 4 and stats["digests"] == 1
+        assert stats["latency"]["max_ms"] >= 50
+
+    @pytest.mark.asyncio
+    async def test_retry_after_pauses_chat(self):
+        """Тест: 429 ставит чат на паузу и повторяет сообщение"""
+        attempts = []
+
+        async def sender(chat_id, text, parse_mode, **kwargs):
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                raise RetryAfter(0.2)
+            return "ok"
+
+        queue = OutboundMessageQueue(sender)
+        assert await queue.send(7, "TP1", priority="high", wait=True) == "ok"
+        await queue.stop()
+
+        assert attempts[1] - attempts[0] >= 0.19
+        stats = queue.get_stats()
+        assert stats["rate_limited"] == 1 and stats["retries"] == 1
+        assert stats["sent"] == 1 and stats["failed"] == 0
+
+    @pytest.mark.asyncio
+    async def test_edits_deduplicated_and_conflated(self):
+        """Тест: неизменённый dashboard не редактируется, ожидающее - заменяется"""
+        edits = []
+
+        async def edit(text):
+            edits.append(text)
+            return True
+
+        # Ёмкость 1: второе редактирование ждёт токен и успевает заменить третье
+        queue = OutboundMessageQueue(per_chat_rate=5.0, per_chat_burst=1.0)
+        key = (1, 100)
+
+        assert await queue.edit(key, "v1 #1", edit, fingerprint="v1", wait=True) is True
+        assert await queue.edit(key, "v1 #2", edit, fingerprint="v1") is False
+
+        await queue.edit(key, "v2 #3", edit, fingerprint="v2")
+        await queue.edit(key, "v3 #4", edit, fingerprint="v3")
+        await asyncio.sleep(0.3)
+        await queue.stop()
+
+        assert edits == ["v1 #1", "v3 #4"]
+        stats = queue.get_stats()
+        assert stats["edits_deduped"] == 1 and stats["edits_conflated"] == 1
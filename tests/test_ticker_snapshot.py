@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для TickerSnapshot
+Таблица всех тикеров и O(1) поиск
+"""
+
+import pytest
+from connectors.bybit_connector import EnhancedBybitConnector
+from connectors.bybit_ticker_snapshot import TickerSnapshot
+
+
+TICKERS = [
+    {
+        "symbol": "BTCUSDT", "lastPrice": "67000.5", "price24hPcnt": "0.0125",
+        "volume24h": "1000", "turnover24h": "67000000", "fundingRate": "0.0001",
+        "openInterest": "50000", "highPrice24h": "68000", "lowPrice24h": "66000",
+    },
+    {
+        "symbol": "ETHUSDT", "lastPrice": "3400", "price24hPcnt": "-0.02",
+        "volume24h": "30000", "turnover24h": "102000000", "fundingRate": "-0.00005",
+        "openInterest": "", "highPrice24h": "3500", "lowPrice24h": "3300",
+    },
+    {
+        "symbol": "BTCPERP", "lastPrice": "67001", "price24hPcnt": "0.01",
+        "volume24h": "10", "turnover24h": "999000000", "fundingRate": "0.0001",
+    },
+]
+
+
+class TestTickerSnapshot:
+    """Тесты для TickerSnapshot"""
+
+    def test_lookups(self):
+        """Тест: цены, изменение, funding и пустые поля"""
+        snapshot = TickerSnapshot()
+        assert snapshot.load(TICKERS) == 3
+
+        assert snapshot.price("BTCUSDT") == pytest.approx(67000.5)
+        assert snapshot.change_pct("ETHUSDT") == pytest.approx(-2.0)
+        assert snapshot.funding_rate("ETHUSDT") == pytest.approx(-0.00005)
+        assert snapshot.open_interest("ETHUSDT") is None
+        assert snapshot.price("DOGEUSDT") is None
+        assert snapshot.stats["misses"] == 1
+
+        ticker = snapshot.get("BTCUSDT")
+        assert ticker["lastPrice"] == pytest.approx(67000.5)
+        assert float(ticker["price24hPcnt"]) == pytest.approx(0.0125)
+
+    def test_top_by_turnover_and_freshness(self):
+        """Тест: топ по обороту только USDT пары, возраст снимка"""
+        snapshot = TickerSnapshot()
+        assert not snapshot.is_fresh(15)
+
+        snapshot.load(TICKERS)
+
+        top = snapshot.top_by_turnover(2)
+        assert [t["symbol"] for t in top] == ["ETHUSDT", "BTCUSDT"]
+        assert snapshot.is_fresh(15)
+
+    @pytest.mark.asyncio
+    async def test_connector_serves_from_snapshot(self):
+        """Тест: get_ticker и funding без HTTP запросов при свежем снимке"""
+        connector = EnhancedBybitConnector()
+        connector.ticker_snapshot.load(TICKERS)
+
+        ticker = await connector.get_ticker("ETHUSDT")
+        price = await connector.getcurrentpricesymbol("BTCUSDT")
+
+        assert ticker["lastPrice"] == pytest.approx(3400)
+        assert price == pytest.approx(67000.5)
+        assert connector.get_funding_rate("BTCUSDT") == pytest.approx(0.01)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для time_partitions
+Маршрутизация по партициям, view, retention и свёртка в агрегаты
+"""
+
+import sqlite3
+
+import pytest
+from analytics.whale_activity_tracker import large_trades_rollups, large_trades_table
+from data.time_partitions import DAY_MS, PartitionCompactor, enable_incremental_vacuum
+
+
+NOW_MS = 1_760_000_000_000  # 2025-10-09 UTC
+
+
+@pytest.fixture
+def conn():
+    connection = sqlite3.connect(":memory:")
+    yield connection
+    connection.close()
+
+
+def trade(ts, side="BUY", usd=100_000.0, symbol="BTCUSDT"):
+    return (symbol, side, usd / 50_000, 50_000.0, usd, None, ts)
+
+
+class TestTimePartitionedTable:
+    """Тесты TimePartitionedTable"""
+
+    def test_rows_routed_to_day_partitions(self, conn):
+        """Тест: строки разных дней - в разные партиции, view видит все"""
+        table = large_trades_table()
+        table.setup(conn)
+        table.insert_many(conn, [trade(NOW_MS), trade(NOW_MS - DAY_MS), trade(NOW_MS + 1)])
+
+        assert sorted(table.partitions(conn)) == ["20251008", "20251009"]
+        assert conn.execute("SELECT COUNT(*) FROM large_trades").fetchone()[0] == 3
+        # Окно в пределах дня - одна партиция без UNION
+        assert table.source(conn, since_ms=NOW_MS - 1000) == "large_trades_p20251009"
+
+    def test_drop_before_removes_whole_partitions(self, conn):
+        """Тест: retention удаляет партицию целиком и обновляет view"""
+        table = large_trades_table()
+        table.setup(conn)
+        table.insert_many(conn, [trade(NOW_MS), trade(NOW_MS - 3 * DAY_MS)])
+
+        dropped = table.drop_before(conn, NOW_MS - DAY_MS)
+
+        assert dropped == ["20251006"]
+        assert conn.execute("SELECT COUNT(*) FROM large_trades").fetchone()[0] == 1
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        assert "large_trades_p20251006" not in tables
+
+    def test_view_swap_is_one_transaction(self, conn):
+        """Тест: DROP+CREATE VIEW - в своей транзакции или в транзакции вызывающего"""
+        table = large_trades_table()
+        table.setup(conn)
+        statements = []
+        conn.set_trace_callback(statements.append)
+
+        table.refresh_view(conn)
+        assert [s.split(" ")[0] for s in statements] == ["BEGIN", "DROP", "CREATE", "COMMIT"]
+        assert not conn.in_transaction
+
+        # В транзакции вызывающего view откатывается вместе с ней
+        conn.execute("BEGIN IMMEDIATE")
+        table.ensure_partition(conn, table.partition_key(NOW_MS))
+        conn.rollback()
+        body = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'view' AND name = 'large_trades'"
+        ).fetchone()[0]
+        assert "large_trades_p" not in body
+
+
+class TestPartitionCompactor:
+    """Тесты PartitionCompactor"""
+
+    def test_old_ticks_rolled_up_then_dropped(self, conn):
+        """Тест: старые сделки сворачиваются в 1m/1h, сырые партиции удаляются"""
+        table = large_trades_table()
+        rollups = large_trades_rollups()
+        table.setup(conn)
+        for rollup in rollups:
+            rollup.target.setup(conn)
+        assert enable_incremental_vacuum(conn)
+
+        old = NOW_MS - 10 * DAY_MS
+        old -= old % 3_600_000  # начало часа
+        table.insert_many(
+            conn,
+            [
+                trade(old, "BUY", 100_000),
+                trade(old + 10_000, "BUY", 300_000),
+                trade(old + 120_000, "SELL", 50_000),
+                trade(NOW_MS, "BUY", 70_000),
+            ],
+        )
+
+        compactor = PartitionCompactor(table, rollups, raw_days=7)
+        result = compactor.compact(conn, NOW_MS)
+
+        assert result["dropped"] == ["large_trades_p" + table.partition_key(old)]
+        assert conn.execute("SELECT COUNT(*) FROM large_trades").fetchone()[0] == 1
+
+        minute_rows = conn.execute(
+            "SELECT side, trades, volume_usd, max_usd FROM large_trades_1m ORDER BY bucket_ts"
+        ).fetchall()
+        assert minute_rows == [("BUY", 2, 400_000.0, 300_000.0), ("SELL", 1, 50_000.0, 50_000.0)]
+
+        hour_rows = conn.execute(
+            "SELECT side, trades, volume_usd FROM large_trades_1h ORDER BY side"
+        ).fetchall()
+        assert hour_rows == [("BUY", 2, 400_000.0), ("SELL", 1, 50_000.0)]
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+    def test_compact_does_not_run_full_vacuum(self, conn):
+        """Тест: перевод auto_vacuum - только на старте, компактор его не делает"""
+        table = large_trades_table()
+        table.setup(conn)
+        table.insert_many(conn, [trade(NOW_MS - 10 * DAY_MS)])
+        conn.commit()
+
+        PartitionCompactor(table, raw_days=7).compact(conn, NOW_MS)
+
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+        assert enable_incremental_vacuum(conn)
+        assert not enable_incremental_vacuum(conn)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для мемоизации EnhancedVetoSystem
+Проверки перезапускаются только при смене входов своего семейства
+"""
+
+import copy
+
+import pytest
+from analytics.veto_system import EnhancedVetoSystem
+
+
+MARKET_DATA = {
+    "ticker": {"volume_24h": 1000.0, "price_24h_pcnt": 1.0},
+    "orderbook": {
+        "spread_bps": 2.0,
+        "mid_price": 100.0,
+        "bids": [{"price": 99.9, "size": 1.0}] * 5,
+        "asks": [{"price": 100.1, "size": 1.0}] * 5,
+    },
+    # 5% funding - выше порога, вето HIGH_FUNDING_RATE
+    "funding_rate": {"funding_rate": 0.05},
+}
+
+
+class TestVetoMemo:
+    """Тесты для мемоизации вето"""
+
+    @pytest.mark.asyncio
+    async def test_same_state_reuses_result(self):
+        """Тест: то же состояние рынка - тот же результат без проверок"""
+        veto = EnhancedVetoSystem()
+
+        first = await veto.analyze_market_conditions("MEMOUSDT", MARKET_DATA)
+        checks_run = veto.memo_stats["checks_run"]
+        recorded = len(veto.veto_history)
+        await veto.analyze_market_conditions("MEMOUSDT", MARKET_DATA)
+        third = await veto.analyze_market_conditions("MEMOUSDT", copy.deepcopy(MARKET_DATA))
+
+        assert checks_run == 6
+        assert first.is_vetoed
+        assert veto.memo_stats["checks_run"] == 6
+        assert veto.memo_stats["results_reused"] == 2
+        assert veto.get_cached_result("MEMOUSDT") is third
+        # Сохраняющиеся вето записаны в историю один раз
+        assert recorded >= 1
+        assert len(veto.veto_history) == recorded
+
+    @pytest.mark.asyncio
+    async def test_only_changed_families_rerun(self):
+        """Тест: смена спреда перезапускает spread и stability, но не orderbook"""
+        veto = EnhancedVetoSystem()
+        await veto.analyze_market_conditions("MEMOUSDT", MARKET_DATA)
+
+        changed = copy.deepcopy(MARKET_DATA)
+        changed["orderbook"]["spread_bps"] = 3.0
+        await veto.analyze_market_conditions("MEMOUSDT", changed)
+
+        assert veto.memo_stats["checks_run"] == 6 + 2
+        assert veto.memo_stats["checks_reused"] == 4
+
+        # Порог - тоже вход: funding пересчитывается
+        veto.adaptive_thresholds["funding_rate"] = 0.1
+        await veto.analyze_market_conditions("MEMOUSDT", changed)
+        assert veto.memo_stats["checks_run"] == 6 + 2 + 1
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests для WhaleActivityTracker
+Поминутные агрегаты, партиции large_trades и компактор
+"""
+
+import sqlite3
+import time
+
+import pytest
+from analytics.whale_activity_tracker import WhaleActivityTracker
+
+
+class TestWhaleBuckets:
+    """Тесты поминутных агрегатов"""
+
+    def test_summary_from_buckets(self):
+        """Тест: сводка считается из бакетов, мелкие сделки не учитываются"""
+        tracker = WhaleActivityTracker(enable_batcher=False)
+        tracker.add_trade("BTCUSDT", "buy", 1.0, 60000)
+        tracker.add_trade("BTCUSDT", "buy", 0.5, 60000)
+        tracker.add_trade("BTCUSDT", "sell", 0.2, 60000)
+        tracker.add_trade("BTCUSDT", "sell", 0.01, 60000)  # $600 - не кит
+
+        summary = tracker.get_whale_summary("BTCUSDT", minutes=5)
+        activity = tracker.get_whale_activity("BTCUSDT", timeframe_seconds=300)
+
+        assert summary["count"] == 3
+        assert summary["buy_volume"] == pytest.approx(90000)
+        assert summary["sell_volume"] == pytest.approx(12000)
+        assert summary["sentiment"] == "BULLISH"
+        assert summary["largest_trade"]["value"] == pytest.approx(60000)
+        assert activity["trades"] == 3
+        assert activity["dominant_side"] == "bullish"
+
+    def test_window_skips_old_minutes(self):
+        """Тест: минуты за пределами окна и перезаписанные слоты не учитываются"""
+        tracker = WhaleActivityTracker(enable_batcher=False)
+        tracker.add_trade("ETHUSDT", "sell", 10, 3000)
+        buckets = tracker.whale_buckets["ETHUSDT"]
+        now_minute = int(time.time()) // 60
+        buckets.add({"side": "BUY", "value": 50000}, now_minute - 30)
+
+        assert buckets.aggregate(15, now_minute)["buy_count"] == 0
+        assert buckets.aggregate(60, now_minute)["buy_count"] == 1
+        assert buckets.aggregate(60, now_minute + buckets.size)["sell_count"] == 0
+
+    def test_recent_whales_newest_first(self):
+        """Тест: get_recent_whales - от новых к старым"""
+        tracker = WhaleActivityTracker(enable_batcher=False)
+        tracker.add_trade("SOLUSDT", "buy", 100, 150)
+        tracker.add_trade("SOLUSDT", "sell", 200, 150)
+
+        whales = tracker.get_recent_whales("SOLUSDT", minutes=5)
+
+        assert [w["side"] for w in whales] == ["SELL", "BUY"]
+
+
+class TestWhaleDatabase:
+    """Тесты партиционированной large_trades"""
+
+    def test_migrates_old_table_and_uses_index(self, tmp_path):
+        """Тест: старая таблица становится партицией, запрос идёт по (symbol, ts)"""
+        db_path = str(tmp_path / "whales.db")
+        recent = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() - 60))
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE large_trades (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    symbol TEXT NOT NULL, side TEXT NOT NULL, size REAL NOT NULL,
+                    price REAL NOT NULL, size_usd REAL NOT NULL,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """
+            )
+            conn.execute(
+                "INSERT INTO large_trades (symbol, side, size, price, size_usd, timestamp) "
+                "VALUES ('BTCUSDT', 'BUY', 1, 60000, 60000, ?), "
+                "('BTCUSDT', 'SELL', 1, 60000, 60000, '2020-01-01 00:00:00')",
+                (recent,),
+            )
+
+        tracker = WhaleActivityTracker(db_path=db_path, enable_batcher=False)
+        tracker.add_trade("BTCUSDT", "sell", 0.5, 60000)
+
+        whales = tracker.get_recent_whales_from_db("BTCUSDT", minutes=5)
+        assert [w["side"] for w in whales] == ["SELL", "BUY"]
+
+        # После рестарта (память пуста) сводка берётся из БД
+        restarted = WhaleActivityTracker(db_path=db_path, enable_batcher=False)
+        assert restarted.get_whale_summary("BTCUSDT", minutes=5)["count"] == 2
+
+        with sqlite3.connect(db_path) as conn:
+            source = restarted.large_trades.source(conn, since_ms=0)
+            plan = " ".join(
+                str(row[-1])
+                for row in conn.execute(
+                    f"EXPLAIN QUERY PLAN SELECT * FROM {source} "
+                    "WHERE symbol = ? AND ts > ? ORDER BY ts DESC",
+                    ("BTCUSDT", 0),
+                )
+            )
+        assert plan.count("_symbol_ts") == 2  # legacy + партиция дня
+        assert "SCAN" not in plan
+        assert "TEMP B-TREE" not in plan
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exit Simulator - общий векторизованный движок выхода TP/SL для бэктестов
+
+Для тысяч сделок сразу находит первый бар касания TP1/TP2/TP3/SL по массивам
+OHLC (NumPy), с частичным закрытием по весам и trailing stop по правилам
+ROITracker._update_trailing_stop.
+
+Правила:
+- Бар входа не проверяется, проверка начинается со следующего бара
+- TP касается по high (LONG) / low (SHORT), SL - по low / high
+- Касание TP и SL в одном баре: по умолчанию SL первым (консервативно),
+  same_bar="tp_first" - TP первым (как в ROITracker._check_tp_sl)
+- Trailing stop: после бара, где P&L >= trigger%, SL = extreme * (1 ∓ distance%),
+  только в сторону уменьшения риска; новый SL действует со следующего бара
+- Остаток позиции без касания к концу горизонта закрывается по close (TIMEOUT)
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+
+# Доли позиции на TP1/TP2/TP3 (как в ROITracker)
+DEFAULT_TP_WEIGHTS = (0.25, 0.25, 0.50)
+
+# Способ закрытия части позиции
+FILL_PENDING = 0
+FILL_TP = 1
+FILL_STOP = 2
+FILL_TIMEOUT = 3
+
+
+@dataclass
+class ExitResult:
+    """Результат симуляции (массивы по сделкам)"""
+
+    exit_bar: np.ndarray  # Бар полного закрытия позиции
+    exit_price: np.ndarray  # Средневзвешенная цена выхода
+    exit_reason: np.ndarray  # "TP" / "SL" / "TIMEOUT"
+    pnl_pct: np.ndarray  # Взвешенный P&L в %
+    fill_bar: np.ndarray  # (n, 3) бар закрытия каждой части
+    fill_price: np.ndarray  # (n, 3) цена закрытия каждой части
+    fill_kind: np.ndarray  # (n, 3) FILL_TP / FILL_STOP / FILL_TIMEOUT
+    tp_hit: np.ndarray  # (n, 3) достигнут ли TP1/TP2/TP3
+
+    def __len__(self) -> int:
+        return len(self.exit_bar)
+
+    def trade(self, i: int) -> Dict:
+        """Результат одной сделки в виде dict"""
+        return {
+            "exit_bar": int(self.exit_bar[i]),
+            "exit_price": float(self.exit_price[i]),
+            "exit_reason": str(self.exit_reason[i]),
+            "pnl_pct": float(self.pnl_pct[i]),
+            "tp1_hit": bool(self.tp_hit[i, 0]),
+            "tp2_hit": bool(self.tp_hit[i, 1]),
+            "tp3_hit": bool(self.tp_hit[i, 2]),
+        }
+
+
+def _direction_sign(direction) -> np.ndarray:
+    """LONG/BUY → +1, SHORT/SELL → -1 (строки или числа)"""
+    arr = np.asarray(direction)
+    if arr.dtype.kind in "iuf":
+        return np.where(arr >= 0, 1.0, -1.0)
+
+    upper = np.char.upper(arr.astype(str))
+    return np.where((upper == "SHORT") | (upper == "SELL"), -1.0, 1.0)
+
+
+def _first_true(mask: np.ndarray) -> np.ndarray:
+    """Индекс первого True по строке (ширина строки, если True нет)"""
+    return np.where(mask.any(axis=1), mask.argmax(axis=1), mask.shape[1])
+
+
+def simulate_exits(
+    high: Sequence[float],
+    low: Sequence[float],
+    close: Sequence[float],
+    entry_bar: Sequence[int],
+    direction,
+    entry_price: Sequence[float],
+    stop_loss: Sequence[float],
+    tp1: Sequence[float],
+    tp2: Optional[Sequence[float]] = None,
+    tp3: Optional[Sequence[float]] = None,
+    weights: Sequence[float] = DEFAULT_TP_WEIGHTS,
+    max_bars: Optional[int] = None,
+    same_bar: str = "sl_first",
+    trailing_trigger: Optional[float] = None,
+    trailing_distance: Optional[float] = None,
+    block_size: int = 256,
+) -> ExitResult:
+    """
+    Первый бар касания TP/SL для массива сделок
+
+    Args:
+        high, low, close: OHLC массивы свечей
+        entry_bar: Индекс бара входа для каждой сделки
+        direction: "LONG"/"SHORT" (или +1/-1) для каждой сделки
+        entry_price, stop_loss, tp1: Уровни по сделкам
+        tp2, tp3: Доп. цели (None/NaN - цели нет, часть закроется по SL/TIMEOUT)
+        weights: Доли позиции на TP1/TP2/TP3; (1, 0, 0) - единственный TP
+        max_bars: Максимальная длительность сделки в барах (None - до конца данных)
+        same_bar: "sl_first" или "tp_first" при касании TP и SL в одном баре
+        trailing_trigger: P&L % активации trailing stop (None - выключен)
+        trailing_distance: Расстояние trailing stop в %
+        block_size: Сколько баров проверять за один векторный шаг
+
+    Returns:
+        ExitResult
+    """
+    if same_bar not in ("sl_first", "tp_first"):
+        raise ValueError(f"same_bar must be 'sl_first' or 'tp_first', got {same_bar}")
+
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    entry_bar = np.asarray(entry_bar, dtype=np.int64).reshape(-1)
+    n = len(entry_bar)
+    n_bars = len(close)
+
+    sign = np.broadcast_to(_direction_sign(direction), (n,)).astype(float)
+    entry = np.broadcast_to(np.asarray(entry_price, dtype=float), (n,))
+
+    def _levels(values) -> np.ndarray:
+        if values is None:
+            return np.full(n, np.nan)
+        return np.broadcast_to(np.asarray(values, dtype=float), (n,))
+
+    targets = np.column_stack([_levels(tp1), _levels(tp2), _levels(tp3)])
+    w = np.asarray(weights, dtype=float)
+    active_parts = w > 0
+
+    # Всё считаем как LONG: для SHORT цены и уровни инвертируются
+    fav_stop = sign * np.broadcast_to(np.asarray(stop_loss, dtype=float), (n,))
+    fav_targets = np.where(np.isnan(targets), np.inf, sign[:, None] * targets)
+    is_long = sign > 0
+
+    trailing = bool(trailing_trigger is not None and trailing_distance)
+    if trailing:
+        # LONG: high >= entry * (1 + t), SL = high * (1 - d)
+        # SHORT: low <= entry / (1 + t), SL = low * (1 + d)
+        trig = trailing_trigger / 100
+        dist = trailing_distance / 100
+        fav_trigger = np.where(is_long, entry * (1 + trig), -entry / (1 + trig))
+        trail_factor = np.where(is_long, 1 - dist, 1 + dist)
+
+    last_bar = np.full(n, n_bars - 1, dtype=np.int64)
+    if max_bars is not None:
+        last_bar = np.minimum(last_bar, entry_bar + max_bars)
+
+    fill_bar = np.full((n, 3), -1, dtype=np.int64)
+    fill_fav = np.full((n, 3), np.nan)
+    fill_kind = np.full((n, 3), FILL_PENDING, dtype=np.int8)
+    fill_kind[:, ~active_parts] = FILL_TIMEOUT  # Части с нулевым весом не нужны
+
+    # Сделки без баров после входа - закрытие по close бара входа
+    no_bars = last_bar <= entry_bar
+    if no_bars.any():
+        idx = np.clip(entry_bar[no_bars], 0, n_bars - 1)
+        fill_bar[no_bars] = idx[:, None]
+        fill_fav[no_bars] = (sign[no_bars] * close[idx])[:, None]
+        fill_kind[no_bars] = FILL_TIMEOUT
+
+    cur_stop = fav_stop.copy()
+    pending = (fill_kind == FILL_PENDING).any(axis=1)
+    offset = 1
+    steps = np.arange(block_size)
+
+    while pending.any():
+        act = np.flatnonzero(pending)
+        bars = entry_bar[act, None] + offset + steps
+        valid = bars <= last_bar[act, None]
+        bars_c = np.minimum(bars, n_bars - 1)
+
+        s = sign[act, None]
+        hi = np.where(s > 0, high[bars_c], -low[bars_c])
+        lo = np.where(s > 0, low[bars_c], -high[bars_c])
+
+        # Уровень стопа, действующий в каждом баре блока
+        if trailing:
+            candidate = np.where(
+                valid & (hi >= fav_trigger[act, None]),
+                hi * trail_factor[act, None],
+                -np.inf,
+            )
+            after_bar = np.maximum(
+                cur_stop[act, None], np.maximum.accumulate(candidate, axis=1)
+            )
+            stop_at_bar = np.concatenate([cur_stop[act, None], after_bar[:, :-1]], axis=1)
+        else:
+            after_bar = np.broadcast_to(cur_stop[act, None], hi.shape)
+            stop_at_bar = after_bar
+
+        sl_idx = _first_true(valid & (lo <= stop_at_bar))
+        sl_in_block = sl_idx < block_size
+        rows = np.arange(len(act))
+        stop_price = stop_at_bar[rows, np.minimum(sl_idx, block_size - 1)]
+
+        for k in range(3):
+            open_k = fill_kind[act, k] == FILL_PENDING
+            if not open_k.any():
+                continue
+
+            tp_idx = _first_true(valid & (hi >= fav_targets[act, k, None]))
+            if same_bar == "tp_first":
+                by_tp = tp_idx <= sl_idx
+            else:
+                by_tp = tp_idx < sl_idx
+            by_tp &= open_k & (tp_idx < block_size)
+            by_sl = open_k & ~by_tp & sl_in_block
+
+            t = act[by_tp]
+            fill_bar[t, k] = bars[by_tp, tp_idx[by_tp]]
+            fill_fav[t, k] = fav_targets[t, k]
+            fill_kind[t, k] = FILL_TP
+
+            t = act[by_sl]
+            fill_bar[t, k] = bars[by_sl, sl_idx[by_sl]]
+            fill_fav[t, k] = stop_price[by_sl]
+            fill_kind[t, k] = FILL_STOP
+
+        # Конец горизонта внутри блока - остаток по close
+        ends = ~valid[:, -1]
+        still_open = fill_kind[act] == FILL_PENDING
+        timeout = ends[:, None] & still_open
+        if timeout.any():
+            r, k = np.nonzero(timeout)
+            t = act[r]
+            fill_bar[t, k] = last_bar[t]
+            fill_fav[t, k] = sign[t] * close[last_bar[t]]
+            fill_kind[t, k] = FILL_TIMEOUT
+
+        cur_stop[act] = after_bar[:, -1]
+        pending[act] = (fill_kind[act] == FILL_PENDING).any(axis=1)
+        offset += block_size
+
+    # Итоги по сделкам
+    fill_price = sign[:, None] * fill_fav
+    part_w = np.where(active_parts, w, 0.0)
+    part_w = part_w / part_w.sum()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        part_pnl = np.where(
+            is_long[:, None],
+            (fill_price / entry[:, None] - 1) * 100,
+            (entry[:, None] / fill_price - 1) * 100,
+        )
+    used = np.broadcast_to(active_parts, (n, 3))
+    pnl_pct = (np.where(used, part_pnl, 0.0) * part_w).sum(axis=1)
+    exit_price = (np.where(used, fill_price, 0.0) * part_w).sum(axis=1)
+    exit_bar = np.where(used, fill_bar, -1).max(axis=1)
+
+    kinds = np.where(used, fill_kind, FILL_TP)
+    exit_reason = np.where(
+        (kinds == FILL_STOP).any(axis=1),
+        "SL",
+        np.where((kinds == FILL_TIMEOUT).any(axis=1), "TIMEOUT", "TP"),
+    )
+
+    return ExitResult(
+        exit_bar=exit_bar,
+        exit_price=exit_price,
+        exit_reason=exit_reason,
+        pnl_pct=pnl_pct,
+        fill_bar=np.where(used, fill_bar, -1),
+        fill_price=np.where(used, fill_price, np.nan),
+        fill_kind=np.where(used, fill_kind, FILL_PENDING).astype(np.int8),
+        tp_hit=(fill_kind == FILL_TP) & used,
+    )
+
+
+def simulate_exit(
+    high: Sequence[float],
+    low: Sequence[float],
+    close: Sequence[float],
+    entry_bar: int,
+    direction: str,
+    entry_price: float,
+    stop_loss: float,
+    tp1: float,
+    tp2: Optional[float] = None,
+    tp3: Optional[float] = None,
+    weights: Sequence[float] = (1.0, 0.0, 0.0),
+    **kwargs,
+) -> Dict:
+    """Выход одной сделки (для последовательных бэктестов), dict из ExitResult.trade"""
+    result = simulate_exits(
+        high,
+        low,
+        close,
+        [entry_bar],
+        [direction],
+        [entry_price],
+        [stop_loss],
+        [tp1],
+        None if tp2 is None else [tp2],
+        None if tp3 is None else [tp3],
+        weights=weights,
+        **kwargs,
+    )
+    return result.trade(0)
+
+
+__all__ = [
+    "ExitResult",
+    "simulate_exits",
+    "simulate_exit",
+    "DEFAULT_TP_WEIGHTS",
+]
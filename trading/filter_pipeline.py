@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Поэтапный конвейер фильтров сигнала для GIO Crypto Bot
+
+Каждый этап замеряет свою стоимость и долю отказов. Блокирующие этапы
+упорядочиваются по ожидаемой стоимости одного отказа (cost / reject_rate):
+дешёвые и избирательные проверки идут первыми, дорогие сетевые - последними.
+Неблокирующие этапы (штрафы/бонусы к confidence) выполняются только для
+кандидатов, прошедших все блокирующие.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config.settings import logger
+from utils.sampling_profiler import profile_tag
+
+StageFunc = Callable[[Dict[str, Any]], Awaitable[Tuple[bool, str]]]
+
+
+@dataclass
+class FilterStage:
+    """Этап конвейера с заявленной стоимостью и статистикой воронки"""
+
+    name: str
+    func: StageFunc
+    cost: float = 1.0  # заявленная стоимость, мс (до накопления замеров)
+    blocking: bool = True
+    enabled: Optional[Callable[[], bool]] = None
+
+    evaluated: int = 0
+    passed: int = 0
+    rejected: int = 0
+    errors: int = 0
+    skipped: int = 0
+    total_ms: float = 0.0
+    reasons: Dict[str, int] = field(default_factory=dict)
+
+    def is_enabled(self) -> bool:
+        return self.enabled is None or bool(self.enabled())
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_ms / self.evaluated if self.evaluated else 0.0
+
+    @property
+    def reject_rate(self) -> float:
+        return self.rejected / self.evaluated if self.evaluated else 0.0
+
+    def expected_cost(self, min_samples: int) -> float:
+        """Замеренная стоимость, пока замеров мало - заявленная"""
+        if self.evaluated < min_samples:
+            return self.cost
+        return self.avg_ms
+
+    def rank(self, min_samples: int) -> float:
+        """Ожидаемая стоимость одного отказа (меньше - раньше в очереди)"""
+        # Сглаживание Лапласа: этап без отказов не получает бесконечный ранг
+        reject_rate = (self.rejected + 1) / (self.evaluated + 2)
+        return self.expected_cost(min_samples) / reject_rate
+
+
+class FilterPipeline:
+    """Конвейер фильтров с ранним выходом и адаптивным порядком"""
+
+    def __init__(
+        self,
+        stages: Optional[List[FilterStage]] = None,
+        adaptive: bool = True,
+        min_samples: int = 20,
+        reorder_every: int = 50,
+    ):
+        self.adaptive = adaptive
+        self.min_samples = min_samples
+        self.reorder_every = max(1, reorder_every)
+
+        self.stages: Dict[str, FilterStage] = {}
+        self._order: List[str] = []
+
+        self.candidates = 0
+        self.accepted = 0
+        self.reorders = 0
+
+        for stage in stages or []:
+            self.add_stage(stage)
+
+    def add_stage(self, stage: FilterStage):
+        """Регистрация этапа; блокирующие сразу сортируются по заявленной стоимости"""
+        self.stages[stage.name] = stage
+        self._order.append(stage.name)
+        self._reorder(count=False)
+
+    @property
+    def order(self) -> List[str]:
+        return list(self._order)
+
+    def _reorder(self, count: bool = True):
+        """Блокирующие - по рангу, неблокирующие - в порядке регистрации после них"""
+        gates = [n for n in self._order if self.stages[n].blocking]
+        annotators = [n for n in self._order if not self.stages[n].blocking]
+        gates.sort(key=lambda n: self.stages[n].rank(self.min_samples))
+        new_order = gates + annotators
+
+        if new_order != self._order:
+            if count:
+                self.reorders += 1
+                logger.debug(f"🔀 Порядок фильтров: {' → '.join(new_order)}")
+            self._order = new_order
+
+    async def _run_stage(self, stage: FilterStage, ctx: Dict[str, Any]) -> Tuple[bool, str]:
+        start = time.perf_counter()
+        try:
+            with profile_tag(f"stage:{stage.name}"):
+                ok, reason = await stage.func(ctx)
+        except Exception as e:
+            # Ошибка фильтра не блокирует сигнал (безопасная стратегия)
+            logger.warning(f"⚠️ Ошибка фильтра {stage.name}: {e}")
+            stage.errors += 1
+            ok, reason = True, f"error: {e}"
+        stage.total_ms += (time.perf_counter() - start) * 1000
+        stage.evaluated += 1
+
+        if ok or not stage.blocking:
+            stage.passed += 1
+            return True, reason
+
+        stage.rejected += 1
+        stage.reasons[reason] = stage.reasons.get(reason, 0) + 1
+        return False, reason
+
+    async def run(self, ctx: Dict[str, Any]) -> Tuple[bool, str]:
+        """
+        Прогон кандидата через этапы
+
+        Returns:
+            (passed, reason) - причина первого отказа или "All filters passed"
+        """
+        self.candidates += 1
+        if self.adaptive and self.candidates % self.reorder_every == 0:
+            self._reorder()
+
+        for name in list(self._order):
+            stage = self.stages[name]
+            if not stage.is_enabled():
+                stage.skipped += 1
+                continue
+
+            ok, reason = await self._run_stage(stage, ctx)
+            if not ok:
+                return False, f"{name}: {reason}"
+
+        self.accepted += 1
+        return True, "All filters passed"
+
+    def get_funnel_stats(self) -> Dict[str, Any]:
+        """Воронка по этапам в текущем порядке"""
+        return {
+            "candidates": self.candidates,
+            "accepted": self.accepted,
+            "reorders": self.reorders,
+            "order": self.order,
+            "stages": {
+                name: {
+                    "blocking": stage.blocking,
+                    "declared_cost_ms": stage.cost,
+                    "evaluated": stage.evaluated,
+                    "passed": stage.passed,
+                    "rejected": stage.rejected,
+                    "errors": stage.errors,
+                    "skipped": stage.skipped,
+                    "avg_ms": round(stage.avg_ms, 3),
+                    "reject_rate": round(stage.reject_rate, 3),
+                    "top_reasons": dict(
+                        sorted(stage.reasons.items(), key=lambda kv: kv[1], reverse=True)[:5]
+                    ),
+                }
+                for name, stage in ((n, self.stages[n]) for n in self._order)
+            },
+        }
+
+
+__all__ = ["FilterStage", "FilterPipeline"]
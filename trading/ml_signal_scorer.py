@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+ML Signal Scorer - вероятность успеха сигнала от XGBoost модели
+- Признаки строятся инкрементально по закрытым свечам (LiveFeatureBuilder)
+- Все символы скорятся ОДНИМ predict за цикл (батч по символам)
+- score(symbol) отдаёт вероятность для последней закрытой свечи; если она
+  ещё не посчитана - ждёт общий батч не дольше latency budget
+"""
+
+import asyncio
+import pickle
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config.settings import ML_SCORER_CONFIG, logger
+from features.live_features import LiveFeatureBuilder, MODEL_FEATURE_COLUMNS
+from utils.helpers import current_epoch_ms
+
+try:
+    import xgboost as xgb
+except ImportError:  # pragma: no cover - опциональная зависимость
+    xgb = None
+
+
+class MLSignalScorer:
+    """Онлайн скоринг сигналов моделью models/xgboost_trading_model.json"""
+
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        scaler_path: Optional[str] = None,
+        interval_minutes: int = ML_SCORER_CONFIG["interval_minutes"],
+        latency_budget_ms: int = ML_SCORER_CONFIG["latency_budget_ms"],
+        history_bars: int = ML_SCORER_CONFIG["history_bars"],
+        feature_columns: Sequence[str] = MODEL_FEATURE_COLUMNS,
+    ):
+        self.model_path = model_path or ML_SCORER_CONFIG["model_path"]
+        self.scaler_path = scaler_path or ML_SCORER_CONFIG["scaler_path"]
+        self.interval_minutes = interval_minutes
+        self.interval_ms = interval_minutes * 60_000
+        self.latency_budget = latency_budget_ms / 1000
+        self.history_bars = history_bars
+
+        self.builder = LiveFeatureBuilder(feature_columns)
+        self.model = None
+        self._mean: Optional[np.ndarray] = None
+        self._scale: Optional[np.ndarray] = None
+
+        # symbol -> (timestamp свечи, вероятность)
+        self._scores: Dict[str, Tuple[int, float]] = {}
+        self._pending_batch: Optional[asyncio.Future] = None
+
+        self.stats = {
+            "batches": 0,
+            "rows": 0,
+            "last_batch_ms": 0.0,
+            "max_batch_ms": 0.0,
+            "budget_timeouts": 0,
+        }
+
+        self._load()
+
+    # ========== МОДЕЛЬ ==========
+
+    def _load(self):
+        """Загрузить модель и scaler; при ошибке скорер выключен"""
+        if xgb is None:
+            logger.warning("⚠️ MLSignalScorer: xgboost не установлен, скоринг отключён")
+            return
+
+        try:
+            model = xgb.Booster()
+            model.load_model(self.model_path)
+            with open(self.scaler_path, "rb") as f:
+                scaler = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ MLSignalScorer: модель не загружена: {e}")
+            return
+
+        n_features = len(self.builder.feature_columns)
+        if model.num_features() != n_features or scaler.n_features_in_ != n_features:
+            logger.error(
+                f"❌ MLSignalScorer: модель ожидает {model.num_features()} признаков, "
+                f"scaler {scaler.n_features_in_}, builder {n_features}"
+            )
+            return
+
+        # StandardScaler.transform без накладных расходов sklearn
+        self._mean = np.asarray(scaler.mean_, dtype=np.float64)
+        self._scale = np.asarray(scaler.scale_, dtype=np.float64)
+        self.model = model
+        logger.info(f"✅ MLSignalScorer: {Path(self.model_path).name} ({n_features} признаков)")
+
+    @property
+    def enabled(self) -> bool:
+        return self.model is not None
+
+    # ========== СВЕЧИ ==========
+
+    def on_bar(self, symbol: str, candle: Dict) -> bool:
+        """Закрытая свеча символа (по возрастанию времени)"""
+        return self.builder.update(symbol, candle)
+
+    async def update_bars(self, connector, symbols: List[str]):
+        """
+        Подтянуть закрытые свечи и пересчитать скоры батчем
+
+        Первый вызов по символу прогревает состояние history_bars свечами,
+        дальше запрашиваются только последние свечи.
+        """
+        if not self.enabled or connector is None:
+            return
+
+        interval = str(self.interval_minutes)
+        now = current_epoch_ms()
+
+        for symbol in symbols:
+            try:
+                limit = 3 if self.builder.bar_count(symbol) else self.history_bars
+                candles = await connector.get_klines(symbol, interval, limit=limit)
+                closed = sorted(
+                    (c for c in candles or [] if c["timestamp"] + self.interval_ms <= now),
+                    key=lambda c: c["timestamp"],
+                )
+                self.builder.extend(symbol, closed)
+            except Exception as e:
+                logger.debug(f"⚠️ MLSignalScorer {symbol}: свечи недоступны: {e}")
+
+        scores = self.score_all()
+        if scores:
+            logger.debug(f"🤖 ML scores: {len(scores)} символов за один predict")
+
+    # ========== СКОРИНГ ==========
+
+    def _collect(self, symbols: Optional[Sequence[str]] = None):
+        """Символы, у которых закрылась новая свеча и ещё нет скора"""
+        batch_symbols, timestamps, rows = [], [], []
+        for symbol in symbols if symbols is not None else self.builder.symbols:
+            if not self.builder.is_ready(symbol):
+                continue
+            timestamp = self.builder.last_timestamp(symbol)
+            cached = self._scores.get(symbol)
+            if cached and cached[0] == timestamp:
+                continue
+            batch_symbols.append(symbol)
+            timestamps.append(timestamp)
+            rows.append(self.builder.vector(symbol))
+        return batch_symbols, timestamps, rows
+
+    def _predict(self, rows: List[np.ndarray]) -> np.ndarray:
+        """Один predict на матрицу всех символов"""
+        started = time.perf_counter()
+
+        matrix = np.vstack(rows)
+        # Пропуски → среднее обучающей выборки (после масштабирования = 0)
+        invalid = ~np.isfinite(matrix)
+        if invalid.any():
+            matrix = np.where(invalid, self._mean, matrix)
+        scaled = (matrix - self._mean) / self._scale
+
+        probabilities = self.model.inplace_predict(scaled)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats["batches"] += 1
+        self.stats["rows"] += len(rows)
+        self.stats["last_batch_ms"] = elapsed_ms
+        self.stats["max_batch_ms"] = max(self.stats["max_batch_ms"], elapsed_ms)
+        return np.asarray(probabilities, dtype=np.float64)
+
+    def _store(self, symbols, timestamps, probabilities) -> Dict[str, float]:
+        result = {}
+        for symbol, timestamp, probability in zip(symbols, timestamps, probabilities):
+            self._scores[symbol] = (timestamp, float(probability))
+            result[symbol] = float(probability)
+        return result
+
+    def score_all(self, symbols: Optional[Sequence[str]] = None) -> Dict[str, float]:
+        """Синхронно пересчитать скоры всех символов с новыми свечами"""
+        if not self.enabled:
+            return {}
+        batch_symbols, timestamps, rows = self._collect(symbols)
+        if not rows:
+            return {}
+        return self._store(batch_symbols, timestamps, self._predict(rows))
+
+    def get_probability(self, symbol: str) -> Optional[float]:
+        """Вероятность для последней закрытой свечи (без вычислений)"""
+        cached = self._scores.get(symbol)
+        if cached and cached[0] == self.builder.last_timestamp(symbol):
+            return cached[1]
+        return None
+
+    async def _run_batch(self):
+        """Общий батч для всех ожидающих символов (predict в executor)"""
+        batch_symbols, timestamps, rows = self._collect()
+        if rows:
+            loop = asyncio.get_running_loop()
+            probabilities = await loop.run_in_executor(None, self._predict, rows)
+            self._store(batch_symbols, timestamps, probabilities)
+
+    async def score(self, symbol: str) -> Optional[float]:
+        """
+        Вероятность успеха сигнала по символу
+
+        Returns:
+            float 0..1 или None (модель выключена, мало истории, превышен бюджет)
+        """
+        if not self.enabled or not self.builder.is_ready(symbol):
+            return None
+
+        probability = self.get_probability(symbol)
+        if probability is not None:
+            return probability
+
+        # Параллельные вызовы ждут один и тот же батч
+        if self._pending_batch is None or self._pending_batch.done():
+            self._pending_batch = asyncio.ensure_future(self._run_batch())
+        try:
+            await asyncio.wait_for(asyncio.shield(self._pending_batch), self.latency_budget)
+        except asyncio.TimeoutError:
+            self.stats["budget_timeouts"] += 1
+            logger.debug(f"⚠️ ML score {symbol}: превышен бюджет {self.latency_budget * 1000:.0f}ms")
+            return None
+        except Exception as e:
+            logger.error(f"❌ ML score {symbol}: {e}")
+            return None
+
+        return self.get_probability(symbol)
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, "symbols": len(self.builder.symbols), "scored": len(self._scores)}
+
+
+__all__ = ["MLSignalScorer"]
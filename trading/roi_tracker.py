@@ -25,7 +25,7 @@ from dataclasses import dataclass, field
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class Signal:
     """Структура сигнала для отслеживания"""
 
@@ -729,9 +729,11 @@ class ROITracker:
                     f"   • Сделка успешна! 🎉"
                 )
 
-            # Отправить
+            # Отправить (очередь Telegram: не ждём API на пути мониторинга цен)
             if hasattr(self.telegram_handler, "send_alert"):
-                await self.telegram_handler.send_alert(message)
+                await self.telegram_handler.send_alert(
+                    message, priority="high", alert_type="TP"
+                )
             elif hasattr(self.telegram_handler, "send_message"):
                 await self.telegram_handler.send_message(message)
 
@@ -772,7 +774,9 @@ class ROITracker:
 
             # Отправить
             if hasattr(self.telegram_handler, "send_alert"):
-                await self.telegram_handler.send_alert(message)
+                await self.telegram_handler.send_alert(
+                    message, priority="high", alert_type="STOP"
+                )
             elif hasattr(self.telegram_handler, "send_message"):
                 await self.telegram_handler.send_message(message)
 
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Scan Scheduler - приоритетное расписание сканирования символов
+- Оценка активности по данным в памяти: реализованная волатильность,
+  всплеск объёма, изменение дисбаланса стакана, близость к ключевым уровням
+- Горячие символы сканируются часто, холодные - редко
+- Общий бюджет анализов в минуту (token bucket)
+- Гарантия свежести: символ не ждёт дольше max_staleness_seconds
+"""
+
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import logger
+
+
+@dataclass
+class SymbolActivity:
+    """Признаки активности символа между сканированиями"""
+
+    prices: Deque[Tuple[float, float]] = field(default_factory=lambda: deque(maxlen=60))
+    volume_ratio: float = 1.0
+    imbalance: Optional[float] = None
+    imbalance_change: float = 0.0
+    levels: List[float] = field(default_factory=list)
+    last_scan: float = 0.0
+    scans: int = 0
+    score: float = 0.0
+
+
+class ActivityScheduler:
+    """Выбор символов для анализа по оценке активности и бюджету"""
+
+    def __init__(
+        self,
+        symbols: Iterable[str],
+        budget_per_minute: float = 30.0,
+        min_interval_seconds: float = 60.0,
+        max_staleness_seconds: float = 300.0,
+        weights: Optional[Dict[str, float]] = None,
+        volatility_ref: float = 0.005,
+        volume_surge_ref: float = 2.0,
+        imbalance_ref: float = 0.3,
+        level_proximity_pct: float = 1.0,
+    ):
+        """
+        Args:
+            symbols: Отслеживаемые символы
+            budget_per_minute: Максимум анализов в минуту (все символы)
+            min_interval_seconds: Интервал для самого горячего символа
+            max_staleness_seconds: Интервал для холодного символа (гарантия свежести)
+            weights: Веса признаков volatility/volume/imbalance/levels
+            volatility_ref: Реализованная волатильность (доля), дающая максимум
+            volume_surge_ref: Отношение объёма к среднему, дающее максимум
+            imbalance_ref: Изменение дисбаланса (-1..1), дающее максимум
+            level_proximity_pct: Расстояние до уровня (%), с которого растёт оценка
+        """
+        self.budget_per_minute = max(1.0, float(budget_per_minute))
+        self.min_interval = float(min_interval_seconds)
+        self.max_staleness = max(self.min_interval, float(max_staleness_seconds))
+        self.weights = weights or {
+            "volatility": 0.35,
+            "volume": 0.25,
+            "imbalance": 0.2,
+            "levels": 0.2,
+        }
+        self.volatility_ref = volatility_ref
+        self.volume_surge_ref = volume_surge_ref
+        self.imbalance_ref = imbalance_ref
+        self.level_proximity = level_proximity_pct / 100
+
+        self.activity: Dict[str, SymbolActivity] = {}
+        for symbol in symbols:
+            self.add_symbol(symbol)
+
+        # Token bucket: ёмкость - минутный бюджет, пополнение budget/60 в секунду
+        self._tokens = self.budget_per_minute
+        self._refilled_at = time.monotonic()
+
+        self.stats = {
+            "ticks": 0,
+            "scheduled": 0,
+            "stale_forced": 0,
+            "budget_exhausted": 0,
+        }
+
+        required = len(self.activity) * 60 / self.max_staleness
+        if required > self.budget_per_minute:
+            logger.warning(
+                f"⚠️ Scan Scheduler: {len(self.activity)} символов требуют "
+                f"{required:.1f} анализов/мин при бюджете {self.budget_per_minute:.0f} - "
+                f"свежесть {self.max_staleness:.0f}с не гарантируется"
+            )
+
+    def add_symbol(self, symbol: str):
+        if symbol not in self.activity:
+            self.activity[symbol] = SymbolActivity()
+
+    # ========== ПРИЗНАКИ ==========
+
+    def observe_price(self, symbol: str, price: Optional[float], now: Optional[float] = None):
+        """Цена из снимка тикеров (для реализованной волатильности)"""
+        if not price or price <= 0 or symbol not in self.activity:
+            return
+        now = time.monotonic() if now is None else now
+        self.activity[symbol].prices.append((now, float(price)))
+
+    def observe_imbalance(self, symbol: str, imbalance: Optional[float]):
+        """Дисбаланс сводного стакана (-1..1); копится модуль изменения"""
+        state = self.activity.get(symbol)
+        if state is None or imbalance is None:
+            return
+        if state.imbalance is not None:
+            state.imbalance_change = max(
+                state.imbalance_change, abs(imbalance - state.imbalance)
+            )
+        state.imbalance = float(imbalance)
+
+    def observe_scan(
+        self,
+        symbol: str,
+        candles: Optional[List[Dict]] = None,
+        levels: Optional[Iterable[float]] = None,
+    ):
+        """Данные анализа символа: объём последней свечи и ключевые уровни"""
+        state = self.activity.get(symbol)
+        if state is None:
+            return
+        if candles:
+            volumes = [float(c.get("volume", 0) or 0) for c in candles[-21:]]
+            baseline = np.mean(volumes[:-1]) if len(volumes) > 1 else 0.0
+            state.volume_ratio = volumes[-1] / baseline if baseline > 0 else 1.0
+        if levels is not None:
+            state.levels = [float(level) for level in levels if level]
+
+    def mark_scanned(self, symbol: str, now: Optional[float] = None):
+        """Символ проанализирован: отсчёт свежести заново"""
+        state = self.activity.get(symbol)
+        if state is None:
+            return
+        state.last_scan = time.monotonic() if now is None else now
+        state.scans += 1
+        state.imbalance_change = 0.0
+
+    # ========== ОЦЕНКА ==========
+
+    def score(self, symbol: str) -> float:
+        """Оценка активности 0..1 (взвешенная сумма нормированных признаков)"""
+        state = self.activity[symbol]
+        features = {
+            "volatility": 0.0,
+            "volume": min(1.0, max(0.0, (state.volume_ratio - 1) / (self.volume_surge_ref - 1))),
+            "imbalance": min(1.0, state.imbalance_change / self.imbalance_ref),
+            "levels": 0.0,
+        }
+
+        if len(state.prices) >= 3:
+            prices = np.fromiter((p for _, p in state.prices), dtype=np.float64)
+            returns = np.diff(np.log(prices))
+            features["volatility"] = min(
+                1.0, float(np.sqrt(np.sum(returns**2))) / self.volatility_ref
+            )
+
+        if state.prices and state.levels:
+            price = state.prices[-1][1]
+            distance = min(abs(price - level) / price for level in state.levels)
+            features["levels"] = max(0.0, 1.0 - distance / self.level_proximity)
+
+        total_weight = sum(self.weights.values()) or 1.0
+        state.score = sum(features[k] * self.weights.get(k, 0) for k in features) / total_weight
+        return state.score
+
+    def interval_for(self, score: float) -> float:
+        """Целевой интервал: геометрически от max_staleness (0) до min_interval (1)"""
+        return self.max_staleness * (self.min_interval / self.max_staleness) ** score
+
+    # ========== ВЫБОР ==========
+
+    def _refill(self, now: float):
+        elapsed = max(0.0, now - self._refilled_at)
+        self._tokens = min(
+            self.budget_per_minute, self._tokens + elapsed * self.budget_per_minute / 60
+        )
+        self._refilled_at = now
+
+    def next_batch(self, now: Optional[float] = None) -> List[str]:
+        """
+        Символы, которые пора анализировать, в порядке срочности
+
+        Сначала просроченные по max_staleness, затем по просрочке целевого
+        интервала с учётом оценки. Размер ограничен бюджетом.
+        """
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        self.stats["ticks"] += 1
+
+        stale, due = [], []
+        for symbol, state in self.activity.items():
+            age = now - state.last_scan if state.last_scan else math.inf
+            if age >= self.max_staleness:
+                stale.append((-age, symbol))
+                continue
+            score = self.score(symbol)
+            overdue = age / self.interval_for(score)
+            if overdue >= 1.0:
+                due.append((-(overdue * (1 + score)), symbol))
+
+        stale.sort()
+        due.sort()
+        candidates = [s for _, s in stale] + [s for _, s in due]
+
+        # Допуск на ошибку округления: 0.1 + 5.9 может дать 5.999...
+        batch = candidates[: int(self._tokens + 1e-9)]
+        self._tokens -= len(batch)
+        if len(batch) < len(candidates):
+            self.stats["budget_exhausted"] += 1
+
+        self.stats["scheduled"] += len(batch)
+        self.stats["stale_forced"] += min(len(batch), len(stale))
+        return batch
+
+    def get_stats(self) -> Dict:
+        now = time.monotonic()
+        return {
+            **self.stats,
+            "tokens": round(self._tokens, 2),
+            "symbols": {
+                symbol: {
+                    "score": round(state.score, 3),
+                    "interval": round(self.interval_for(state.score), 1),
+                    "age": round(now - state.last_scan, 1) if state.last_scan else None,
+                    "scans": state.scans,
+                }
+                for symbol, state in sorted(
+                    self.activity.items(), key=lambda item: item[1].score, reverse=True
+                )
+            },
+        }
+
+
+__all__ = ["ActivityScheduler", "SymbolActivity"]
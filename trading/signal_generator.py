@@ -19,6 +19,7 @@ from config.settings import (
     DEFAULT_ATR_SL_MULTIPLIER,
     DEFAULT_TP1_PCT,
     MIN_RR_RATIO,
+    FILTER_PIPELINE_CONFIG,
 )
 from config.constants import (
     SignalStatusEnum,
@@ -31,6 +32,7 @@ from analytics.veto_system import EnhancedVetoSystem, VetoAnalysisResult
 from utils.helpers import current_epoch_ms, safe_float, calculate_percentage_change
 from utils.validators import validate_signal_data
 from systems.unified_scenario_matcher import EnhancedScenarioMatcher
+from trading.filter_pipeline import FilterPipeline, FilterStage
 
 
 # Импорт фильтров (если они есть)
@@ -108,6 +110,9 @@ class AdvancedSignalGenerator:
         if self.multi_tf_filter:
             logger.info("✅ Multi-TF Filter интегрирован в SignalGenerator")
 
+        # Конвейер фильтров: дешёвые и избирательные отказы - первыми
+        self.filter_pipeline = self._build_filter_pipeline()
+
         # Кэш технических индикаторов
         self.technical_cache = {}
         self.price_history = defaultdict(lambda: [])
@@ -1374,7 +1379,7 @@ class AdvancedSignalGenerator:
             )
 
             # Валидируем сигнал
-            if validate_signal_data(signal.__dict__):
+            if validate_signal_data(signal.to_dict()):
                 return signal
             else:
                 logger.warning(f"⚠️ Созданный сигнал не прошёл валидацию для {symbol}")
@@ -1428,6 +1433,38 @@ class AdvancedSignalGenerator:
             logger.error(f"❌ Ошибка создания vetoed signals: {e}")
             return []
 
+    def _build_filter_pipeline(self) -> FilterPipeline:
+        """Регистрация этапов фильтрации с заявленной стоимостью"""
+        costs = FILTER_PIPELINE_CONFIG.get("stage_costs", {})
+        return FilterPipeline(
+            stages=[
+                FilterStage("min_rr", self._stage_min_rr, cost=costs.get("min_rr", 0.01)),
+                FilterStage(
+                    "multi_tf",
+                    self._stage_multi_tf,
+                    cost=costs.get("multi_tf", 250.0),
+                    enabled=lambda: self.multi_tf_filter is not None,
+                ),
+                FilterStage(
+                    "confirm",
+                    self._stage_confirm,
+                    cost=costs.get("confirm", 50.0),
+                    blocking=False,
+                    enabled=lambda: self.confirm_filter is not None,
+                ),
+                FilterStage(
+                    "cluster",
+                    self._stage_cluster,
+                    cost=costs.get("cluster", 20.0),
+                    blocking=False,
+                    enabled=lambda: bool(getattr(self.bot, "cluster_detector", None)),
+                ),
+            ],
+            adaptive=FILTER_PIPELINE_CONFIG.get("adaptive", True),
+            min_samples=FILTER_PIPELINE_CONFIG.get("min_samples", 20),
+            reorder_every=FILTER_PIPELINE_CONFIG.get("reorder_every", 50),
+        )
+
     async def _apply_filters(
         self,
         signal: EnhancedTradingSignal,
@@ -1436,7 +1473,11 @@ class AdvancedSignalGenerator:
         technical: TechnicalAnalysis,
     ) -> Tuple[bool, str]:
         """
-        Применение всех фильтров к сигналу
+        Применение всех фильтров к сигналу через FilterPipeline
+
+        Блокирующие этапы (min_rr, multi_tf) идут в порядке ожидаемой
+        стоимости отказа, неблокирующие (confirm, cluster) - только для
+        прошедших их сигналов.
 
         Args:
             signal: Сигнал для проверки
@@ -1448,171 +1489,178 @@ class AdvancedSignalGenerator:
             (is_valid, reason) - прошёл ли фильтры и причина
         """
         try:
-            # Подготовка данных для фильтров
-            ticker = market_data.get("ticker", {})
-            current_price = safe_float(ticker.get("last_price", 0))
-
-            # Получаем orderbook data
-            orderbook_data = market_data.get("orderbook", {})
-            bids = orderbook_data.get("bids", [])
-            asks = orderbook_data.get("asks", [])
-
-            # Рассчитываем orderbook imbalance
-            orderbook_imbalance = None
-            if bids and asks:
-                bid_volume = sum([float(bid[1]) for bid in bids[:20]])
-                ask_volume = sum([float(ask[1]) for ask in asks[:20]])
-                total = bid_volume + ask_volume
-
-                if total > 0:
-                    orderbook_imbalance = ((bid_volume - ask_volume) / total) * 100
-
-            # Получаем candle data
-            klines_data = market_data.get("klines", {})
-            candles = klines_data.get("candles", [])
-            last_candle = {}
-
-            if candles:
-                last_candle_data = candles[-1]
-                last_candle = {
-                    "open": safe_float(last_candle_data.get("open", 0)),
-                    "high": safe_float(last_candle_data.get("high", 0)),
-                    "low": safe_float(last_candle_data.get("low", 0)),
-                    "close": safe_float(last_candle_data.get("close", 0)),
-                    "volume": safe_float(last_candle_data.get("volume", 0)),
-                }
-
-            # Подготовка market_data для фильтров
-            filter_market_data = {
-                "orderbook": {
-                    "imbalance": orderbook_imbalance,
-                    "bids": bids,
-                    "asks": asks,
-                },
-                "volume_1m": last_candle.get("volume", 0),
-                "avg_volume_24h": (
-                    safe_float(ticker.get("volume_24h", 0)) / 1440
-                    if ticker.get("volume_24h")
-                    else 0
-                ),
-                "last_candle": last_candle,
-                "large_trades": [],
-            }
-
-            # Подготовка signal_dict для фильтров
-            signal_dict = {
+            ctx = {
+                "signal": signal,
                 "symbol": symbol,
-                "direction": signal.side,
-                "entry": signal.price_entry,
-                "tp1_price": signal.tp1_price,
-                "tp2_price": signal.tp2_price,
-                "tp3_price": signal.tp3_price,
-                "sl_price": signal.sl_price,
-                "score": signal.confidence_score * 100,
-                "risk_reward": signal.rr1,
+                "market_data": market_data,
+                "technical": technical,
             }
+            passed, reason = await self.filter_pipeline.run(ctx)
 
-            # ========== 1. Multi-TF Filter (BLOCKING) ==========
-            if self.multi_tf_filter:
-                logger.info(f"🔍 Применение Multi-TF Filter для {symbol}...")
-
-                mtf_valid, mtf_trends, mtf_reason = await self.multi_tf_filter.validate(
-                    symbol=symbol,
-                    direction=signal.side,
-                    timeframes=["1h", "4h", "1d"],
-                    min_agreement=2,
-                )
-
-                if not mtf_valid:
-                    logger.warning(
-                        f"❌ {symbol}: Multi-TF Filter отклонил сигнал: {mtf_reason}"
-                    )
-                    return (False, f"Multi-TF Filter: {mtf_reason}")
-                else:
-                    logger.info(f"✅ {symbol}: Multi-TF Filter пройден: {mtf_reason}")
-                    logger.info(f"   📊 MTF Тренды: {mtf_trends}")
-
-                    # Увеличиваем confidence за согласование TF
-                    signal.confidence_score = min(1.0, signal.confidence_score + 0.1)
-
-                    # Сохраняем MTF информацию в сигнал
-                    signal.market_conditions["mtf_trends"] = mtf_trends
-                    signal.market_conditions["mtf_alignment"] = mtf_reason
-
-            # ========== 2. Confirm Filter (NON-BLOCKING) ==========
-            if self.confirm_filter:
-                logger.info(f"🔍 Применение Confirm Filter для {symbol}...")
-
-                # ✅ validate() теперь возвращает dict с penalty
-                result = await self.confirm_filter.validate(
-                    symbol=symbol,
-                    direction=signal.side,
-                    market_data=filter_market_data,
-                    signal_data=signal_dict,
-                )
-
-                penalty = result.get("confidence_penalty", 0)
-                warnings = result.get("warnings", [])
-
-                # Применяем штраф к confidence
-                original_confidence = signal.confidence_score
-                signal.confidence_score = max(
-                    0, signal.confidence_score - (penalty / 100)
-                )
-
-                # Логирование
-                if penalty > 0:
-                    logger.warning(
-                        f"⚠️ {symbol}: Confirm Filter снизил confidence "
-                        f"{original_confidence:.2f} → {signal.confidence_score:.2f} (-{penalty}%)"
-                    )
-                    for warn in warnings:
-                        logger.warning(f"  └─ {warn}")
-                else:
-                    logger.info(f"✅ {symbol}: Confirm Filter OK (0% penalty)")
-
-                # Сохраняем детали в сигнал
-                signal.market_conditions["confirm_filter_penalty"] = penalty
-                signal.market_conditions["confirm_filter_warnings"] = warnings
-
-            # ========== 3. Cluster Analysis (NON-BLOCKING) ==========
-            if hasattr(self.bot, "cluster_detector") and self.bot.cluster_detector:
-                try:
-                    logger.info(f"🔍 Применение Cluster Analysis для {symbol}...")
-
-                    cluster_score = await self.bot.cluster_detector.get_cluster_score(
-                        symbol=symbol, direction=signal.side
-                    )
-
-                    logger.info(f"   📊 Cluster Score: {cluster_score:.2f}")
-
-                    if cluster_score > 0.5:
-                        signal.confidence_score = min(
-                            1.0, signal.confidence_score + (cluster_score * 0.14)
-                        )
-                        logger.info(
-                            f"✅ {symbol}: Cluster Analysis пройден, новый confidence: {signal.confidence_score:.2f}"
-                        )
-                        signal.market_conditions["cluster_score"] = cluster_score
-                    else:
-                        logger.warning(
-                            f"⚠️ {symbol}: Низкий Cluster Score: {cluster_score:.2f}"
-                        )
-
-                except Exception as e:
-                    logger.warning(f"⚠️ Ошибка Cluster Analysis для {symbol}: {e}")
-            else:
-                logger.debug(f"⚠️ Cluster Detector не доступен для {symbol}")
-
-            # ✅ Все фильтры пройдены
-            logger.info(f"🎯 {symbol}: Все фильтры успешно пройдены!")
-            return (True, "All filters passed")
+            if passed:
+                logger.info(f"🎯 {symbol}: Все фильтры успешно пройдены!")
+            return (passed, reason)
 
         except Exception as e:
             logger.error(f"❌ Ошибка применения фильтров: {e}", exc_info=True)
             # В случае ошибки пропускаем сигнал (безопасная стратегия)
             return (True, f"Filters skipped due to error: {e}")
 
+    async def _stage_min_rr(self, ctx: Dict[str, Any]) -> Tuple[bool, str]:
+        """Минимальный R/R - тот же порог, что и при ранжировании, но до сетевых фильтров"""
+        rr = ctx["signal"].rr1
+        if rr < MIN_RR_RATIO:
+            return (False, f"RR {rr:.2f} < {MIN_RR_RATIO}")
+        return (True, f"RR {rr:.2f}")
+
+    async def _stage_multi_tf(self, ctx: Dict[str, Any]) -> Tuple[bool, str]:
+        """Multi-TF Filter (BLOCKING)"""
+        signal, symbol = ctx["signal"], ctx["symbol"]
+        logger.info(f"🔍 Применение Multi-TF Filter для {symbol}...")
+
+        mtf_valid, mtf_trends, mtf_reason = await self.multi_tf_filter.validate(
+            symbol=symbol,
+            direction=signal.side,
+            timeframes=["1h", "4h", "1d"],
+            min_agreement=2,
+        )
+
+        if not mtf_valid:
+            logger.warning(f"❌ {symbol}: Multi-TF Filter отклонил сигнал: {mtf_reason}")
+            return (False, mtf_reason)
+
+        logger.info(f"✅ {symbol}: Multi-TF Filter пройден: {mtf_reason}")
+        logger.info(f"   📊 MTF Тренды: {mtf_trends}")
+
+        # Увеличиваем confidence за согласование TF
+        signal.confidence_score = min(1.0, signal.confidence_score + 0.1)
+
+        # Сохраняем MTF информацию в сигнал
+        signal.market_conditions["mtf_trends"] = mtf_trends
+        signal.market_conditions["mtf_alignment"] = mtf_reason
+        return (True, mtf_reason)
+
+    def _prepare_filter_market_data(self, market_data: Dict) -> Dict[str, Any]:
+        """Подготовка market_data для Confirm Filter (imbalance стакана, последняя свеча)"""
+        ticker = market_data.get("ticker", {})
+
+        # Получаем orderbook data
+        orderbook_data = market_data.get("orderbook", {})
+        bids = orderbook_data.get("bids", [])
+        asks = orderbook_data.get("asks", [])
+
+        # Рассчитываем orderbook imbalance
+        orderbook_imbalance = None
+        if bids and asks:
+            bid_volume = sum([float(bid[1]) for bid in bids[:20]])
+            ask_volume = sum([float(ask[1]) for ask in asks[:20]])
+            total = bid_volume + ask_volume
+
+            if total > 0:
+                orderbook_imbalance = ((bid_volume - ask_volume) / total) * 100
+
+        # Получаем candle data
+        klines_data = market_data.get("klines", {})
+        candles = klines_data.get("candles", [])
+        last_candle = {}
+
+        if candles:
+            last_candle_data = candles[-1]
+            last_candle = {
+                "open": safe_float(last_candle_data.get("open", 0)),
+                "high": safe_float(last_candle_data.get("high", 0)),
+                "low": safe_float(last_candle_data.get("low", 0)),
+                "close": safe_float(last_candle_data.get("close", 0)),
+                "volume": safe_float(last_candle_data.get("volume", 0)),
+            }
+
+        return {
+            "orderbook": {
+                "imbalance": orderbook_imbalance,
+                "bids": bids,
+                "asks": asks,
+            },
+            "volume_1m": last_candle.get("volume", 0),
+            "avg_volume_24h": (
+                safe_float(ticker.get("volume_24h", 0)) / 1440
+                if ticker.get("volume_24h")
+                else 0
+            ),
+            "last_candle": last_candle,
+            "large_trades": [],
+        }
+
+    async def _stage_confirm(self, ctx: Dict[str, Any]) -> Tuple[bool, str]:
+        """Confirm Filter (NON-BLOCKING): штраф к confidence"""
+        signal, symbol = ctx["signal"], ctx["symbol"]
+        logger.info(f"🔍 Применение Confirm Filter для {symbol}...")
+
+        signal_dict = {
+            "symbol": symbol,
+            "direction": signal.side,
+            "entry": signal.price_entry,
+            "tp1_price": signal.tp1_price,
+            "tp2_price": signal.tp2_price,
+            "tp3_price": signal.tp3_price,
+            "sl_price": signal.sl_price,
+            "score": signal.confidence_score * 100,
+            "risk_reward": signal.rr1,
+        }
+
+        # ✅ validate() теперь возвращает dict с penalty
+        result = await self.confirm_filter.validate(
+            symbol=symbol,
+            direction=signal.side,
+            market_data=self._prepare_filter_market_data(ctx["market_data"]),
+            signal_data=signal_dict,
+        )
+
+        penalty = result.get("confidence_penalty", 0)
+        warnings = result.get("warnings", [])
+
+        # Применяем штраф к confidence
+        original_confidence = signal.confidence_score
+        signal.confidence_score = max(0, signal.confidence_score - (penalty / 100))
+
+        # Логирование
+        if penalty > 0:
+            logger.warning(
+                f"⚠️ {symbol}: Confirm Filter снизил confidence "
+                f"{original_confidence:.2f} → {signal.confidence_score:.2f} (-{penalty}%)"
+            )
+            for warn in warnings:
+                logger.warning(f"  └─ {warn}")
+        else:
+            logger.info(f"✅ {symbol}: Confirm Filter OK (0% penalty)")
+
+        # Сохраняем детали в сигнал
+        signal.market_conditions["confirm_filter_penalty"] = penalty
+        signal.market_conditions["confirm_filter_warnings"] = warnings
+        return (True, f"penalty {penalty}%")
+
+    async def _stage_cluster(self, ctx: Dict[str, Any]) -> Tuple[bool, str]:
+        """Cluster Analysis (NON-BLOCKING): бонус к confidence"""
+        signal, symbol = ctx["signal"], ctx["symbol"]
+        logger.info(f"🔍 Применение Cluster Analysis для {symbol}...")
+
+        cluster_score = await self.bot.cluster_detector.get_cluster_score(
+            symbol=symbol, direction=signal.side
+        )
+
+        logger.info(f"   📊 Cluster Score: {cluster_score:.2f}")
+
+        if cluster_score > 0.5:
+            signal.confidence_score = min(
+                1.0, signal.confidence_score + (cluster_score * 0.14)
+            )
+            logger.info(
+                f"✅ {symbol}: Cluster Analysis пройден, новый confidence: {signal.confidence_score:.2f}"
+            )
+            signal.market_conditions["cluster_score"] = cluster_score
+        else:
+            logger.warning(f"⚠️ {symbol}: Низкий Cluster Score: {cluster_score:.2f}")
+        return (True, f"score {cluster_score:.2f}")
+
     async def _filter_and_rank_signals(
         self, signals: List[EnhancedTradingSignal], market_data: Dict
     ) -> List[EnhancedTradingSignal]:
@@ -1734,6 +1782,7 @@ class AdvancedSignalGenerator:
                 "signal_settings": self.signal_settings.copy(),
                 "technical_cache_size": len(self.technical_cache),
                 "price_history_symbols": len(self.price_history),
+                "filter_funnel": self.filter_pipeline.get_funnel_stats(),
                 "most_matched_scenario": (
                     max(
                         self.generation_stats["scenarios_matched"],
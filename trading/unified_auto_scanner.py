@@ -9,8 +9,15 @@ import asyncio
 import time
 from typing import Optional, List, Dict
 from datetime import datetime
-from config.settings import logger, TRACKED_SYMBOLS, SCANNER_CONFIG
+from config.settings import (
+    logger,
+    TRACKED_SYMBOLS,
+    SCANNER_CONFIG,
+    SCAN_SCHEDULER_CONFIG,
+)
 from utils.data_validator import DataValidator  # ← ДОБАВЛЕНО!
+from trading.scan_scheduler import ActivityScheduler
+from utils.sampling_profiler import profile_tag
 
 
 class UnifiedAutoScanner:
@@ -70,6 +77,23 @@ class UnifiedAutoScanner:
         self.max_signals_per_hour = 10  # Максимум 10 сигналов в час
         self.max_active_positions_per_symbol = 2  # Макс. позиций по символу
 
+        # ✅ АДАПТИВНОЕ РАСПИСАНИЕ (вместо полного прохода каждые interval)
+        self.scheduler = None
+        if SCAN_SCHEDULER_CONFIG.get("enabled", True):
+            cfg = SCAN_SCHEDULER_CONFIG
+            self.scheduler = ActivityScheduler(
+                self.symbols,
+                budget_per_minute=cfg.get("budget_per_minute", 30),
+                min_interval_seconds=cfg.get("min_interval_seconds", 60),
+                max_staleness_seconds=cfg.get("max_staleness_seconds") or interval,
+                weights=cfg.get("weights"),
+                volatility_ref=cfg.get("volatility_ref", 0.005),
+                volume_surge_ref=cfg.get("volume_surge_ref", 2.0),
+                imbalance_ref=cfg.get("imbalance_ref", 0.3),
+                level_proximity_pct=cfg.get("level_proximity_pct", 1.0),
+            )
+            self.tick_seconds = cfg.get("tick_seconds", 10)
+
         logger.info(
             f"✅ UnifiedAutoScanner инициализирован (интервал: {self.interval_minutes} мин)"
         )
@@ -108,6 +132,12 @@ class UnifiedAutoScanner:
         try:
             while self.is_running:
                 try:
+                    if self.scheduler:
+                        # Адаптивное расписание: только символы, которым пора
+                        await self.scan_due()
+                        await asyncio.sleep(self.tick_seconds)
+                        continue
+
                     # Выполняем сканирование
                     await self.scan_market()
                     await asyncio.sleep(self.interval_minutes * 60)
@@ -120,17 +150,23 @@ class UnifiedAutoScanner:
         except asyncio.CancelledError:
             logger.info("🛑 Цикл сканирования отменён")
 
+    def _signal_limit_reached(self, now: float) -> bool:
+        """Часовой лимит сигналов (с очисткой устаревших отметок)"""
+        hour_ago = now - 3600
+        self.signals_per_hour = [t for t in self.signals_per_hour if t > hour_ago]
+
+        if len(self.signals_per_hour) >= self.max_signals_per_hour:
+            logger.warning(
+                f"⚠️ Лимит сигналов достигнут: {self.max_signals_per_hour}/час"
+            )
+            return True
+        return False
+
     async def scan_market(self):
         """Сканирование рынка на всех символах"""
         try:
             now = time.time()
-            hour_ago = now - 3600
-            self.signals_per_hour = [t for t in self.signals_per_hour if t > hour_ago]
-
-            if len(self.signals_per_hour) >= self.max_signals_per_hour:
-                logger.warning(
-                    f"⚠️ Лимит сигналов достигнут: {self.max_signals_per_hour}/час"
-                )
+            if self._signal_limit_reached(now):
                 return
             logger.info(f"🔍 Начало сканирования рынка ({len(self.symbols)} символов)")
 
@@ -138,108 +174,8 @@ class UnifiedAutoScanner:
 
             for symbol in self.symbols:
                 try:
-                    # Анализируем символ
-                    result = await self.analyze_symbol(symbol)
-
-                    if result and result.get("signal"):
+                    if await self._process_symbol(symbol, now):
                         signals_found += 1
-                        logger.info(f"🎯 Найден сигнал: {symbol} {result['direction']}")
-
-                        # Сохраняем сигнал если есть recorder
-                        if self.signal_recorder:
-                            signal_id = self.signal_recorder.record_signal(
-                                symbol=symbol,
-                                direction=result["direction"],
-                                entry_price=result["entry_price"],
-                                sl_price=result["stop_loss"],
-                                tp1_price=result["tp1_price"],
-                                tp2_price=result["tp2_price"],
-                                tp3_price=result["tp3_price"],
-                                scenario_id=result.get("scenario_id", "auto_scanner"),
-                                status="active",
-                                quality_score=result.get("quality_score", 0),
-                                risk_reward=result.get("risk_reward", 0),
-                            )
-
-                            logger.info(f"✅ Сигнал #{signal_id} сохранён в БД")
-                            # ✅ РЕГИСТРИРУЕМ СИГНАЛ В ЛИМИТЕ
-                            self.signals_per_hour.append(now)
-
-                            # Сохраняем данные в market_data для команды /scenario
-                            try:
-                                # ✅ ИСПОЛЬЗУЕМ result НАПРЯМУЮ (без market_data)
-                                self.bot.market_data[symbol] = {
-                                    "price": result["entry_price"],
-                                    "cvd": result.get(
-                                        "cvd", 0
-                                    ),  # ← НАПРЯМУЮ ИЗ result!
-                                    "volume_ratio": result.get(
-                                        "volume_ratio", 0
-                                    ),  # ← НАПРЯМУЮ ИЗ result!
-                                    "funding_rate": result.get("funding_rate", 0),
-                                    "long_short_ratio": result.get(
-                                        "long_short_ratio", 0
-                                    ),
-                                    "market_regime": result.get(
-                                        "market_regime", "Unknown"
-                                    ),
-                                    "wyckoff_phase": result.get(
-                                        "wyckoff_phase", "Unknown"
-                                    ),
-                                    "pattern": result.get("scenario_name", "Unknown"),
-                                    "strategy": result.get("strategy", "Unknown"),
-                                    "score": result.get("quality_score", 0),
-                                    "trend_1h": result.get("trend_1h", "UNKNOWN"),
-                                    "trend_4h": result.get("trend_4h", "UNKNOWN"),
-                                    "trend_1d": result.get("trend_1d", "UNKNOWN"),
-                                    "mtf_aligned": result.get("mtf_aligned", 0),
-                                    "mtf_agreement": result.get("mtf_agreement", 0),
-                                    "timestamp": datetime.now().isoformat(),
-                                }
-                                logger.info(
-                                    f"💾 {symbol}: Данные сохранены в market_data для /scenario"
-                                )
-                                logger.debug(
-                                    f"🔍 DEBUG: bot.market_data[{symbol}] CVD={self.bot.market_data.get(symbol, {}).get('cvd', 'N/A')}"
-                                )
-                                logger.debug(
-                                    f"🔍 DEBUG: Всего символов в market_data: {len(self.bot.market_data)}"
-                                )
-                            except Exception as e:
-                                logger.error(
-                                    f"❌ Ошибка сохранения market_data для {symbol}: {e}"
-                                )
-
-                            # Отправляем уведомление в Telegram
-                            if (
-                                hasattr(self.bot, "telegram_handler")
-                                and self.bot.telegram_handler
-                            ):
-                                try:
-                                    await self.bot.telegram_handler.notify_new_signal(
-                                        {
-                                            "id": signal_id,
-                                            "symbol": symbol,
-                                            "direction": result["direction"],
-                                            "entry_price": result["entry_price"],
-                                            "tp1_price": result["tp1_price"],
-                                            "tp2_price": result["tp2_price"],
-                                            "tp3_price": result["tp3_price"],
-                                            "stop_loss": result["stop_loss"],
-                                            "quality_score": result.get(
-                                                "quality_score", 0
-                                            ),
-                                            "risk_reward": result.get("risk_reward", 0),
-                                            "timestamp": datetime.now(),
-                                        }
-                                    )
-                                    logger.info(
-                                        f"📨 Сигнал #{signal_id} отправлен в Telegram"
-                                    )
-                                except Exception as e:
-                                    logger.error(
-                                        f"❌ Ошибка отправки Telegram уведомления: {e}"
-                                    )
 
                     # Небольшая пауза между символами
                     await asyncio.sleep(0.5)
@@ -253,6 +189,188 @@ class UnifiedAutoScanner:
         except Exception as e:
             logger.error(f"❌ Ошибка scan_market: {e}")
 
+    async def scan_due(self) -> int:
+        """
+        Один шаг адаптивного расписания: анализ символов, которым пора
+
+        Returns:
+            Количество проанализированных символов
+        """
+        now = time.time()
+        if self._signal_limit_reached(now):
+            return 0
+
+        self._collect_activity()
+        batch = self.scheduler.next_batch()
+        if not batch:
+            return 0
+
+        logger.debug(f"🔍 Scan Scheduler: {', '.join(batch)}")
+        signals_found = 0
+
+        for symbol in batch:
+            try:
+                if await self._process_symbol(symbol, now):
+                    signals_found += 1
+            except Exception as e:
+                logger.error(f"❌ Ошибка анализа {symbol}: {e}")
+            finally:
+                self.scheduler.mark_scanned(symbol)
+
+        if signals_found:
+            logger.info(
+                f"✅ Scan Scheduler: {len(batch)} символов, найдено {signals_found} сигналов"
+            )
+        return len(batch)
+
+    def _collect_activity(self):
+        """Признаки активности из данных в памяти (снимок тикеров, сводный стакан)"""
+        connector = getattr(self.bot, "bybit_connector", None)
+        snapshot = getattr(connector, "ticker_snapshot", None)
+        snapshot_fresh = snapshot is not None and snapshot.is_fresh(
+            getattr(connector, "snapshot_max_age", 30)
+        )
+        book = getattr(self.bot, "consolidated_book", None)
+
+        for symbol in self.symbols:
+            if snapshot_fresh:
+                self.scheduler.observe_price(symbol, snapshot.price(symbol))
+            if book is not None:
+                self.scheduler.observe_imbalance(symbol, book.imbalance(symbol))
+
+    def _notify_scenario(self, symbol: str, match_result: Dict):
+        """Передать сценарий в EnhancedAlertsSystem (алерт при смене сценария)"""
+        get_alerts = getattr(self.bot, "_get_alerts_system", None)
+        alerts = get_alerts() if get_alerts else None
+        if not alerts:
+            return
+        try:
+            alerts.on_scenario(
+                symbol,
+                match_result.get("scenario_name") or match_result.get("scenario_id", "Unknown"),
+                confidence=float(match_result.get("score", 0)) / 100,
+                phase=match_result.get("phase") or match_result.get("status", ""),
+            )
+        except Exception as e:
+            logger.debug(f"⚠️ {symbol}: on_scenario: {e}")
+
+    def _notify_klines(self, symbol: str, candles: List[Dict]):
+        """Новые закрытые 1h свечи в EnhancedAlertsSystem (всплеск объёма, пробой VP)"""
+        get_alerts = getattr(self.bot, "_get_alerts_system", None)
+        alerts = get_alerts() if get_alerts else None
+        if not alerts:
+            return
+        try:
+            alerts.on_closed_klines(symbol, candles, interval_minutes=60)
+        except Exception as e:
+            logger.debug(f"⚠️ {symbol}: on_closed_klines: {e}")
+
+    def _record_scan_features(self, symbol: str, candles: List, volume_profile: Dict):
+        """Объём свечей и ключевые уровни (Volume Profile, 24h high/low) для расписания"""
+        if not self.scheduler:
+            return
+        levels = [volume_profile.get(k) for k in ("poc", "vah", "val")] if volume_profile else []
+
+        connector = getattr(self.bot, "bybit_connector", None)
+        snapshot = getattr(connector, "ticker_snapshot", None)
+        if snapshot is not None and symbol in snapshot:
+            levels += [
+                snapshot.value(symbol, "high_24h"),
+                snapshot.value(symbol, "low_24h"),
+            ]
+        self.scheduler.observe_scan(symbol, candles=candles, levels=levels)
+
+    async def _process_symbol(self, symbol: str, now: float) -> bool:
+        """Анализ символа и обработка найденного сигнала"""
+        # Анализируем символ (метка для атрибуции сэмплов профайлера)
+        with profile_tag(f"symbol:{symbol}"):
+            result = await self.analyze_symbol(symbol)
+
+        if not (result and result.get("signal")):
+            return False
+
+        logger.info(f"🎯 Найден сигнал: {symbol} {result['direction']}")
+
+        # Сохраняем сигнал если есть recorder
+        if self.signal_recorder:
+            signal_id = self.signal_recorder.record_signal(
+                symbol=symbol,
+                direction=result["direction"],
+                entry_price=result["entry_price"],
+                sl_price=result["stop_loss"],
+                tp1_price=result["tp1_price"],
+                tp2_price=result["tp2_price"],
+                tp3_price=result["tp3_price"],
+                scenario_id=result.get("scenario_id", "auto_scanner"),
+                status="active",
+                quality_score=result.get("quality_score", 0),
+                risk_reward=result.get("risk_reward", 0),
+            )
+
+            logger.info(f"✅ Сигнал #{signal_id} сохранён в БД")
+            # ✅ РЕГИСТРИРУЕМ СИГНАЛ В ЛИМИТЕ
+            self.signals_per_hour.append(now)
+
+            # Сохраняем данные в market_data для команды /scenario
+            try:
+                # ✅ ИСПОЛЬЗУЕМ result НАПРЯМУЮ (без market_data)
+                self.bot.market_data[symbol] = {
+                    "price": result["entry_price"],
+                    "cvd": result.get("cvd", 0),  # ← НАПРЯМУЮ ИЗ result!
+                    "volume_ratio": result.get(
+                        "volume_ratio", 0
+                    ),  # ← НАПРЯМУЮ ИЗ result!
+                    "funding_rate": result.get("funding_rate", 0),
+                    "long_short_ratio": result.get("long_short_ratio", 0),
+                    "market_regime": result.get("market_regime", "Unknown"),
+                    "wyckoff_phase": result.get("wyckoff_phase", "Unknown"),
+                    "pattern": result.get("scenario_name", "Unknown"),
+                    "strategy": result.get("strategy", "Unknown"),
+                    "score": result.get("quality_score", 0),
+                    "trend_1h": result.get("trend_1h", "UNKNOWN"),
+                    "trend_4h": result.get("trend_4h", "UNKNOWN"),
+                    "trend_1d": result.get("trend_1d", "UNKNOWN"),
+                    "mtf_aligned": result.get("mtf_aligned", 0),
+                    "mtf_agreement": result.get("mtf_agreement", 0),
+                    "timestamp": datetime.now().isoformat(),
+                }
+                logger.info(f"💾 {symbol}: Данные сохранены в market_data для /scenario")
+                logger.debug(
+                    f"🔍 DEBUG: bot.market_data[{symbol}] CVD={self.bot.market_data.get(symbol, {}).get('cvd', 'N/A')}"
+                )
+                logger.debug(
+                    f"🔍 DEBUG: Всего символов в market_data: {len(self.bot.market_data)}"
+                )
+            except Exception as e:
+                logger.error(f"❌ Ошибка сохранения market_data для {symbol}: {e}")
+
+            # Отправляем уведомление в Telegram
+            if (
+                hasattr(self.bot, "telegram_handler")
+                and self.bot.telegram_handler
+            ):
+                try:
+                    await self.bot.telegram_handler.notify_new_signal(
+                        {
+                            "id": signal_id,
+                            "symbol": symbol,
+                            "direction": result["direction"],
+                            "entry_price": result["entry_price"],
+                            "tp1_price": result["tp1_price"],
+                            "tp2_price": result["tp2_price"],
+                            "tp3_price": result["tp3_price"],
+                            "stop_loss": result["stop_loss"],
+                            "quality_score": result.get("quality_score", 0),
+                            "risk_reward": result.get("risk_reward", 0),
+                            "timestamp": datetime.now(),
+                        }
+                    )
+                    logger.info(f"📨 Сигнал #{signal_id} отправлен в Telegram")
+                except Exception as e:
+                    logger.error(f"❌ Ошибка отправки Telegram уведомления: {e}")
+
+        return True
+
     # ✅ ДОБАВИТЬ ЭТОТ МЕТОД ЗДЕСЬ:
     async def scan_symbol(self, symbol: str) -> Optional[Dict]:
         """
@@ -464,6 +582,8 @@ class UnifiedAutoScanner:
                 logger.debug(f"⚠️ {symbol}: Volume Profile не получен")
                 volume_profile = {}
 
+            self._record_scan_features(symbol, candles, volume_profile)
+
             news_sentiment = {}
             veto_checks = {}
 
@@ -496,6 +616,8 @@ class UnifiedAutoScanner:
             if not match_result:
                 return None
 
+            self._notify_scenario(symbol, match_result)
+
             # ========== 8. ПРИМЕНЯЕМ ФИЛЬТРЫ ==========
             direction = match_result.get("direction", "LONG")
 
@@ -711,6 +833,8 @@ class UnifiedAutoScanner:
                 logger.warning(f"⚠️ {symbol}: Нет свечей")
                 return None
 
+            self._notify_klines(symbol, candles)
+
             # ========== ВАЛИДАЦИЯ ЦЕНЫ ИЗ ТИКЕРА ==========
             last_price = float(
                 ticker.get("lastPrice", 0) or ticker.get("last_price", 0)
@@ -3,14 +3,68 @@
 """
 Cache Manager - управление in-memory кэшем с TTL
 Уменьшает количество API запросов через кэширование данных
+
+Размер записей оценивается в байтах: у каждого namespace своя квота и
+свой lock, общий бюджет памяти делится между ними. get_or_compute()
+защищает горячие ключи от stampede (single-flight + вероятностное
+раннее обновление).
 """
 
+import math
+import random
+import sys
 import time
 import asyncio
-from typing import Dict, Optional, Any, Tuple
+import inspect
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
 from collections import OrderedDict
 from dataclasses import dataclass
-from config.settings import logger
+from config.settings import CACHE_CONFIG, logger
+
+
+# Элементов контейнера, по которым оценивается средний размер
+SIZE_SAMPLE = 32
+SIZE_MAX_DEPTH = 6
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    Примерный размер объекта в байтах
+
+    numpy массивы и compact-модели - по nbytes; большие контейнеры - по
+    выборке первых SIZE_SAMPLE элементов (стакан на 200 уровней не
+    обходится целиком на каждый set).
+    """
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes + 96
+
+    size = sys.getsizeof(value)
+    if _depth >= SIZE_MAX_DEPTH or isinstance(value, (str, bytes, int, float, bool)):
+        return size
+
+    if isinstance(value, dict):
+        count = len(value)
+        if not count:
+            return size
+        items = value.items() if count <= SIZE_SAMPLE else list(value.items())[:SIZE_SAMPLE]
+        sample = sum(
+            estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in items
+        )
+        return size + sample * count // min(count, SIZE_SAMPLE)
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        count = len(value)
+        if not count:
+            return size
+        items = value if count <= SIZE_SAMPLE else list(value)[:SIZE_SAMPLE]
+        sample = sum(estimate_size(v, _depth + 1) for v in items)
+        return size + sample * count // min(count, SIZE_SAMPLE)
+
+    attrs = getattr(value, "__dict__", None)
+    if attrs is not None:
+        return size + estimate_size(attrs, _depth + 1)
+    return size
 
 
 @dataclass
@@ -22,6 +76,9 @@ class CacheEntry:
     timestamp: float
     ttl: float
     hit_count: int = 0
+    size: int = 0
+    # Длительность вычисления (get_or_compute) - для раннего обновления
+    compute_time: float = 0.0
 
     @property
     def is_expired(self) -> bool:
@@ -34,28 +91,74 @@ class CacheEntry:
         return time.time() - self.timestamp
 
 
+class _Namespace:
+    """LRU записи одного namespace + его квота и lock"""
+
+    __slots__ = ("name", "quota", "entries", "bytes", "lock", "inflight", "stats")
+
+    def __init__(self, name: str, quota: int):
+        self.name = name
+        self.quota = quota
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.bytes = 0
+        self.lock = asyncio.Lock()
+        # key -> Future вычисления get_or_compute
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def remove(self, key: str) -> CacheEntry:
+        entry = self.entries.pop(key)
+        self.bytes -= entry.size
+        return entry
+
+    @property
+    def pressure(self) -> float:
+        return self.bytes / self.quota if self.quota else float("inf")
+
+
 class CacheManager:
     """
     In-Memory кэш менеджер с TTL
 
     Features:
-    - LRU (Least Recently Used) eviction
+    - LRU (Least Recently Used) eviction внутри namespace
+    - Байтовые квоты namespace под общим бюджетом памяти
+    - Lock на namespace (тикеры не ждут стаканы)
     - TTL (Time To Live) для автоматической очистки
+    - get_or_compute: single-flight и вероятностное раннее обновление
     - Hit/Miss статистика
-    - Namespace support для разделения данных
     """
 
-    def __init__(self, max_size: int = 1000, default_ttl: float = 60.0):
+    def __init__(
+        self,
+        max_size: int = CACHE_CONFIG["max_entries"],
+        default_ttl: float = CACHE_CONFIG["default_ttl"],
+        max_bytes: int = CACHE_CONFIG["max_bytes"],
+        namespace_quotas: Optional[Dict[str, int]] = None,
+        default_namespace_bytes: int = CACHE_CONFIG["default_namespace_bytes"],
+        early_refresh_beta: float = CACHE_CONFIG["early_refresh_beta"],
+    ):
         """
         Args:
-            max_size: Максимальное количество записей
+            max_size: Максимальное количество записей (всего)
             default_ttl: TTL по умолчанию (секунды)
+            max_bytes: Общий бюджет памяти (оценка, байты)
+            namespace_quotas: {namespace: байты} (по умолчанию CACHE_CONFIG)
+            default_namespace_bytes: Квота namespace без явной записи
+            early_refresh_beta: β раннего обновления (0 - только по TTL)
         """
         self.max_size = max_size
         self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.namespace_quotas = dict(
+            CACHE_CONFIG["namespace_bytes"] if namespace_quotas is None else namespace_quotas
+        )
+        self.default_namespace_bytes = default_namespace_bytes
+        self.early_refresh_beta = early_refresh_beta
 
-        # OrderedDict для LRU
-        self.cache: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.namespaces: Dict[str, _Namespace] = {}
+        self.total_bytes = 0
+        self.total_entries = 0
 
         # Статистика
         self.stats = {
@@ -64,15 +167,106 @@ class CacheManager:
             "evictions": 0,
             "expirations": 0,
             "total_requests": 0,
+            "rejected": 0,
+            "early_refreshes": 0,
+            "stampede_waits": 0,
         }
 
-        # Lock для thread-safety
-        self.lock = asyncio.Lock()
-
         logger.info(
             f"✅ CacheManager инициализирован: "
-            f"max_size={max_size}, default_ttl={default_ttl}s"
+            f"max_size={max_size}, max_bytes={max_bytes / 1024 / 1024:.0f}MB, "
+            f"default_ttl={default_ttl}s"
+        )
+
+    # ========== NAMESPACE ==========
+
+    def _namespace(self, namespace: str) -> _Namespace:
+        ns = self.namespaces.get(namespace)
+        if ns is None:
+            quota = self.namespace_quotas.get(namespace, self.default_namespace_bytes)
+            ns = _Namespace(namespace, min(quota, self.max_bytes))
+            self.namespaces[namespace] = ns
+        return ns
+
+    def _drop(self, ns: _Namespace, full_key: str) -> CacheEntry:
+        entry = ns.remove(full_key)
+        self.total_bytes -= entry.size
+        self.total_entries -= 1
+        return entry
+
+    def _evict_lru(self, ns: _Namespace):
+        full_key = next(iter(ns.entries))
+        self._drop(ns, full_key)
+        ns.stats["evictions"] += 1
+        self.stats["evictions"] += 1
+        logger.debug(f"🗑️ Cache EVICTED (LRU): {full_key}")
+
+    def _make_room(self, ns: _Namespace, size: int):
+        """Освободить место: сначала квота namespace, затем общий бюджет"""
+        while ns.entries and ns.bytes + size > ns.quota:
+            self._evict_lru(ns)
+
+        # Общий бюджет: вытесняем из namespace, сильнее всех занявшего свою квоту
+        while (
+            self.total_bytes + size > self.max_bytes or self.total_entries >= self.max_size
+        ):
+            victims = [n for n in self.namespaces.values() if n.entries]
+            if not victims:
+                break
+            self._evict_lru(max(victims, key=lambda n: n.pressure))
+
+    def _lookup(self, ns: _Namespace, full_key: str) -> Optional[CacheEntry]:
+        """Живая запись или None (истёкшая удаляется)"""
+        entry = ns.entries.get(full_key)
+        if entry is None:
+            return None
+        if entry.is_expired:
+            self._drop(ns, full_key)
+            self.stats["expirations"] += 1
+            logger.debug(f"⏰ Cache EXPIRED: {full_key} (age: {entry.age:.1f}s)")
+            return None
+        return entry
+
+    def _record(self, ns: _Namespace, entry: Optional[CacheEntry]):
+        self.stats["total_requests"] += 1
+        if entry is None:
+            self.stats["misses"] += 1
+            ns.stats["misses"] += 1
+            return
+        self.stats["hits"] += 1
+        ns.stats["hits"] += 1
+        entry.hit_count += 1
+        ns.entries.move_to_end(entry.key)
+
+    def _store(
+        self, ns: _Namespace, full_key: str, value: Any, ttl: float, compute_time: float = 0.0
+    ) -> bool:
+        size = estimate_size(value) + sys.getsizeof(full_key)
+        if full_key in ns.entries:
+            self._drop(ns, full_key)
+
+        if size > ns.quota:
+            self.stats["rejected"] += 1
+            logger.debug(
+                f"⚠️ Cache REJECTED: {full_key} ({size} B > квота {ns.name} {ns.quota} B)"
+            )
+            return False
+
+        self._make_room(ns, size)
+        ns.entries[full_key] = CacheEntry(
+            key=full_key,
+            value=value,
+            timestamp=time.time(),
+            ttl=ttl,
+            size=size,
+            compute_time=compute_time,
         )
+        ns.bytes += size
+        self.total_bytes += size
+        self.total_entries += 1
+        return True
+
+    # ========== API ==========
 
     async def get(self, key: str, namespace: str = "default") -> Optional[Any]:
         """
@@ -85,36 +279,20 @@ class CacheManager:
         Returns:
             Значение или None если не найдено/истекло
         """
-        async with self.lock:
-            self.stats["total_requests"] += 1
+        ns = self._namespace(namespace)
+        async with ns.lock:
             full_key = f"{namespace}:{key}"
+            entry = self._lookup(ns, full_key)
+            self._record(ns, entry)
 
-            # Проверяем наличие в кэше
-            if full_key not in self.cache:
-                self.stats["misses"] += 1
+            if entry is None:
                 logger.debug(f"❌ Cache MISS: {full_key}")
                 return None
 
-            entry = self.cache[full_key]
-
-            # Проверяем TTL
-            if entry.is_expired:
-                self.stats["misses"] += 1
-                self.stats["expirations"] += 1
-                del self.cache[full_key]
-                logger.debug(f"⏰ Cache EXPIRED: {full_key} (age: {entry.age:.1f}s)")
-                return None
-
-            # Hit! Обновляем статистику и LRU order
-            self.stats["hits"] += 1
-            entry.hit_count += 1
-            self.cache.move_to_end(full_key)
-
             logger.debug(
                 f"✅ Cache HIT: {full_key} "
                 f"(age: {entry.age:.1f}s, hits: {entry.hit_count})"
             )
-
             return entry.value
 
     async def set(
@@ -127,33 +305,105 @@ class CacheManager:
         """
         Сохранить значение в кэш
 
+        Запись больше квоты namespace не сохраняется (stats["rejected"])
+
         Args:
             key: Ключ
             value: Значение
             ttl: TTL (секунды), если None - использует default_ttl
             namespace: Пространство имён
         """
-        async with self.lock:
+        ns = self._namespace(namespace)
+        async with ns.lock:
             full_key = f"{namespace}:{key}"
             ttl = ttl if ttl is not None else self.default_ttl
+            if self._store(ns, full_key, value, ttl):
+                logger.debug(f"💾 Cache SET: {full_key} (ttl: {ttl}s)")
 
-            # Создаём запись
-            entry = CacheEntry(
-                key=full_key, value=value, timestamp=time.time(), ttl=ttl
-            )
+    def _should_refresh_early(self, entry: CacheEntry, beta: float) -> bool:
+        """
+        XFetch: обновить раньше срока с вероятностью, растущей к истечению
+
+        Чем дольше вычисление, тем раньше начинается обновление; одновременно
+        его запускает один вызывающий, остальные получают текущее значение.
+        """
+        if beta <= 0 or entry.compute_time <= 0:
+            return False
+        remaining = entry.timestamp + entry.ttl - time.time()
+        return -entry.compute_time * beta * math.log(1.0 - random.random()) >= remaining
 
-            # Если достигли лимита - удаляем самую старую запись (LRU)
-            if len(self.cache) >= self.max_size and full_key not in self.cache:
-                oldest_key = next(iter(self.cache))
-                del self.cache[oldest_key]
-                self.stats["evictions"] += 1
-                logger.debug(f"🗑️ Cache EVICTED (LRU): {oldest_key}")
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Union[Any, Awaitable[Any]]],
+        ttl: Optional[float] = None,
+        namespace: str = "default",
+        beta: Optional[float] = None,
+    ) -> Any:
+        """
+        Значение из кэша или результат compute() (не более одного
+        вычисления на ключ одновременно)
 
-            # Добавляем/обновляем запись
-            self.cache[full_key] = entry
-            self.cache.move_to_end(full_key)
+        None из compute() не кэшируется - так вызывающий сообщает, что
+        результат (ошибка, пустые данные) хранить не нужно.
 
-            logger.debug(f"💾 Cache SET: {full_key} (ttl: {ttl}s)")
+        Args:
+            key: Ключ
+            compute: Функция или корутина-функция без аргументов
+            ttl: TTL (секунды)
+            namespace: Пространство имён
+            beta: β раннего обновления (по умолчанию early_refresh_beta)
+        """
+        ns = self._namespace(namespace)
+        full_key = f"{namespace}:{key}"
+        ttl = ttl if ttl is not None else self.default_ttl
+        beta = self.early_refresh_beta if beta is None else beta
+
+        async with ns.lock:
+            entry = self._lookup(ns, full_key)
+            self._record(ns, entry)
+            inflight = ns.inflight.get(full_key)
+
+            if entry is not None:
+                # Уже обновляется или ещё рано - отдаём текущее значение
+                if inflight is not None or not self._should_refresh_early(entry, beta):
+                    return entry.value
+                self.stats["early_refreshes"] += 1
+            elif inflight is not None:
+                self.stats["stampede_waits"] += 1
+
+            if inflight is None:
+                inflight = asyncio.get_running_loop().create_future()
+                ns.inflight[full_key] = inflight
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            return await asyncio.shield(inflight)
+
+        try:
+            started = time.perf_counter()
+            value = compute()
+            if inspect.isawaitable(value):
+                value = await value
+            elapsed = time.perf_counter() - started
+
+            if value is not None:
+                async with ns.lock:
+                    self._store(ns, full_key, value, ttl, compute_time=elapsed)
+            inflight.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            inflight.cancel()
+            raise
+        except Exception as e:
+            inflight.set_exception(e)
+            # Исключение получат ожидающие; у лидера оно поднимается ниже
+            inflight.exception()
+            raise
+        finally:
+            ns.inflight.pop(full_key, None)
 
     async def delete(self, key: str, namespace: str = "default") -> bool:
         """
@@ -166,10 +416,11 @@ class CacheManager:
         Returns:
             True если удалено, False если не найдено
         """
-        async with self.lock:
+        ns = self._namespace(namespace)
+        async with ns.lock:
             full_key = f"{namespace}:{key}"
-            if full_key in self.cache:
-                del self.cache[full_key]
+            if full_key in ns.entries:
+                self._drop(ns, full_key)
                 logger.debug(f"🗑️ Cache DELETE: {full_key}")
                 return True
             return False
@@ -184,24 +435,24 @@ class CacheManager:
         Returns:
             Количество удалённых записей
         """
-        async with self.lock:
-            if namespace is None:
-                # Очищаем весь кэш
-                count = len(self.cache)
-                self.cache.clear()
-                logger.info(f"🗑️ Cache CLEARED: {count} записей")
-                return count
-            else:
-                # Очищаем только указанный namespace
-                prefix = f"{namespace}:"
-                keys_to_delete = [k for k in self.cache.keys() if k.startswith(prefix)]
-                for key in keys_to_delete:
-                    del self.cache[key]
-                logger.info(
-                    f"🗑️ Cache CLEARED namespace '{namespace}': "
-                    f"{len(keys_to_delete)} записей"
-                )
-                return len(keys_to_delete)
+        names = list(self.namespaces) if namespace is None else [namespace]
+        count = 0
+        for name in names:
+            ns = self.namespaces.get(name)
+            if ns is None:
+                continue
+            async with ns.lock:
+                count += len(ns.entries)
+                self.total_bytes -= ns.bytes
+                self.total_entries -= len(ns.entries)
+                ns.entries.clear()
+                ns.bytes = 0
+
+        if namespace is None:
+            logger.info(f"🗑️ Cache CLEARED: {count} записей")
+        else:
+            logger.info(f"🗑️ Cache CLEARED namespace '{namespace}': {count} записей")
+        return count
 
     async def cleanup_expired(self) -> int:
         """
@@ -210,19 +461,19 @@ class CacheManager:
         Returns:
             Количество удалённых записей
         """
-        async with self.lock:
-            expired_keys = [
-                key for key, entry in self.cache.items() if entry.is_expired
-            ]
+        removed = 0
+        for ns in list(self.namespaces.values()):
+            async with ns.lock:
+                expired_keys = [key for key, entry in ns.entries.items() if entry.is_expired]
+                for key in expired_keys:
+                    self._drop(ns, key)
+                    self.stats["expirations"] += 1
+                removed += len(expired_keys)
 
-            for key in expired_keys:
-                del self.cache[key]
-                self.stats["expirations"] += 1
+        if removed:
+            logger.debug(f"🗑️ Cache cleanup: {removed} истёкших записей")
 
-            if expired_keys:
-                logger.debug(f"🗑️ Cache cleanup: {len(expired_keys)} истёкших записей")
-
-            return len(expired_keys)
+        return removed
 
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -242,9 +493,20 @@ class CacheManager:
             **self.stats,
             "hit_rate": hit_rate,
             "miss_rate": miss_rate,
-            "cache_size": len(self.cache),
+            "cache_size": self.total_entries,
             "max_size": self.max_size,
-            "utilization": (len(self.cache) / self.max_size * 100),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "utilization": (self.total_bytes / self.max_bytes * 100),
+            "namespaces": {
+                name: {
+                    "entries": len(ns.entries),
+                    "bytes": ns.bytes,
+                    "quota": ns.quota,
+                    **ns.stats,
+                }
+                for name, ns in self.namespaces.items()
+            },
         }
 
     def get_detailed_stats(self) -> Dict[str, Any]:
@@ -258,7 +520,9 @@ class CacheManager:
 
         # Топ записей по количеству hits
         top_entries = sorted(
-            self.cache.values(), key=lambda e: e.hit_count, reverse=True
+            (entry for ns in self.namespaces.values() for entry in ns.entries.values()),
+            key=lambda e: e.hit_count,
+            reverse=True,
         )[:10]
 
         stats["top_entries"] = [
@@ -267,6 +531,7 @@ class CacheManager:
                 "hits": entry.hit_count,
                 "age": entry.age,
                 "ttl": entry.ttl,
+                "size": entry.size,
             }
             for entry in top_entries
         ]
@@ -281,9 +546,7 @@ class CacheManager:
             Dict со статистикой (включая размер в MB)
         """
         stats = self.get_stats()
-
-        # Добавляем размер в MB (примерная оценка)
-        stats["total_size_mb"] = stats["cache_size"] * 0.001  # Примерно 1KB на запись
+        stats["total_size_mb"] = stats["bytes"] / 1024 / 1024
         stats["total_items"] = stats["cache_size"]
 
         return stats
@@ -322,11 +585,9 @@ def get_cache_manager() -> CacheManager:
     """Получить глобальный Cache Manager (Singleton)"""
     global _global_cache_manager
     if _global_cache_manager is None:
-        _global_cache_manager = CacheManager(
-            max_size=1000, default_ttl=10.0  # 10 секунд для ticker data
-        )
+        _global_cache_manager = CacheManager()  # CACHE_CONFIG (10s TTL для ticker data)
     return _global_cache_manager
 
 
 # Экспорт
-__all__ = ["CacheManager", "CacheEntry", "get_cache_manager"]
+__all__ = ["CacheManager", "CacheEntry", "estimate_size", "get_cache_manager"]
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+Колоночный парсинг и валидация свечей (OHLCV)
+- Ответ биржи (список строк/словарей) → типизированные NumPy колонки
+- Все проверки (NaN/Inf, цены > 0, объём >= 0, low <= open/close <= high)
+  выполняются масками над массивами, без цикла по свечам
+- Один и тот же этап используется REST коннекторами и CSV загрузчиками
+"""
+
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config.settings import logger
+
+
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+
+# Спред (high - low) / low выше порога - подозрительно (логируем, не отбрасываем)
+SUSPICIOUS_SPREAD = 0.5
+
+
+class CandleFrame:
+    """
+    Валидированные свечи в колоночном виде
+
+    timestamp - int64, OHLCV - float64, строки отсортированы по времени
+    (от старых к новым) без дубликатов. extra - дополнительные колонки
+    (close_time, quote_volume, ...).
+    """
+
+    __slots__ = (
+        "timestamp", "open", "high", "low", "close", "volume",
+        "extra", "invalid_count", "total_count", "suspicious_count",
+    )
+
+    def __init__(
+        self,
+        timestamp: np.ndarray,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+        extra: Optional[Dict[str, np.ndarray]] = None,
+        invalid_count: int = 0,
+        total_count: int = 0,
+        suspicious_count: int = 0,
+    ):
+        self.timestamp = timestamp
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.extra = extra or {}
+        self.invalid_count = invalid_count
+        self.total_count = total_count
+        self.suspicious_count = suspicious_count
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        data = {"timestamp": self.timestamp}
+        for name in OHLCV_COLUMNS:
+            data[name] = getattr(self, name)
+        data.update(self.extra)
+        return data
+
+    def to_dicts(self, descending: bool = False) -> List[Dict]:
+        """Список словарей свечей (формат коннекторов)"""
+        data = self.columns()
+        names = list(data)
+        # tolist() отдаёт нативные int/float - без numpy скаляров в словарях
+        values = [data[name].tolist() for name in names]
+        rows = [dict(zip(names, row)) for row in zip(*values)]
+        if descending:
+            rows.reverse()
+        return rows
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns(), copy=False)
+
+
+def _matrix(rows: Sequence, width: int) -> np.ndarray:
+    """Строки ответа → float64 матрица n x width (отсутствующее/мусор → NaN)"""
+    padded = [
+        list(row[:width]) + [None] * (width - len(row))
+        if isinstance(row, (list, tuple)) else [None] * width
+        for row in rows
+    ]
+    try:
+        # Быстрый путь: numpy парсит числовые строки сам
+        return np.array(padded, dtype=np.float64).reshape(len(padded), width)
+    except (ValueError, TypeError):
+        frame = pd.DataFrame(padded)
+        return frame.apply(pd.to_numeric, errors="coerce").to_numpy(np.float64)
+
+
+def validate_columns(
+    timestamp: np.ndarray,
+    open: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Маска валидных свечей и маска подозрительного спреда
+
+    NaN не проходит ни одно сравнение, поэтому отдельная проверка не нужна
+    (кроме Inf).
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        valid = (
+            (timestamp > 0)
+            & (open > 0) & (high > 0) & (low > 0) & (close > 0)
+            & (volume >= 0)
+            & np.isfinite(timestamp) & np.isfinite(high) & np.isfinite(volume)
+            & (low <= open) & (open <= high)
+            & (low <= close) & (close <= high)
+        )
+        suspicious = valid & ((high - low) / low > SUSPICIOUS_SPREAD)
+    return valid, suspicious
+
+
+def _build(
+    matrix: np.ndarray,
+    extra_names: Iterable[str],
+    total: int,
+    label: str,
+) -> CandleFrame:
+    timestamp, open_, high, low, close, volume = (matrix[:, i] for i in range(6))
+    valid, suspicious = validate_columns(timestamp, open_, high, low, close, volume)
+
+    invalid_count = int(total - valid.sum())
+    suspicious_count = int(suspicious.sum())
+    if suspicious_count:
+        logger.warning(
+            f"⚠️ {label}: {suspicious_count} свечей с подозрительным спредом "
+            f"> {SUSPICIOUS_SPREAD:.0%}"
+        )
+
+    rows = matrix[valid]
+    # Сортировка по времени и удаление дубликатов (последний выигрывает)
+    order = np.argsort(rows[:, 0], kind="stable")
+    rows = rows[order]
+    if len(rows) > 1:
+        keep = np.append(rows[1:, 0] != rows[:-1, 0], True)
+        rows = rows[keep]
+
+    extra = {
+        name: rows[:, 6 + i] for i, name in enumerate(extra_names)
+    }
+    return CandleFrame(
+        rows[:, 0].astype(np.int64),
+        *(np.ascontiguousarray(rows[:, i]) for i in range(1, 6)),
+        extra=extra,
+        invalid_count=invalid_count,
+        total_count=total,
+        suspicious_count=suspicious_count,
+    )
+
+
+def parse_klines(
+    rows: Sequence[Sequence],
+    extra_columns: Optional[Mapping[str, Tuple[int, str]]] = None,
+    label: str = "klines",
+) -> CandleFrame:
+    """
+    Массив свечей биржи ([ts, open, high, low, close, volume, ...]) → CandleFrame
+
+    Args:
+        rows: Строки ответа (Bybit result.list, Binance /klines, OKX data)
+        extra_columns: {имя: (индекс поля, dtype)} - дополнительные колонки
+        label: Метка для логов (обычно символ)
+    """
+    extra_columns = dict(extra_columns or {})
+    width = max([6] + [index + 1 for index, _ in extra_columns.values()])
+
+    matrix = _matrix(rows, width)
+    if width > 6:
+        indices = list(range(6)) + [index for index, _ in extra_columns.values()]
+        matrix = matrix[:, indices]
+
+    frame = _build(matrix, extra_columns.keys(), len(rows), label)
+    for name, (_, dtype) in extra_columns.items():
+        column = frame.extra[name]
+        if np.dtype(dtype).kind in "iu":
+            column = np.nan_to_num(column, nan=0).astype(dtype)
+        frame.extra[name] = column
+    return frame
+
+
+def parse_candle_records(
+    records: Sequence[Mapping],
+    fields: Optional[Mapping[str, str]] = None,
+    label: str = "candles",
+) -> CandleFrame:
+    """
+    Список словарей свечей → CandleFrame
+
+    Args:
+        records: Свечи как словари (Coinbase candles, кэшированные свечи)
+        fields: {колонка CandleFrame: ключ в словаре}, по умолчанию совпадают
+    """
+    fields = dict(fields or {})
+    keys = [fields.get(name, name) for name in ("timestamp",) + OHLCV_COLUMNS]
+    rows = [[record.get(key) for key in keys] for record in records]
+    return parse_klines(rows, label=label)
+
+
+def validate_ohlcv_frame(df: pd.DataFrame, label: str = "dataframe") -> Tuple[pd.DataFrame, int]:
+    """
+    Отфильтровать невалидные свечи DataFrame (колонки open/high/low/close/volume)
+
+    Returns:
+        (DataFrame только с валидными строками, число отброшенных)
+    """
+    columns = {}
+    for name in OHLCV_COLUMNS:
+        if name in df.columns:
+            columns[name] = pd.to_numeric(df[name], errors="coerce").to_numpy(np.float64)
+        elif name == "volume":
+            columns[name] = np.zeros(len(df))
+        else:
+            return df, 0
+
+    # Время уже проверено парсером дат - здесь достаточно заглушки > 0
+    valid, _ = validate_columns(np.ones(len(df)), *(columns[n] for n in OHLCV_COLUMNS))
+    invalid_count = int(len(df) - valid.sum())
+    if invalid_count:
+        logger.warning(f"⚠️ {label}: отброшено {invalid_count} невалидных свечей")
+        df = df.loc[valid].reset_index(drop=True)
+    return df, invalid_count
+
+
+__all__ = [
+    "CandleFrame",
+    "parse_klines",
+    "parse_candle_records",
+    "validate_columns",
+    "validate_ohlcv_frame",
+    "OHLCV_COLUMNS",
+    "SUSPICIOUS_SPREAD",
+]
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dispatch Queue - развязка чтения WebSocket и обработчиков
+- Reader только кладёт сообщение в очередь темы и сразу читает дальше
+- У каждой темы свой consumer task: медленный стакан не задерживает сделки
+- Conflating темы (снимки стакана, тикер): по ключу хранится только
+  последнее состояние, промежуточные заменяются
+- FIFO темы (сделки): без потерь, порядок сохраняется
+- Счётчики: глубина очереди, максимум, conflated, dropped, ошибки
+"""
+
+import asyncio
+import inspect
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from config.settings import logger
+
+
+# Глубина FIFO очереди для предупреждения (порог удваивается до опустошения)
+BACKLOG_WARNING = 1000
+
+
+class _TopicQueue:
+    """Очередь одной темы + её consumer"""
+
+    __slots__ = (
+        "topic",
+        "conflate",
+        "maxsize",
+        "fifo",
+        "latest",
+        "event",
+        "task",
+        "busy",
+        "stats",
+        "_warned_at",
+    )
+
+    def __init__(self, topic: str, conflate: bool, maxsize: Optional[int]):
+        self.topic = topic
+        self.conflate = conflate
+        self.maxsize = maxsize
+        self.fifo: deque = deque()
+        self.latest: Dict[Hashable, Tuple[Callable, tuple]] = {}
+        self.event = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.busy = False
+        self.stats = {
+            "enqueued": 0,
+            "processed": 0,
+            "conflated": 0,
+            "dropped": 0,
+            "errors": 0,
+            "max_depth": 0,
+        }
+        self._warned_at = BACKLOG_WARNING
+
+    def __len__(self) -> int:
+        return len(self.latest) if self.conflate else len(self.fifo)
+
+    def put(self, handler: Callable, args: tuple, key: Optional[Hashable]) -> int:
+        """Возвращает новую глубину очереди"""
+        self.stats["enqueued"] += 1
+        if self.conflate:
+            if key in self.latest:
+                # Ключ остаётся на своём месте в очереди, значение - последнее
+                self.stats["conflated"] += 1
+            self.latest[key] = (handler, args)
+        else:
+            if self.maxsize and len(self.fifo) >= self.maxsize:
+                self.fifo.popleft()
+                self.stats["dropped"] += 1
+            self.fifo.append((handler, args))
+
+        depth = len(self)
+        if depth > self.stats["max_depth"]:
+            self.stats["max_depth"] = depth
+        self.event.set()
+        return depth
+
+    def pop(self) -> Tuple[Callable, tuple]:
+        if self.conflate:
+            key = next(iter(self.latest))
+            return self.latest.pop(key)
+        return self.fifo.popleft()
+
+
+class TopicDispatcher:
+    """
+    Диспетчер сообщений по темам
+
+    submit() синхронный и никогда не ждёт обработчик. Тип темы задаётся при
+    первом submit (есть key - conflating) или явно через add_topic().
+    """
+
+    def __init__(self, name: str = "Dispatcher"):
+        self.name = name
+        self._topics: Dict[str, _TopicQueue] = {}
+
+    def add_topic(self, topic: str, conflate: bool = False, maxsize: Optional[int] = None):
+        """
+        Объявить тему
+
+        Args:
+            conflate: Хранить только последнее значение по ключу
+            maxsize: Лимит FIFO (старые вытесняются, считаются в dropped);
+                     None - без потерь
+        """
+        if topic not in self._topics:
+            self._topics[topic] = _TopicQueue(topic, conflate, maxsize)
+        return self._topics[topic]
+
+    def submit(self, topic: str, handler: Callable, *args: Any, key: Optional[Hashable] = None):
+        """Положить вызов handler(*args) в очередь темы"""
+        queue = self._topics.get(topic)
+        if queue is None:
+            queue = self.add_topic(topic, conflate=key is not None)
+
+        depth = queue.put(handler, args, key)
+        if not queue.conflate and depth >= queue._warned_at:
+            logger.warning(
+                f"⚠️ {self.name}: очередь '{topic}' растёт ({depth} сообщений), "
+                f"обработчик не успевает"
+            )
+            queue._warned_at *= 2
+
+        if queue.task is None or queue.task.done():
+            queue.task = asyncio.get_running_loop().create_task(self._consume(queue))
+
+    async def _consume(self, queue: _TopicQueue):
+        while True:
+            if not len(queue):
+                queue.event.clear()
+                await queue.event.wait()
+                continue
+
+            handler, args = queue.pop()
+            queue.busy = True
+            try:
+                result = handler(*args)
+                if inspect.isawaitable(result):
+                    await result
+                queue.stats["processed"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                queue.stats["errors"] += 1
+                logger.error(f"❌ {self.name}: ошибка обработчика '{queue.topic}': {e}")
+            finally:
+                queue.busy = False
+
+            if not len(queue):
+                queue._warned_at = BACKLOG_WARNING
+
+            # Отдаём управление reader'у даже если обработчик не уступил
+            await asyncio.sleep(0)
+
+    async def drain(self, timeout: float = 5.0):
+        """Дождаться опустошения всех очередей (тесты, остановка)"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while (
+            any(len(q) or q.busy for q in self._topics.values())
+            and loop.time() < deadline
+        ):
+            await asyncio.sleep(0.01)
+
+    async def stop(self):
+        """Остановка consumers (необработанные сообщения отбрасываются)"""
+        tasks = [q.task for q in self._topics.values() if q.task and not q.task.done()]
+        for task in tasks:
+            task.cancel()
+        for queue in self._topics.values():
+            queue.fifo.clear()
+            queue.latest.clear()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """{topic: {depth, max_depth, enqueued, processed, conflated, dropped, errors}}"""
+        return {
+            topic: {"depth": len(queue), "conflate": queue.conflate, **queue.stats}
+            for topic, queue in self._topics.items()
+        }
+
+
+__all__ = ["TopicDispatcher"]
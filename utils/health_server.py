@@ -22,6 +22,63 @@ async def health_check_handler(request):
     )
 
 
+async def loop_health_handler(request):
+    """
+    Здоровье event loop: лаг, блокировки со стеком, инвентарь задач
+
+    GET /health/loop?tasks=0 - без инвентаря задач
+    """
+    try:
+        from utils.loop_monitor import get_loop_monitor
+
+        with_tasks = request.query.get("tasks", "1") != "0"
+        return web.json_response(get_loop_monitor().get_stats(tasks=with_tasks))
+    except Exception as e:
+        logger.error(f"❌ Ошибка loop health: {e}")
+        return web.json_response({"error": str(e)}, status=500)
+
+
+async def profile_handler(request):
+    """
+    Сэмплирующий профайлер (нужен ?token=PROFILER_TOKEN)
+
+    GET /profile/start?duration=30&hz=100
+    GET /profile/stop - остановить и вернуть сводку + путь к .collapsed
+    GET /profile/status
+    """
+    try:
+        from config.settings import PROFILER_CONFIG
+        from utils.sampling_profiler import get_profiler
+
+        token = PROFILER_CONFIG.get("token")
+        if not token or request.query.get("token") != token:
+            return web.json_response({"error": "forbidden"}, status=403)
+
+        profiler = get_profiler()
+        action = request.match_info["action"]
+        if action == "start":
+            duration = request.query.get("duration")
+            rate_hz = request.query.get("hz")
+            return web.json_response(
+                profiler.start(
+                    duration=float(duration) if duration else None,
+                    rate_hz=float(rate_hz) if rate_hz else None,
+                )
+            )
+        if action == "stop":
+            # join потока сэмплера - не в event loop
+            result = await asyncio.to_thread(profiler.stop)
+            return web.json_response({"running": profiler.is_running, "result": result})
+        if action == "status":
+            return web.json_response(profiler.status())
+        return web.json_response({"error": f"unknown action: {action}"}, status=404)
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    except Exception as e:
+        logger.error(f"❌ Ошибка профайлера: {e}")
+        return web.json_response({"error": str(e)}, status=500)
+
+
 async def start_health_server(port: int = 8080):
     """
     Запустить Health Check Server
@@ -37,6 +94,8 @@ async def start_health_server(port: int = 8080):
     try:
         app = web.Application()
         app.router.add_get("/health", health_check_handler)
+        app.router.add_get("/health/loop", loop_health_handler)
+        app.router.add_get("/profile/{action}", profile_handler)
 
         runner = web.AppRunner(app)
         await runner.setup()
@@ -48,6 +107,8 @@ async def start_health_server(port: int = 8080):
 
         logger.info(f"✅ Health Check Server запущен на порту {port}")
         logger.info(f"   • Endpoint: http://0.0.0.0:{port}/health")
+        logger.info(f"   • Event loop: http://0.0.0.0:{port}/health/loop")
+        logger.info(f"   • Profiler: http://0.0.0.0:{port}/profile/start|stop|status")
 
         return runner
 
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Loop Monitor - здоровье asyncio event loop
+- Непрерывный замер лага планирования (sleep(interval) против факта)
+- Watchdog-поток шлёт в loop пробы (call_soon_threadsafe) чаще
+  block_threshold; если loop не отвечает дольше порога,
+  снимается стек потока loop - видно, какой синхронный код его держит
+  (SQLite, pandas, eval и т.п.)
+- Инвентарь живых задач, сгруппированный по создателю
+  (файл:строка вызова create_task, иначе имя корутины)
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import Counter, deque
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from config.settings import logger, LOOP_MONITOR_CONFIG
+
+
+# Кадры asyncio/этого модуля не считаются создателем задачи
+_ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+_THIS_FILE = __file__
+
+
+def _creator_frame() -> str:
+    """Первый кадр вне asyncio - кто вызвал create_task/ensure_future"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not filename.startswith(_ASYNCIO_DIR) and filename != _THIS_FILE:
+            return f"{os.path.basename(filename)}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def _coro_name(task: asyncio.Task) -> str:
+    coro = task.get_coro()
+    return getattr(coro, "__qualname__", None) or type(coro).__name__
+
+
+class LoopMonitor:
+    """Лаг event loop, блокирующие вызовы со стеком и инвентарь задач"""
+
+    def __init__(
+        self,
+        interval: float = 0.5,
+        block_threshold: float = 0.25,
+        max_events: int = 50,
+        track_creators: bool = True,
+        stack_limit: int = 25,
+    ):
+        """
+        Args:
+            interval: Период замера лага (секунды)
+            block_threshold: Loop без ответа дольше - блокировка (секунды)
+            max_events: Сколько последних блокировок хранить
+            track_creators: Запоминать место create_task (task factory)
+            stack_limit: Глубина сохраняемого стека
+        """
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.track_creators = track_creators
+        self.stack_limit = stack_limit
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._previous_factory = None
+
+        self._heartbeat = time.monotonic()
+        self._probe_pending = False
+        self._lags: deque = deque(maxlen=600)
+        self._current_block: Optional[Dict[str, Any]] = None
+        # _current_block меняет поток-сторож, читает loop (get_block_events)
+        self._block_lock = threading.Lock()
+        self.block_events: deque = deque(maxlen=max_events)
+        self._creators: "weakref.WeakKeyDictionary[asyncio.Task, tuple]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+        self.stats = {
+            "samples": 0,
+            "max_lag_ms": 0.0,
+            "lag_over_threshold": 0,
+            "blocks": 0,
+        }
+
+    # ========== ЗАПУСК / ОСТАНОВКА ==========
+
+    def start(self):
+        """Запуск в текущем event loop"""
+        if self._task is not None and not self._task.done():
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._probe_pending = False
+
+        if self.track_creators:
+            self._previous_factory = self._loop.get_task_factory()
+            self._loop.set_task_factory(self._task_factory)
+
+        self._task = asyncio.create_task(self._lag_sampler(), name="loop_monitor")
+
+        self._stop_event.clear()
+        self._watchdog = threading.Thread(
+            target=self._watchdog_loop, name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+        logger.info(
+            f"✅ Loop Monitor запущен (интервал {self.interval}s, "
+            f"блокировка > {self.block_threshold * 1000:.0f}ms)"
+        )
+
+    async def stop(self):
+        self._stop_event.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._loop is not None and self.track_creators:
+            if self._loop.get_task_factory() == self._task_factory:
+                self._loop.set_task_factory(self._previous_factory)
+
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    # ========== ЗАМЕРЫ ==========
+
+    def _task_factory(self, loop, coro, **kwargs):
+        if self._previous_factory is not None:
+            task = self._previous_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        try:
+            self._creators[task] = (_creator_frame(), time.monotonic())
+        except TypeError:
+            pass
+        return task
+
+    async def _lag_sampler(self):
+        """Лаг = фактическая пауза - запрошенная"""
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+
+            lag = max(0.0, now - start - self.interval)
+            self._lags.append(lag)
+            self.stats["samples"] += 1
+            self.stats["max_lag_ms"] = max(self.stats["max_lag_ms"], lag * 1000)
+            if lag >= self.block_threshold:
+                self.stats["lag_over_threshold"] += 1
+
+    def _probe(self):
+        """Ответ loop на пробу watchdog"""
+        self._heartbeat = time.monotonic()
+        self._probe_pending = False
+
+    def _watchdog_loop(self):
+        """
+        Поток-сторож: снимок стека loop во время блокировки
+
+        Каждые block_threshold / 4 в loop отправляется проба; heartbeat -
+        время последнего ответа. Здоровый loop отвечает сразу (проба будит
+        и простаивающий select), поэтому heartbeat не старше периода проб,
+        а заблокированный не отвечает - простой считается от heartbeat.
+        Блокировка длиннее порога не пропускается при любой фазе, начало
+        определяется с точностью до периода проб.
+        """
+        period = max(0.01, self.block_threshold / 4)
+        while not self._stop_event.wait(period):
+            if not self._probe_pending:
+                self._probe_pending = True
+                try:
+                    self._loop.call_soon_threadsafe(self._probe)
+                except RuntimeError:
+                    # Loop закрыт
+                    break
+
+            now = time.monotonic()
+            heartbeat = self._heartbeat
+            stalled = now - heartbeat
+
+            if stalled >= self.block_threshold:
+                if self._current_block is None:
+                    event = self._capture_block(now, stalled)
+                    with self._block_lock:
+                        self._current_block = event
+                else:
+                    with self._block_lock:
+                        self._current_block["duration_ms"] = round(
+                            (now - self._current_block["_started"]) * 1000, 1
+                        )
+            elif self._current_block is not None:
+                # Конец блокировки - момент ответа на пробу
+                self._finish_block(heartbeat)
+
+    def _capture_block(self, now: float, stalled: float) -> Dict[str, Any]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame, limit=self.stack_limit) if frame else []
+        top = stack[-1].strip().splitlines()[0] if stack else "unknown"
+
+        event = {
+            "_started": now - stalled,
+            "started_at": time.time() - stalled,
+            "duration_ms": round(stalled * 1000, 1),
+            "top_frame": top,
+            "stack": [line.rstrip() for line in stack],
+        }
+        self.stats["blocks"] += 1
+        logger.warning(f"⚠️ Event loop заблокирован > {stalled * 1000:.0f}ms: {top}")
+        return event
+
+    def _finish_block(self, ended: float):
+        with self._block_lock:
+            event = self._current_block
+            self._current_block = None
+            event["duration_ms"] = round((ended - event.pop("_started")) * 1000, 1)
+            self.block_events.append(event)
+        logger.warning(
+            f"⚠️ Блокировка event loop {event['duration_ms']:.0f}ms\n"
+            + "\n".join(event["stack"][-5:])
+        )
+
+    # ========== ОТЧЁТЫ ==========
+
+    def get_lag_stats(self) -> Dict[str, Any]:
+        lags = {"avg_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0, "last_ms": 0.0}
+        if self._lags:
+            samples = np.fromiter(self._lags, dtype=np.float64) * 1000
+            lags = {
+                "avg_ms": round(float(samples.mean()), 2),
+                "p50_ms": round(float(np.percentile(samples, 50)), 2),
+                "p99_ms": round(float(np.percentile(samples, 99)), 2),
+                "last_ms": round(float(samples[-1]), 2),
+            }
+        return {**self.stats, **lags, "max_lag_ms": round(self.stats["max_lag_ms"], 2)}
+
+    def get_task_inventory(self, limit: int = 20) -> Dict[str, Any]:
+        """Живые задачи по группам: создатель (или корутина) → количество, возраст"""
+        try:
+            tasks = asyncio.all_tasks(self._loop) if self._loop else asyncio.all_tasks()
+        except RuntimeError:
+            return {"total": 0, "groups": []}
+
+        now = time.monotonic()
+        counts: Counter = Counter()
+        oldest: Dict[tuple, float] = {}
+        for task in tasks:
+            creator, created = self._creators.get(task, ("unknown", None))
+            key = (creator, _coro_name(task))
+            counts[key] += 1
+            if created is not None:
+                oldest[key] = max(oldest.get(key, 0.0), now - created)
+
+        groups = [
+            {
+                "creator": creator,
+                "coroutine": coroutine,
+                "count": count,
+                "oldest_s": round(oldest[(creator, coroutine)], 1)
+                if (creator, coroutine) in oldest
+                else None,
+            }
+            for (creator, coroutine), count in counts.most_common(limit)
+        ]
+        return {"total": len(tasks), "groups": groups}
+
+    def get_block_events(self, limit: int = 10) -> List[Dict[str, Any]]:
+        with self._block_lock:
+            events = list(self.block_events)[-limit:]
+            current = dict(self._current_block) if self._current_block else None
+        if current is not None:
+            current.pop("_started", None)
+            events.append({**current, "ongoing": True})
+        return events
+
+    def get_stats(self, tasks: bool = True) -> Dict[str, Any]:
+        report = {
+            "running": self._task is not None and not self._task.done(),
+            "lag": self.get_lag_stats(),
+            "blocks": self.get_block_events(),
+        }
+        if tasks:
+            report["tasks"] = self.get_task_inventory()
+        return report
+
+
+# Глобальный экземпляр Loop Monitor
+_global_loop_monitor: Optional[LoopMonitor] = None
+
+
+def get_loop_monitor() -> LoopMonitor:
+    """Получить глобальный Loop Monitor (Singleton)"""
+    global _global_loop_monitor
+    if _global_loop_monitor is None:
+        _global_loop_monitor = LoopMonitor(
+            **{k: v for k, v in LOOP_MONITOR_CONFIG.items() if k != "enabled"}
+        )
+    return _global_loop_monitor
+
+
+# Экспорт
+__all__ = ["LoopMonitor", "get_loop_monitor"]
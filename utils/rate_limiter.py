@@ -2,14 +2,91 @@
 # -*- coding: utf-8 -*-
 """
 Rate Limiter - контроль частоты API запросов
-Предотвращает превышение лимитов API
+Token bucket на биржу: вес запросов, классы приоритета и подстройка
+под остаток квоты из заголовков ответа (Bybit / Binance)
 """
 
 import asyncio
 import time
-from typing import Dict, Optional
-from collections import deque
-from config.settings import logger
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Mapping, Optional, Tuple
+from config.settings import RATE_LIMIT_CONFIG, logger
+
+
+PRIORITIES = ("critical", "normal", "low")
+
+# Минимальная доля скорости пополнения при расхождении с сервером
+MIN_RATE_FACTOR = 0.25
+
+# Приоритет запросов текущей задачи (acquire без явного priority)
+_current_priority: ContextVar[str] = ContextVar("rate_limit_priority", default="normal")
+
+
+@contextmanager
+def request_priority(priority: str):
+    """
+    Приоритет для всех запросов внутри блока (без протаскивания аргумента
+    через коннекторы)
+
+    Пример:
+        with request_priority("low"):
+            await connector.get_ticker("BTCUSDT")
+    """
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class _TokenBucket:
+    """Ведро токенов одной биржи (ёмкость = лимит окна в единицах веса)"""
+
+    __slots__ = (
+        "name",
+        "capacity",
+        "refill_rate",
+        "rate_factor",
+        "tokens",
+        "updated",
+        "blocked_until",
+        "stats",
+    )
+
+    def __init__(self, name: str, capacity: float, window_seconds: float, now: float):
+        self.name = name
+        self.capacity = float(capacity)
+        self.refill_rate = self.capacity / window_seconds
+        self.rate_factor = 1.0
+        self.tokens = self.capacity
+        self.updated = now
+        self.blocked_until = 0.0
+        self.stats = {
+            "requests": 0,
+            "weight": 0.0,
+            "waits": 0,
+            "wait_seconds": 0.0,
+            "server_adjustments": 0,
+            "rate_limited": 0,
+        }
+
+    def refill(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(
+                self.capacity, self.tokens + elapsed * self.refill_rate * self.rate_factor
+            )
+            self.updated = now
+
+    def wait_time(self, weight: float, reserve: float, now: float) -> float:
+        """0 - можно брать; иначе секунды до нужного запаса"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        deficit = weight + reserve * self.capacity - self.tokens
+        if deficit <= 0:
+            return 0.0
+        return deficit / (self.refill_rate * self.rate_factor)
 
 
 class RateLimiter:
@@ -17,68 +94,121 @@ class RateLimiter:
     Rate Limiter для контроля частоты API запросов
 
     Поддерживает:
-    - Sliding window rate limiting
-    - Per-endpoint лимиты
-    - Exponential backoff при превышении
+    - Token bucket на биржу (endpoint "bybit_ticker" → ведро "bybit")
+    - Вес запросов из таблицы биржи
+    - Приоритеты: critical (торговля) / normal / low (дашборд) - младшим
+      классам недоступен резерв ёмкости
+    - Подстройку под X-Bapi-Limit-Status / X-MBX-USED-WEIGHT-1M и паузу
+      по 429/418 (Retry-After)
     """
 
-    def __init__(self, requests_per_second: int = 10, burst_size: int = 20):
+    def __init__(
+        self,
+        requests_per_second: int = 10,
+        burst_size: int = 20,
+        exchanges: Optional[Dict[str, Dict]] = None,
+        priority_reserve: Optional[Dict[str, float]] = None,
+    ):
         """
         Args:
-            requests_per_second: Максимум запросов в секунду
-            burst_size: Максимальный burst (мгновенных запросов)
+            requests_per_second: Скорость ведра "default" (endpoint без биржи)
+            burst_size: Ёмкость ведра "default"
+            exchanges: {биржа: {capacity, window_seconds, weights}}
+                       (по умолчанию RATE_LIMIT_CONFIG)
+            priority_reserve: {приоритет: доля ёмкости в резерве}
         """
         self.requests_per_second = requests_per_second
         self.burst_size = burst_size
 
-        # Sliding window для каждого endpoint
-        self.request_windows: Dict[str, deque] = {}
+        self.exchanges = dict(exchanges or RATE_LIMIT_CONFIG["exchanges"])
+        self.exchanges["default"] = {
+            **self.exchanges.get("default", {}),
+            "capacity": burst_size,
+            "window_seconds": burst_size / requests_per_second,
+        }
+        self.priority_reserve = priority_reserve or RATE_LIMIT_CONFIG["priority_reserve"]
+        self.penalty_seconds = RATE_LIMIT_CONFIG["penalty_seconds"]
 
-        # Locks для thread-safety
-        self.locks: Dict[str, asyncio.Lock] = {}
+        self.buckets: Dict[str, _TokenBucket] = {}
+        # Счётчики запросов по endpoint (для /status)
+        self.endpoint_counts: Dict[str, int] = {}
 
         logger.info(
-            f"✅ RateLimiter инициализирован: {requests_per_second} req/s, burst={burst_size}"
+            f"✅ RateLimiter инициализирован: token bucket "
+            f"({', '.join(name for name in self.exchanges if name != 'default')}), "
+            f"default {requests_per_second} req/s, burst={burst_size}"
         )
 
-    async def acquire(self, endpoint: str = "default") -> None:
+    def _bucket(self, exchange: str) -> _TokenBucket:
+        bucket = self.buckets.get(exchange)
+        if bucket is None:
+            config = self.exchanges[exchange]
+            bucket = _TokenBucket(
+                exchange, config["capacity"], config["window_seconds"], time.monotonic()
+            )
+            self.buckets[exchange] = bucket
+        return bucket
+
+    def resolve(self, endpoint: str) -> Tuple[str, str]:
+        """endpoint → (биржа, имя в таблице весов): "binance_klines" → ("binance", "klines")"""
+        exchange, _, name = endpoint.partition("_")
+        if exchange in self.exchanges and exchange != "default":
+            return exchange, name
+        return "default", endpoint
+
+    def weight_of(self, endpoint: str) -> float:
+        exchange, name = self.resolve(endpoint)
+        return self.exchanges[exchange].get("weights", {}).get(name, 1)
+
+    async def acquire(
+        self,
+        endpoint: str = "default",
+        weight: Optional[float] = None,
+        priority: Optional[str] = None,
+    ) -> None:
         """
         Запросить разрешение на API вызов
 
-        Блокирует выполнение если превышен лимит
+        Блокирует выполнение, пока в ведре биржи не хватает токенов сверх
+        резерва приоритета
 
         Args:
-            endpoint: Название API endpoint
+            endpoint: Название API endpoint ("bybit_orderbook", "binance_klines")
+            weight: Вес запроса (по умолчанию - из таблицы биржи)
+            priority: critical / normal / low (по умолчанию - из request_priority)
         """
-        # Инициализация для нового endpoint
-        if endpoint not in self.request_windows:
-            self.request_windows[endpoint] = deque()
-            self.locks[endpoint] = asyncio.Lock()
-
-        async with self.locks[endpoint]:
-            current_time = time.time()
-            window = self.request_windows[endpoint]
-
-            # Удаляем старые запросы (старше 1 секунды)
-            while window and window[0] < current_time - 1.0:
-                window.popleft()
-
-            # Проверяем лимиты
-            if len(window) >= self.requests_per_second:
-                # Превышен лимит - ждём
-                sleep_time = window[0] + 1.0 - current_time
-                if sleep_time > 0:
-                    logger.debug(f"⚠️ Rate limit для {endpoint}: ждём {sleep_time:.2f}s")
-                    await asyncio.sleep(sleep_time)
-                    # Рекурсивный вызов после ожидания
-                    return await self.acquire(endpoint)
-
-            # Burst protection
-            if len(window) >= self.burst_size:
-                await asyncio.sleep(0.1)  # Небольшая задержка
-
-            # Добавляем текущий запрос в window
-            window.append(current_time)
+        priority = priority or _current_priority.get()
+        exchange, _ = self.resolve(endpoint)
+        bucket = self._bucket(exchange)
+        reserve = self.priority_reserve.get(priority, self.priority_reserve["normal"])
+        if weight is None:
+            weight = self.weight_of(endpoint)
+        # Запрос тяжелее доступной классу ёмкости ждал бы вечно
+        weight = min(weight, bucket.capacity * (1.0 - reserve))
+
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            bucket.refill(now)
+            delay = bucket.wait_time(weight, reserve, now)
+            if delay <= 0:
+                break
+            if not waited:
+                bucket.stats["waits"] += 1
+                logger.debug(
+                    f"⚠️ Rate limit {exchange} ({endpoint}, {priority}): ждём {delay:.2f}s"
+                )
+            await asyncio.sleep(delay)
+            waited += delay
+
+        bucket.tokens -= weight
+        bucket.stats["requests"] += 1
+        bucket.stats["weight"] += weight
+        bucket.stats["wait_seconds"] += waited
+        self.endpoint_counts[endpoint] = self.endpoint_counts.get(endpoint, 0) + 1
+
+    # Совместимость со старым именем
+    wait_if_needed = acquire
 
     async def acquire_bulk(self, endpoint: str, count: int) -> None:
         """
@@ -91,31 +221,105 @@ class RateLimiter:
         for _ in range(count):
             await self.acquire(endpoint)
 
-    def get_stats(self, endpoint: str = "default") -> Dict:
+    def update_from_headers(
+        self, exchange: str, headers: Mapping[str, str], status: int = 200
+    ) -> Optional[float]:
         """
-        Получить статистику использования
+        Подстроить ведро под квоту, которую сообщил сервер
+
+        Остаток сервера ниже нашей оценки (другие процессы на том же IP,
+        неучтённые веса) - токены урезаются и пополнение замедляется; при
+        совпадении скорость возвращается к номинальной. 429/418 - пауза
+        до Retry-After.
 
         Args:
-            endpoint: Название API endpoint
+            exchange: "bybit" / "binance"
+            headers: Заголовки ответа (aiohttp CIMultiDict или dict)
+            status: HTTP статус ответа
 
         Returns:
-            Dict со статистикой
+            Остаток квоты по серверу (доля 0..1) или None без заголовков
         """
-        if endpoint not in self.request_windows:
-            return {"requests_last_second": 0, "endpoint": endpoint}
+        if exchange not in self.exchanges:
+            return None
+        bucket = self._bucket(exchange)
+        lower = {str(key).lower(): value for key, value in headers.items()}
+        now = time.monotonic()
+        bucket.refill(now)
+
+        if status in (418, 429):
+            bucket.stats["rate_limited"] += 1
+            try:
+                pause = float(lower.get("retry-after", self.penalty_seconds))
+            except (TypeError, ValueError):
+                pause = self.penalty_seconds
+            bucket.blocked_until = max(bucket.blocked_until, now + pause)
+            bucket.tokens = 0.0
+            bucket.rate_factor = max(MIN_RATE_FACTOR, bucket.rate_factor * 0.5)
+            logger.warning(f"⚠️ {exchange}: HTTP {status}, пауза запросов {pause:.1f}s")
+            return 0.0
+
+        fraction = None
+        try:
+            if "x-bapi-limit-status" in lower and "x-bapi-limit" in lower:
+                limit = float(lower["x-bapi-limit"])
+                if limit > 0:
+                    fraction = float(lower["x-bapi-limit-status"]) / limit
+                if fraction is not None and fraction <= 0:
+                    reset_ms = float(lower.get("x-bapi-limit-reset-timestamp", 0))
+                    if reset_ms:
+                        pause = max(0.0, reset_ms / 1000.0 - time.time())
+                        bucket.blocked_until = max(bucket.blocked_until, now + pause)
+            elif "x-mbx-used-weight-1m" in lower:
+                used = float(lower["x-mbx-used-weight-1m"])
+                fraction = 1.0 - used / bucket.capacity
+        except (TypeError, ValueError):
+            return None
+
+        if fraction is None:
+            return None
+        fraction = min(1.0, max(0.0, fraction))
+
+        server_tokens = fraction * bucket.capacity
+        if server_tokens < bucket.tokens - 1.0:
+            bucket.tokens = server_tokens
+            bucket.rate_factor = max(MIN_RATE_FACTOR, bucket.rate_factor * 0.8)
+            bucket.stats["server_adjustments"] += 1
+        elif bucket.rate_factor < 1.0:
+            bucket.rate_factor = min(1.0, bucket.rate_factor + 0.05)
+        return fraction
+
+    def get_bucket_stats(self, exchange: str) -> Dict:
+        """Состояние ведра биржи"""
+        bucket = self._bucket(exchange)
+        bucket.refill(time.monotonic())
+        return {
+            "exchange": exchange,
+            "tokens": round(bucket.tokens, 2),
+            "capacity": bucket.capacity,
+            "refill_per_second": bucket.refill_rate * bucket.rate_factor,
+            "rate_factor": round(bucket.rate_factor, 3),
+            "blocked_for": max(0.0, bucket.blocked_until - time.monotonic()),
+            "utilization": (1.0 - bucket.tokens / bucket.capacity) * 100,
+            **bucket.stats,
+        }
 
-        current_time = time.time()
-        window = self.request_windows[endpoint]
+    def get_stats(self, endpoint: str = "default") -> Dict:
+        """
+        Получить статистику использования
 
-        # Подсчитываем запросы за последнюю секунду
-        recent_requests = sum(1 for ts in window if ts >= current_time - 1.0)
+        Args:
+            endpoint: Название API endpoint
 
+        Returns:
+            Dict со статистикой (endpoint + ведро его биржи)
+        """
+        exchange, _ = self.resolve(endpoint)
         return {
+            **self.get_bucket_stats(exchange),
             "endpoint": endpoint,
-            "requests_last_second": recent_requests,
-            "limit_per_second": self.requests_per_second,
-            "burst_size": self.burst_size,
-            "utilization": (recent_requests / self.requests_per_second) * 100,
+            "endpoint_requests": self.endpoint_counts.get(endpoint, 0),
+            "weight_per_request": self.weight_of(endpoint),
         }
 
     def get_all_stats(self) -> Dict:
@@ -125,18 +329,9 @@ class RateLimiter:
         Returns:
             Dict с общей статистикой и по endpoint
         """
-        total_requests = 0
-        endpoint_stats = {}
-
-        for endpoint in self.request_windows.keys():
-            stats = self.get_stats(endpoint)
-            # Считаем ВСЕ запросы (не только за последнюю секунду)
-            request_count = len(self.request_windows[endpoint])
-            total_requests += request_count
-            endpoint_stats[endpoint] = request_count
-
+        total_requests = sum(self.endpoint_counts.values())
         # Возвращаем формат для /status
-        return {"total_requests": total_requests, **endpoint_stats}
+        return {"total_requests": total_requests, **self.endpoint_counts}
 
 
 class ExponentialBackoff:
@@ -191,10 +386,10 @@ def get_rate_limiter() -> RateLimiter:
     global _global_rate_limiter
     if _global_rate_limiter is None:
         _global_rate_limiter = RateLimiter(
-            requests_per_second=10, burst_size=20  # Bybit: ~10 req/s
+            requests_per_second=10, burst_size=20  # endpoint без префикса биржи
         )
     return _global_rate_limiter
 
 
 # Экспорт
-__all__ = ["RateLimiter", "ExponentialBackoff", "get_rate_limiter"]
+__all__ = ["RateLimiter", "ExponentialBackoff", "get_rate_limiter", "request_priority"]
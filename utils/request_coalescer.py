@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Request Coalescer - общий слой REST запросов для всех коннекторов
+- Single-flight: одинаковые запросы "в полёте" выполняются один раз,
+  остальные вызовы ждут тот же результат
+- Короткий TTL кэш ответов по endpoint (ticker/orderbook/klines/...)
+- Статистика по endpoint: hit rate и coalesce rate
+"""
+
+import asyncio
+import functools
+import inspect
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from config.settings import logger
+
+
+# TTL ответов по endpoint (секунды); endpoint = "<биржа>_<метод>"
+DEFAULT_ENDPOINT_TTLS = {
+    "bybit_ticker": 5.0,
+    "bybit_orderbook": 3.0,
+    "bybit_klines": 5.0,
+    "bybit_funding": 30.0,
+    "bybit_open_interest": 30.0,
+    "bybit_long_short": 60.0,
+    "binance_ticker": 5.0,
+    "binance_orderbook": 3.0,
+    "binance_klines": 5.0,
+    "okx_ticker": 5.0,
+    "okx_orderbook": 3.0,
+    "coinbase_ticker": 5.0,
+    "coinbase_orderbook": 3.0,
+    "coinbase_candles": 5.0,
+}
+
+
+def _cacheable(value: Any) -> bool:
+    """Пустые ответы/ошибки не кэшируются (только делятся между ожидающими)"""
+    return bool(value)
+
+
+class RequestCoalescer:
+    """
+    Single-flight + TTL кэш для идемпотентных GET запросов
+
+    Ключ запроса = (endpoint, параметры). Ответ возвращается всем
+    вызывающим как один и тот же объект - его нельзя изменять на месте.
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = 2.0,
+        max_entries: int = 2048,
+    ):
+        self.ttls = dict(DEFAULT_ENDPOINT_TTLS)
+        self.ttls.update(ttls or {})
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+
+        # (endpoint, key) -> (время истечения, ответ); порядок = LRU
+        self._cache: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        # (endpoint, key) -> задача запроса в полёте
+        self._inflight: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _endpoint_stats(self, endpoint: str) -> Dict[str, int]:
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            stats = self._stats[endpoint] = {
+                "requests": 0,
+                "hits": 0,
+                "coalesced": 0,
+                "fetches": 0,
+                "errors": 0,
+            }
+        return stats
+
+    async def fetch(
+        self,
+        endpoint: str,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        cacheable: Callable[[Any], bool] = _cacheable,
+    ) -> Any:
+        """
+        Получить ответ: из кэша, из запроса в полёте или новым запросом
+
+        Args:
+            endpoint: Имя endpoint (для TTL и статистики)
+            key: Параметры запроса (hashable)
+            loader: Корутина-фабрика реального запроса
+            ttl: TTL ответа (по умолчанию из настроек endpoint)
+        """
+        stats = self._endpoint_stats(endpoint)
+        stats["requests"] += 1
+        cache_key = (endpoint, key)
+
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            expires_at, value = cached
+            if expires_at > time.monotonic():
+                stats["hits"] += 1
+                self._cache.move_to_end(cache_key)
+                return value
+            del self._cache[cache_key]
+
+        future = self._inflight.get(cache_key)
+        if future is not None:
+            stats["coalesced"] += 1
+        else:
+            stats["fetches"] += 1
+            future = asyncio.ensure_future(loader())
+            self._inflight[cache_key] = future
+            future.add_done_callback(
+                functools.partial(self._on_done, cache_key, endpoint, ttl, cacheable)
+            )
+
+        # shield: отмена одного из ожидающих не отменяет общий запрос
+        return await asyncio.shield(future)
+
+    def _on_done(self, cache_key, endpoint, ttl, cacheable, future: asyncio.Future):
+        self._inflight.pop(cache_key, None)
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self._endpoint_stats(endpoint)["errors"] += 1
+            return
+
+        value = future.result()
+        if not cacheable(value):
+            return
+
+        ttl = self.ttls.get(endpoint, self.default_ttl) if ttl is None else ttl
+        if ttl <= 0:
+            return
+        self._cache[cache_key] = (time.monotonic() + ttl, value)
+        self._cache.move_to_end(cache_key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def invalidate(self, endpoint: Optional[str] = None, key: Optional[Hashable] = None) -> int:
+        """Сбросить кэш (весь, по endpoint или конкретный ключ)"""
+        if endpoint is None:
+            count = len(self._cache)
+            self._cache.clear()
+            return count
+        if key is not None:
+            return 1 if self._cache.pop((endpoint, key), None) is not None else 0
+
+        keys = [k for k in self._cache if k[0] == endpoint]
+        for k in keys:
+            del self._cache[k]
+        return len(keys)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Статистика по endpoint
+
+        hit_rate - доля ответов из кэша, coalesce_rate - доля вызовов,
+        присоединившихся к запросу в полёте, saved_rate - доля вызовов без
+        реального HTTP запроса.
+        """
+        result = {}
+        for endpoint, stats in self._stats.items():
+            requests = stats["requests"] or 1
+            result[endpoint] = {
+                **stats,
+                "hit_rate": stats["hits"] / requests * 100,
+                "coalesce_rate": stats["coalesced"] / requests * 100,
+                "saved_rate": (stats["hits"] + stats["coalesced"]) / requests * 100,
+            }
+        return result
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Суммарная статистика по всем endpoint"""
+        totals = {"requests": 0, "hits": 0, "coalesced": 0, "fetches": 0, "errors": 0}
+        for stats in self._stats.values():
+            for name in totals:
+                totals[name] += stats[name]
+        requests = totals["requests"] or 1
+        totals["saved_rate"] = (totals["hits"] + totals["coalesced"]) / requests * 100
+        totals["cache_size"] = len(self._cache)
+        totals["inflight"] = len(self._inflight)
+        return totals
+
+
+# Глобальный экземпляр (общий для всех коннекторов)
+_global_coalescer: Optional[RequestCoalescer] = None
+
+
+def get_request_coalescer() -> RequestCoalescer:
+    """Получить глобальный Request Coalescer (Singleton)"""
+    global _global_coalescer
+    if _global_coalescer is None:
+        _global_coalescer = RequestCoalescer()
+        logger.info("✅ RequestCoalescer инициализирован")
+    return _global_coalescer
+
+
+def coalesced(endpoint: str, ttl: Optional[float] = None):
+    """
+    Декоратор async метода коннектора: single-flight + TTL кэш
+
+    Ключ строится из аргументов вызова с учётом значений по умолчанию,
+    поэтому get_klines(s, "60") и get_klines(s, interval="60") - один запрос.
+
+    Пример:
+        @coalesced("bybit_ticker")
+        async def get_ticker(self, symbol): ...
+    """
+
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(
+                (name, value)
+                for name, value in bound.arguments.items()
+                if name != "self"
+            )
+            return await get_request_coalescer().fetch(
+                endpoint, key, lambda: method(self, *args, **kwargs), ttl=ttl
+            )
+
+        wrapper.uncached = method
+        return wrapper
+
+    return decorator
+
+
+__all__ = [
+    "RequestCoalescer",
+    "get_request_coalescer",
+    "coalesced",
+    "DEFAULT_ENDPOINT_TTLS",
+]
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sampling Profiler - профилирование CPU в работающем процессе
+- Запуск/остановка во время работы (Telegram /profile, health-server)
+- Фоновый поток снимает sys._current_frames() с заданной частотой;
+  если сам замер дороже max_overhead_pct интервала - частота снижается
+- Результат: collapsed-stack файл (flamegraph.pl / speedscope) и
+  сводка top-N горячих функций (self / inclusive)
+- Атрибуция: profile_tag("symbol:BTCUSDT") помечает сэмплы текущей
+  asyncio задачи (или потока) - метка становится корнем стека
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from config.settings import logger, PROFILER_CONFIG
+
+
+# Верхние кадры ожидания: поток простаивает, это не CPU
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+# Метки атрибуции: asyncio задача → метка, поток → метка
+_task_tags: "weakref.WeakKeyDictionary[asyncio.Task, str]" = weakref.WeakKeyDictionary()
+_thread_tags: Dict[int, str] = {}
+
+
+@contextmanager
+def profile_tag(label: str):
+    """
+    Пометить сэмплы текущей задачи/потока (вложенные метки склеиваются через "/")
+
+    Пример:
+        with profile_tag(f"symbol:{symbol}"):
+            await self.analyze_symbol(symbol)
+    """
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+
+    if task is not None:
+        previous = _task_tags.get(task)
+        _task_tags[task] = f"{previous}/{label}" if previous else label
+        try:
+            yield
+        finally:
+            if previous is None:
+                _task_tags.pop(task, None)
+            else:
+                _task_tags[task] = previous
+    else:
+        ident = threading.get_ident()
+        previous = _thread_tags.get(ident)
+        _thread_tags[ident] = f"{previous}/{label}" if previous else label
+        try:
+            yield
+        finally:
+            if previous is None:
+                _thread_tags.pop(ident, None)
+            else:
+                _thread_tags[ident] = previous
+
+
+def _running_tasks_by_thread() -> Dict[int, asyncio.Task]:
+    """Текущая задача каждого работающего event loop (по id потока loop)"""
+    result = {}
+    try:
+        current = asyncio.tasks._current_tasks
+        for loop, task in list(current.items()):
+            thread_id = getattr(loop, "_thread_id", None)
+            if thread_id is not None:
+                result[thread_id] = task
+    except Exception:
+        pass
+    return result
+
+
+class SamplingProfiler:
+    """Статистический профайлер по стекам всех потоков"""
+
+    def __init__(
+        self,
+        output_dir: str = "profiles",
+        rate_hz: float = 100.0,
+        max_rate_hz: float = 250.0,
+        default_duration: float = 30.0,
+        max_duration: float = 300.0,
+        max_overhead_pct: float = 5.0,
+        max_stack_depth: int = 64,
+        top_n: int = 20,
+        include_idle: bool = False,
+    ):
+        """
+        Args:
+            output_dir: Каталог для .collapsed и .txt файлов
+            rate_hz: Частота по умолчанию (сэмплов в секунду)
+            max_rate_hz: Верхняя граница частоты
+            default_duration: Длительность по умолчанию (секунды)
+            max_duration: Верхняя граница длительности
+            max_overhead_pct: Доля интервала, которую может занимать замер
+            max_stack_depth: Глубина стека (внешние кадры отбрасываются)
+            top_n: Размер сводки горячих функций
+            include_idle: Учитывать простаивающие потоки
+        """
+        self.output_dir = str(output_dir)
+        self.rate_hz = rate_hz
+        self.max_rate_hz = max_rate_hz
+        self.default_duration = default_duration
+        self.max_duration = max_duration
+        self.max_overhead_pct = max_overhead_pct
+        self.max_stack_depth = max_stack_depth
+        self.top_n = top_n
+        self.include_idle = include_idle
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._labels: Dict[Any, str] = {}
+
+        self._stacks: Counter = Counter()
+        self._session: Dict[str, Any] = {}
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ========== УПРАВЛЕНИЕ ==========
+
+    def start(self, duration: Optional[float] = None, rate_hz: Optional[float] = None) -> Dict[str, Any]:
+        """Запуск сессии (не более одной одновременно)"""
+        with self._lock:
+            if self.is_running:
+                return {"started": False, "reason": "already running", **self.status()}
+
+            duration = min(float(duration or self.default_duration), self.max_duration)
+            rate_hz = min(max(float(rate_hz or self.rate_hz), 1.0), self.max_rate_hz)
+
+            self._stacks = Counter()
+            self._session = {
+                "started_at": time.time(),
+                "started": time.monotonic(),
+                "duration": duration,
+                "rate_hz": rate_hz,
+                "interval": 1.0 / rate_hz,
+                "samples": 0,
+                "idle_skipped": 0,
+                "sample_cost": 0.0,
+                "rate_reductions": 0,
+            }
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="sampling-profiler", daemon=True
+            )
+            self._thread.start()
+
+        logger.info(f"🔬 Профайлер запущен: {duration:.0f}s @ {rate_hz:.0f}Hz")
+        return {"started": True, "duration": duration, "rate_hz": rate_hz}
+
+    def stop(self) -> Optional[Dict[str, Any]]:
+        """
+        Остановка и запись результата (если уже остановлен - последний результат)
+
+        None - поток сэмплера не завершился за 5с, результат ещё не записан
+        """
+        thread = self._thread
+        if thread is not None:
+            self._stop_event.set()
+            thread.join(timeout=5)
+            if thread.is_alive():
+                return None
+        return self.last_result
+
+    def status(self) -> Dict[str, Any]:
+        """Текущая сессия или результат последней"""
+        if not self.is_running:
+            return {"running": False, "last_result": self.last_result}
+        session = self._session
+        return {
+            "running": True,
+            "elapsed": round(time.monotonic() - session["started"], 1),
+            "duration": session["duration"],
+            "rate_hz": round(1.0 / session["interval"], 1),
+            "samples": session["samples"],
+        }
+
+    # ========== СЭМПЛИРОВАНИЕ ==========
+
+    def _run(self):
+        session = self._session
+        own_ident = threading.get_ident()
+        deadline = session["started"] + session["duration"]
+        try:
+            while not self._stop_event.is_set():
+                begin = time.perf_counter()
+                self._sample(own_ident)
+                cost = time.perf_counter() - begin
+                session["sample_cost"] += cost
+
+                # Ограничение накладных расходов: замер не дороже max_overhead_pct интервала
+                interval = session["interval"]
+                if cost > interval * self.max_overhead_pct / 100:
+                    session["interval"] = min(1.0, cost * 100 / self.max_overhead_pct)
+                    session["rate_reductions"] += 1
+
+                if time.monotonic() >= deadline:
+                    break
+                self._stop_event.wait(max(0.0, session["interval"] - cost))
+        except Exception as e:
+            logger.error(f"❌ Ошибка профайлера: {e}")
+        finally:
+            self.last_result = self._finish()
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            module = os.path.splitext(os.path.basename(code.co_filename))[0]
+            label = f"{module}:{code.co_name}"
+            self._labels[code] = label
+        return label
+
+    def _sample(self, own_ident: int):
+        frames = sys._current_frames()
+        tasks = _running_tasks_by_thread()
+        names = {t.ident: t.name for t in threading.enumerate()}
+
+        for ident, frame in frames.items():
+            if ident == own_ident:
+                continue
+
+            code = frame.f_code
+            if not self.include_idle and (
+                (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+            ):
+                self._session["idle_skipped"] += 1
+                continue
+
+            stack: List[str] = []
+            while frame is not None and len(stack) < self.max_stack_depth:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+
+            root = [f"thread:{names.get(ident, ident)}"]
+            task = tasks.get(ident)
+            tag = _task_tags.get(task) if task is not None else None
+            tag = tag or _thread_tags.get(ident)
+            if tag:
+                root.insert(0, f"tag:{tag}")
+
+            self._stacks[";".join(root + stack)] += 1
+        self._session["samples"] += 1
+
+    # ========== РЕЗУЛЬТАТ ==========
+
+    def _finish(self) -> Dict[str, Any]:
+        session = self._session
+        elapsed = time.monotonic() - session["started"]
+        stacks = self._stacks
+
+        self_counts: Counter = Counter()
+        inclusive: Counter = Counter()
+        tags: Counter = Counter()
+        total = sum(stacks.values())
+        for key, count in stacks.items():
+            frames = key.split(";")
+            if frames[0].startswith("tag:"):
+                tags[frames[0][4:]] += count
+            code_frames = [f for f in frames if not f.startswith(("tag:", "thread:"))]
+            if code_frames:
+                self_counts[code_frames[-1]] += count
+                for name in set(code_frames):
+                    inclusive[name] += count
+
+        def top(counter: Counter) -> List[Dict[str, Any]]:
+            return [
+                {"function": name, "samples": n, "pct": round(100 * n / total, 1)}
+                for name, n in counter.most_common(self.top_n)
+            ]
+
+        result = {
+            "started_at": session["started_at"],
+            "elapsed": round(elapsed, 2),
+            "samples": session["samples"],
+            "stack_samples": total,
+            "idle_skipped": session["idle_skipped"],
+            "effective_rate_hz": round(session["samples"] / elapsed, 1) if elapsed else 0.0,
+            "overhead_pct": round(100 * session["sample_cost"] / elapsed, 2) if elapsed else 0.0,
+            "rate_reductions": session["rate_reductions"],
+            "top_self": top(self_counts) if total else [],
+            "top_inclusive": top(inclusive) if total else [],
+            "tags": dict(tags.most_common(self.top_n)),
+            "collapsed_file": None,
+            "summary_file": None,
+        }
+
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            stamp = datetime.fromtimestamp(session["started_at"]).strftime("%Y%m%d_%H%M%S")
+            base = os.path.join(self.output_dir, f"profile_{stamp}")
+
+            with open(f"{base}.collapsed", "w", encoding="utf-8") as f:
+                for key, count in stacks.most_common():
+                    f.write(f"{key} {count}\n")
+            with open(f"{base}.txt", "w", encoding="utf-8") as f:
+                f.write(self.format_summary(result))
+
+            result["collapsed_file"] = f"{base}.collapsed"
+            result["summary_file"] = f"{base}.txt"
+        except Exception as e:
+            logger.error(f"❌ Не удалось записать профиль: {e}")
+
+        logger.info(
+            f"🔬 Профайлер остановлен: {result['samples']} сэмплов за {result['elapsed']:.0f}s "
+            f"(overhead {result['overhead_pct']:.1f}%) → {result['collapsed_file']}"
+        )
+        return result
+
+    @staticmethod
+    def format_summary(result: Dict[str, Any], limit: int = 20) -> str:
+        """Текстовая сводка: горячие функции и атрибуция по меткам"""
+        lines = [
+            f"Samples: {result['samples']} ({result['stack_samples']} stacks) "
+            f"in {result['elapsed']}s @ {result['effective_rate_hz']}Hz, "
+            f"overhead {result['overhead_pct']}%",
+            "",
+            "Top self:",
+        ]
+        lines += [f"  {r['pct']:5.1f}%  {r['function']}" for r in result["top_self"][:limit]]
+        lines += ["", "Top inclusive:"]
+        lines += [f"  {r['pct']:5.1f}%  {r['function']}" for r in result["top_inclusive"][:limit]]
+        if result["tags"]:
+            lines += ["", "Tags:"]
+            lines += [f"  {n:6d}  {tag}" for tag, n in list(result["tags"].items())[:limit]]
+        return "\n".join(lines) + "\n"
+
+
+# Глобальный экземпляр Sampling Profiler
+_global_profiler: Optional[SamplingProfiler] = None
+
+
+def get_profiler() -> SamplingProfiler:
+    """Получить глобальный Sampling Profiler (Singleton)"""
+    global _global_profiler
+    if _global_profiler is None:
+        _global_profiler = SamplingProfiler(
+            **{k: v for k, v in PROFILER_CONFIG.items() if k != "token"}
+        )
+    return _global_profiler
+
+
+# Экспорт
+__all__ = ["SamplingProfiler", "get_profiler", "profile_tag"]
@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Telegram Queue - исходящие сообщения вне торгового пути
+- Вызывающий только ставит сообщение в очередь; отправляет фоновый worker
+- Приоритеты: critical > high > medium > low
+- Token bucket на чат (~1 msg/s) и общий (~30 msg/s) - лимиты Telegram
+- 429 (RetryAfter): пауза чата на retry_after и повтор без потери сообщения
+- Всплески алертов одного типа склеиваются в digest-сообщение
+- Редактирования: одинаковое содержимое не отправляется, ожидающее
+  редактирование того же сообщения заменяется последним
+- Метрики: задержка в очереди, отправлено, склеено, отброшено
+"""
+
+import asyncio
+import hashlib
+import itertools
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import logger, TELEGRAM_QUEUE_CONFIG
+
+
+PRIORITIES = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+
+# Лимит длины сообщения Telegram (с запасом под заголовок digest)
+MAX_MESSAGE_LENGTH = 4000
+
+DIGEST_SEPARATOR = "\n\n━━━━━━━━━━━━━━━━━━━━\n\n"
+
+
+class _Bucket:
+    """Token bucket чата (или общий) с паузой после 429"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated", "paused_until")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def delay(self, now: float) -> float:
+        """Сколько ждать до токена (0 - можно отправлять)"""
+        if now < self.paused_until:
+            return self.paused_until - now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def pause(self, seconds: float, now: float):
+        self.paused_until = max(self.paused_until, now + seconds)
+        self.tokens = 0.0
+        self.updated = now
+
+
+class _Outbound:
+    """Сообщение (или digest, или редактирование) в очереди"""
+
+    __slots__ = (
+        "priority",
+        "seq",
+        "chat_id",
+        "texts",
+        "parse_mode",
+        "kwargs",
+        "alert_type",
+        "created",
+        "ready_at",
+        "futures",
+        "edit_key",
+        "edit_func",
+        "fingerprint",
+        "attempts",
+    )
+
+    def __init__(self, priority: int, seq: int, chat_id: Any, text: str, now: float):
+        self.priority = priority
+        self.seq = seq
+        self.chat_id = chat_id
+        self.texts = [text]
+        self.parse_mode = None
+        self.kwargs: Dict[str, Any] = {}
+        self.alert_type: Optional[str] = None
+        self.created = now
+        self.ready_at = now
+        self.futures: List[asyncio.Future] = []
+        self.edit_key: Optional[Hashable] = None
+        self.edit_func: Optional[Callable[[str], Awaitable[Any]]] = None
+        self.fingerprint: Optional[str] = None
+        self.attempts = 0
+
+    @property
+    def length(self) -> int:
+        return sum(len(t) for t in self.texts) + len(DIGEST_SEPARATOR) * (len(self.texts) - 1)
+
+    def render(self) -> str:
+        if len(self.texts) == 1:
+            return self.texts[0]
+        header = f"📦 {self.alert_type}: {len(self.texts)} уведомлений"
+        return header + DIGEST_SEPARATOR + DIGEST_SEPARATOR.join(self.texts)
+
+
+def _fingerprint(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class OutboundMessageQueue:
+    """Приоритетная очередь исходящих Telegram сообщений"""
+
+    def __init__(
+        self,
+        sender: Optional[Callable[..., Awaitable[Any]]] = None,
+        per_chat_rate: float = 1.0,
+        per_chat_burst: float = 3.0,
+        global_rate: float = 25.0,
+        max_queue: int = 500,
+        coalesce_window: float = 2.0,
+        coalesce_max: int = 10,
+        max_age_seconds: float = 600.0,
+        max_retries: int = 3,
+    ):
+        """
+        Args:
+            sender: async sender(chat_id, text, parse_mode, **kwargs) - отправка нового сообщения
+            per_chat_rate: Сообщений в секунду на чат
+            per_chat_burst: Ёмкость bucket чата
+            global_rate: Сообщений в секунду на всех
+            max_queue: Максимум сообщений в очереди (сверх - вытесняется худший приоритет)
+            coalesce_window: Задержка алерта с типом для склейки всплеска (секунды)
+            coalesce_max: Максимум алертов в одном digest
+            max_age_seconds: Не-critical сообщения старше - отбрасываются
+            max_retries: Повторов после 429
+        """
+        self.sender = sender
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.max_queue = max_queue
+        self.coalesce_window = coalesce_window
+        self.coalesce_max = coalesce_max
+        self.max_age_seconds = max_age_seconds
+        self.max_retries = max_retries
+
+        self._items: List[_Outbound] = []
+        self._digests: Dict[Tuple[Any, str], _Outbound] = {}
+        self._edits: Dict[Hashable, _Outbound] = {}
+        self._last_edit: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._buckets: Dict[Any, _Bucket] = {}
+        self._global = _Bucket(global_rate, global_rate)
+        self._seq = itertools.count()
+
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._latencies: deque = deque(maxlen=1000)
+
+        self.stats = {
+            "enqueued": 0,
+            "sent": 0,
+            "digests": 0,
+            "coalesced": 0,
+            "edits": 0,
+            "edits_deduped": 0,
+            "edits_conflated": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "failed": 0,
+            "dropped_full": 0,
+            "dropped_expired": 0,
+            "max_depth": 0,
+        }
+
+    # ========== ПОСТАНОВКА В ОЧЕРЕДЬ ==========
+
+    async def send(
+        self,
+        chat_id: Any,
+        text: str,
+        priority: str = "medium",
+        parse_mode: Optional[str] = None,
+        alert_type: Optional[str] = None,
+        wait: bool = False,
+        **kwargs,
+    ) -> Any:
+        """
+        Поставить сообщение в очередь
+
+        Args:
+            alert_type: Тип алерта; алерты одного типа и чата склеиваются в digest
+            wait: Дождаться отправки (результат sender или None)
+
+        Returns:
+            wait=False: True если принято в очередь
+        """
+        now = time.monotonic()
+        level = PRIORITIES.get(priority, PRIORITIES["medium"])
+        self.stats["enqueued"] += 1
+
+        # Склейка с ожидающим алертом того же типа
+        if alert_type and level > PRIORITIES["critical"]:
+            digest = self._digests.get((chat_id, alert_type))
+            if (
+                digest is not None
+                and digest.parse_mode == parse_mode
+                and len(digest.texts) < self.coalesce_max
+                and digest.length + len(DIGEST_SEPARATOR) + len(text) <= MAX_MESSAGE_LENGTH
+            ):
+                digest.texts.append(text)
+                digest.priority = min(digest.priority, level)
+                self.stats["coalesced"] += 1
+                return await self._accepted(digest, wait)
+
+        item = _Outbound(level, next(self._seq), chat_id, text, now)
+        item.parse_mode = parse_mode
+        item.kwargs = kwargs
+        if alert_type and level > PRIORITIES["critical"]:
+            item.alert_type = alert_type
+            item.ready_at = now + self.coalesce_window
+            self._digests[(chat_id, alert_type)] = item
+
+        if not self._push(item):
+            return None if wait else False
+        return await self._accepted(item, wait)
+
+    async def edit(
+        self,
+        key: Hashable,
+        text: str,
+        edit_func: Callable[[str], Awaitable[Any]],
+        fingerprint: Optional[str] = None,
+        priority: str = "low",
+        wait: bool = False,
+    ) -> Any:
+        """
+        Редактирование уже отправленного сообщения
+
+        Args:
+            key: Ключ сообщения, например (chat_id, message_id)
+            edit_func: async edit_func(text) - вызов edit API
+            fingerprint: Содержимое для сравнения (по умолчанию - text);
+                счётчики/время обновления стоит исключить
+
+        Returns:
+            False если содержимое не изменилось (редактирование не нужно);
+            wait=True: результат edit_func, None при ошибке/отбрасывании
+        """
+        fingerprint = _fingerprint(fingerprint if fingerprint is not None else text)
+        self.stats["enqueued"] += 1
+
+        pending = self._edits.get(key)
+        if pending is not None:
+            # Ожидающее редактирование заменяется последним состоянием
+            pending.texts = [text]
+            pending.edit_func = edit_func
+            pending.fingerprint = fingerprint
+            self.stats["edits_conflated"] += 1
+            return await self._accepted(pending, wait)
+
+        if self._last_edit.get(key) == fingerprint:
+            self.stats["edits_deduped"] += 1
+            return False
+
+        item = _Outbound(
+            PRIORITIES.get(priority, PRIORITIES["low"]), next(self._seq), key, text, time.monotonic()
+        )
+        if isinstance(key, tuple) and key:
+            item.chat_id = key[0]
+        item.edit_key = key
+        item.edit_func = edit_func
+        item.fingerprint = fingerprint
+        self._edits[key] = item
+
+        if not self._push(item):
+            return None if wait else False
+        return await self._accepted(item, wait)
+
+    async def _accepted(self, item: _Outbound, wait: bool) -> Any:
+        self._ensure_worker()
+        self._wakeup.set()
+        if not wait:
+            return True
+        future = asyncio.get_running_loop().create_future()
+        item.futures.append(future)
+        return await future
+
+    def _push(self, item: _Outbound) -> bool:
+        """Добавить в очередь; при переполнении вытесняется худший приоритет"""
+        if len(self._items) >= self.max_queue:
+            worst = max(self._items, key=lambda i: (i.priority, i.seq))
+            if worst.priority <= item.priority:
+                self.stats["dropped_full"] += 1
+                self._forget(item)
+                logger.warning("⚠️ Telegram очередь переполнена, сообщение отброшено")
+                return False
+            self._drop(worst, "dropped_full")
+
+        self._items.append(item)
+        self.stats["max_depth"] = max(self.stats["max_depth"], len(self._items))
+        return True
+
+    # ========== WORKER ==========
+
+    def _ensure_worker(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._worker())
+
+    def _bucket(self, chat_id: Any) -> _Bucket:
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._buckets[chat_id] = _Bucket(self.per_chat_rate, self.per_chat_burst)
+        return bucket
+
+    def _forget(self, item: _Outbound):
+        if item.alert_type and self._digests.get((item.chat_id, item.alert_type)) is item:
+            del self._digests[(item.chat_id, item.alert_type)]
+        if item.edit_key is not None and self._edits.get(item.edit_key) is item:
+            del self._edits[item.edit_key]
+
+    def _resolve(self, item: _Outbound, result: Any):
+        for future in item.futures:
+            if not future.done():
+                future.set_result(result)
+
+    def _drop(self, item: _Outbound, reason: str):
+        self._items.remove(item)
+        self._forget(item)
+        self.stats[reason] += len(item.texts)
+        self._resolve(item, None)
+
+    def _next_ready(self, now: float) -> Tuple[Optional[_Outbound], Optional[float]]:
+        """Первое по приоритету сообщение, которое можно отправить сейчас"""
+        wait = None
+        global_delay = self._global.delay(now)
+
+        for item in sorted(self._items, key=lambda i: (i.priority, i.seq)):
+            if item.priority > PRIORITIES["critical"] and now - item.created > self.max_age_seconds:
+                self._drop(item, "dropped_expired")
+                continue
+
+            delay = max(item.ready_at - now, self._bucket(item.chat_id).delay(now), global_delay)
+            if delay <= 0:
+                return item, None
+            wait = delay if wait is None else min(wait, delay)
+
+        return None, wait
+
+    async def _worker(self):
+        """Фоновая отправка с соблюдением лимитов"""
+        while True:
+            try:
+                now = time.monotonic()
+                item, wait = self._next_ready(now)
+
+                if item is None:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                self._items.remove(item)
+                self._forget(item)
+                self._bucket(item.chat_id).take()
+                self._global.take()
+                await self._deliver(item)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Ошибка Telegram очереди: {e}")
+                await asyncio.sleep(1)
+
+    async def _deliver(self, item: _Outbound):
+        try:
+            if item.edit_func is not None:
+                result = await item.edit_func(item.texts[0])
+            else:
+                if self.sender is None:
+                    raise RuntimeError("sender не настроен")
+                result = await self.sender(
+                    item.chat_id, item.render(), item.parse_mode, **item.kwargs
+                )
+
+        except Exception as e:
+            retry_after = getattr(e, "retry_after", None)
+            if retry_after is not None:
+                # telegram.error.RetryAfter: int или timedelta в новых версиях
+                seconds = getattr(retry_after, "total_seconds", lambda: retry_after)()
+                now = time.monotonic()
+                self._bucket(item.chat_id).pause(float(seconds), now)
+                self.stats["rate_limited"] += 1
+
+                if item.attempts < self.max_retries:
+                    item.attempts += 1
+                    item.ready_at = now
+                    self.stats["retries"] += 1
+                    self._items.append(item)
+                    if item.edit_key is not None and item.edit_key not in self._edits:
+                        self._edits[item.edit_key] = item
+                    logger.warning(f"⚠️ Telegram 429: пауза {float(seconds):.0f}s для {item.chat_id}")
+                    return
+
+            if item.edit_func is not None and "message is not modified" in str(e).lower():
+                self._remember_edit(item)
+                self.stats["edits_deduped"] += 1
+                self._resolve(item, False)
+                return
+
+            self.stats["failed"] += len(item.texts)
+            logger.error(f"❌ Ошибка отправки в Telegram: {e}")
+            self._resolve(item, None)
+            return
+
+        now = time.monotonic()
+        self._latencies.append(now - item.created)
+        if item.edit_func is not None:
+            self._remember_edit(item)
+            self.stats["edits"] += 1
+        else:
+            self.stats["sent"] += 1
+            if len(item.texts) > 1:
+                self.stats["digests"] += 1
+        self._resolve(item, result)
+
+    def _remember_edit(self, item: _Outbound):
+        self._last_edit[item.edit_key] = item.fingerprint
+        self._last_edit.move_to_end(item.edit_key)
+        while len(self._last_edit) > 1000:
+            self._last_edit.popitem(last=False)
+
+    # ========== УПРАВЛЕНИЕ ==========
+
+    async def stop(self, flush_timeout: float = 5.0):
+        """Остановка worker после попытки отправить очередь"""
+        if self._task is None:
+            return
+        deadline = time.monotonic() + flush_timeout
+        while self._items and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        for item in list(self._items):
+            self._drop(item, "dropped_expired")
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Метрики очереди: глубина, задержка (мс), отправлено/склеено/отброшено"""
+        by_priority = {name: 0 for name in PRIORITIES}
+        names = {level: name for name, level in PRIORITIES.items()}
+        for item in self._items:
+            by_priority[names[item.priority]] += 1
+
+        latency = {"avg_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        if self._latencies:
+            samples = np.fromiter(self._latencies, dtype=np.float64) * 1000
+            latency = {
+                "avg_ms": round(float(samples.mean()), 1),
+                "p95_ms": round(float(np.percentile(samples, 95)), 1),
+                "max_ms": round(float(samples.max()), 1),
+            }
+
+        return {
+            **self.stats,
+            "queued": len(self._items),
+            "by_priority": by_priority,
+            "latency": latency,
+        }
+
+
+# Глобальный экземпляр Telegram Queue
+_global_telegram_queue: Optional[OutboundMessageQueue] = None
+
+
+def get_telegram_queue() -> OutboundMessageQueue:
+    """Получить глобальную очередь исходящих сообщений (Singleton)"""
+    global _global_telegram_queue
+    if _global_telegram_queue is None:
+        _global_telegram_queue = OutboundMessageQueue(**TELEGRAM_QUEUE_CONFIG)
+    return _global_telegram_queue
+
+
+# Экспорт
+__all__ = ["OutboundMessageQueue", "PRIORITIES", "get_telegram_queue"]
@@ -2,14 +2,16 @@
 """
 WebSocket Manager
 Robust WebSocket connection with automatic reconnection and health monitoring
+Чтение сокета не ждёт обработчик: сообщения уходят в очереди TopicDispatcher
 """
 
 import asyncio
 import json
 import websockets
-from typing import Callable, Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any, Iterable, Tuple
 from datetime import datetime
 from config.settings import logger
+from utils.dispatch_queue import TopicDispatcher
 
 
 class WebSocketManager:
@@ -19,6 +21,7 @@ class WebSocketManager:
     - Health monitoring
     - Exponential backoff
     - Connection pooling
+    - Dispatch очередями по темам (conflating для снимков, FIFO для сделок)
     """
 
     def __init__(
@@ -32,7 +35,15 @@ class WebSocketManager:
         reconnect_delay: int = 5,
         max_reconnect_attempts: int = 10,
         name: str = "WebSocket",
+        topic_of: Optional[Callable[[Dict], Tuple[str, Any]]] = None,
+        conflate_topics: Iterable[str] = (),
     ):
+        """
+        Args:
+            topic_of: data -> (тема, ключ); по умолчанию одна FIFO тема
+            conflate_topics: Темы, где по ключу (символу) нужен только
+                             последний снимок (стакан depth, тикер)
+        """
         self.url = url
         self.on_message = on_message
         self.on_connect = on_connect
@@ -42,6 +53,11 @@ class WebSocketManager:
         self.reconnect_delay = reconnect_delay
         self.max_reconnect_attempts = max_reconnect_attempts
         self.name = name
+        self.topic_of = topic_of
+        self.conflate_topics = set(conflate_topics)
+
+        # Очереди обработки: reader не блокируется на on_message
+        self.dispatcher = TopicDispatcher(name)
 
         # State
         self.running = False
@@ -97,7 +113,7 @@ class WebSocketManager:
 
                     try:
                         data = json.loads(message)
-                        await self.on_message(data)
+                        self._dispatch(data)
                     except json.JSONDecodeError as e:
                         logger.error(f"❌ {self.name}: JSON decode error: {e}")
                     except Exception as e:
@@ -107,6 +123,13 @@ class WebSocketManager:
             logger.error(f"❌ {self.name}: Connection error: {e}")
             raise
 
+    def _dispatch(self, data: Dict):
+        """Положить сообщение в очередь его темы (не ждёт обработчик)"""
+        topic, key = self.topic_of(data) if self.topic_of else ("messages", None)
+        if topic not in self.conflate_topics:
+            key = None  # FIFO без потерь
+        self.dispatcher.submit(topic, self.on_message, data, key=key)
+
     async def _handle_disconnect(self):
         """Обработка отключения"""
         if self.on_disconnect:
@@ -139,6 +162,8 @@ class WebSocketManager:
             await self.ws.close()
             logger.info(f"🔌 {self.name}: WebSocket закрыт")
 
+        await self.dispatcher.stop()
+
     async def send(self, message: Dict[Any, Any]):
         """Отправка сообщения"""
         if self.ws and not self.ws.closed:
@@ -165,6 +190,7 @@ class WebSocketManager:
             "last_message": (
                 self.last_message_time.isoformat() if self.last_message_time else None
             ),
+            "queues": self.dispatcher.get_stats(),
         }
 
     def is_healthy(self) -> bool: